@@ -0,0 +1,232 @@
+# benchmarks/adapter_benchmark.py - Vazão e saídas de referência do prompt_adapter
+"""
+Mede tempo (perf_counter), vazão e pico de memória (tracemalloc) dos
+extratores de utils/prompt_adapter.py sobre o corpus de payloads
+(benchmarks/adapter_corpus.py) e confere as saídas com as de referência em
+benchmarks/corpus/golden/, para que otimizações possam ser verificadas como
+equivalentes.
+
+Roda offline: nenhuma chamada à API. As bases locais consultadas pelos
+extratores (H2H, janelas móveis, ratings e armazém de partidas) apontam para
+um diretório temporário vazio, para que o resultado não dependa do que existe
+em DATA_DIR.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.adapter_benchmark                  # tempo + conferência das saídas
+    python -m benchmarks.adapter_benchmark --golden-only    # só a conferência
+    python -m benchmarks.adapter_benchmark --update-golden  # grava novas saídas de referência
+    python -m benchmarks.adapter_benchmark --filter simplify --payload brasileirao_palmeiras_flamengo
+
+Sai com código 1 se alguma saída diferir da referência.
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+
+from benchmarks.adapter_corpus import GOLDEN_DIR, load_corpus
+from benchmarks.run_benchmarks import measure
+
+# Diferenças listadas por função quando a saída não bate com a referência
+MAX_REPORTED_DIFFS = 10
+
+
+def build_functions():
+    """
+    Funções medidas, cada uma recebendo (entrada preparada, entrada do manifesto)
+
+    Returns:
+        list: [(nome, função)]
+    """
+    from utils.prompt_adapter import (
+        simplify_api_data, transform_to_highly_optimized_data, extract_deep_team_data,
+        validate_stats_for_agent
+    )
+
+    return [
+        ("simplify_api_data",
+         lambda payload, entry: simplify_api_data(payload, entry["home_team"], entry["away_team"])),
+        ("transform_to_highly_optimized_data",
+         lambda payload, entry: transform_to_highly_optimized_data(payload, entry["home_team"], entry["away_team"])),
+        ("extract_deep_team_data",
+         lambda payload, entry: extract_deep_team_data(payload, entry["home_team"], entry["away_team"],
+                                                       log_details=False)),
+        ("validate_stats_for_agent", lambda stats_data, entry: validate_stats_for_agent(stats_data)),
+    ]
+
+
+def isolate_local_stores(directory):
+    """
+    Aponta as bases SQLite locais lidas por simplify_api_data para `directory`
+    (sem arquivos: as consultas retornam None sem criar bases)
+    """
+    import utils.h2h_store as h2h_store
+    import utils.match_warehouse as match_warehouse
+    import utils.rolling_features as rolling_features
+    import utils.team_ratings as team_ratings
+
+    h2h_store.H2H_DB_FILE = os.path.join(directory, "h2h.db")
+    h2h_store._shared_store = None
+    match_warehouse.MATCH_WAREHOUSE_DB_FILE = os.path.join(directory, "match_warehouse.db")
+    match_warehouse._shared_warehouse = None
+    rolling_features.ROLLING_FEATURES_DB_FILE = os.path.join(directory, "rolling_features.db")
+    rolling_features._shared_store = None
+    team_ratings.TEAM_RATINGS_DB_FILE = os.path.join(directory, "team_ratings.db")
+    team_ratings._shared_store = None
+
+
+def prepare_input(name, payload, entry):
+    """Entrada de cada função: o payload, ou a saída de simplify_api_data para validate_stats_for_agent"""
+    if name == "validate_stats_for_agent":
+        from utils.prompt_adapter import simplify_api_data
+        return simplify_api_data(payload, entry["home_team"], entry["away_team"])
+    return payload
+
+
+def normalize(output):
+    """Saída em JSON canônico (chaves ordenadas; tipos não serializáveis como texto)"""
+    return json.loads(json.dumps(output, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def golden_path(entry):
+    return os.path.join(GOLDEN_DIR, f"{entry['name']}.json")
+
+
+def load_golden(entry):
+    path = golden_path(entry)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_golden(entry, outputs):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(golden_path(entry), "w", encoding="utf-8") as f:
+        json.dump(outputs, f, indent=1, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
+def diff_paths(expected, actual, path="", out=None):
+    """Caminhos (a.b[0].c) onde as duas estruturas divergem"""
+    out = [] if out is None else out
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            child = f"{path}.{key}" if path else key
+            if key not in expected or key not in actual:
+                out.append(f"{child}: {expected.get(key, '<ausente>')!r} -> {actual.get(key, '<ausente>')!r}")
+            else:
+                diff_paths(expected[key], actual[key], child, out)
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            diff_paths(left, right, f"{path}[{index}]", out)
+    elif expected != actual:
+        out.append(f"{path}: {expected!r} -> {actual!r}")
+    return out
+
+
+def main():
+    store_dir = tempfile.mkdtemp(prefix="adapter_benchmark_")
+    try:
+        isolate_local_stores(store_dir)
+        return run(parse_args())
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vazão e saídas de referência do prompt_adapter")
+    parser.add_argument("--filter", help="Apenas funções cujo nome contém este texto")
+    parser.add_argument("--payload", action="append", help="Apenas estas entradas do corpus (repetível)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Tempo mínimo por caso em segundos")
+    parser.add_argument("--golden-only", action="store_true", help="Só conferir as saídas de referência")
+    parser.add_argument("--no-golden", action="store_true", help="Só medir (sem conferir as saídas)")
+    parser.add_argument("--update-golden", action="store_true", help="Gravar as saídas atuais como referência")
+    parser.add_argument("--output", help="Arquivo JSON para gravar as medições")
+    return parser.parse_args()
+
+
+def run(args):
+    """Medições e conferência das saídas (bases locais já isoladas)"""
+    # Os extratores registram muitos logs; medir sem o custo do handler
+    logging.disable(logging.CRITICAL)
+
+    corpus = load_corpus(args.payload)
+    if not corpus:
+        print("Corpus vazio (python -m benchmarks.adapter_corpus synthetic)")
+        return 1
+
+    functions = build_functions()
+    if args.filter:
+        functions = [(name, func) for name, func in functions if args.filter in name]
+
+    failures = []
+    results = {}
+    if not args.golden_only and not args.update_golden:
+        print(f"{'payload':36s} {'função':36s} {'mínimo':>10s} {'mediana':>10s} {'por s':>8s} {'pico mem':>10s}")
+        for entry, payload in corpus:
+            for name, func in functions:
+                # Cópia própria do payload por função: algumas alteram a entrada
+                data = prepare_input(name, json.loads(json.dumps(payload)), entry)
+                result = measure(lambda: func(data, entry), min_time=args.min_time)
+                results[f"{name}[{entry['name']}]"] = result
+                print(f"{entry['name']:36s} {name:36s} {result['min_us']:>8.1f}us {result['median_us']:>8.1f}us "
+                      f"{1e6 / result['median_us']:>8.0f} {result['peak_bytes'] / 1024:>8.1f}KB")
+
+        totals = {}
+        for name, _ in functions:
+            medians = [results[f"{name}[{entry['name']}]"]["median_us"] for entry, _ in corpus]
+            totals[name] = sum(medians)
+        print(f"\nVazão no corpus ({len(corpus)} payloads):")
+        for name, total_us in totals.items():
+            print(f"  {name:36s} {len(corpus) * 1e6 / total_us:>8.0f} payloads/s")
+
+    if not args.no_golden:
+        for entry, payload in corpus:
+            # Saídas de cópias novas do payload (a medição pode ter alterado as anteriores)
+            outputs = {}
+            for name, func in functions:
+                data = prepare_input(name, json.loads(json.dumps(payload)), entry)
+                outputs[name] = normalize(func(data, entry))
+
+            if args.update_golden:
+                golden = load_golden(entry) or {}
+                golden.update(outputs)
+                save_golden(entry, golden)
+                print(f"Referência gravada: {golden_path(entry)}")
+                continue
+
+            golden = load_golden(entry)
+            if golden is None:
+                failures.append((entry["name"], "-", ["sem saída de referência (use --update-golden)"]))
+                continue
+            for name, output in outputs.items():
+                if name not in golden:
+                    failures.append((entry["name"], name, ["sem saída de referência (use --update-golden)"]))
+                elif output != golden[name]:
+                    failures.append((entry["name"], name, diff_paths(golden[name], output)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        print("\nSAÍDAS DIFERENTES DA REFERÊNCIA:")
+        for payload_name, name, diffs in failures:
+            print(f"- {payload_name} / {name}")
+            for line in diffs[:MAX_REPORTED_DIFFS]:
+                print(f"    {line}")
+            if len(diffs) > MAX_REPORTED_DIFFS:
+                print(f"    ... mais {len(diffs) - MAX_REPORTED_DIFFS}")
+        return 1
+
+    if not args.no_golden and not args.update_golden:
+        print("\nSaídas iguais às de referência")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
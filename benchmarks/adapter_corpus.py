@@ -0,0 +1,198 @@
+# benchmarks/adapter_corpus.py - Corpus de payloads complete_analysis para o prompt_adapter
+"""
+Corpus de payloads no formato de utils/enhanced_api_client.get_complete_match_analysis
+usado por benchmarks/adapter_benchmark.py (tempo, memória e saídas de referência).
+
+Cada payload fica em benchmarks/corpus/<nome>.json.gz e é descrito em
+benchmarks/corpus/manifest.json (times, liga, temporada e origem):
+- "recorded": gravado da API com este script (requer a chave da FootyStats)
+- "synthetic": gerado por benchmarks/payloads.py, com variações de estrutura
+  (sem H2H, sem advanced_stats, lastx vazio...) para cobrir os ramos de fallback
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.adapter_corpus record --home Palmeiras --away Flamengo --season 14231 --league "Brasileirão"
+    python -m benchmarks.adapter_corpus synthetic
+    python -m benchmarks.adapter_corpus list
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import logging
+import argparse
+from datetime import datetime
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+MANIFEST_FILE = os.path.join(CORPUS_DIR, "manifest.json")
+GOLDEN_DIR = os.path.join(CORPUS_DIR, "golden")
+
+# Payloads sintéticos: (nome, liga, temporada, casa, visitante, times na liga, seed, variação)
+SYNTHETIC_FIXTURES = (
+    ("premier_league_arsenal_chelsea", "Premier League", 12325, "Arsenal", "Chelsea", 20, 0, None),
+    ("brasileirao_palmeiras_flamengo", "Brasileirão", 14231, "Palmeiras", "Flamengo", 20, 1, None),
+    ("la_liga_barcelona_real_madrid", "La Liga", 12316, "Barcelona", "Real Madrid", 20, 2, "no_h2h"),
+    ("liga_profesional_boca_river", "Liga Profesional", 14125, "Boca Juniors", "River Plate", 28, 3,
+     "no_advanced_stats"),
+    ("eredivisie_ajax_psv", "Eredivisie", 12322, "Ajax", "PSV", 18, 4, "empty_lastx"),
+    ("mls_inter_miami_la_galaxy", "MLS", 13973, "Inter Miami", "LA Galaxy", 29, 5, "flat_team_stats"),
+)
+
+
+def _apply_variation(payload, variation):
+    """Remove ou achata partes do payload como nas respostas incompletas da API"""
+    if variation == "no_h2h":
+        payload.pop("head_to_head", None)
+        payload["match_details"].pop("h2h", None)
+    elif variation == "no_advanced_stats":
+        payload.pop("advanced_stats", None)
+    elif variation == "empty_lastx":
+        payload["team_form"] = {"home": [], "away": []}
+    elif variation == "flat_team_stats":
+        # league-teams sem o objeto aninhado "stats" (estatísticas no próprio time)
+        for side in ("home_team", "away_team"):
+            team = payload["basic_stats"][side]["stats"]
+            team.update(team.pop("stats"))
+    return payload
+
+
+def slugify(text):
+    text = re.sub(r"[^a-z0-9]+", "_", text.lower())
+    return text.strip("_")
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return []
+    with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(entries):
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    entries = sorted(entries, key=lambda entry: entry["name"])
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_payload(entry):
+    """Payload de uma entrada do manifesto (sempre uma cópia nova)"""
+    with gzip.open(os.path.join(CORPUS_DIR, entry["file"]), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_corpus(names=None):
+    """
+    Entradas do manifesto com os payloads
+
+    Args:
+        names (iterable): Apenas estas entradas (None = todas)
+
+    Returns:
+        list: [(entrada do manifesto, payload)]
+    """
+    entries = load_manifest()
+    if names:
+        names = set(names)
+        entries = [entry for entry in entries if entry["name"] in names]
+    return [(entry, load_payload(entry)) for entry in entries]
+
+
+def add_payload(name, payload, home_team, away_team, league, season_id, source):
+    """
+    Grava um payload no corpus e atualiza o manifesto (substitui a entrada de mesmo nome)
+
+    Returns:
+        dict: Entrada do manifesto
+    """
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    filename = f"{name}.json.gz"
+    # mtime fixo: o mesmo payload gera sempre o mesmo arquivo
+    with open(os.path.join(CORPUS_DIR, filename), "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+    entry = {
+        "name": name,
+        "file": filename,
+        "home_team": home_team,
+        "away_team": away_team,
+        "league": league,
+        "season_id": season_id,
+        "source": source,
+    }
+    if source == "recorded":
+        entry["recorded_at"] = datetime.now().strftime("%Y-%m-%d")
+    entries = [existing for existing in load_manifest() if existing["name"] != name]
+    entries.append(entry)
+    save_manifest(entries)
+    return entry
+
+
+def build_synthetic_corpus():
+    """Grava os payloads sintéticos de SYNTHETIC_FIXTURES"""
+    from benchmarks.payloads import build_payload
+
+    entries = []
+    for name, league, season_id, home, away, teams, seed, variation in SYNTHETIC_FIXTURES:
+        payload = build_payload(seed, teams=teams, home_name=home, away_name=away)
+        payload["basic_stats"]["league_id"] = season_id
+        _apply_variation(payload, variation)
+        entries.append(add_payload(name, payload, home, away, league, season_id, "synthetic"))
+    return entries
+
+
+def record_payload(home_team, away_team, season_id, league="", name=None, force_refresh=False):
+    """
+    Grava no corpus o complete_analysis real de uma partida
+
+    Returns:
+        dict: Entrada do manifesto, ou None se a API não retornou dados
+    """
+    from utils.enhanced_api_client import get_complete_match_analysis
+
+    payload = get_complete_match_analysis(home_team, away_team, season_id, force_refresh=force_refresh)
+    if not isinstance(payload, dict) or not payload:
+        return None
+    name = name or slugify(f"{league or season_id}_{home_team}_{away_team}")
+    return add_payload(name, payload, home_team, away_team, league, season_id, "recorded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus de payloads complete_analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Gravar um payload real da API")
+    record.add_argument("--home", required=True)
+    record.add_argument("--away", required=True)
+    record.add_argument("--season", type=int, required=True, help="season_id da liga na FootyStats")
+    record.add_argument("--league", default="")
+    record.add_argument("--name", help="Nome da entrada (padrão: liga_casa_visitante)")
+    record.add_argument("--force-refresh", action="store_true", help="Ignorar o cache da API")
+
+    commands.add_parser("synthetic", help="Gravar os payloads sintéticos")
+    commands.add_parser("list", help="Listar o corpus")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == "record":
+        entry = record_payload(args.home, args.away, args.season, args.league, args.name, args.force_refresh)
+        if not entry:
+            print("A API não retornou dados para esta partida")
+            return 1
+        print(f"Gravado: {entry['file']}")
+        print("Atualize as saídas de referência: python -m benchmarks.adapter_benchmark --update-golden")
+    elif args.command == "synthetic":
+        for entry in build_synthetic_corpus():
+            print(f"Gravado: {entry['file']}")
+    else:
+        for entry in load_manifest():
+            print(f"{entry['name']:40s} {entry['source']:9s} {entry['league']:18s} "
+                  f"{entry['home_team']} x {entry['away_team']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/extraction_benchmark.py - Custo da extração do payload da FootyStats
+"""
+Compara a extração pelo plano compilado (utils/extraction_plan.py, usada por
+simplify_api_data, completa e só com os campos de Money Line) com a extração
+que ela substituiu, congelada em benchmarks/legacy_extraction.py (caminhos
+diretos + busca recursiva na árvore inteira), em payloads sintéticos no
+formato de complete_analysis (benchmarks/payloads.py). Mede tempo
+(perf_counter) e pico de alocação (tracemalloc) por análise.
+
+Referência registrada na introdução do plano (1 CPU, 20 times por liga):
+extração anterior ~9ms e 38KiB de pico; simplify_api_data ~0,36ms e 8,7KiB.
+generic_search (o fallback atual, já sobre o AliasIndex) aparece só como
+informação e não entra no gate.
+
+Roda offline: nenhuma chamada à API.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.extraction_benchmark
+    python -m benchmarks.extraction_benchmark --payloads 5 --repeat 500 --min-speedup 10
+
+Sai com código 1 se o ganho de tempo sobre a extração anterior ficar abaixo de
+--min-speedup ou se o pico de memória não for menor que o dela.
+"""
+import gc
+import sys
+import time
+import logging
+import argparse
+import statistics
+import tracemalloc
+
+HOME_TEAM = "Arsenal"
+AWAY_TEAM = "Chelsea"
+
+DEFAULT_MIN_SPEEDUP = 10.0
+
+
+def measure(func, repeat):
+    """Mediana do tempo (µs) e pico de alocação (bytes) de func()"""
+    func()
+    gc.collect()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extração: plano compilado vs busca recursiva")
+    parser.add_argument("--payloads", type=int, default=3, help="Payloads sintéticos (seeds)")
+    parser.add_argument("--teams", type=int, default=20, help="Times por liga (tamanho das tabelas)")
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--min-speedup", type=float, default=DEFAULT_MIN_SPEEDUP)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    from benchmarks.legacy_extraction import legacy_extract
+    from benchmarks.payloads import build_payload
+    from utils.extraction_plan import generic_search, extract_with_plan
+    from utils.prompt_adapter import simplify_api_data
+
+    cases = (
+        ("simplify_api_data", lambda payload: simplify_api_data(payload, HOME_TEAM, AWAY_TEAM)),
+        ("simplify_api_data (money_line)",
+         lambda payload: simplify_api_data(payload, HOME_TEAM, AWAY_TEAM, {"money_line": True})),
+        ("extract_with_plan", lambda payload: extract_with_plan(payload, HOME_TEAM, AWAY_TEAM)),
+        ("extração anterior (congelada)", lambda payload: legacy_extract(payload, HOME_TEAM, AWAY_TEAM)),
+        ("generic_search (fallback atual)", lambda payload: generic_search(payload, HOME_TEAM, AWAY_TEAM)),
+    )
+
+    totals = {name: [0.0, 0] for name, _ in cases}
+    for seed in range(args.payloads):
+        payload = build_payload(seed, teams=args.teams, home_name=HOME_TEAM, away_name=AWAY_TEAM)
+        for name, func in cases:
+            # A busca recursiva é ordens de grandeza mais lenta: menos repetições
+            repeat = max(5, args.repeat // 20) if ("generic" in name or "anterior" in name) else args.repeat
+            median_us, peak = measure(lambda: func(payload), repeat)
+            totals[name][0] += median_us
+            totals[name][1] = max(totals[name][1], peak)
+            print(f"payload {seed}  {name:32s} {median_us:10.1f}µs  pico {peak / 1024:8.1f}KiB")
+
+    plan_us, plan_peak = totals["simplify_api_data"]
+    legacy_us, legacy_peak = totals["extração anterior (congelada)"]
+    speedup = legacy_us / plan_us if plan_us else float("inf")
+    print(f"\nGanho de tempo sobre a extração anterior: {speedup:.1f}x (mínimo {args.min_speedup:.1f}x)")
+    print(f"Pico de memória: {plan_peak / 1024:.1f}KiB (anterior {legacy_peak / 1024:.1f}KiB)")
+    return 0 if speedup >= args.min_speedup and plan_peak < legacy_peak else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# benchmarks/llm_load.py - Teste de carga do pipeline de análise com IA
+"""
+Simula vários usuários pedindo análises ao mesmo tempo contra o servidor
+local compatível com o OpenAI (utils/openai_stub.py), passando pelo cliente
+OpenAI real, pelo despachante (fila por tier) e pelo streaming de
+utils/ai.analyze_with_gpt. Reporta vazão, pedidos descartados e os percentis
+de espera na fila, primeiro trecho e latência registrados em utils/llm_metrics.py.
+
+Roda offline: o servidor simulado é iniciado no próprio processo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.llm_load
+    python -m benchmarks.llm_load --users 20 --concurrency 4 --latency 1.0 --sigma 0.5 --rate-limit 0.05
+    python -m benchmarks.llm_load --no-stream --parallel-sections
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+
+USER_TIERS = ("pro", "standard", "free")
+
+SELECTED_MARKETS = {
+    "money_line": True, "chance_dupla": True, "over_under": True,
+    "ambos_marcam": True, "escanteios": True, "cartoes": True
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga no pipeline de análise contra o OpenAI simulado")
+    parser.add_argument("--users", type=int, default=12, help="Pedidos simultâneos")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM_MAX_CONCURRENCY do despachante")
+    parser.add_argument("--max-queue", type=int, default=20, help="LLM_MAX_QUEUE do despachante")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mediana até o primeiro token (s)")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Dispersão log-normal da latência")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Proporção de respostas 429")
+    parser.add_argument("--no-stream", action="store_true", help="Chamadas bloqueantes em vez de streaming")
+    parser.add_argument("--parallel-sections", action="store_true", help="Análise em seções paralelas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Configuração lida na importação dos módulos
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+    os.environ["LLM_MAX_QUEUE"] = str(args.max_queue)
+    os.environ.pop("LLM_BACKEND", None)
+    logging.disable(logging.CRITICAL)
+
+    from utils.openai_stub import start_stub_server
+    server = start_stub_server(latency=args.latency, sigma=args.sigma, tokens_per_second=args.tokens_per_second,
+                               rate_limit=args.rate_limit, retry_after=0.2, seed=args.seed)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # Os 429 simulados chegam ao despachante (novas tentativas com backoff)
+    os.environ["OPENAI_MAX_RETRIES"] = "0"
+
+    import utils.llm_metrics as llm_metrics
+    from utils.ai import analyze_with_gpt
+    from utils.llm_dispatcher import get_llm_dispatcher
+
+    # Métricas desta execução em arquivo temporário (não mistura com as do app)
+    metrics_dir = tempfile.mkdtemp(prefix="llm_load_")
+    llm_metrics._shared_store = llm_metrics.LLMMetricsStore(os.path.join(metrics_dir, "llm_metrics.jsonl"))
+
+    results = []
+    results_lock = threading.Lock()
+    barrier = threading.Barrier(args.users)
+
+    def user(index):
+        tier = USER_TIERS[index % len(USER_TIERS)]
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            analysis = analyze_with_gpt(
+                f"Pedido de análise {index}",
+                selected_markets=SELECTED_MARKETS,
+                stream_callback=None if args.no_stream else (lambda text: None),
+                tier=tier,
+                raise_on_overload=True,
+                parallel_sections=args.parallel_sections
+            )
+            status = "ok" if analysis else "erro"
+        except Exception as e:
+            status = type(e).__name__
+        with results_lock:
+            results.append((tier, status, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(args.users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    ok = [r for r in results if r[1] == "ok"]
+    print(f"Pedidos: {len(results)} em {elapsed:.2f}s ({len(ok) / elapsed:.2f} análises/s)")
+    statuses = {}
+    for _, status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print("Resultados: " + ", ".join(f"{name}={count}" for name, count in sorted(statuses.items())))
+
+    print("\nTempo total por tier (s):")
+    for tier in USER_TIERS:
+        durations = [d for t, s, d in ok if t == tier]
+        if durations:
+            print(f"  {tier:9s} p50 {llm_metrics.percentile(durations, 50):6.2f}  "
+                  f"p95 {llm_metrics.percentile(durations, 95):6.2f}  (n={len(durations)})")
+
+    print("\nChamadas ao LLM (s):")
+    summary = llm_metrics.summarize(llm_metrics.get_llm_metrics_store().read())
+    for name, values in summary.items():
+        if values["count"]:
+            print(f"  {name:12s} " + "  ".join(f"{p} {values[p]:6.2f}" for p in ("p50", "p95", "p99"))
+                  + f"  (n={values['count']})")
+
+    print(f"\nServidor: {server.stats()}")
+    print(f"Despachante: {get_llm_dispatcher().stats()}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# benchmarks/payloads.py - Payloads sintéticos no formato de complete_analysis
+"""
+Gera payloads determinísticos com a mesma estrutura e ordem de grandeza de
+utils/enhanced_api_client.get_complete_match_analysis (league-teams com
+estatísticas completas, tabelas da liga, lastx, detalhes da partida e H2H),
+para medir o custo da extração do prompt_adapter sem acesso à API.
+"""
+import random
+
+# Estatísticas base do objeto "stats" de league-teams (cada uma com _overall/_home/_away)
+_STAT_BASES = (
+    "seasonMatchesPlayed", "seasonWinsNum", "seasonDrawsNum", "seasonLossesNum",
+    "seasonScoredNum", "seasonConcededNum", "seasonGoalsTotal", "seasonGoals", "seasonConceded",
+    "seasonPPG", "seasonCS", "seasonCSPercentage", "seasonBTTSPercentage", "seasonOver25Percentage",
+    "seasonFTSPercentage", "seasonFTS", "seasonBTTS", "seasonOver15Percentage", "seasonOver35Percentage",
+    "cardsAVG", "cardsTotal", "cards_for_avg", "cards_against_avg", "cornersAVG", "cornersAgainstAVG",
+    "cornersTotalAVG", "cornersTotal", "xg_for_avg", "xg_against_avg", "xg_for", "xg_against",
+    "shotsAVG", "shotsOnTargetAVG", "shotsOffTargetAVG", "possessionAVG", "foulsAVG", "offsidesAVG",
+    "winPercentage", "drawPercentage", "losePercentage", "leaguePosition", "dangerous_attacksAVG",
+    "attacksAVG", "firstGoalScoredPercentage", "leadingAtHTPercentage", "scoredBothHalvesPercentage",
+)
+
+# Estatísticas por faixa de minutos e linhas de gols (volume típico do payload real)
+_STAT_BANDS = (
+    "goals_scored_min", "goals_conceded_min", "cards_min", "corners_min",
+)
+_MINUTE_BANDS = ("0_to_10", "11_to_20", "21_to_30", "31_to_40", "41_to_50", "51_to_60",
+                 "61_to_70", "71_to_80", "81_to_90")
+_LINES = ("05", "15", "25", "35", "45", "55", "65", "75", "85", "95", "105", "115")
+
+_FORM_LETTERS = "wdl"
+
+
+def _team_stats(rng, played):
+    stats = {}
+    for base in _STAT_BASES:
+        for suffix in ("overall", "home", "away"):
+            key = f"{base}_{suffix}"
+            if "Percentage" in base:
+                stats[key] = rng.randint(10, 80)
+            elif "AVG" in base or "avg" in base or base == "seasonPPG":
+                stats[key] = round(rng.uniform(0.5, 12.0), 2)
+            elif base == "seasonMatchesPlayed":
+                stats[key] = played if suffix == "overall" else played // 2
+            else:
+                stats[key] = rng.randint(0, played * 3)
+    for band in _STAT_BANDS:
+        for minutes in _MINUTE_BANDS:
+            stats[f"{band}_{minutes}"] = rng.randint(0, 8)
+    for line in _LINES:
+        for kind in ("seasonOver{}Num", "seasonUnder{}Num", "over{}CornersPercentage", "over{}CardsPercentage"):
+            for suffix in ("overall", "home", "away"):
+                stats[f"{kind.format(line)}_{suffix}"] = rng.randint(0, 100)
+    stats["seasonRecentPPG"] = round(rng.uniform(0.5, 2.8), 2)
+    stats["formRun_overall"] = "".join(rng.choice(_FORM_LETTERS) for _ in range(5))
+    stats["formRun_home"] = "".join(rng.choice(_FORM_LETTERS) for _ in range(5))
+    stats["formRun_away"] = "".join(rng.choice(_FORM_LETTERS) for _ in range(5))
+    stats["additional_info"] = {f"info_{i}": rng.randint(0, 50) for i in range(60)}
+    return stats
+
+
+def _team(rng, team_id, name, played):
+    return {
+        "id": team_id,
+        "name": name,
+        "cleanName": name,
+        "english_name": name,
+        "shortHand": name.lower().replace(" ", "-"),
+        "country": "England",
+        "founded": str(rng.randint(1870, 1920)),
+        "image": f"teams/{team_id}.png",
+        "table_position": rng.randint(1, 20),
+        "performance_rank": rng.randint(1, 20),
+        "risk": rng.randint(0, 100),
+        "season": "2024/2025",
+        "alt_names": [f"{name} FC", name.upper()],
+        "official_sites": [f"https://example.org/{team_id}"],
+        "stats": _team_stats(rng, played),
+    }
+
+
+def _table_row(rng, team_id, name, position):
+    return {
+        "id": team_id, "name": name, "cleanName": name, "position": position,
+        "points": rng.randint(10, 80), "matchesPlayed": rng.randint(20, 30),
+        "seasonWins_overall": rng.randint(0, 20), "seasonDraws_overall": rng.randint(0, 10),
+        "seasonLosses_overall": rng.randint(0, 20), "seasonGoals": rng.randint(10, 70),
+        "seasonConceded": rng.randint(10, 70), "ppg": round(rng.uniform(0.5, 2.5), 2),
+        "zone": {"name": "Mid Table", "number": 0},
+        "wdl_record": "".join(rng.choice(_FORM_LETTERS) for _ in range(5)),
+    }
+
+
+def _h2h(rng, home_id, away_id):
+    home_wins, away_wins, draws = rng.randint(0, 5), rng.randint(0, 5), rng.randint(0, 4)
+    return {
+        "team_a_id": home_id,
+        "team_b_id": away_id,
+        "previous_matches_results": {
+            "team_a_win_home": home_wins // 2, "team_a_win_away": home_wins - home_wins // 2,
+            "team_b_win_home": away_wins // 2, "team_b_win_away": away_wins - away_wins // 2,
+            "draw": draws, "team_a_wins": home_wins, "team_b_wins": away_wins,
+            "totalMatches": home_wins + away_wins + draws,
+        },
+        "betting_stats": {
+            "over05": 8, "over15": 6, "over25": 4, "over35": 2, "btts": 5,
+            "over05Percentage": 90, "over25Percentage": 50, "bttsPercentage": 55,
+            "avg_goals": round(rng.uniform(1.5, 3.5), 2), "total_goals": rng.randint(10, 40),
+        },
+        "previous_matches_ids": [
+            {"id": 7000000 + i, "date_unix": 1600000000 + i * 86400 * 180,
+             "team_a_id": home_id, "team_b_id": away_id,
+             "team_a_goals": rng.randint(0, 4), "team_b_goals": rng.randint(0, 4)}
+            for i in range(10)
+        ],
+    }
+
+
+def build_payload(seed=0, teams=20, home_name="Arsenal", away_name="Chelsea"):
+    """
+    Payload no formato de get_complete_match_analysis
+
+    Args:
+        seed (int): Semente (mesmo seed, mesmo payload)
+        teams (int): Times na liga (tamanho das tabelas)
+        home_name (str): Time da casa
+        away_name (str): Time visitante
+
+    Returns:
+        dict: complete_analysis sintético
+    """
+    rng = random.Random(seed)
+    played = rng.randint(20, 30)
+    names = [home_name, away_name] + [f"Team {i}" for i in range(teams - 2)]
+    league_teams = [_team(rng, 100 + i, name, played) for i, name in enumerate(names)]
+    home_team_data, away_team_data = league_teams[0], league_teams[1]
+
+    table = [_table_row(rng, 100 + i, name, i + 1) for i, name in enumerate(names)]
+    league_table = {
+        "league_table": table,
+        "all_matches_table_overall": [dict(row) for row in table],
+        "all_matches_table_home": [dict(row) for row in table],
+        "all_matches_table_away": [dict(row) for row in table],
+        "specific_tables": [{"round": r, "table": [dict(row) for row in table[:10]]} for r in range(3)],
+    }
+
+    def lastx(team_id, name):
+        team = _team(rng, team_id, name, 5)
+        team["last_x_match_num"] = 5
+        return [team]
+
+    h2h = _h2h(rng, home_team_data["id"], away_team_data["id"])
+    match_details = {
+        "id": 9000000 + seed, "homeID": home_team_data["id"], "awayID": away_team_data["id"],
+        "home_name": home_name, "away_name": away_name, "season": "2024/2025", "status": "incomplete",
+        "referee": "Referee", "stadium_name": "Stadium",
+        **{f"team_a_{stat}": rng.randint(0, 10) for stat in ("corners", "cards_num", "shots", "fouls", "offsides")},
+        **{f"team_b_{stat}": rng.randint(0, 10) for stat in ("corners", "cards_num", "shots", "fouls", "offsides")},
+        **{f"pre_match_{stat}": round(rng.uniform(0, 3), 2) for stat in ("home_ppg", "away_ppg", "teamA_overall_ppg",
+                                                                          "teamB_overall_ppg", "home_xg", "away_xg")},
+        "odds_ft_1": 2.1, "odds_ft_x": 3.4, "odds_ft_2": 3.5,
+        "trends": {"home": [["good", f"Tendência {i}"] for i in range(6)],
+                   "away": [["bad", f"Tendência {i}"] for i in range(6)]},
+        "h2h": h2h,
+    }
+
+    return {
+        "basic_stats": {
+            "league_id": 12325,
+            "home_team": {"name": home_name, "id": home_team_data["id"], "stats": home_team_data},
+            "away_team": {"name": away_name, "id": away_team_data["id"], "stats": away_team_data},
+            "referee": "Referee",
+        },
+        "league_table": league_table,
+        "team_form": {
+            "home": lastx(home_team_data["id"], home_name),
+            "away": lastx(away_team_data["id"], away_name),
+        },
+        "head_to_head": h2h,
+        "match_details": match_details,
+        "advanced_stats": {
+            "home": {key: home_team_data["stats"].get(key) for key in (
+                "possessionAVG_overall", "winPercentage_overall", "seasonCSPercentage_overall",
+                "seasonBTTSPercentage_overall")},
+            "away": {key: away_team_data["stats"].get(key) for key in (
+                "possessionAVG_overall", "winPercentage_overall", "seasonCSPercentage_overall",
+                "seasonBTTSPercentage_overall")},
+        },
+    }
@@ -0,0 +1,322 @@
+# benchmarks/run_benchmarks.py - Micro-benchmarks dos caminhos críticos
+"""
+Mede latência (perf_counter) e alocações (tracemalloc) das funções de
+probabilidade e formatação usando entradas representativas gravadas em
+benchmarks/inputs/, e compara com benchmarks/baseline.json.
+
+O gate padrão compara só pico de memória e número de alocações, que não
+dependem da máquina. Tempos absolutos variam entre máquinas e com a carga (uma
+CPU compartilhada basta para estourar 25%); com --check-time o tempo de cada
+caso é dividido pelo de um laço de referência medido na mesma execução e só
+essa razão é comparada com o baseline.
+
+Roda offline: nenhuma função medida acessa a API ou o OpenAI.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run_benchmarks                    # compara com o baseline
+    python -m benchmarks.run_benchmarks --update-baseline  # grava um novo baseline
+    python -m benchmarks.run_benchmarks --check-time       # inclui o gate de tempo normalizado
+    python -m benchmarks.run_benchmarks --filter cards --check-time --threshold 0.5
+
+Sai com código 1 se alguma função regredir além do limite.
+"""
+import gc
+import os
+import math
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUTS_FILE = os.path.join(BENCH_DIR, "inputs", "match_inputs.json")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Regressão tolerada (fração) sobre o baseline
+DEFAULT_TIME_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.25
+
+# Folga absoluta para não acusar regressão em ruído de poucos microssegundos/bytes
+TIME_SLACK_US = 5.0
+MEMORY_SLACK_BYTES = 2048
+ALLOCATION_SLACK = 4
+
+
+def reference_workload():
+    """
+    Laço de referência em Python puro (dicionário, aritmética de ponto
+    flutuante e formatação), usado para normalizar os tempos da execução
+    """
+    totals = {}
+    acc = 0.0
+    for i in range(500):
+        key = i % 16
+        totals[key] = totals.get(key, 0.0) + i * 0.5
+        acc += math.exp(-i / 250.0)
+    return f"{acc:.3f}{len(totals)}"
+
+
+def load_inputs(path=INPUTS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_cases(inputs):
+    """
+    Monta os casos de benchmark a partir das entradas gravadas
+
+    Returns:
+        list: [(nome, função sem argumentos)]
+    """
+    from utils.ai import (
+        calculate_advanced_probabilities, calculate_multi_threshold_corners,
+        calculate_corners_probability_for_threshold, calculate_multi_threshold_cards,
+        calculate_cards_probability_for_threshold, form_to_points, calculate_h2h_factor,
+        format_highly_optimized_prompt
+    )
+    from utils.opportunities import generate_all_opportunities
+    from utils.fast_analysis import render_analysis_report
+    from utils.team_features import TeamFeatures
+
+    odds_data = inputs["odds_data"]
+    selected_markets = inputs["selected_markets"]
+    implied = inputs["implied_probabilities"]
+
+    cases = []
+    for fixture in inputs["fixtures"]:
+        label = fixture["label"]
+        home, away, h2h = fixture["home_team"], fixture["away_team"], fixture["h2h"]
+        league_id = fixture["league_id"]
+
+        probabilities = calculate_advanced_probabilities(
+            home, away, h2h_data=h2h, league_id=league_id, odds_data=odds_data
+        )
+        optimized_data = {
+            "home_team": home,
+            "away_team": away,
+            "h2h": h2h,
+            "match_info": fixture["match_info"]
+        }
+
+        # Registros tipados construídos uma vez por time, como no dashboard
+        home_features = TeamFeatures.from_dict(home)
+        away_features = TeamFeatures.from_dict(away)
+
+        cases.extend([
+            (f"calculate_advanced_probabilities[{label}]",
+             lambda home=home, away=away, h2h=h2h, league_id=league_id: calculate_advanced_probabilities(
+                 home, away, h2h_data=h2h, league_id=league_id, odds_data=odds_data)),
+            (f"calculate_advanced_probabilities[{label},features]",
+             lambda home=home_features, away=away_features, h2h=h2h, league_id=league_id: calculate_advanced_probabilities(
+                 home, away, h2h_data=h2h, league_id=league_id, odds_data=odds_data)),
+            (f"TeamFeatures.from_dict[{label}]",
+             lambda home=home: TeamFeatures.from_dict(home)),
+            (f"calculate_multi_threshold_corners[{label}]",
+             lambda home=home_features, away=away_features: calculate_multi_threshold_corners(home, away, 1.0)),
+            (f"calculate_multi_threshold_cards[{label}]",
+             lambda home=home_features, away=away_features: calculate_multi_threshold_cards(home, away, 1.0, 0.1)),
+            (f"calculate_h2h_factor[{label}]",
+             lambda home=home, away=away, h2h=h2h: calculate_h2h_factor(home, away, h2h)),
+            (f"format_highly_optimized_prompt[{label}]",
+             lambda data=optimized_data, fixture=fixture: format_highly_optimized_prompt(
+                 data, fixture["home_team_name"], fixture["away_team_name"], odds_data, selected_markets)),
+            (f"generate_all_opportunities[{label}]",
+             lambda probs=probabilities, fixture=fixture: generate_all_opportunities(
+                 selected_markets, probs, implied,
+                 fixture["home_team_name"], fixture["away_team_name"], odds_data)),
+            (f"render_analysis_report[{label}]",
+             lambda probs=probabilities, fixture=fixture: render_analysis_report(
+                 fixture["home_team_name"], fixture["away_team_name"], selected_markets, probs, odds_data)),
+        ])
+
+    cases.extend([
+        ("calculate_corners_probability_for_threshold",
+         lambda: calculate_corners_probability_for_threshold(10.2, 9.5)),
+        ("calculate_cards_probability_for_threshold",
+         lambda: calculate_cards_probability_for_threshold(4.3, 4.5)),
+        ("form_to_points", lambda: form_to_points("WDLWW")),
+    ])
+    return cases
+
+
+def measure(func, min_time=0.2, repeat=7):
+    """
+    Mede uma função: mediana/p95 por chamada e pico de memória de uma chamada
+
+    Args:
+        func (callable): Função sem argumentos
+        min_time (float): Tempo mínimo de cada rodada (define o número de chamadas)
+        repeat (int): Número de rodadas
+
+    Returns:
+        dict: median_us, p95_us, min_us, calls, peak_bytes, allocations
+    """
+    # Aquecimento e calibração do número de chamadas por rodada
+    func()
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 2
+
+    # Coletor de lixo desligado durante a medição, como no timeit
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number * 1e6)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    samples.sort()
+    p95_index = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+
+    # Alocações de uma chamada (fora da medição de tempo, tracemalloc tem custo alto)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base_current, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocations = sum(
+        stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0
+    )
+
+    return {
+        "median_us": round(statistics.median(samples), 2),
+        "p95_us": round(samples[p95_index], 2),
+        "min_us": round(samples[0], 2),
+        "calls": number * repeat,
+        "peak_bytes": int(peak - base_current),
+        "allocations": int(allocations)
+    }
+
+
+def compare(results, baseline, time_threshold, memory_threshold, check_time=False):
+    """
+    Compara os resultados com o baseline
+
+    Args:
+        results (dict): Resultados desta execução
+        baseline (dict): Resultados gravados
+        time_threshold (float): Regressão de tempo tolerada (fração)
+        memory_threshold (float): Regressão de memória/alocações tolerada (fração)
+        check_time (bool): Comparar também o tempo, normalizado pelo laço de referência
+
+    Returns:
+        list: [(nome, motivo)] das regressões encontradas
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+
+        memory_limit = reference["peak_bytes"] * (1 + memory_threshold) + MEMORY_SLACK_BYTES
+        if result["peak_bytes"] > memory_limit:
+            regressions.append((name, f"memória {result['peak_bytes']}B > limite {int(memory_limit)}B "
+                                      f"(baseline {reference['peak_bytes']}B)"))
+
+        allocation_limit = reference["allocations"] * (1 + memory_threshold) + ALLOCATION_SLACK
+        if result["allocations"] > allocation_limit:
+            regressions.append((name, f"alocações {result['allocations']} > limite {int(allocation_limit)} "
+                                      f"(baseline {reference['allocations']})"))
+
+        if not check_time or not reference.get("reference_us") or not result.get("reference_us"):
+            continue
+
+        # Melhor rodada (como no timeit), em unidades do laço de referência da própria execução
+        scale = result["reference_us"] / reference["reference_us"]
+        time_limit = (reference["min_us"] * (1 + time_threshold) + TIME_SLACK_US) * scale
+        if result["min_us"] > time_limit:
+            regressions.append((name, f"tempo {result['min_us']:.1f}us > limite {time_limit:.1f}us "
+                                      f"(baseline {reference['min_us']:.1f}us, máquina {scale:.2f}x)"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos caminhos críticos")
+    parser.add_argument("--filter", help="Executar apenas casos cujo nome contém este texto")
+    parser.add_argument("--check-time", action="store_true",
+                        help="Comparar também o tempo, normalizado pelo laço de referência")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="Regressão de tempo tolerada com --check-time (fração, padrão 0.25)")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="Regressão de memória e alocações tolerada (fração, padrão 0.25)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Tempo mínimo por caso em segundos")
+    parser.add_argument("--update-baseline", action="store_true", help="Gravar os resultados como baseline")
+    parser.add_argument("--output", help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    # Os caminhos medidos registram muitos logs; medir sem o custo do handler
+    logging.disable(logging.CRITICAL)
+
+    cases = build_cases(load_inputs())
+    if args.filter:
+        cases = [(name, func) for name, func in cases if args.filter in name]
+
+    # Gravado em cada caso para que baselines parciais (--filter) continuem comparáveis
+    reference_us = measure(reference_workload, min_time=args.min_time)["min_us"]
+    print(f"Laço de referência: {reference_us:.1f}us\n")
+
+    results = {}
+    print(f"{'função':58s} {'mínimo':>10s} {'mediana':>10s} {'p95':>10s} {'pico mem':>10s} {'allocs':>7s}")
+    for name, func in cases:
+        result = measure(func, min_time=args.min_time)
+        result["reference_us"] = reference_us
+        results[name] = result
+        print(f"{name:58s} {result['min_us']:>8.1f}us {result['median_us']:>8.1f}us {result['p95_us']:>8.1f}us "
+              f"{result['peak_bytes'] / 1024:>8.1f}KB {result['allocations']:>7d}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline atualizado: {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("Sem baseline para comparar (use --update-baseline)")
+        return 0
+
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold, args.check_time)
+    if regressions:
+        print("\nREGRESSÕES:")
+        for name, reason in regressions:
+            print(f"- {name}: {reason}")
+        return 1
+
+    print("\nSem regressões em relação ao baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
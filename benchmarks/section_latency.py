@@ -0,0 +1,118 @@
+# benchmarks/section_latency.py - Latência da análise em seções paralelas
+"""
+Compara o tempo total da análise em uma única resposta com o da geração em
+seções paralelas (utils/section_generation.py), usando o cliente simulado
+(StubLLMClient) com duração proporcional ao número de palavras geradas.
+
+Roda offline: nenhuma chamada ao OpenAI.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.section_latency
+    python -m benchmarks.section_latency --words 300 --seconds-per-word 0.002 --repeat 5
+
+Sai com código 1 se o modo paralelo não ficar abaixo de --max-ratio do tempo
+da resposta única.
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+
+# Mercados selecionados no cenário medido (todos os grupos de seção)
+SELECTED_MARKETS = {
+    "money_line": True, "chance_dupla": True, "over_under": True,
+    "ambos_marcam": True, "escanteios": True, "cartoes": True
+}
+
+# Latência fixa de cada chamada (tempo até o primeiro token) em segundos
+DEFAULT_BASE_LATENCY = 0.05
+DEFAULT_SECONDS_PER_WORD = 0.002
+DEFAULT_WORDS = 200
+DEFAULT_MAX_RATIO = 0.6
+
+
+def make_responder(words):
+    """
+    Respostas simuladas: cada grupo de mercados e a confiança têm `words` palavras;
+    a resposta única contém todos eles
+    """
+    from utils.section_generation import SECTION_GROUPS
+
+    text = " ".join(["palavra"] * words)
+    group_parts = {
+        name: {
+            "sections": [{"title": title, "content": text}],
+            "opportunities": []
+        }
+        for name, title, _ in SECTION_GROUPS
+    }
+    confidence_part = {"summary": text, "confidence": {"level": "Médio", "rationale": "Consistência média."}}
+
+    def respond(kwargs):
+        schema_name = kwargs["response_format"]["json_schema"]["name"]
+        section = schema_name.replace("match_analysis_", "", 1) if schema_name != "match_analysis" else None
+        if section is None:
+            full = {"summary": confidence_part["summary"], "sections": [], "opportunities": [],
+                    "confidence": confidence_part["confidence"]}
+            for part in group_parts.values():
+                full["sections"].extend(part["sections"])
+            return json.dumps(full, ensure_ascii=False)
+        if section in group_parts:
+            return json.dumps(group_parts[section], ensure_ascii=False)
+        return json.dumps(confidence_part, ensure_ascii=False)
+
+    return respond
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência: resposta única vs seções paralelas")
+    parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help="Palavras por seção")
+    parser.add_argument("--seconds-per-word", type=float, default=DEFAULT_SECONDS_PER_WORD)
+    parser.add_argument("--base-latency", type=float, default=DEFAULT_BASE_LATENCY)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="Razão máxima aceita entre paralelo e resposta única")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    from utils.analysis_schema import RESPONSE_FORMAT, parse_structured_analysis
+    from utils.llm_dispatcher import LLMDispatcher, StubLLMClient
+    from utils.section_generation import generate_analysis_by_sections
+
+    client = StubLLMClient(response=make_responder(args.words), latency=args.base_latency,
+                           seconds_per_word=args.seconds_per_word)
+    dispatcher = LLMDispatcher(max_concurrency=4, max_queue=20)
+
+    def call(prompt, response_format, timer=None):
+        response = client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}], response_format=response_format
+        )
+        return response.choices[0].message.content
+
+    def single():
+        return dispatcher.run(lambda: call("prompt", RESPONSE_FORMAT))
+
+    def parallel():
+        return generate_analysis_by_sections(call, "prompt", SELECTED_MARKETS, dispatcher=dispatcher)
+
+    results = {}
+    for name, func in (("resposta única", single), ("seções paralelas", parallel)):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            output = func()
+            timings.append(time.perf_counter() - started)
+        parse_structured_analysis(output)
+        results[name] = statistics.median(timings)
+        print(f"{name:20s} mediana {results[name] * 1000:8.1f}ms  mínimo {min(timings) * 1000:8.1f}ms")
+
+    ratio = results["seções paralelas"] / results["resposta única"]
+    print(f"\nRazão paralelo / único: {ratio:.2f} (limite {args.max_ratio:.2f})")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
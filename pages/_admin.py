@@ -292,6 +292,71 @@ if password == ADMIN_PASSWORD:
                     except Exception as e:
                         st.error(f"Erro ao resetar verificação: {str(e)}")
 
+        # Desempenho e custo das chamadas ao LLM (utils/llm_metrics.py)
+        st.header("Desempenho da IA")
+        try:
+            import time
+            from utils.llm_metrics import (
+                get_llm_metrics_store, summarize, daily_costs, KIND_LLM_CALL, KIND_ANALYSIS
+            )
+
+            period_days = st.selectbox("Período", options=[1, 7, 30], index=1,
+                                       format_func=lambda d: f"Últimos {d} dia(s)")
+            metrics = get_llm_metrics_store().read(since=time.time() - period_days * 86400)
+
+            if metrics:
+                field_names = {
+                    "queue_wait": "Espera na fila",
+                    "first_token": "Primeiro trecho",
+                    "latency": "Latência da chamada",
+                    "fetch_seconds": "Busca de dados",
+                    "llm_seconds": "Análise com IA",
+                    "total_seconds": "Total da análise"
+                }
+
+                def percentile_rows(summary):
+                    rows = []
+                    for name, values in summary.items():
+                        row = {"Etapa": field_names.get(name, name), "Amostras": values["count"]}
+                        for p in ("p50", "p95", "p99"):
+                            row[f"{p} (s)"] = f"{values[p]:.2f}" if values[p] is not None else "-"
+                        rows.append(row)
+                    return rows
+
+                st.subheader("Chamadas ao LLM")
+                st.table(percentile_rows(summarize(metrics, KIND_LLM_CALL)))
+                st.subheader("Análises do Dashboard")
+                st.table(percentile_rows(summarize(metrics, KIND_ANALYSIS)))
+
+                days = daily_costs(metrics)
+                cost_col1, cost_col2, cost_col3 = st.columns(3)
+                with cost_col1:
+                    st.metric("Custo no período (US$)", f"{sum(d['cost'] for d in days):.2f}")
+                with cost_col2:
+                    st.metric("Chamadas ao LLM", sum(d["calls"] for d in days))
+                with cost_col3:
+                    total_analyses = sum(d["analyses"] for d in days)
+                    hits = sum(d["cache_hits"] for d in days)
+                    st.metric("Acertos do cache de análises",
+                              f"{100 * hits / total_analyses:.0f}%" if total_analyses else "-")
+
+                st.subheader("Custo por Dia")
+                st.dataframe([{
+                    "Data": d["date"],
+                    "Chamadas": d["calls"],
+                    "Erros": d["errors"],
+                    "Tokens entrada": d["input_tokens"],
+                    "Tokens em cache": d["cached_tokens"],
+                    "Tokens saída": d["output_tokens"],
+                    "Custo (US$)": f"{d['cost']:.4f}",
+                    "Análises": d["analyses"],
+                    "Do cache": d["cache_hits"]
+                } for d in days])
+            else:
+                st.info("Nenhuma chamada ao LLM registrada no período.")
+        except Exception as e:
+            st.error(f"Erro ao carregar métricas da IA: {str(e)}")
+
         # Sessão 4: Estatísticas de Análise
         st.header("Estatísticas de Análise")
         
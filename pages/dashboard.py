@@ -17,271 +17,6 @@ logger = logging.getLogger("valueHunter.dashboard")
 TEAMS_CACHE_DIR = os.path.join(DATA_DIR, "teams_cache")
 os.makedirs(TEAMS_CACHE_DIR, exist_ok=True)
 
-# Adicione todas essas funções no início do arquivo pages/dashboard.py,
-# antes das outras funções que as utilizam
-
-def format_text_for_display(text, max_width=70):
-    """
-    Formata um texto para garantir que nenhuma linha exceda o comprimento máximo especificado.
-    
-    Args:
-        text (str): Texto a ser formatado
-        max_width (int): Largura máxima de cada linha em caracteres
-        
-    Returns:
-        str: Texto formatado com quebras de linha
-    """
-    lines = []
-    for line in text.split('\n'):
-        if len(line) <= max_width:
-            lines.append(line)
-        else:
-            # Quebrar linhas muito longas
-            current_line = ""
-            words = line.split()
-            
-            for word in words:
-                if len(current_line) + len(word) + 1 <= max_width:
-                    # Adicionar palavra à linha atual
-                    if current_line:
-                        current_line += " " + word
-                    else:
-                        current_line = word
-                else:
-                    # Iniciar nova linha
-                    lines.append(current_line)
-                    current_line = word
-            
-            # Adicionar a última linha
-            if current_line:
-                lines.append(current_line)
-    
-    return '\n'.join(lines)
-
-def format_generic_section(section):
-    """
-    Formata seções genéricas da análise
-    
-    Args:
-        section (str): Texto da seção
-        
-    Returns:
-        str: Seção formatada
-    """
-    lines = section.split('\n')
-    formatted_lines = []
-    
-    # Cabeçalho sempre permanece igual
-    if lines and lines[0].startswith('# '):
-        formatted_lines.append(lines[0])
-        start_idx = 1
-    else:
-        start_idx = 0
-    
-    # Formatar as demais linhas
-    for i in range(start_idx, len(lines)):
-        formatted_lines.append(format_text_for_display(lines[i], max_width=70))
-    
-    return '\n'.join(formatted_lines)
-
-def format_confidence_section(section):
-    """
-    Formata especificamente a seção de Nível de Confiança
-    
-    Args:
-        section (str): Texto da seção de confiança
-        
-    Returns:
-        str: Seção de confiança formatada
-    """
-    lines = section.split('\n')
-    formatted_lines = []
-    
-    # Cabeçalho sempre permanece igual
-    if lines and lines[0].startswith('# '):
-        formatted_lines.append(lines[0])
-        start_idx = 1
-    else:
-        start_idx = 0
-    
-    # Formatar cada linha de conteúdo
-    for i in range(start_idx, len(lines)):
-        line = lines[i]
-        
-        # Se a linha começa com um marcador, processar especialmente
-        if line.strip().startswith('- **'):
-            # Dividir em marcador e conteúdo
-            parts = line.split(':', 1)
-            
-            if len(parts) > 1:
-                # Adicionar o marcador
-                formatted_lines.append(parts[0] + ':')
-                
-                # Formatar o conteúdo com indentação
-                content = parts[1].strip()
-                formatted_content = format_text_for_display(content, max_width=65)
-                
-                # Adicionar indentação às linhas de conteúdo
-                for content_line in formatted_content.split('\n'):
-                    formatted_lines.append('  ' + content_line)
-            else:
-                # Se não conseguir dividir, adicionar linha inteira formatada
-                formatted_lines.append(format_text_for_display(line, max_width=70))
-        else:
-            # Para outras linhas, simplesmente formatar
-            formatted_lines.append(format_text_for_display(line, max_width=70))
-    
-    return '\n'.join(formatted_lines)
-
-def update_opportunities_format(opportunities_section):
-    """
-    Atualiza a formatação da seção de oportunidades para evitar linhas muito longas
-    que exijam rolagem horizontal.
-    
-    Args:
-        opportunities_section (str): Texto da seção de oportunidades
-        
-    Returns:
-        str: Texto reformatado para limitar a largura
-    """
-    # Dividir o texto em linhas
-    lines = opportunities_section.split('\n')
-    formatted_lines = []
-    
-    # Largura máxima por linha (ajuste conforme necessário)
-    max_width = 70
-    
-    for line in lines:
-        # Se a linha for uma oportunidade (começa com '- **')
-        if line.startswith('- **'):
-            # Manter a primeira linha como está (título da oportunidade)
-            formatted_lines.append(line)
-        # Se for uma justificativa (começa com '  *Justificativa:')
-        elif line.strip().startswith('*Justificativa:'):
-            # Verificar se já está dividida em múltiplas linhas
-            if '\n' in line:
-                # Já está formatada, adicionar todas as linhas
-                formatted_lines.extend(line.split('\n'))
-            else:
-                # Separar a parte inicial "*Justificativa:" do resto do texto
-                prefix = "  *Justificativa:"
-                content = line.strip()[len(prefix):].strip()
-                
-                # Formatar o conteúdo da justificativa
-                current_line = prefix + " "
-                words = content.split()
-                
-                for word in words:
-                    # Se adicionar a palavra não ultrapassar a largura máxima
-                    if len(current_line) + len(word) + 1 <= max_width:
-                        # Adicionar palavra à linha atual
-                        if current_line.endswith(" "):
-                            current_line += word
-                        else:
-                            current_line += " " + word
-                    else:
-                        # Adicionar a linha atual e começar uma nova
-                        formatted_lines.append(current_line)
-                        # Alinhar a nova linha com a justificativa (espaços antes)
-                        current_line = "    " + word
-                
-                # Adicionar a última linha da justificativa
-                if current_line:
-                    formatted_lines.append(current_line)
-        else:
-            # Outras linhas são mantidas como estão
-            formatted_lines.append(line)
-    
-    # Juntar as linhas formatadas
-    return '\n'.join(formatted_lines)
-
-def format_opportunities_section(section):
-    """
-    Formata especificamente a seção de Oportunidades Identificadas,
-    mantendo apenas o formato básico da oportunidade sem estatísticas adicionais.
-    
-    Args:
-        section (str): Texto da seção de oportunidades
-        
-    Returns:
-        str: Seção de oportunidades formatada e simplificada
-    """
-    # Se não houver oportunidades ou apenas a mensagem de que não há valor
-    if "Infelizmente não detectamos valor" in section:
-        return section
-    
-    import re
-    
-    lines = section.split('\n')
-    formatted_lines = []
-    
-    # Cabeçalho sempre permanece igual
-    if lines and lines[0].startswith('# '):
-        formatted_lines.append(lines[0])
-    else:
-        formatted_lines.append("# Oportunidades Identificadas:")
-    
-    # Procurar padrões de oportunidades e reescrever no formato desejado
-    pattern = r"- \*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    
-    for line in lines:
-        match = re.search(pattern, line)
-        if match:
-            opportunity_name, real_prob, implied_prob, margin = match.groups()
-            # Formatar exatamente como desejado, sem nenhuma estatística adicional
-            formatted_line = f"- **{opportunity_name.strip()}**: Real {real_prob}% vs Implícita {implied_prob}% (Valor de {margin}%)"
-            formatted_lines.append(formatted_line)
-    
-    return "\n".join(formatted_lines)
-
-def format_all_analysis_sections(analysis_text):
-    """
-    Formata todas as seções da análise para evitar linhas muito longas.
-    
-    Args:
-        analysis_text (str): Texto completo da análise
-        
-    Returns:
-        str: Texto da análise com todas as seções formatadas
-    """
-    # Quebrar o texto em seções principais
-    sections = []
-    current_section = []
-    
-    for line in analysis_text.split('\n'):
-        # Se for um cabeçalho de seção (começa com #)
-        if line.startswith('# '):
-            # Se já temos uma seção anterior, adicionar às seções
-            if current_section:
-                sections.append('\n'.join(current_section))
-                current_section = []
-            
-            # Iniciar nova seção com o cabeçalho
-            current_section.append(line)
-        else:
-            # Adicionar linha à seção atual
-            current_section.append(line)
-    
-    # Adicionar a última seção se existir
-    if current_section:
-        sections.append('\n'.join(current_section))
-    
-    # Formatar cada seção individualmente
-    formatted_sections = []
-    
-    for section in sections:
-        # Identificar seções especiais para tratamento específico
-        if section.startswith('# Nível de Confiança Geral'):
-            formatted_sections.append(format_confidence_section(section))
-        elif section.startswith('# Oportunidades Identificadas'):
-            formatted_sections.append(format_opportunities_section(section))
-        else:
-            # Formatar seções genéricas
-            formatted_sections.append(format_generic_section(section))
-    
-    # Juntar todas as seções formatadas
-    return '\n\n'.join(formatted_sections)
-
 # Funções auxiliares para seleção de ligas (ADICIONADAS NO INÍCIO)
 def get_league_selection(key_suffix=""):
     """
@@ -829,7 +564,7 @@ def diagnose_api_issues(selected_league):
 # Versão limpa de fetch_stats_data em pages/dashboard.py
 # Remova o código de fallback mantendo apenas dados reais
 
-def fetch_stats_data(selected_league, home_team=None, away_team=None):
+def fetch_stats_data(selected_league, home_team=None, away_team=None, selected_markets=None, as_dataframe=False):
     """
     Busca estatísticas das equipes sem fallbacks
     
@@ -837,9 +572,13 @@ def fetch_stats_data(selected_league, home_team=None, away_team=None):
         selected_league (str): Nome da liga
         home_team (str, optional): Nome do time da casa
         away_team (str, optional): Nome do time visitante
+        selected_markets (dict, optional): Mercados selecionados (campos dos demais extraídos sob demanda)
+        as_dataframe (bool, optional): Também montar o DataFrame de duas linhas
+            (convert_to_dataframe_format); a análise usa apenas os dados simplificados
         
     Returns:
-        tuple: (DataFrame com estatísticas, dados brutos) ou (None, None) em caso de erro
+        tuple: (DataFrame com estatísticas ou None se as_dataframe=False, dados simplificados)
+            ou (None, None) em caso de erro
     """
     try:
         import logging
@@ -860,7 +599,7 @@ def fetch_stats_data(selected_league, home_team=None, away_team=None):
         status.info("Buscando estatísticas atualizadas...")
         
         try:
-            from utils.enhanced_api_client import get_complete_match_analysis, convert_to_dataframe_format
+            from utils.enhanced_api_client import get_complete_match_analysis
             
             # Determinar o season_id
             if selected_league == "EFL League One (England)":
@@ -893,11 +632,14 @@ def fetch_stats_data(selected_league, home_team=None, away_team=None):
                 st.error(f"Não foi possível obter estatísticas para {home_team} vs {away_team}")
                 return None, None
             
-            # Converter para DataFrame
-            team_stats_df = convert_to_dataframe_format(complete_analysis)
-            if team_stats_df is None:
-                st.error("Erro ao processar estatísticas para formato DataFrame")
-                return None, None
+            # Converter para DataFrame (apenas se pedido)
+            team_stats_df = None
+            if as_dataframe:
+                from utils.enhanced_api_client import convert_to_dataframe_format
+                team_stats_df = convert_to_dataframe_format(complete_analysis)
+                if team_stats_df is None:
+                    st.error("Erro ao processar estatísticas para formato DataFrame")
+                    return None, None
                 
             # Sucesso ao carregar os dados
             st.success(f"Estatísticas carregadas com sucesso para {home_team} vs {away_team}")
@@ -924,7 +666,7 @@ def fetch_stats_data(selected_league, home_team=None, away_team=None):
                 from utils.prompt_adapter import simplify_api_data
                 
                 # Substituir o optimized_data com uma versão simplificada
-                optimized_data = simplify_api_data(complete_analysis, home_team, away_team)
+                optimized_data = simplify_api_data(complete_analysis, home_team, away_team, selected_markets)
                 
                 # Preservar informações da liga que podem ter sido perdidas
                 optimized_data["match_info"]["league"] = selected_league
@@ -932,12 +674,13 @@ def fetch_stats_data(selected_league, home_team=None, away_team=None):
                 
                 logger.info("Dados extraídos para análise de IA")
             
-            # Contagem de campos
-            home_fields = sum(1 for k, v in optimized_data["home_team"].items() 
+            # Contagem de campos (apenas os já extraídos, sem disparar os sob demanda)
+            from utils.extraction_plan import resolved_items
+            home_fields = sum(1 for k, v in resolved_items(optimized_data["home_team"]) 
                           if (isinstance(v, (int, float)) and v != 0) or 
                             (isinstance(v, str) and v != "" and v != "?????"))
                             
-            away_fields = sum(1 for k, v in optimized_data["away_team"].items() 
+            away_fields = sum(1 for k, v in resolved_items(optimized_data["away_team"]) 
                           if (isinstance(v, (int, float)) and v != 0) or 
                             (isinstance(v, str) and v != "" and v != "?????"))
                             
@@ -1151,10 +894,12 @@ def _usage_stats():
 
 
 # Update check_analysis_limits function to use consistent naming
-def check_analysis_limits(selected_markets):
+def check_analysis_limits(selected_markets, required_credits=None):
     """Check if user can perform analysis with selected markets"""
     try:
         num_markets = sum(1 for v in selected_markets.values() if v)
+        if required_credits is not None:
+            num_markets = required_credits
         stats = st.session_state.user_manager.get_usage_stats(st.session_state.email)
         
         # Check which key exists in the stats dictionary
@@ -1688,6 +1433,16 @@ def show_main_dashboard():
             # Botão em largura total para melhor design
             analyze_button = st.button("Analisar Partida", type="primary", use_container_width=True)
             
+            # Análise rápida: relatório calculado sem chamada à IA, por menos créditos
+            from utils.fast_analysis import fast_analysis_credits
+            num_selected = sum(1 for v in selected_markets.values() if v)
+            fast_mode = st.checkbox(
+                "⚡ Análise rápida (sem IA)",
+                value=False,
+                help=f"Resultado imediato calculado a partir das estatísticas e odds. "
+                     f"Custa {fast_analysis_credits(num_selected)} crédito(s) em vez de {num_selected}."
+            )
+            
             # Código atualizado para o botão de análise
             if analyze_button:
                 if not any(selected_markets.values()):
@@ -1699,7 +1454,8 @@ def show_main_dashboard():
                     return
                 
                 # Verificar limites de análise
-                if not check_analysis_limits(selected_markets):
+                required_credits = fast_analysis_credits(num_selected) if fast_mode else None
+                if not check_analysis_limits(selected_markets, required_credits):
                     return
                     
                 # Criar um placeholder para o status
@@ -1707,9 +1463,11 @@ def show_main_dashboard():
                 
                 # Buscar estatísticas em tempo real (sem cache)
                 status.info("Buscando estatísticas atualizadas...")
-                team_stats_df, stats_data = fetch_stats_data(selected_league, home_team, away_team)
+                analysis_started = time.time()
+                team_stats_df, stats_data = fetch_stats_data(selected_league, home_team, away_team, selected_markets)
+                fetch_seconds = time.time() - analysis_started
                 
-                if team_stats_df is None:
+                if stats_data is None:
                     status.error("Falha ao carregar estatísticas. Tente novamente.")
                     return
                 
@@ -1722,7 +1480,7 @@ def show_main_dashboard():
                 try:
                     # Etapa 1: Verificar dados
                     status.info("Preparando dados para análise...")
-                    if team_stats_df is None:
+                    if stats_data is None:
                         status.error("Falha ao carregar dados")
                         return
             
@@ -1732,6 +1490,7 @@ def show_main_dashboard():
                     # Etapa 3: Formatar prompt e extrair probabilidades
                     status.info("Preparando análise...")
                     from utils.ai import format_highly_optimized_prompt, calculate_advanced_probabilities
+                    from utils.prompt_adapter import extract_team_features
                     
                     # Obter o ID da liga a partir dos dados estatísticos ou do mapeamento de ligas
                     league_id = None
@@ -1758,62 +1517,18 @@ def show_main_dashboard():
                     logger.info(f"Usando league_id: {league_id} para {selected_league}")
                     
                     # Primeiro calculamos as probabilidades
+                    home_features, away_features = extract_team_features(stats_data, selected_markets)
                     original_probabilities = calculate_advanced_probabilities(
-                        stats_data["home_team"], 
-                        stats_data["away_team"],
-                        league_id  # Adicionar o ID da liga aqui
+                        home_features,
+                        away_features,
+                        league_id=league_id,
+                        odds_data=odds_data,
+                        selected_markets=selected_markets
                     )
                     
-                    # Extrair probabilidades implícitas das odds
-                    implied_probabilities = {}
-                    
-                    # Função auxiliar para extrair odds de um texto
-                    def extract_odds(text, pattern, default=0.0):
-                        import re
-                        matches = re.findall(pattern, text)
-                        if matches:
-                            try:
-                                return float(matches[0])
-                            except:
-                                pass
-                        return default
-                    
-                    # Parsear as odds para Money Line
-                    if selected_markets.get("money_line") and odds_data:
-                        # Padrões para extrair odds
-                        home_odd = extract_odds(odds_data, rf"(?:Casa|Home).*?@(\d+\.?\d*)")
-                        draw_odd = extract_odds(odds_data, r"Empate.*?@(\d+\.?\d*)")
-                        away_odd = extract_odds(odds_data, rf"(?:Fora|Away).*?@(\d+\.?\d*)")
-                        
-                        if home_odd > 0:
-                            implied_probabilities["home"] = 100.0 / home_odd
-                        if draw_odd > 0:
-                            implied_probabilities["draw"] = 100.0 / draw_odd
-                        if away_odd > 0:
-                            implied_probabilities["away"] = 100.0 / away_odd
-                    
-                    # Parsear para Chance Dupla
-                    if selected_markets.get("chance_dupla") and odds_data:
-                        home_draw_odd = extract_odds(odds_data, r"1X.*?@(\d+\.?\d*)")
-                        home_away_odd = extract_odds(odds_data, r"12.*?@(\d+\.?\d*)")
-                        draw_away_odd = extract_odds(odds_data, r"X2.*?@(\d+\.?\d*)")
-                        
-                        if home_draw_odd > 0:
-                            implied_probabilities["home_draw"] = 100.0 / home_draw_odd
-                        if home_away_odd > 0:
-                            implied_probabilities["home_away"] = 100.0 / home_away_odd
-                        if draw_away_odd > 0:
-                            implied_probabilities["draw_away"] = 100.0 / draw_away_odd
-                    
-                    # Parsear para BTTS
-                    if selected_markets.get("ambos_marcam") and odds_data:
-                        btts_yes_odd = extract_odds(odds_data, r"Sim.*?@(\d+\.?\d*)")
-                        btts_no_odd = extract_odds(odds_data, r"Não.*?@(\d+\.?\d*)")
-                        
-                        if btts_yes_odd > 0:
-                            implied_probabilities["btts_yes"] = 100.0 / btts_yes_odd
-                        if btts_no_odd > 0:
-                            implied_probabilities["btts_no"] = 100.0 / btts_no_odd
+                    # Extrair probabilidades implícitas das odds (dicionário de get_odds_data ou texto)
+                    from utils.opportunities import calculate_implied_probabilities
+                    implied_probabilities = calculate_implied_probabilities(odds_data, selected_markets)
                     
                     # Adicionar as probabilidades implícitas às probabilidades originais
                     if implied_probabilities:
@@ -1829,762 +1544,164 @@ def show_main_dashboard():
                         return
                     
                     # Etapa 4: Análise GPT com probabilidades originais
-                    status.info("Realizando análise com IA...")
-                    analysis = analyze_with_gpt(
-                        prompt,
-                        original_probabilities=original_probabilities,
-                        selected_markets=selected_markets,
-                        home_team=home_team,
-                        away_team=away_team
+                    # Análises da mesma partida com odds e mercados equivalentes são
+                    # compartilhadas entre usuários pelo cache (evita nova chamada ao GPT)
+                    from utils.ai import PROMPT_TEMPLATE_VERSION
+                    from utils.analysis_cache import get_analysis_cache, make_cache_key, analysis_fixture
+                    
+                    fixture = analysis_fixture(league_id, home_team, away_team)
+                    analysis = None
+                    cache_key = None
+                    analysis_cache = None
+                    try:
+                        analysis_cache = get_analysis_cache()
+                        cache_key = make_cache_key(
+                            fixture, selected_markets, odds_data, original_probabilities, PROMPT_TEMPLATE_VERSION
+                        )
+                        analysis = analysis_cache.get(cache_key)
+                    except Exception as cache_error:
+                        logger.warning(f"Cache de análises indisponível: {str(cache_error)}")
+                    cache_status = ("hit" if analysis else "miss") if cache_key else None
+                    
+                    from utils.analysis_schema import (
+                        parse_structured_analysis, completed_sections, reconcile_opportunities,
+                        AnalysisSchemaError
+                    )
+                    
+                    # Área onde o texto da IA aparece progressivamente durante o streaming
+                    stream_placeholder = st.empty()
+                    
+                    # A resposta é JSON (utils/analysis_schema.py): exibir as seções já completas
+                    def render_partial_analysis(partial_text):
+                        sections = completed_sections(partial_text)
+                        preview = "\n\n".join(f"# {section.title}\n{section.content}" for section in sections)
+                        stream_placeholder.markdown((preview or "Gerando análise...") + " ▌")
+                    
+                    def show_queue_position(position):
+                        status.info(f"Aguardando na fila de análises (posição {position})...")
+                    
+                    # Análise rápida (sem IA): escolhida pelo usuário ou automática quando a
+                    # fila do LLM está saturada e a resposta não sairia dentro do prazo
+                    from utils.fast_analysis import (
+                        fast_analysis_reason, fast_analysis_credits, render_analysis_report,
+                        evaluate_markets, ANALYSIS_DEADLINE_SECONDS
                     )
+                    from utils.llm_dispatcher import get_llm_dispatcher, LLMDispatcherError
                     
-                    if not analysis:
+                    fast_reason = "modo rápido selecionado" if fast_mode else None
+                    if not analysis and not fast_reason:
+                        user_tier = st.session_state.user_manager.get_user_tier_name(st.session_state.email) or "free"
+                        fast_reason = fast_analysis_reason(get_llm_dispatcher().stats(), user_tier)
+                    
+                    llm_seconds = 0.0
+                    if not analysis and not fast_reason:
+                        status.info("Realizando análise com IA...")
+                        llm_started = time.time()
+                        try:
+                            analysis = analyze_with_gpt(
+                                prompt,
+                                original_probabilities=original_probabilities,
+                                selected_markets=selected_markets,
+                                home_team=home_team,
+                                away_team=away_team,
+                                stream_callback=render_partial_analysis,
+                                tier=user_tier,
+                                on_queue_position=show_queue_position,
+                                queue_timeout=ANALYSIS_DEADLINE_SECONDS,
+                                raise_on_overload=True
+                            )
+                        except LLMDispatcherError as overload_error:
+                            fast_reason = f"serviço de IA sobrecarregado ({str(overload_error)})"
+                        llm_seconds = time.time() - llm_started
+                        
+                        if analysis and analysis_cache and cache_key:
+                            try:
+                                analysis_cache.put(cache_key, analysis, fixture=fixture)
+                            except Exception as cache_error:
+                                logger.warning(f"Erro ao salvar análise no cache: {str(cache_error)}")
+                    
+                    if not analysis and not fast_reason:
+                        stream_placeholder.empty()
                         status.error("Falha na análise com IA")
                         return
                     
                     # Etapa 5: Mostrar resultado
-                    if analysis:
-                        # Limpar status
-                        status.empty()
-                        
-                        # Limpar possíveis tags HTML da resposta
-                        if isinstance(analysis, str):
-                            # Verificar se a análise começa com a tag de div
-                            if "<div class=\"analysis-result\">" in analysis:
-                                analysis = analysis.replace("<div class=\"analysis-result\">", "")
-                                if "</div>" in analysis:
-                                    analysis = analysis.replace("</div>", "")
-                        
-                        # IMPORTANTE: Aplicar formatação avançada para garantir filtragem por mercados selecionados
-                        from utils.ai import format_analysis_response
-                        
-                        # Adiciona módulo re para expressões regulares caso não esteja importado
-                        import re
-                        
-                        def reconstruct_analysis(analysis_text, home_team, away_team, selected_markets, original_probabilities, implied_probabilities, odds_data):
-                            """
-                            Reconstrução completa da análise com justificativas detalhadas e formatação adequada.
-                            """
-                            try:
-                                # Logs para depuração
-                                print(f"Selected markets: {selected_markets}")
-                                print(f"Original probabilities keys: {original_probabilities.keys() if original_probabilities else 'None'}")
-                                print(f"Implied probabilities keys: {implied_probabilities.keys() if implied_probabilities else 'None'}")
-                                print(f"Odds data: {odds_data}")
-                                
-                                # Iniciar construção da análise
-                                new_analysis = []
-                                
-                                # Adicionar cabeçalho
-                                new_analysis.append(f"# Análise da Partida\n## {home_team} x {away_team}")
-                                
-                                # Adicionar análise de mercados disponíveis
-                                markets_section = "# Análise de Mercados Disponíveis:\n"
-                        
-                                # Moneyline
-                                if selected_markets.get("money_line"):
-                                    markets_section += "- **Money Line (1X2):**\n"
-                                    home_odd = 0
-                                    draw_odd = 0
-                                    away_odd = 0
-                                
-                                    # Extrair odds do texto original
-                                    home_match = re.search(r"Casa.*?@(\d+\.?\d*)", odds_data)
-                                    if home_match:
-                                        home_odd = float(home_match.group(1))
-                                        markets_section += f"  - Casa ({home_team}): @{home_odd}\n"
-                                    
-                                    draw_match = re.search(r"Empate.*?@(\d+\.?\d*)", odds_data)
-                                    if draw_match:
-                                        draw_odd = float(draw_match.group(1))
-                                        markets_section += f"  - Empate: @{draw_odd}\n"
-                                    
-                                    away_match = re.search(r"Fora.*?@(\d+\.?\d*)", odds_data)
-                                    if away_match:
-                                        away_odd = float(away_match.group(1))
-                                        markets_section += f"  - Fora ({away_team}): @{away_odd}\n"
-                                    
-                                    # Atualizar probabilidades implícitas
-                                    if home_odd > 0:
-                                        implied_probabilities["home"] = 100.0 / home_odd
-                                    if draw_odd > 0:
-                                        implied_probabilities["draw"] = 100.0 / draw_odd
-                                    if away_odd > 0:
-                                        implied_probabilities["away"] = 100.0 / away_odd
-                                
-                                # Chance Dupla
-                                if selected_markets.get("chance_dupla"):
-                                    markets_section += "- **Chance Dupla:**\n"
-                                    home_draw_odd = 0
-                                    home_away_odd = 0
-                                    draw_away_odd = 0
-                                
-                                    # Extrair odds do texto original
-                                    hd_match = re.search(r"1X.*?@(\d+\.?\d*)", odds_data)
-                                    if hd_match:
-                                        home_draw_odd = float(hd_match.group(1))
-                                        markets_section += f"  - 1X ({home_team} ou Empate): @{home_draw_odd}\n"
-                                    
-                                    ha_match = re.search(r"12.*?@(\d+\.?\d*)", odds_data)
-                                    if ha_match:
-                                        home_away_odd = float(ha_match.group(1))
-                                        markets_section += f"  - 12 ({home_team} ou {away_team}): @{home_away_odd}\n"
-                                    
-                                    da_match = re.search(r"X2.*?@(\d+\.?\d*)", odds_data)
-                                    if da_match:
-                                        draw_away_odd = float(da_match.group(1))
-                                        markets_section += f"  - X2 (Empate ou {away_team}): @{draw_away_odd}\n"
-                                    
-                                    # Atualizar probabilidades implícitas
-                                    if home_draw_odd > 0:
-                                        implied_probabilities["home_draw"] = 100.0 / home_draw_odd
-                                    if home_away_odd > 0:
-                                        implied_probabilities["home_away"] = 100.0 / home_away_odd
-                                    if draw_away_odd > 0:
-                                        implied_probabilities["draw_away"] = 100.0 / draw_away_odd
-                                
-                                # Ambos Marcam
-                                if selected_markets.get("ambos_marcam"):
-                                    markets_section += "- **Ambos Marcam (BTTS):**\n"
-                                    btts_yes_odd = 0
-                                    btts_no_odd = 0
-                                
-                                    # Extrair odds do texto original
-                                    yes_match = re.search(r"Sim.*?@(\d+\.?\d*)", odds_data)
-                                    if yes_match:
-                                        btts_yes_odd = float(yes_match.group(1))
-                                        markets_section += f"  - Sim: @{btts_yes_odd}\n"
-                                    
-                                    no_match = re.search(r"Não.*?@(\d+\.?\d*)", odds_data)
-                                    if no_match:
-                                        btts_no_odd = float(no_match.group(1))
-                                        markets_section += f"  - Não: @{btts_no_odd}\n"
-                                    
-                                    # Atualizar probabilidades implícitas
-                                    if btts_yes_odd > 0:
-                                        implied_probabilities["btts_yes"] = 100.0 / btts_yes_odd
-                                    if btts_no_odd > 0:
-                                        implied_probabilities["btts_no"] = 100.0 / btts_no_odd
-                                
-                                # Over/Under
-                                if selected_markets.get("over_under"):
-                                    markets_section += "- **Over/Under:**\n"
-                                    
-                                    # Extrair linha e odds
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Gols", odds_data)
-                                    over_match = re.search(r"Over\s+\d+\.?\d*\s+Gols:.*?@(\d+\.?\d*)", odds_data)
-                                    under_match = re.search(r"Under\s+\d+\.?\d*\s+Gols:.*?@(\d+\.?\d*)", odds_data)
-                                    
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        
-                                        if over_match:
-                                            over_odd = float(over_match.group(1))
-                                            markets_section += f"  - Over {line} Gols: @{over_odd}\n"
-                                            implied_probabilities[f"over_{str(line).replace('.', '_')}"] = 100.0 / over_odd
-                                        
-                                        if under_match:
-                                            under_odd = float(under_match.group(1))
-                                            markets_section += f"  - Under {line} Gols: @{under_odd}\n"
-                                            implied_probabilities[f"under_{str(line).replace('.', '_')}"] = 100.0 / under_odd
-                                
-                                # Escanteios
-                                if selected_markets.get("escanteios"):
-                                    markets_section += "- **Escanteios:**\n"
-                                    
-                                    # Extrair linha e odds
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Escanteios", odds_data)
-                                    over_match = re.search(r"Over\s+\d+\.?\d*\s+Escanteios:.*?@(\d+\.?\d*)", odds_data)
-                                    under_match = re.search(r"Under\s+\d+\.?\d*\s+Escanteios:.*?@(\d+\.?\d*)", odds_data)
-                                    
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        
-                                        if over_match:
-                                            over_odd = float(over_match.group(1))
-                                            markets_section += f"  - Over {line} Escanteios: @{over_odd}\n"
-                                            implied_probabilities[f"corners_over_{str(line).replace('.', '_')}"] = 100.0 / over_odd
-                                        
-                                        if under_match:
-                                            under_odd = float(under_match.group(1))
-                                            markets_section += f"  - Under {line} Escanteios: @{under_odd}\n"
-                                            implied_probabilities[f"corners_under_{str(line).replace('.', '_')}"] = 100.0 / under_odd
-                                
-                                # Cartões
-                                if selected_markets.get("cartoes"):
-                                    markets_section += "- **Cartões:**\n"
-                                    
-                                    # Extrair linha e odds
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Cartões", odds_data)
-                                    over_match = re.search(r"Over\s+\d+\.?\d*\s+Cartões:.*?@(\d+\.?\d*)", odds_data)
-                                    under_match = re.search(r"Under\s+\d+\.?\d*\s+Cartões:.*?@(\d+\.?\d*)", odds_data)
-                                    
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        
-                                        if over_match:
-                                            over_odd = float(over_match.group(1))
-                                            markets_section += f"  - Over {line} Cartões: @{over_odd}\n"
-                                            implied_probabilities[f"cards_over_{str(line).replace('.', '_')}"] = 100.0 / over_odd
-                                        
-                                        if under_match:
-                                            under_odd = float(under_match.group(1))
-                                            markets_section += f"  - Under {line} Cartões: @{under_odd}\n"
-                                            implied_probabilities[f"cards_under_{str(line).replace('.', '_')}"] = 100.0 / under_odd
-                                
-                                # IMPORTANTE: Adicionar a seção de mercados ao resultado
-                                new_analysis.append(markets_section)
-                        
-                                # Probabilidades calculadas
-                                probs_section = "# Probabilidades Calculadas (REAL vs IMPLÍCITA):\n"
-                                opportunities = []
-                        
-                                # Money Line
-                                if selected_markets.get("money_line") and "moneyline" in original_probabilities:
-                                    probs_section += "## Money Line (1X2):\n"
-                                    
-                                    # Casa
-                                    home_real = original_probabilities["moneyline"].get("home_win", 0)
-                                    home_implicit = implied_probabilities.get("home", 0)
-                                    home_value = home_real > home_implicit + 2
-                                    
-                                    probs_section += f"- **{home_team}**: Real {home_real:.1f}% vs Implícita {home_implicit:.1f}%{' (Valor)' if home_value else ''}\n"
-                                    
-                                    if home_value:
-                                        # Adicionar justificativa
-                                        home_justification = generate_justification(
-                                            "moneyline", "home_win", home_team, home_real, home_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                    # Empate
-                                    draw_real = original_probabilities["moneyline"].get("draw", 0)
-                                    draw_implicit = implied_probabilities.get("draw", 0)
-                                    draw_value = draw_real > draw_implicit + 2
-                                    
-                                    probs_section += f"- **Empate**: Real {draw_real:.1f}% vs Implícita {draw_implicit:.1f}%{' (Valor)' if draw_value else ''}\n"
-                                    
-                                    if draw_value:
-                                        # Adicionar justificativa
-                                        draw_justification = generate_justification(
-                                            "moneyline", "draw", "Empate", draw_real, draw_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                            
-                                    # Fora
-                                    away_real = original_probabilities["moneyline"].get("away_win", 0)
-                                    away_implicit = implied_probabilities.get("away", 0)
-                                    away_value = away_real > away_implicit + 2
-                                    
-                                    probs_section += f"- **{away_team}**: Real {away_real:.1f}% vs Implícita {away_implicit:.1f}%{' (Valor)' if away_value else ''}\n"
-                                    
-                                    if away_value:
-                                        # Adicionar justificativa
-                                        away_justification = generate_justification(
-                                            "moneyline", "away_win", away_team, away_real, away_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                        
-                                # Double Chance
-                                if selected_markets.get("chance_dupla") and "double_chance" in original_probabilities:
-                                    probs_section += "## Chance Dupla (Double Chance):\n"
-                                    
-                                    # 1X
-                                    hd_real = original_probabilities["double_chance"].get("home_or_draw", 0)
-                                    hd_implicit = implied_probabilities.get("home_draw", 0)
-                                    hd_value = hd_real > hd_implicit + 2
-                                    
-                                    probs_section += f"- **{home_team} ou Empate**: Real {hd_real:.1f}% vs Implícita {hd_implicit:.1f}%{' (Valor)' if hd_value else ''}\n"
-                                    
-                                    if hd_value:
-                                        # Adicionar justificativa
-                                        hd_justification = generate_justification(
-                                            "double_chance", "home_or_draw", f"{home_team} ou Empate", hd_real, hd_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                            
-                                    # 12
-                                    ha_real = original_probabilities["double_chance"].get("home_or_away", 0)
-                                    ha_implicit = implied_probabilities.get("home_away", 0)
-                                    ha_value = ha_real > ha_implicit + 2
-                                    
-                                    probs_section += f"- **{home_team} ou {away_team}**: Real {ha_real:.1f}% vs Implícita {ha_implicit:.1f}%{' (Valor)' if ha_value else ''}\n"
-                                    
-                                    if ha_value:
-                                        # Adicionar justificativa
-                                        ha_justification = generate_justification(
-                                            "double_chance", "home_or_away", f"{home_team} ou {away_team}", ha_real, ha_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                            
-                                    # X2
-                                    da_real = original_probabilities["double_chance"].get("away_or_draw", 0)
-                                    da_implicit = implied_probabilities.get("draw_away", 0)
-                                    da_value = da_real > da_implicit + 2
-                                    
-                                    probs_section += f"- **Empate ou {away_team}**: Real {da_real:.1f}% vs Implícita {da_implicit:.1f}%{' (Valor)' if da_value else ''}\n"
-                                    
-                                    if da_value:
-                                        # Adicionar justificativa
-                                        da_justification = generate_justification(
-                                            "double_chance", "away_or_draw", f"Empate ou {away_team}", da_real, da_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                        
-                                # BTTS
-                                if selected_markets.get("ambos_marcam") and "btts" in original_probabilities:
-                                    probs_section += "## Ambos Marcam (BTTS):\n"
-                                    
-                                    # Sim
-                                    yes_real = original_probabilities["btts"].get("yes", 0)
-                                    yes_implicit = implied_probabilities.get("btts_yes", 0)
-                                    yes_value = yes_real > yes_implicit + 2
-                                    
-                                    probs_section += f"- **Sim**: Real {yes_real:.1f}% vs Implícita {yes_implicit:.1f}%{' (Valor)' if yes_value else ''}\n"
-                                    
-                                    if yes_value:
-                                        # Adicionar justificativa
-                                        yes_justification = generate_justification(
-                                            "btts", "yes", "Ambos Marcam - Sim", yes_real, yes_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                            
-                                    # Não
-                                    no_real = original_probabilities["btts"].get("no", 0)
-                                    no_implicit = implied_probabilities.get("btts_no", 0)
-                                    no_value = no_real > no_implicit + 2
-                                    
-                                    probs_section += f"- **Não**: Real {no_real:.1f}% vs Implícita {no_implicit:.1f}%{' (Valor)' if no_value else ''}\n"
-                                    
-                                    if no_value:
-                                        # Adicionar justificativa
-                                        no_justification = generate_justification(
-                                            "btts", "no", "Ambos Marcam - Não", no_real, no_implicit,
-                                            original_probabilities, home_team, away_team
-                                        )
-                                                                        
-                                # Over/Under
-                                if selected_markets.get("over_under") and "over_under" in original_probabilities:
-                                    probs_section += "## Over/Under Gols:\n"
-                                    
-                                    # Extrair linha do texto de odds
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Gols", odds_data)
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        line_str = str(line).replace('.', '_')
-                                        
-                                        # Over
-                                        over_real = original_probabilities["over_under"].get("over_2_5", 0)  # Padrão para 2.5
-                                        if line == 0.5:
-                                            over_real = 90.0  # Aproximação para over 0.5
-                                        elif line == 1.5:
-                                            over_real = 75.0  # Aproximação para over 1.5
-                                        elif line == 3.5:
-                                            over_real = 40.0  # Aproximação para over 3.5
-                                        elif line == 4.5:
-                                            over_real = 25.0  # Aproximação para over 4.5
-                                        
-                                        over_implicit = implied_probabilities.get(f"over_{line_str}", 0)
-                                        over_value = over_real > over_implicit + 2
-                                        
-                                        probs_section += f"- **Over {line} Gols**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-                                        
-                                        if over_value:
-                                            # Adicionar justificativa
-                                            over_justification = generate_justification(
-                                                "over_under", f"over_{line_str}", f"Over {line} Gols", over_real, over_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                                    
-                                        # Under
-                                        under_real = 100.0 - over_real
-                                        under_implicit = implied_probabilities.get(f"under_{line_str}", 0)
-                                        under_value = under_real > under_implicit + 2
-                                        
-                                        probs_section += f"- **Under {line} Gols**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-                                        
-                                        if under_value:
-                                            # Adicionar justificativa
-                                            under_justification = generate_justification(
-                                                "over_under", f"under_{line_str}", f"Under {line} Gols", under_real, under_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                            
-                                # Escanteios
-                                if selected_markets.get("escanteios") and "corners" in original_probabilities:
-                                    probs_section += "## Escanteios:\n"
-                                    
-                                    # Extrair linha do texto de odds
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Escanteios", odds_data)
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        line_str = str(line).replace('.', '_')
-                                        
-                                        # Ajustar as probabilidades reais com base na linha
-                                        if line == 9.5:  # Linha padrão
-                                            over_real = original_probabilities["corners"].get("over_9_5", 0)
-                                        else:
-                                            # Ajustes para outras linhas
-                                            base_over = original_probabilities["corners"].get("over_9_5", 50)
-                                            if line < 9.5:
-                                                over_real = min(95, base_over + ((9.5 - line) * 10))  # +10% por cada ponto abaixo de 9.5
-                                            else:
-                                                over_real = max(5, base_over - ((line - 9.5) * 10))   # -10% por cada ponto acima de 9.5
-                                        
-                                        over_implicit = implied_probabilities.get(f"corners_over_{line_str}", 0)
-                                        over_value = over_real > over_implicit + 2
-                                        
-                                        probs_section += f"- **Over {line} Escanteios**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-                                        
-                                        if over_value:
-                                            # Adicionar justificativa
-                                            over_corners_justification = generate_justification(
-                                                "corners", f"over_{line_str}", f"Over {line} Escanteios", over_real, over_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                                    
-                                        # Under
-                                        under_real = 100.0 - over_real
-                                        under_implicit = implied_probabilities.get(f"corners_under_{line_str}", 0)
-                                        under_value = under_real > under_implicit + 2
-                                        
-                                        probs_section += f"- **Under {line} Escanteios**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-                                        
-                                        if under_value:
-                                            # Adicionar justificativa
-                                            under_corners_justification = generate_justification(
-                                                "corners", f"under_{line_str}", f"Under {line} Escanteios", under_real, under_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                            
-                                # Cartões - Código corrigido para usar expected_cards
-                                if selected_markets.get("cartoes") and "cards" in original_probabilities:
-                                    probs_section += "## Cartões:\n"
-                                    
-                                    # Extrair linha e odds do texto
-                                    line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Cartões", odds_data)
-                                    over_match = re.search(r"Over\s+\d+\.?\d*\s+Cartões:.*?@(\d+\.?\d*)", odds_data)
-                                    under_match = re.search(r"Under\s+\d+\.?\d*\s+Cartões:.*?@(\d+\.?\d*)", odds_data)
-                                    
-                                    if line_match:
-                                        line = float(line_match.group(1))
-                                        line_str = str(line).replace('.', '_')
-                                        
-                                        # Extrair e calcular probabilidades implícitas a partir das odds
-                                        if over_match:
-                                            over_odd = float(over_match.group(1))
-                                            # Calcular probabilidade implícita (1/odd * 100)
-                                            implied_probabilities[f"cards_over_{line_str}"] = 100.0 / over_odd
-                                        
-                                        if under_match:
-                                            under_odd = float(under_match.group(1))
-                                            # Calcular probabilidade implícita (1/odd * 100)
-                                            implied_probabilities[f"cards_under_{line_str}"] = 100.0 / under_odd
-                                        
-                                        # Extrair o expected_cards e usar os valores originais calculados
-                                        if "cards" in original_probabilities:
-                                            cards_data = original_probabilities["cards"]
-                                            
-                                            # Se cards_data for uma tupla (over_prob, under_prob, expected_cards)
-                                            if isinstance(cards_data, tuple) and len(cards_data) >= 3:
-                                                # Usar os valores originais da função calculate_cards_probability
-                                                over_real = cards_data[0] * 100
-                                                under_real = cards_data[1] * 100
-                                                expected_cards = cards_data[2]
-                                                
-                                                # Se o expected_cards for muito diferente do threshold, garantir valores extremos
-                                                if expected_cards > line + 8:  # Muitos cartões
-                                                    over_real = 95.0
-                                                    under_real = 5.0
-                                                elif expected_cards < line - 5:  # Poucos cartões
-                                                    over_real = 5.0
-                                                    under_real = 95.0
-                                                    
-                                            # Se cards_data for um dicionário
-                                            elif isinstance(cards_data, dict):
-                                                if "expected_cards" in cards_data:
-                                                    expected_cards = cards_data["expected_cards"]
-                                                    
-                                                    # Calcular probabilidades com base na distribuição normal
-                                                    import math
-                                                    std_dev = math.sqrt(expected_cards * 0.75)
-                                                    z_score = (line - expected_cards) / std_dev if std_dev > 0 else -5
-                                                    
-                                                    # Normal CDF para under probability
-                                                    def normal_cdf(x):
-                                                        return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
-                                                        
-                                                    under_real = normal_cdf(z_score) * 100
-                                                    over_real = 100.0 - under_real
-                                                
-                                                # Se tiver valores específicos para essa linha
-                                                elif f"over_{line_str}" in cards_data and f"under_{line_str}" in cards_data:
-                                                    over_real = cards_data[f"over_{line_str}"] * 100
-                                                    under_real = cards_data[f"under_{line_str}"] * 100
-                                                
-                                                # Valores gerais se não houver específicos
-                                                elif "over" in cards_data and "under" in cards_data:
-                                                    over_real = cards_data["over"] * 100
-                                                    under_real = cards_data["under"] * 100
-                                                
-                                                else:
-                                                    # Valores padrão se não houver nenhum específico
-                                                    over_real = 50.0
-                                                    under_real = 50.0
-                                            else:
-                                                # Valores padrão se cards_data não for nem tupla nem dict
-                                                over_real = 50.0
-                                                under_real = 50.0
-                                                
-                                            # Verificação final para garantir que os valores são coerentes
-                                            # Se temos logs indicando que o valor esperado é muito alto (>19)
-                                            if isinstance(cards_data, dict) and "expected_cards" in cards_data and isinstance(cards_data["expected_cards"], (int, float)):
-                                                expected_cards = cards_data["expected_cards"]
-                                                # Para um threshold bem menor que o valor esperado, Over deve ser muito alto
-                                                if expected_cards > line + 6:
-                                                    over_real = max(over_real, 90.0)
-                                                    under_real = min(under_real, 10.0)
-                                                # Para um threshold bem maior que o valor esperado, Under deve ser muito alto
-                                                elif expected_cards + 6 < line:
-                                                    over_real = min(over_real, 10.0)
-                                                    under_real = max(under_real, 90.0)
-                                            elif isinstance(cards_data, tuple) and len(cards_data) >= 3:
-                                                expected_cards = cards_data[2]
-                                                if expected_cards > line + 6:
-                                                    over_real = max(over_real, 90.0)
-                                                    under_real = min(under_real, 10.0)
-                                                elif expected_cards + 6 < line:
-                                                    over_real = min(over_real, 10.0)
-                                                    under_real = max(under_real, 90.0)
-                                        else:
-                                            # Se não houver dados de cards, usar valores neutros
-                                            over_real = 50.0
-                                            under_real = 50.0
-                                        
-                                        # Obter probabilidades implícitas das odds
-                                        over_implicit = implied_probabilities.get(f"cards_over_{line_str}", 0)
-                                        under_implicit = implied_probabilities.get(f"cards_under_{line_str}", 0)
-                                        
-                                        # Debug: imprimir valores para verificação
-                                        print(f"DEBUG - Cartões: over_real={over_real}, over_implicit={over_implicit}, under_real={under_real}, under_implicit={under_implicit}")
-                                        
-                                        # Verificar valor
-                                        over_value = over_real > over_implicit + 2
-                                        under_value = under_real > under_implicit + 2
-                                        
-                                        # Adicionar ao output
-                                        probs_section += f"- **Over {line} Cartões**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-                                        
-                                        if over_value:
-                                            # Adicionar justificativa
-                                            over_cards_justification = generate_justification(
-                                                "cards", f"over_{line_str}", f"Over {line} Cartões", over_real, over_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                                    
-                                        probs_section += f"- **Under {line} Cartões**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-                                        
-                                        if under_value:
-                                            # Adicionar justificativa
-                                            under_cards_justification = generate_justification(
-                                                "cards", f"under_{line_str}", f"Under {line} Cartões", under_real, under_implicit,
-                                                original_probabilities, home_team, away_team
-                                            )
-                                                                            
-                                # CRÍTICO: Adicionar a seção de probabilidades ao resultado
-                                new_analysis.append(probs_section)
-                                
-                                # Oportunidades identificadas# Oportunidades identificadas - usando nossa nova função
-                                # Oportunidades identificadas com nossa nova função
-                                opportunities_section, value_opportunities = generate_all_opportunities(
-                                    selected_markets, 
-                                    original_probabilities, 
-                                    implied_probabilities, 
-                                    home_team, 
-                                    away_team, 
-                                    odds_data
-                                )
-                                new_analysis.append(opportunities_section)
-                                
-                                # Nível de confiança
-                                confidence_section = "# Nível de Confiança Geral: Médio\n"
-                                
-                                # Extrair dados da consistência
-                                if "analysis_data" in original_probabilities:
-                                    analysis_data = original_probabilities["analysis_data"]
-                                    
-                                    # Obter consistência dos times
-                                    home_consistency = analysis_data.get("home_consistency", 0)
-                                    away_consistency = analysis_data.get("away_consistency", 0)
-                                    
-                                    # Ajustar para valores percentuais se necessário
-                                    if home_consistency <= 1.0:
-                                        home_consistency = home_consistency * 100
-                                    if away_consistency <= 1.0:
-                                        away_consistency = away_consistency * 100
-                                    
-                                    # Adicionar apenas informações de consistência
-                                    confidence_section += f"- **Consistência**: {home_team}: {home_consistency:.1f}%, {away_team}: {away_consistency:.1f}%\n"
-                                    confidence_section += "- Valores mais altos de consistência indicam maior confiança na previsão."
-                                else:
-                                    confidence_section += "- Dados insuficientes para determinar a consistência das equipes."
-                                
-                                new_analysis.append(confidence_section)
-                                
-                                # Avaliação de viabilidade - APENAS UMA SEÇÃO PARA TODAS AS OPORTUNIDADES
-                                viability_section = "# AVALIAÇÃO DE VIABILIDADE DE APOSTAS\n"
-                                
-                                # Avaliar cada oportunidade com valor
-                                if value_opportunities:
-                                    for opp in value_opportunities:
-                                        name = opp["name"]
-                                        real_prob = opp["real_prob"]
-                                        edge = opp["edge"]
-                                        
-                                        # Determinar nível de viabilidade
-                                        viability = ""
-                                        assessment = ""
-                                        recommendation = ""
-                                        
-                                        if real_prob > 70 and edge > 7:
-                                            viability = "🔥🔥🔥 EXCELENTE"
-                                            assessment = "Alta probabilidade e grande margem"
-                                            recommendation = "Oportunidade excelente para apostar. Considere uma aposta com valor mais alto."
-                                        elif real_prob > 60 and edge > 5:
-                                            viability = "🔥🔥 MUITO BOA"
-                                            assessment = "Boa probabilidade e margem significativa"
-                                            recommendation = "Boa oportunidade para apostar. Valor recomendado."
-                                        elif real_prob > 50 and edge > 3:
-                                            viability = "🔥 BOA"
-                                            assessment = "Probabilidade e margem razoáveis"
-                                            recommendation = "Considere uma aposta com valor moderado."
-                                        else:
-                                            viability = "⚠️ RAZOÁVEL"
-                                            assessment = "Ou boa probabilidade ou boa margem"
-                                            recommendation = "Apostar com cautela e valor reduzido."
-                                        
-                                        # Adicionar à seção
-                                        viability_section += f"## {name} - {viability}\n"
-                                        viability_section += f"- Probabilidade: {real_prob:.1f}% | Margem: {edge:.1f}%\n"
-                                        viability_section += f"- Avaliação: {assessment}\n"
-                                        viability_section += f"- Recomendação: {recommendation}\n"
-                                else:
-                                    viability_section += "Não foram identificadas oportunidades com valor significativo para avaliação.\n"
-                                
-                                # Legenda
-                                viability_section += "\n# LEGENDA DE VIABILIDADE\n"
-                                viability_section += "- 🔥🔥🔥 EXCELENTE: Alta probabilidade (>70%) e grande margem (>7%)\n"
-                                viability_section += "- 🔥🔥 MUITO BOA: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-                                viability_section += "- 🔥 BOA: Probabilidade e margem razoáveis (>50% e >3%)\n"
-                                viability_section += "- ⚠️ RAZOÁVEL: Ou boa probabilidade ou boa margem\n"
-                                viability_section += "- ❌ BAIXA: Probabilidade e margem insuficientes\n"
-                                
-                                new_analysis.append(viability_section)
-                                
-                                # Avaliar cada oportunidade
-                                for opportunity in opportunities:
-                                    # Extrair dados
-                                    match = re.search(r"\*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)", opportunity)
-                                    if match:
-                                        market = match.group(1)
-                                        real_prob = float(match.group(2))
-                                        implicit_prob = float(match.group(3))
-                                        edge = float(match.group(4))
-                                        
-                                        # Inicializar a seção de viabilidade
-                                        viability_section = "# AVALIAÇÃO DE VIABILIDADE DE APOSTAS\n"
-                                        
-                                        # Determinar nível de viabilidade
-                                        viability = ""
-                                        assessment = ""
-                                        recommendation = ""
-                                        
-                                        if real_prob > 70 and edge > 7:
-                                            viability = "🔥🔥🔥 EXCELENTE"
-                                            assessment = "Alta probabilidade e grande margem"
-                                            recommendation = "Oportunidade excelente para apostar. Considere uma aposta com valor mais alto."
-                                        elif real_prob > 60 and edge > 5:
-                                            viability = "🔥🔥 MUITO BOA"
-                                            assessment = "Boa probabilidade e margem significativa"
-                                            recommendation = "Boa oportunidade para apostar. Valor recomendado."
-                                        elif real_prob > 50 and edge > 3:
-                                            viability = "🔥 BOA"
-                                            assessment = "Probabilidade e margem razoáveis"
-                                            recommendation = "Considere uma aposta com valor moderado."
-                                        else:
-                                            viability = "⚠️ RAZOÁVEL"
-                                            assessment = "Ou boa probabilidade ou boa margem"
-                                            recommendation = "Apostar com cautela e valor reduzido."
-                                        
-                                        # Adicionar à seção
-                                        viability_section += f"## {market} - {viability}\n"
-                                        viability_section += f"- Probabilidade: {real_prob:.1f}% | Margem: {edge:.1f}%\n"
-                                        viability_section += f"- Avaliação: {assessment}\n"
-                                        viability_section += f"- Recomendação: {recommendation}\n"
-                                        
-                                        # Legenda
-                                        viability_section += "# LEGENDA DE VIABILIDADE\n"
-                                        viability_section += "- 🔥🔥🔥 EXCELENTE: Alta probabilidade (>70%) e grande margem (>7%)\n"
-                                        viability_section += "- 🔥🔥 MUITO BOA: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-                                        viability_section += "- 🔥 BOA: Probabilidade e margem razoáveis (>50% e >3%)\n"
-                                        viability_section += "- ⚠️ RAZOÁVEL: Ou boa probabilidade ou boa margem\n"
-                                        viability_section += "- ❌ BAIXA: Probabilidade e margem insuficientes\n"
-                                        
-                                        new_analysis.append(viability_section)
-                                # Juntar tudo
-                                return "\n".join(new_analysis)
-                                
-                            except Exception as e:
-                                logger.error(f"Erro durante a análise: {str(e)}")
-                                logger.error(traceback.format_exc())
-                                status.error(f"Erro durante a análise: {str(e)}")
-                                if st.session_state.debug_mode:
-                                    st.code(traceback.format_exc())
-                        
-                        # Mostrar análise formatada
-                        formatted_analysis = reconstruct_analysis(
-                            analysis, 
-                            home_team, 
-                            away_team, 
-                            selected_markets, 
-                            original_probabilities, 
-                            implied_probabilities, 
+                    # Resposta da IA validada no esquema JSON; os números exibidos são os calculados.
+                    # Sem resposta válida (ou na análise rápida), o relatório é montado direto
+                    # das probabilidades calculadas e das odds
+                    status.empty()
+                    structured = None
+                    if analysis and not fast_reason:
+                        try:
+                            structured = parse_structured_analysis(analysis)
+                        except AnalysisSchemaError as schema_error:
+                            logger.warning(f"Resposta da IA fora do esquema: {str(schema_error)}")
+                    
+                    if structured:
+                        market_rows = evaluate_markets(
+                            selected_markets, original_probabilities, odds_data, home_team, away_team
+                        )
+                        formatted_analysis = reconcile_opportunities(structured, market_rows).to_markdown(
+                            home_team, away_team
+                        )
+                    else:
+                        if fast_reason:
+                            logger.info(f"Análise rápida para {home_team} x {away_team}: {fast_reason}")
+                            st.info(f"⚡ Análise rápida (sem IA): {fast_reason}.")
+                        formatted_analysis = render_analysis_report(
+                            home_team,
+                            away_team,
+                            selected_markets,
+                            original_probabilities,
                             odds_data
                         )
+                    
+                    # Exibir a análise formatada no lugar do texto parcial do streaming
+                    stream_placeholder.markdown(formatted_analysis)
+                    
+                    # Tempo de cada etapa (busca de dados vs IA) para o painel administrativo
+                    from utils.llm_metrics import record_analysis
+                    record_analysis(
+                        fetch_seconds, llm_seconds, time.time() - analysis_started,
+                        cache=cache_status, mode="rapida" if fast_reason else "ia",
+                        markets=sum(1 for v in selected_markets.values() if v)
+                    )
+                    # IMPORTANTE: Registrar uso após análise bem-sucedida
+                    try:
+                        num_markets = sum(1 for v in selected_markets.values() if v)
+                        # Análise rápida custa menos créditos que a análise com IA
+                        num_credits = fast_analysis_credits(num_markets) if fast_reason else num_markets
+                        # Registro de uso com dados detalhados
+                        analysis_data = {
+                            "league": selected_league,
+                            "home_team": home_team,
+                            "away_team": away_team,
+                            "markets_used": [k for k, v in selected_markets.items() if v],
+                            "fast_analysis": bool(fast_reason)
+                        }
+                        # Créditos são cobrados também quando a análise vem do cache
+                        success = st.session_state.user_manager.use_credits(
+                            st.session_state.email, 
+                            num_credits
+                        )
+                        logger.info(f"Uso registrado: {analysis_data}")
                         
-                        # Exibir a análise formatada
-                        st.markdown(formatted_analysis)
-                        # IMPORTANTE: Registrar uso após análise bem-sucedida
-                        try:
-                            num_markets = sum(1 for v in selected_markets.values() if v)
-                            # Registro de uso com dados detalhados
-                            analysis_data = {
-                                "league": selected_league,
-                                "home_team": home_team,
-                                "away_team": away_team,
-                                "markets_used": [k for k, v in selected_markets.items() if v]
-                            }
-                            success = st.session_state.user_manager.record_usage(
-                                st.session_state.email, 
-                                num_markets,
-                                analysis_data
-                            )
+                        if success:
+                            # Forçar atualização do cache de estatísticas
+                            if hasattr(st.session_state, 'user_stats_cache'):
+                                del st.session_state.user_stats_cache  # Remover cache para forçar reload
                             
-                            if success:
-                                # Forçar atualização do cache de estatísticas
-                                if hasattr(st.session_state, 'user_stats_cache'):
-                                    del st.session_state.user_stats_cache  # Remover cache para forçar reload
-                                
-                                # Mostrar mensagem de sucesso com créditos restantes
-                                updated_stats = st.session_state.user_manager.get_usage_stats(st.session_state.email)
-                                credits_after = updated_stats['credits_remaining']
-                                st.success(f"{num_markets} créditos foram consumidos. Agora você tem {credits_after} créditos.")
-                            else:
-                                st.warning("Não foi possível registrar o uso. Por favor verifique seus créditos.")
-                        except Exception as usage_error:
-                            logger.error(f"Erro ao registrar uso: {str(usage_error)}")
-                            logger.error(traceback.format_exc())
-                            st.warning("Ocorreu um erro ao contabilizar créditos. Entre em contato com o suporte.")
-                        
+                            # Mostrar mensagem de sucesso com créditos restantes
+                            updated_stats = st.session_state.user_manager.get_usage_stats(st.session_state.email)
+                            credits_after = updated_stats['credits_remaining']
+                            st.success(f"{num_credits} créditos foram consumidos. Agora você tem {credits_after} créditos.")
+                        else:
+                            st.warning("Não foi possível registrar o uso. Por favor verifique seus créditos.")
+                    except Exception as usage_error:
+                        logger.error(f"Erro ao registrar uso: {str(usage_error)}")
+                        logger.error(traceback.format_exc())
+                        st.warning("Ocorreu um erro ao contabilizar créditos. Entre em contato com o suporte.")
+                    
                 except Exception as analysis_error:
                     status.error(f"Erro durante análise: {str(analysis_error)}")
                     logger.error(f"Erro durante análise: {str(analysis_error)}")
@@ -2781,543 +1898,6 @@ def transform_api_data(stats_data, home_team, away_team, selected_markets):
         
         return result
 
-# Função de avaliação de oportunidades
-def evaluate_opportunity(real_prob, margin):
-    """Avalia a qualidade da oportunidade com base na probabilidade e margem"""
-    if real_prob >= 70 and margin >= 7:
-        return "EXCELENTE", "green", "Alta probabilidade e grande margem"
-    elif real_prob >= 60 and margin >= 5:
-        return "MUITO BOA", "lightgreen", "Boa probabilidade e margem significativa" 
-    elif real_prob >= 50 and margin >= 3:
-        return "BOA", "yellow", "Probabilidade e margem razoáveis"
-    elif real_prob >= 60 or margin >= 5:
-        return "RAZOÁVEL", "orange", "Ou boa probabilidade ou boa margem"
-    else:
-        return "BAIXA", "red", "Probabilidade e margem insuficientes"
-
-# Função para adicionar a avaliação ao final da análise
-def add_opportunity_evaluation(analysis_text):
-    """
-    Adiciona uma avaliação das oportunidades ao final do texto de análise
-    
-    Args:
-        analysis_text (str): O texto da análise original
-        
-    Returns:
-        str: Texto da análise com a avaliação adicionada
-    """
-    import re
-    
-    # Extrair as oportunidades com regex
-    pattern = r"\*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    matches = re.findall(pattern, analysis_text)
-    
-    if not matches:
-        # Se não encontrar oportunidades no formato esperado, tente outro padrão
-        pattern = r"\- \*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-        matches = re.findall(pattern, analysis_text)
-        
-    if not matches:
-        # Tente um padrão mais genérico como último recurso
-        pattern = r"([^-:]+): Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(?Valor de (\d+\.\d+)%\)?"
-        matches = re.findall(pattern, analysis_text)
-    
-    # Se ainda não encontrou oportunidades, retorna o texto original
-    if not matches:
-        return analysis_text
-    
-    # Adicionar a seção de avaliação de oportunidades
-    evaluation_text = "\n\n# AVALIAÇÃO DE VIABILIDADE DE APOSTAS\n"
-    
-    for match in matches:
-        opportunity_name, real_prob_str, implicit_prob_str, margin_str = match
-        
-        try:
-            # Converter para números
-            real_prob = float(real_prob_str)
-            margin = float(margin_str)
-            
-            # Avaliar a oportunidade
-            rating, description = evaluate_opportunity(real_prob, margin)
-            
-            # Formatar classificação com símbolos
-            rating_symbol = {
-                "EXCELENTE": "🔥🔥🔥",
-                "MUITO BOA": "🔥🔥",
-                "BOA": "🔥",
-                "RAZOÁVEL": "⚠️",
-                "BAIXA": "❌"
-            }.get(rating, "")
-            
-            # Adicionar à saída
-            evaluation_text += f"\n## {opportunity_name.strip()} - {rating_symbol} {rating}\n"
-            evaluation_text += f"- Probabilidade: {real_prob:.1f}% | Margem: {margin:.1f}%\n"
-            evaluation_text += f"- Avaliação: {description}\n"
-            
-            # Adicionar recomendações específicas com base na classificação
-            if rating == "EXCELENTE":
-                evaluation_text += "- Recomendação: Oportunidade excelente para apostar. Considere uma aposta com valor mais alto.\n"
-            elif rating == "MUITO BOA":
-                evaluation_text += "- Recomendação: Boa oportunidade para apostar. Valor recomendado.\n"
-            elif rating == "BOA":
-                evaluation_text += "- Recomendação: Oportunidade viável para apostar com moderação.\n"
-            elif rating == "RAZOÁVEL":
-                evaluation_text += "- Recomendação: Apostar com cautela e valor reduzido.\n"
-            else:
-                evaluation_text += "- Recomendação: Não recomendamos esta aposta. Valor baixo detectado.\n"
-            
-        except (ValueError, TypeError):
-            continue
-    
-    # Adicionar legenda
-    evaluation_text += "\n# LEGENDA DE VIABILIDADE\n"
-    evaluation_text += "- 🔥🔥🔥 EXCELENTE: Alta probabilidade (>70%) e grande margem (>7%)\n"
-    evaluation_text += "- 🔥🔥 MUITO BOA: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-    evaluation_text += "- 🔥 BOA: Probabilidade e margem razoáveis (>50% e >3%)\n"
-    evaluation_text += "- ⚠️ RAZOÁVEL: Ou boa probabilidade ou boa margem\n"
-    evaluation_text += "- ❌ BAIXA: Probabilidade e margem insuficientes\n"
-    
-    # Retornar o texto original + a avaliação
-    return analysis_text + evaluation_text
-
-# Função alternativa caso os emojis não funcionem bem
-def add_opportunity_evaluation_simple(analysis_text):
-    """
-    Versão sem emojis, caso eles não funcionem bem na sua implementação
-    """
-    import re
-    
-    # Extrair as oportunidades com regex
-    pattern = r"\*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    matches = re.findall(pattern, analysis_text)
-    
-    if not matches:
-        # Se não encontrar oportunidades no formato esperado, tente outro padrão
-        pattern = r"\- \*\*([^*]+)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-        matches = re.findall(pattern, analysis_text)
-        
-    if not matches:
-        # Tente um padrão mais genérico como último recurso
-        pattern = r"([^-:]+): Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(?Valor de (\d+\.\d+)%\)?"
-        matches = re.findall(pattern, analysis_text)
-    
-    # Se ainda não encontrou oportunidades, retorna o texto original
-    if not matches:
-        return analysis_text
-    
-    # Adicionar a seção de avaliação de oportunidades
-    evaluation_text = "\n\n# AVALIAÇÃO DE VIABILIDADE DE APOSTAS\n"
-    
-    for match in matches:
-        opportunity_name, real_prob_str, implicit_prob_str, margin_str = match
-        
-        try:
-            # Converter para números
-            real_prob = float(real_prob_str)
-            margin = float(margin_str)
-            
-            # Avaliar a oportunidade
-            rating, description = evaluate_opportunity(real_prob, margin)
-            
-            # Formatar classificação com símbolos
-            rating_symbol = {
-                "EXCELENTE": "***",
-                "MUITO BOA": "**",
-                "BOA": "*",
-                "RAZOÁVEL": "!",
-                "BAIXA": "X"
-            }.get(rating, "")
-            
-            # Adicionar à saída
-            evaluation_text += f"\n## {opportunity_name.strip()} - {rating_symbol} {rating}\n"
-            evaluation_text += f"- Probabilidade: {real_prob:.1f}% | Margem: {margin:.1f}%\n"
-            evaluation_text += f"- Avaliação: {description}\n"
-            
-            # Adicionar recomendações específicas com base na classificação
-            if rating == "EXCELENTE":
-                evaluation_text += "- Recomendação: Oportunidade excelente para apostar. Considere uma aposta com valor mais alto.\n"
-            elif rating == "MUITO BOA":
-                evaluation_text += "- Recomendação: Boa oportunidade para apostar. Valor recomendado.\n"
-            elif rating == "BOA":
-                evaluation_text += "- Recomendação: Oportunidade viável para apostar com moderação.\n"
-            elif rating == "RAZOÁVEL":
-                evaluation_text += "- Recomendação: Apostar com cautela e valor reduzido.\n"
-            else:
-                evaluation_text += "- Recomendação: Não recomendamos esta aposta. Valor baixo detectado.\n"
-            
-        except (ValueError, TypeError):
-            continue
-    
-    # Adicionar legenda
-    evaluation_text += "\n# LEGENDA DE VIABILIDADE\n"
-    evaluation_text += "- *** EXCELENTE: Alta probabilidade (>70%) e grande margem (>7%)\n"
-    evaluation_text += "- ** MUITO BOA: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-    evaluation_text += "- * BOA: Probabilidade e margem razoáveis (>50% e >3%)\n"
-    evaluation_text += "- ! RAZOÁVEL: Ou boa probabilidade ou boa margem\n"
-    evaluation_text += "- X BAIXA: Probabilidade e margem insuficientes\n"
-    
-    # Retornar o texto original + a avaliação
-    return analysis_text + evaluation_text
-
-
-# Função para mostrar o indicador visual da oportunidade usando componentes do Streamlit
-def show_opportunity_indicator_native(real_prob, margin, opportunity_name):
-    """
-    Mostra um indicador visual da qualidade da oportunidade usando componentes nativos do Streamlit
-    
-    Args:
-        real_prob (float): Probabilidade real (0-100)
-        margin (float): Margem (diferença entre prob real e implícita)
-        opportunity_name (str): Nome da oportunidade/mercado
-    """
-    rating, color, description = evaluate_opportunity(real_prob, margin)
-    
-    # Mapear cores para cores do Streamlit
-    color_map = {
-        "green": "success",
-        "lightgreen": "success",
-        "yellow": "warning",
-        "orange": "warning",
-        "red": "error"
-    }
-    
-    st_color = color_map.get(color, "primary")
-    
-    # Criar um container com bordas para o indicador
-    with st.container():
-        # Título da oportunidade
-        st.subheader(opportunity_name)
-        
-        # Mostrar probabilidade com barra de progresso
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            st.write("Probabilidade:")
-        with col2:
-            st.progress(min(1.0, real_prob/100))
-            st.write(f"{real_prob:.1f}%")
-        
-        # Mostrar margem com barra de progresso
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            st.write("Margem:")
-        with col2:
-            # Escalar a margem para melhor visualização (máximo considerado: 20%)
-            st.progress(min(1.0, margin/20))
-            st.write(f"{margin:.1f}%")
-            
-        # Mostrar classificação e descrição
-        if st_color == "success":
-            st.success(f"**Classificação: {rating}** - {description}")
-        elif st_color == "warning":
-            st.warning(f"**Classificação: {rating}** - {description}")
-        elif st_color == "error":
-            st.error(f"**Classificação: {rating}** - {description}")
-        else:
-            st.info(f"**Classificação: {rating}** - {description}")
-            
-        # Adicionar uma linha divisória
-        st.markdown("---")
-
-# Função modificada para extrair oportunidades identificadas e mostrar indicadores
-def extract_and_show_opportunities_native(analysis_text):
-    """
-    Extrai oportunidades do texto de análise e mostra indicadores visuais
-    usando apenas componentes nativos do Streamlit
-    
-    Args:
-        analysis_text (str): Texto da análise
-    """
-    import re
-    
-    # Procurar a seção de Oportunidades Identificadas
-    opportunities_section = None
-    sections = analysis_text.split("#")
-    
-    for section in sections:
-        if "Oportunidades Identificadas" in section:
-            opportunities_section = section
-            break
-    
-    if not opportunities_section:
-        st.warning("Não foi possível encontrar oportunidades na análise.")
-        return
-    
-    # Extrair oportunidades individuais
-    opportunities = []
-    
-    # Padrão de regex para capturar: nome, probabilidade real, implícita e margem
-    pattern = r"\*\*(.*?)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    
-    matches = re.findall(pattern, opportunities_section)
-    
-    if not matches:
-        st.warning("Nenhuma oportunidade específica encontrada na análise.")
-        return
-    
-    # Mostrar cabeçalho
-    st.markdown("## Indicadores de Oportunidades")
-    st.markdown("Analise as oportunidades identificadas e suas classificações:")
-    
-    # Criar indicador para cada oportunidade
-    for match in matches:
-        opportunity_name, real_prob_str, implicit_prob_str, margin_str = match
-        
-        try:
-            real_prob = float(real_prob_str)
-            margin = float(margin_str)
-            
-            # Mostrar indicador usando componentes nativos
-            show_opportunity_indicator_native(real_prob, margin, opportunity_name)
-        except (ValueError, TypeError) as e:
-            st.error(f"Erro ao processar oportunidade: {e}")
-            continue
-    
-    # Adicionar legenda explicativa
-    with st.expander("Legenda de Classificação", expanded=False):
-        st.markdown("""
-        ### Como interpretar as classificações:
-        
-        - **Excelente**: Alta probabilidade (>70%) e grande margem (>7%) - Oportunidade ideal para apostar
-        - **Muito Boa**: Boa probabilidade (>60%) e margem significativa (>5%) - Forte recomendação
-        - **Boa**: Probabilidade e margem razoáveis (>50% e >3%) - Recomendação moderada
-        - **Razoável**: Ou boa probabilidade ou boa margem - Considerar com cautela
-        - **Baixa**: Probabilidade e margem insuficientes - Não recomendado
-        
-        *A probabilidade indica a chance do evento acontecer, enquanto a margem representa a diferença entre a probabilidade real e a implícita nas odds.*
-        """)
-
-# Alternativa usando apenas texto formatado (sem elementos visuais)
-def show_opportunities_text_only(analysis_text):
-    """
-    Versão alternativa que usa apenas texto formatado, sem elementos visuais do Streamlit
-    
-    Args:
-        analysis_text (str): Texto da análise
-    """
-    import re
-    
-    # Procurar a seção de Oportunidades Identificadas
-    opportunities_section = None
-    sections = analysis_text.split("#")
-    
-    for section in sections:
-        if "Oportunidades Identificadas" in section:
-            opportunities_section = section
-            break
-    
-    if not opportunities_section:
-        st.write("Não foi possível encontrar oportunidades na análise.")
-        return
-    
-    # Extrair oportunidades individuais
-    pattern = r"\*\*(.*?)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    matches = re.findall(pattern, opportunities_section)
-    
-    if not matches:
-        st.write("Nenhuma oportunidade específica encontrada na análise.")
-        return
-    
-    # Preparar o texto de saída
-    output_text = "## AVALIAÇÃO DE OPORTUNIDADES\n\n"
-    
-    for match in matches:
-        opportunity_name, real_prob_str, implicit_prob_str, margin_str = match
-        
-        try:
-            real_prob = float(real_prob_str)
-            margin = float(margin_str)
-            
-            # Avaliar a oportunidade
-            rating, _, description = evaluate_opportunity(real_prob, margin)
-            
-            # Formatar classificação com símbolos
-            rating_symbol = {
-                "Excelente": "🔥🔥🔥",
-                "Muito Boa": "🔥🔥",
-                "Boa": "🔥",
-                "Razoável": "⚠️",
-                "Baixa": "❌"
-            }.get(rating, "")
-            
-            # Adicionar à saída
-            output_text += f"### {opportunity_name} {rating_symbol}\n"
-            output_text += f"- Probabilidade: {real_prob:.1f}% | Margem: {margin:.1f}%\n"
-            output_text += f"- Classificação: **{rating}** - {description}\n\n"
-            
-        except (ValueError, TypeError):
-            continue
-    
-    # Adicionar legenda
-    output_text += "### Legenda:\n"
-    output_text += "- 🔥🔥🔥 Excelente: Alta probabilidade (>70%) e grande margem (>7%)\n"
-    output_text += "- 🔥🔥 Muito Boa: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-    output_text += "- 🔥 Boa: Probabilidade e margem razoáveis (>50% e >3%)\n"
-    output_text += "- ⚠️ Razoável: Ou boa probabilidade ou boa margem\n"
-    output_text += "- ❌ Baixa: Probabilidade e margem insuficientes\n"
-    
-    # Mostrar o texto
-    st.markdown(output_text)
-
-# Versão ultra minimalista usando apenas texto simples (sem markdown)
-def show_opportunities_ultra_simple(analysis_text):
-    """
-    Versão ultra minimalista que usa apenas texto simples
-    
-    Args:
-        analysis_text (str): Texto da análise
-    """
-    import re
-    
-    # Extrair oportunidades diretamente do texto completo
-    pattern = r"\*\*(.*?)\*\*: Real (\d+\.\d+)% vs Implícita (\d+\.\d+)% \(Valor de (\d+\.\d+)%\)"
-    matches = re.findall(pattern, analysis_text)
-    
-    if not matches:
-        return
-    
-    # Adicionar as avaliações como texto puro após a análise
-    new_text = analysis_text + "\n\n"
-    new_text += "# AVALIAÇÃO DE OPORTUNIDADES\n\n"
-    
-    for match in matches:
-        opportunity_name, real_prob_str, implicit_prob_str, margin_str = match
-        
-        try:
-            real_prob = float(real_prob_str)
-            margin = float(margin_str)
-            
-            # Avaliar a oportunidade
-            rating, _, description = evaluate_opportunity(real_prob, margin)
-            
-            # Formatar classificação com símbolos
-            rating_symbol = {
-                "Excelente": "***",
-                "Muito Boa": "**",
-                "Boa": "*",
-                "Razoável": "!",
-                "Baixa": "X"
-            }.get(rating, "")
-            
-            # Adicionar à saída
-            new_text += f"{rating_symbol} {opportunity_name}\n"
-            new_text += f"- Probabilidade: {real_prob:.1f}% | Margem: {margin:.1f}%\n"
-            new_text += f"- Classificação: {rating} - {description}\n\n"
-            
-        except (ValueError, TypeError):
-            continue
-    
-    # Adicionar legenda
-    new_text += "Legenda:\n"
-    new_text += "*** Excelente: Alta probabilidade (>70%) e grande margem (>7%)\n"
-    new_text += "** Muito Boa: Boa probabilidade (>60%) e margem significativa (>5%)\n"
-    new_text += "* Boa: Probabilidade e margem razoáveis (>50% e >3%)\n"
-    new_text += "! Razoável: Ou boa probabilidade ou boa margem\n"
-    new_text += "X Baixa: Probabilidade e margem insuficientes\n"
-    
-    return new_text
-def format_text_for_display(text, max_width=70):
-    """
-    Formata um texto para garantir que nenhuma linha exceda o comprimento máximo especificado.
-    
-    Args:
-        text (str): Texto a ser formatado
-        max_width (int): Largura máxima de cada linha em caracteres
-        
-    Returns:
-        str: Texto formatado com quebras de linha
-    """
-    lines = []
-    for line in text.split('\n'):
-        if len(line) <= max_width:
-            lines.append(line)
-        else:
-            # Quebrar linhas muito longas
-            current_line = ""
-            words = line.split()
-            
-            for word in words:
-                if len(current_line) + len(word) + 1 <= max_width:
-                    # Adicionar palavra à linha atual
-                    if current_line:
-                        current_line += " " + word
-                    else:
-                        current_line = word
-                else:
-                    # Iniciar nova linha
-                    lines.append(current_line)
-                    current_line = word
-            
-            # Adicionar a última linha
-            if current_line:
-                lines.append(current_line)
-    
-    return '\n'.join(lines)
-
-def update_opportunities_format(opportunities_section):
-    """
-    Atualiza a formatação da seção de oportunidades para evitar linhas muito longas
-    que exijam rolagem horizontal e preserva a primeira letra das justificativas.
-    
-    Args:
-        opportunities_section (str): Texto da seção de oportunidades
-        
-    Returns:
-        str: Texto reformatado para limitar a largura
-    """
-    # Dividir o texto em linhas
-    lines = opportunities_section.split('\n')
-    formatted_lines = []
-    
-    # Largura máxima por linha (ajuste conforme necessário)
-    max_width = 70
-    
-    for line in lines:
-        # Se a linha for uma oportunidade (começa com '- **')
-        if line.startswith('- **'):
-            # Manter a primeira linha como está (título da oportunidade)
-            formatted_lines.append(line)
-        # Se for uma justificativa (contém "*Justificativa:")
-        elif '*Justificativa:' in line:
-            # Verificar se já está dividida em múltiplas linhas
-            if '\n' in line:
-                # Já está formatada, adicionar todas as linhas
-                formatted_lines.extend(line.split('\n'))
-            else:
-                # Dividir em prefixo e conteúdo, preservando a primeira letra
-                parts = line.split('*Justificativa:', 1)
-                prefix = parts[0] + "*Justificativa:"
-                content = parts[1].strip() if len(parts) > 1 else ""
-                
-                # Formatar o conteúdo da justificativa
-                if content:
-                    # Palavra por palavra para garantir que nenhuma letra seja perdida
-                    words = content.split()
-                    current_line = prefix + " " + words[0]  # Garantir que a primeira palavra esteja completa
-                    
-                    for word in words[1:]:
-                        # Se adicionar a palavra não ultrapassar a largura máxima
-                        if len(current_line) + len(word) + 1 <= max_width:
-                            # Adicionar palavra à linha atual
-                            current_line += " " + word
-                        else:
-                            # Adicionar a linha atual e começar uma nova
-                            formatted_lines.append(current_line)
-                            # Alinhar a nova linha com a justificativa (espaços antes)
-                            current_line = "    " + word
-                    
-                    # Adicionar a última linha da justificativa
-                    if current_line:
-                        formatted_lines.append(current_line)
-                else:
-                    # Se não houver conteúdo, adicionar apenas o prefixo
-                    formatted_lines.append(prefix)
-        else:
-            # Outras linhas são mantidas como estão
-            formatted_lines.append(line)
-    
-    # Juntar as linhas formatadas
-    return '\n'.join(formatted_lines)
-
 
 def apply_responsive_sidebar_css():
     """
@@ -3473,13 +2053,6 @@ def ensure_sidebar_visibility():
     </script>
     """, unsafe_allow_html=True)
     
-def generate_justification(market_type, bet_type, team_name, real_prob, implied_prob, 
-                         original_probabilities, home_team, away_team):
-    """
-    Versão modificada que retorna string vazia, eliminando justificativas
-    """
-    return ""  # Retorna string vazia em vez de gerar justificativas
-    
 def fix_sidebar_animation():
     """
     Corrige o problema de animação da sidebar durante o carregamento,
@@ -3627,309 +2200,3 @@ def remove_top_whitespace():
     }
     </style>
     """, unsafe_allow_html=True)
-def generate_all_opportunities(selected_markets, original_probabilities, implied_probabilities, 
-                              home_team, away_team, odds_data):
-    """
-    Gera apenas as oportunidades com valor para os mercados selecionados.
-    
-    Returns:
-        tuple: (texto_oportunidades, lista_oportunidades_valor)
-    """
-    import re
-    
-    # Lista para armazenar oportunidades com valor
-    value_opportunities = []
-    valid_opportunities = []  # Para armazenar textos das oportunidades com valor
-    
-    # 1. Money Line (se selecionado)
-    if selected_markets.get("money_line") and "moneyline" in original_probabilities:
-        # Casa
-        home_real = original_probabilities["moneyline"].get("home_win", 0)
-        home_implicit = implied_probabilities.get("home", 0)
-        home_edge = home_real - home_implicit
-        if home_edge > 2:
-            opp_text = f"- **{home_team}**: Real {home_real:.1f}% vs Implícita {home_implicit:.1f}% (Valor de {home_edge:.1f}%)"
-            valid_opportunities.append(("Money Line (1X2)", opp_text))
-            value_opportunities.append({
-                "name": f"{home_team}",
-                "market": "Money Line",
-                "real_prob": home_real,
-                "implied_prob": home_implicit,
-                "edge": home_edge
-            })
-        
-        # Empate
-        draw_real = original_probabilities["moneyline"].get("draw", 0)
-        draw_implicit = implied_probabilities.get("draw", 0)
-        draw_edge = draw_real - draw_implicit
-        if draw_edge > 2:
-            opp_text = f"- **Empate**: Real {draw_real:.1f}% vs Implícita {draw_implicit:.1f}% (Valor de {draw_edge:.1f}%)"
-            valid_opportunities.append(("Money Line (1X2)", opp_text))
-            value_opportunities.append({
-                "name": "Empate",
-                "market": "Money Line",
-                "real_prob": draw_real,
-                "implied_prob": draw_implicit,
-                "edge": draw_edge
-            })
-        
-        # Fora
-        away_real = original_probabilities["moneyline"].get("away_win", 0)
-        away_implicit = implied_probabilities.get("away", 0)
-        away_edge = away_real - away_implicit
-        if away_edge > 2:
-            opp_text = f"- **{away_team}**: Real {away_real:.1f}% vs Implícita {away_implicit:.1f}% (Valor de {away_edge:.1f}%)"
-            valid_opportunities.append(("Money Line (1X2)", opp_text))
-            value_opportunities.append({
-                "name": f"{away_team}",
-                "market": "Money Line",
-                "real_prob": away_real,
-                "implied_prob": away_implicit,
-                "edge": away_edge
-            })
-    
-    # 2. Chance Dupla (se selecionado)
-    if selected_markets.get("chance_dupla") and "double_chance" in original_probabilities:
-        # 1X
-        hd_real = original_probabilities["double_chance"].get("home_or_draw", 0)
-        hd_implicit = implied_probabilities.get("home_draw", 0)
-        hd_edge = hd_real - hd_implicit
-        if hd_edge > 2:
-            opp_text = f"- **{home_team} ou Empate**: Real {hd_real:.1f}% vs Implícita {hd_implicit:.1f}% (Valor de {hd_edge:.1f}%)"
-            valid_opportunities.append(("Chance Dupla", opp_text))
-            value_opportunities.append({
-                "name": f"{home_team} ou Empate",
-                "market": "Chance Dupla",
-                "real_prob": hd_real,
-                "implied_prob": hd_implicit,
-                "edge": hd_edge
-            })
-        
-        # 12
-        ha_real = original_probabilities["double_chance"].get("home_or_away", 0)
-        ha_implicit = implied_probabilities.get("home_away", 0)
-        ha_edge = ha_real - ha_implicit
-        if ha_edge > 2:
-            opp_text = f"- **{home_team} ou {away_team}**: Real {ha_real:.1f}% vs Implícita {ha_implicit:.1f}% (Valor de {ha_edge:.1f}%)"
-            valid_opportunities.append(("Chance Dupla", opp_text))
-            value_opportunities.append({
-                "name": f"{home_team} ou {away_team}",
-                "market": "Chance Dupla",
-                "real_prob": ha_real,
-                "implied_prob": ha_implicit,
-                "edge": ha_edge
-            })
-        
-        # X2
-        da_real = original_probabilities["double_chance"].get("away_or_draw", 0)
-        da_implicit = implied_probabilities.get("draw_away", 0)
-        da_edge = da_real - da_implicit
-        if da_edge > 2:
-            opp_text = f"- **Empate ou {away_team}**: Real {da_real:.1f}% vs Implícita {da_implicit:.1f}% (Valor de {da_edge:.1f}%)"
-            valid_opportunities.append(("Chance Dupla", opp_text))
-            value_opportunities.append({
-                "name": f"Empate ou {away_team}",
-                "market": "Chance Dupla",
-                "real_prob": da_real,
-                "implied_prob": da_implicit,
-                "edge": da_edge
-            })
-    
-    # 3. Ambos Marcam (se selecionado)
-    if selected_markets.get("ambos_marcam") and "btts" in original_probabilities:
-        # Sim
-        yes_real = original_probabilities["btts"].get("yes", 0)
-        yes_implicit = implied_probabilities.get("btts_yes", 0)
-        yes_edge = yes_real - yes_implicit
-        if yes_edge > 2:
-            opp_text = f"- **Sim**: Real {yes_real:.1f}% vs Implícita {yes_implicit:.1f}% (Valor de {yes_edge:.1f}%)"
-            valid_opportunities.append(("Ambos Marcam (BTTS)", opp_text))
-            value_opportunities.append({
-                "name": "Ambos Marcam - Sim",
-                "market": "BTTS",
-                "real_prob": yes_real,
-                "implied_prob": yes_implicit,
-                "edge": yes_edge
-            })
-        
-        # Não
-        no_real = original_probabilities["btts"].get("no", 0)
-        no_implicit = implied_probabilities.get("btts_no", 0)
-        no_edge = no_real - no_implicit
-        if no_edge > 2:
-            opp_text = f"- **Não**: Real {no_real:.1f}% vs Implícita {no_implicit:.1f}% (Valor de {no_edge:.1f}%)"
-            valid_opportunities.append(("Ambos Marcam (BTTS)", opp_text))
-            value_opportunities.append({
-                "name": "Ambos Marcam - Não",
-                "market": "BTTS",
-                "real_prob": no_real,
-                "implied_prob": no_implicit,
-                "edge": no_edge
-            })
-    
-    # 4. Over/Under (se selecionado)
-    if selected_markets.get("over_under") and "over_under" in original_probabilities:
-        # Extrair linha do texto de odds
-        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Gols", odds_data)
-        if line_match:
-            line = float(line_match.group(1))
-            line_str = str(line).replace('.', '_')
-            
-            # Over
-            over_real = original_probabilities["over_under"].get(f"over_{line_str}", 0)
-            if over_real == 0:  # Fallback para over_2_5 se específico não existir
-                over_real = original_probabilities["over_under"].get("over_2_5", 0)
-            over_implicit = implied_probabilities.get(f"over_{line_str}", 0)
-            over_edge = over_real - over_implicit
-            if over_edge > 2:
-                opp_text = f"- **Over {line} Gols**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
-                valid_opportunities.append(("Over/Under Gols", opp_text))
-                value_opportunities.append({
-                    "name": f"Over {line} Gols",
-                    "market": "Over/Under",
-                    "real_prob": over_real,
-                    "implied_prob": over_implicit,
-                    "edge": over_edge
-                })
-            
-            # Under
-            under_real = original_probabilities["over_under"].get(f"under_{line_str}", 0)
-            if under_real == 0:  # Fallback ou cálculo
-                under_real = 100.0 - over_real
-            under_implicit = implied_probabilities.get(f"under_{line_str}", 0)
-            under_edge = under_real - under_implicit
-            if under_edge > 2:
-                opp_text = f"- **Under {line} Gols**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
-                valid_opportunities.append(("Over/Under Gols", opp_text))
-                value_opportunities.append({
-                    "name": f"Under {line} Gols",
-                    "market": "Over/Under",
-                    "real_prob": under_real,
-                    "implied_prob": under_implicit,
-                    "edge": under_edge
-                })
-    
-    # 5. Escanteios (se selecionado)
-    if selected_markets.get("escanteios") and "corners" in original_probabilities:
-        # Extrair linha do texto de odds
-        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Escanteios", odds_data)
-        if line_match:
-            line = float(line_match.group(1))
-            line_str = str(line).replace('.', '_')
-            
-            # Calcular over e under para escanteios
-            if f"over_{line_str}" in original_probabilities["corners"]:
-                over_real = original_probabilities["corners"][f"over_{line_str}"] * 100
-            else:
-                # Use o padrão para over_9_5 e ajuste
-                base_over = original_probabilities["corners"].get("over_9_5", 50)
-                if isinstance(base_over, float) and base_over <= 1.0:
-                    base_over = base_over * 100
-                if line < 9.5:
-                    over_real = min(95, base_over + ((9.5 - line) * 10))
-                else:
-                    over_real = max(5, base_over - ((line - 9.5) * 10))
-            
-            over_implicit = implied_probabilities.get(f"corners_over_{line_str}", 0)
-            over_edge = over_real - over_implicit
-            if over_edge > 2:
-                opp_text = f"- **Over {line} Escanteios**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
-                valid_opportunities.append(("Escanteios", opp_text))
-                value_opportunities.append({
-                    "name": f"Over {line} Escanteios",
-                    "market": "Escanteios",
-                    "real_prob": over_real,
-                    "implied_prob": over_implicit,
-                    "edge": over_edge
-                })
-            
-            # Under
-            under_real = 100.0 - over_real
-            under_implicit = implied_probabilities.get(f"corners_under_{line_str}", 0)
-            under_edge = under_real - under_implicit
-            if under_edge > 2:
-                opp_text = f"- **Under {line} Escanteios**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
-                valid_opportunities.append(("Escanteios", opp_text))
-                value_opportunities.append({
-                    "name": f"Under {line} Escanteios",
-                    "market": "Escanteios",
-                    "real_prob": under_real,
-                    "implied_prob": under_implicit,
-                    "edge": under_edge
-                })
-    
-    # 6. Cartões (se selecionado)
-    if selected_markets.get("cartoes") and "cards" in original_probabilities:
-        # Extrair linha do texto de odds
-        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Cartões", odds_data)
-        if line_match:
-            line = float(line_match.group(1))
-            line_str = str(line).replace('.', '_')
-            
-            # Calcular over e under para cartões
-            if isinstance(original_probabilities["cards"], dict):
-                if f"over_{line_str}" in original_probabilities["cards"]:
-                    over_real = original_probabilities["cards"][f"over_{line_str}"] * 100
-                else:
-                    # Aproximação baseada em expected_cards
-                    expected_cards = original_probabilities["cards"].get("expected_cards", 3.5)
-                    if expected_cards > line + 1.5:
-                        over_real = 75
-                    elif expected_cards > line:
-                        over_real = 60
-                    elif expected_cards + 1.5 < line:
-                        over_real = 25
-                    else:
-                        over_real = 40
-            else:
-                # Valor padrão se não tivermos dados específicos
-                over_real = 50
-            
-            over_implicit = implied_probabilities.get(f"cards_over_{line_str}", 0)
-            over_edge = over_real - over_implicit
-            if over_edge > 2:
-                opp_text = f"- **Over {line} Cartões**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
-                valid_opportunities.append(("Cartões", opp_text))
-                value_opportunities.append({
-                    "name": f"Over {line} Cartões",
-                    "market": "Cartões",
-                    "real_prob": over_real,
-                    "implied_prob": over_implicit,
-                    "edge": over_edge
-                })
-            
-            # Under
-            under_real = 100.0 - over_real
-            under_implicit = implied_probabilities.get(f"cards_under_{line_str}", 0)
-            under_edge = under_real - under_implicit
-            if under_edge > 2:
-                opp_text = f"- **Under {line} Cartões**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
-                valid_opportunities.append(("Cartões", opp_text))
-                value_opportunities.append({
-                    "name": f"Under {line} Cartões",
-                    "market": "Cartões",
-                    "real_prob": under_real,
-                    "implied_prob": under_implicit,
-                    "edge": under_edge
-                })
-    
-    # Construir o texto final apenas com oportunidades que têm valor
-    opportunities_text = "# Oportunidades Identificadas:\n"
-    
-    if valid_opportunities:
-        # Agrupar oportunidades por mercado
-        from collections import defaultdict
-        grouped_opps = defaultdict(list)
-        
-        for market, opp_text in valid_opportunities:
-            grouped_opps[market].append(opp_text)
-        
-        # Adicionar cada mercado e suas oportunidades
-        for market, opps in grouped_opps.items():
-            opportunities_text += f"## {market}:\n"
-            opportunities_text += "\n".join(opps) + "\n"
-    else:
-        opportunities_text += "Infelizmente não detectamos valor em nenhuma das suas apostas."
-    
-    # Retornar tanto o texto quanto a lista de oportunidades com valor
-    return opportunities_text, value_opportunities
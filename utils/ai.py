@@ -1,13 +1,22 @@
 import os
+import time
 import logging
 import streamlit as st
 import json
 import math
 import numpy as np  # Se você também estiver usando numpy
+from contextlib import nullcontext
+
+from utils.prompt_budget import compact_prompt, estimate_tokens, log_prompt_budget
+from utils.analysis_schema import RESPONSE_FORMAT
 
 # Configuração de logging
 logger = logging.getLogger("valueHunter.ai")
 
+# Versão do template do prompt: incrementar ao mudar format_highly_optimized_prompt
+# ou o prompt de sistema, para invalidar as análises em utils/analysis_cache.py
+PROMPT_TEMPLATE_VERSION = "3"
+
 try:
     from openai import OpenAI, OpenAIError
     logger.info("OpenAI importado com sucesso")
@@ -34,6 +43,12 @@ except ImportError as e:
 
 @st.cache_resource
 def get_openai_client():
+    # Backend local para testes (LLM_BACKEND=stub), sem acesso ao provedor
+    if os.environ.get("LLM_BACKEND") == "stub":
+        from utils.llm_dispatcher import StubLLMClient
+        logger.info("Usando cliente LLM simulado (LLM_BACKEND=stub)")
+        return StubLLMClient(latency=float(os.environ.get("LLM_STUB_LATENCY", "1.0")))
+    
     # Melhor tratamento de erros para obtenção da API key
     try:
         # Se estamos no Render, usar variáveis de ambiente diretamente
@@ -50,13 +65,25 @@ def get_openai_client():
                 api_key = os.environ.get("OPENAI_API_KEY", "")
                 logger.info("Usando API key da OpenAI de variáveis de ambiente locais")
         
+        # Servidor compatível alternativo (ex.: utils/openai_stub.py para testes de carga)
+        base_url = os.environ.get("OPENAI_BASE_URL")
+        if base_url and not api_key:
+            api_key = "stub"
+        
         if not api_key:
             logger.error("OpenAI API key não encontrada em nenhuma configuração")
             return None
             
         try:
-            client = OpenAI(api_key=api_key)
-            logger.info("Cliente OpenAI inicializado com sucesso")
+            # Todas as chamadas passam por LLMDispatcher.call_with_retry, que já faz
+            # as novas tentativas; as do SDK (padrão 2) se somariam às dele
+            options = {"max_retries": int(os.environ.get("OPENAI_MAX_RETRIES") or 0)}
+            if base_url:
+                client = OpenAI(api_key=api_key, base_url=base_url, **options)
+                logger.info(f"Cliente OpenAI inicializado com base_url {base_url}")
+            else:
+                client = OpenAI(api_key=api_key, **options)
+                logger.info("Cliente OpenAI inicializado com sucesso")
             return client
         except Exception as e:
             logger.error(f"Erro ao criar cliente OpenAI: {str(e)}")
@@ -65,7 +92,35 @@ def get_openai_client():
         logger.error(f"Erro não tratado em get_openai_client: {str(e)}")
         return None
 
-# Add to utils/ai.py
+# Instruções fixas do prompt de análise. Ficam no início do prompt e não dependem
+# da partida, então o prefixo é idêntico entre requisições. Com o prompt de sistema
+# somam ~400-800 tokens, abaixo do mínimo de 1024 do cache de prompt do provedor:
+# hoje não há tokens em cache; a ordem só importa se o prefixo crescer
+ANALYSIS_INSTRUCTIONS_PREFIX = """
+# INSTRUÇÕES PARA ANÁLISE
+Analise os dados estatísticos fornecidos para identificar valor nas odds.
+Você é um especialista em probabilidades esportivas que utiliza nosso método avançado de Dispersão e Ponderação:
+- Forma recente: 25%
+- Estatísticas de equipe: 35%
+- Posição na tabela: 20%
+- Métricas de criação: 20%
+
+IMPORTANTE: As probabilidades REAIS já foram calculadas para os mercados selecionados (seção "MERCADOS SELECIONADOS PARA ESTA ANÁLISE") e somam exatamente 100% em cada mercado.
+Todas as probabilidades reais estão na seção "PROBABILIDADES CALCULADAS".
+
+Responda APENAS com um objeto JSON no esquema solicitado:
+- "summary": visão geral da partida em 2 a 3 frases
+- "sections": análises por tema, na ordem: {"title": "Análise de Mercados Disponíveis", "content": resumo APENAS dos mercados selecionados com odds e probabilidades implícitas}, {"title": "Probabilidades Calculadas (REAL vs IMPLÍCITA)", "content": comparação das probabilidades REAIS com as IMPLÍCITAS APENAS nos mercados selecionados}; "content" em markdown (listas com "- ")
+- "opportunities": cada seleção com valor (probabilidade real pelo menos 2% maior que a implícita), com "market", "selection", "real_prob", "implied_prob" e "edge" em % e "justification" em uma frase
+- "confidence": {"level": "Baixo" | "Médio" | "Alto", "rationale": explicação}
+
+Em "selection" use exatamente: o nome do time (vitória), "Empate", "[Time] ou Empate", "Empate ou [Time]", "[Mandante] ou [Visitante]", "Ambos Marcam - Sim", "Ambos Marcam - Não", "Over 2.5 Gols", "Under 9.5 Escanteios", "Over 3.5 Cartões" (com a linha informada nas odds).
+
+Em "confidence.rationale", sempre esclareça que:
+- Consistência é uma medida (%) que indica quão previsível é o desempenho da equipe
+- Forma (X.X/15) representa a pontuação dos últimos 5 jogos (vitória=3pts, empate=1pt, derrota=0pts)
+- Valores mais altos em ambas métricas aumentam a confiança na previsão
+"""
 
 def format_highly_optimized_prompt(optimized_data, home_team, away_team, odds_data, selected_markets):
     """
@@ -105,10 +160,11 @@ def format_highly_optimized_prompt(optimized_data, home_team, away_team, odds_da
         has_stats_data = True
         
         # Log da qualidade dos dados
-        home_fields = sum(1 for k, v in home.items() 
+        from utils.extraction_plan import resolved_items
+        home_fields = sum(1 for k, v in resolved_items(home) 
                        if (isinstance(v, (int, float)) and v != 0) or 
                           (isinstance(v, str) and v not in ["", "?????"]))
-        away_fields = sum(1 for k, v in away.items() 
+        away_fields = sum(1 for k, v in resolved_items(away) 
                        if (isinstance(v, (int, float)) and v != 0) or 
                           (isinstance(v, str) and v not in ["", "?????"]))
         
@@ -240,35 +296,31 @@ def format_highly_optimized_prompt(optimized_data, home_team, away_team, odds_da
 """
 
        # 4. CARDS AND CORNERS if selected
-
-        # ─── CÁLCULO CORRETO DE MÉDIAS ──────────────────────────────
-        home_avg_corners = home.get("corners_per_game", 0)
-        away_avg_corners = away.get("corners_per_game", 0)
-        avg_corners      = home_avg_corners + away_avg_corners
-        
-        home_avg_cards   = home.get("cards_per_game", 0)
-        away_avg_cards   = away.get("cards_per_game", 0)
-        avg_cards        = home_avg_cards + away_avg_cards
-        # ───────────────────────────────────────────────────────────
+        # (médias lidas só com o mercado selecionado: fora dele os campos
+        # ficam pendentes na extração sob demanda)
         
         other_stats = ""
         
         if selected_markets.get("escanteios"):
+            home_avg_corners = home.get("corners_per_game", 0)
+            away_avg_corners = away.get("corners_per_game", 0)
+            avg_corners      = home_avg_corners + away_avg_corners
             other_stats += f"""
         # ESTATÍSTICAS PARA MERCADOS DE ESCANTEIOS
         
         ### Dados de Escanteios
-        …  
         * Média combinada de escanteios: {avg_corners:.2f} por jogo  
           (Casa: {home_avg_corners:.2f} | Fora: {away_avg_corners:.2f})
         """
         
         if selected_markets.get("cartoes"):
+            home_avg_cards   = home.get("cards_per_game", 0)
+            away_avg_cards   = away.get("cards_per_game", 0)
+            avg_cards        = home_avg_cards + away_avg_cards
             other_stats += f"""
         # ESTATÍSTICAS PARA MERCADOS DE CARTÕES
         
         ### Dados de Cartões
-        …  
         * Média combinada de cartões: {avg_cards:.2f} por jogo  
           (Casa: {home_avg_cards:.2f} | Fora: {away_avg_cards:.2f})
         """
@@ -592,19 +644,9 @@ def format_highly_optimized_prompt(optimized_data, home_team, away_team, odds_da
         
         # 6. PROBABILITY SECTION
         # Removida lógica de fallback conforme solicitado pelo cliente
-        prob_title = "PROBABILIDADES CALCULADAS (MÉTODO DE DISPERSÃO E PONDERAÇÃO)"
-        prob_explanation = """
-        ### Metodologia
-        As probabilidades foram calculadas usando nossa metodologia de dispersão e ponderação com:
-        - Forma recente: 25% (ajustado)
-        - Estatísticas de equipe: 35% (ajustado)
-        - Posição na tabela: 20%
-        - Métricas de criação: 20%"""
-            
-        # Start building the probability section
-        probability_section = f"""
-        # {prob_title}
-        {prob_explanation}
+        # (a metodologia faz parte do prefixo estático ANALYSIS_INSTRUCTIONS_PREFIX)
+        probability_section = """
+        # PROBABILIDADES CALCULADAS (MÉTODO DE DISPERSÃO E PONDERAÇÃO)
         """
         
         # Only include Money Line if selected
@@ -693,42 +735,12 @@ def format_highly_optimized_prompt(optimized_data, home_team, away_team, odds_da
         # Join the market names into a string
         selected_markets_str = ", ".join(selected_market_names)
         
+        # Parte variável das instruções; o formato da resposta fica no prefixo estático
         instructions = f"""
-        # INSTRUÇÕES PARA ANÁLISE
-        
-        Analise os dados estatísticos fornecidos para identificar valor nas odds.
-        Você é um especialista em probabilidades esportivas que utiliza nosso método avançado de Dispersão e Ponderação.
-        
-        IMPORTANTE: As probabilidades REAIS já foram calculadas para você para os seguintes mercados selecionados e somam exatamente 100% em cada mercado:
+        # MERCADOS SELECIONADOS PARA ESTA ANÁLISE
         {selected_markets_str}
         
-        Todas as probabilidades reais estão na seção "PROBABILIDADES CALCULADAS".
-        
-        VOCÊ DEVE responder EXATAMENTE no formato abaixo:
-        
-        # Análise da Partida
-        ## {home_team} x {away_team}
-        
-        # Análise de Mercados Disponíveis:
-        [Resumo detalhado APENAS dos mercados selecionados ({selected_markets_str}) com suas odds e probabilidades implícitas]
-        
-        # Probabilidades Calculadas (REAL vs IMPLÍCITA):
-        [Compare as probabilidades REAIS calculadas com as probabilidades IMPLÍCITAS nas odds APENAS para os mercados selecionados ({selected_markets_str})]
-        
-        # Oportunidades Identificadas:
-        [Liste cada mercado onde você encontrou valor/edge, mostrando a porcentagem de vantagem]
-        - Considere valor quando a probabilidade real for pelo menos 2% maior que a implícita
-        
-        # Nível de Confiança Geral: [Baixo/Médio/Alto]
-        [Explique o nível de confiança, incluindo uma explicação clara sobre:
-        - O que significa "consistência" (a previsibilidade do desempenho do time)
-        - O que significam os valores de forma (X.X/15) - explicando que são pontos dos últimos 5 jogos
-        - Como esses fatores influenciam sua confiança na análise]
-        
-        ATENÇÃO: Ao explicar o nível de confiança, sempre esclareça que:
-        - Consistência é uma medida (%) que indica quão previsível é o desempenho da equipe
-        - Forma (X.X/15) representa a pontuação dos últimos 5 jogos (vitória=3pts, empate=1pt, derrota=0pts)
-        - Valores mais altos em ambas métricas aumentam a confiança na previsão
+        Analise APENAS estes mercados. Mandante: {home_team}. Visitante: {away_team}.
         """
 
         # Adicionar aviso quando utilizamos o modelo de fallback
@@ -741,28 +753,32 @@ e recomende cautela nas decisões baseadas nesta análise.
 """
 
         # Compile the final prompt
-        sections = [
-            fundamental_stats,
-        ]
+        # Prefixo estático primeiro (ver ANALYSIS_INSTRUCTIONS_PREFIX), depois os dados da partida;
+        # seções de estatísticas só entram para os mercados selecionados
+        sections = {"instrucoes_fixas": ANALYSIS_INSTRUCTIONS_PREFIX}
+        sections["fundamentais"] = fundamental_stats
         
         # Only include result stats if moneyline or double chance are selected
         if selected_markets.get("money_line") or selected_markets.get("chance_dupla"):
-            sections.append(result_stats)
+            sections["resultado"] = result_stats
         
         # Only include goals stats if over/under or btts are selected
         if selected_markets.get("over_under") or selected_markets.get("ambos_marcam"):
-            sections.append(goals_stats)
+            sections["gols"] = goals_stats
         
         # Only include other stats if relevant markets are selected
         if other_stats and (selected_markets.get("escanteios") or selected_markets.get("cartoes")):
-            sections.append(other_stats)
+            sections["escanteios_cartoes"] = other_stats
         
         # Always include probability section and markets info
-        sections.append(probability_section)
-        sections.append(markets_info)
-        sections.append(instructions)
+        sections["probabilidades"] = probability_section
+        sections["odds"] = markets_info
+        sections["instrucoes"] = instructions
+        
+        sections = {name: compact_prompt(text) for name, text in sections.items() if text}
+        log_prompt_budget(sections, f"{home_team} vs {away_team}")
         
-        full_prompt = "\n".join([s for s in sections if s])
+        full_prompt = "\n\n".join(sections.values())
         logger.info(f"Prompt prepared successfully for {home_team} vs {away_team}")
         
         return full_prompt
@@ -803,38 +819,207 @@ Responda com EXATAMENTE este formato:
 # Nível de Confiança Geral: [Baixo/Médio/Alto]
 [Explique o que significa 'consistência' e 'forma (X.X/15)' ao justificar o nível de confiança]
 """
-def analyze_with_gpt(prompt, original_probabilities=None, selected_markets=None, home_team=None, away_team=None):
+# Prompt de sistema do analista (parte da versão PROMPT_TEMPLATE_VERSION)
+ANALYST_SYSTEM_PROMPT = "Você é um Agente Analista de Probabilidades Esportivas especializado. Trabalhe com quaisquer dados estatísticos disponíveis, mesmo que sejam limitados. Na ausência de dados completos, forneça análise com base nas odds implícitas e nos poucos dados disponíveis, sendo transparente sobre as limitações, mas ainda oferecendo recomendações práticas."
+
+# Intervalo mínimo entre atualizações da tela durante o streaming (segundos)
+STREAM_RENDER_INTERVAL = 0.15
+
+# Modelo usado nas análises (também define o preço em utils/llm_metrics.py)
+LLM_MODEL = "gpt-4o"
+
+
+def _analysis_messages(prompt):
+    return [
+        {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _log_token_usage(usage):
+    """Registra o consumo real de tokens informado pelo provedor (inclui tokens em cache)"""
+    if not usage:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details else 0
+    logger.info(f"Tokens usados: entrada={usage.prompt_tokens} (cache={cached or 0}), "
+                f"saída={usage.completion_tokens}")
+
+
+def stream_analysis_with_gpt(client, prompt, timer=None):
+    """
+    Gera o texto da análise em pedaços, à medida que o modelo responde
+
+    Args:
+        client: Cliente OpenAI
+        prompt (str): Prompt formatado
+        timer (LLMCallTimer): Recebe o primeiro trecho e o consumo de tokens (utils/llm_metrics.py)
+
+    Yields:
+        str: Trechos de texto da resposta
+    """
+    from utils.llm_dispatcher import get_llm_dispatcher
+    
+    # Novas tentativas apenas na abertura do stream (antes de qualquer texto exibido)
+    stream = get_llm_dispatcher().call_with_retry(lambda: client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=_analysis_messages(prompt),
+        temperature=0.3,
+        timeout=60,
+        response_format=RESPONSE_FORMAT,
+        stream=True,
+        stream_options={"include_usage": True}
+    ))
+    for chunk in stream:
+        if not chunk.choices:
+            # Último evento do stream traz apenas o consumo de tokens
+            usage = getattr(chunk, "usage", None)
+            _log_token_usage(usage)
+            if timer:
+                timer.usage = usage
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if timer:
+                timer.first_token()
+            yield delta
+
+
+def analyze_with_gpt(prompt, original_probabilities=None, selected_markets=None, home_team=None, away_team=None,
+                     stream_callback=None, tier="free", on_queue_position=None, queue_timeout=None,
+                     raise_on_overload=False, parallel_sections=None, interactive=True):
+    """
+    Envia o prompt ao GPT e retorna o texto completo da análise (JSON no esquema
+    de utils/analysis_schema.py)
+
+    As chamadas passam pelo despachante do processo (utils/llm_dispatcher.py),
+    que limita a concorrência e ordena a fila pelo tier do usuário, e são
+    registradas em utils/llm_metrics.py (fila, latência, tokens e custo).
+
+    Args:
+        prompt (str): Prompt formatado
+        stream_callback (callable): Se informado, a resposta é consumida em streaming e
+                                    stream_callback(texto_parcial) é chamado a cada
+                                    STREAM_RENDER_INTERVAL segundos e ao final
+        tier (str): Tier do usuário (pro, standard, free)
+        on_queue_position (callable): Chamado com a posição na fila enquanto o pedido espera
+        queue_timeout (float): Espera máxima na fila (padrão do despachante)
+        raise_on_overload (bool): Propagar LLMDispatcherError (fila cheia ou espera esgotada)
+                                  em vez de exibir erro, para o chamador usar a análise rápida
+        parallel_sections (bool): Gerar a análise em seções paralelas (utils/section_generation.py);
+                                  padrão LLM_PARALLEL_SECTIONS. Nesse modo stream_callback recebe o
+                                  JSON combinado a cada seção concluída
+        interactive (bool): Exibir spinner e erros no Streamlit; False em tarefas fora do
+                            app (utils/pregeneration.py), que só registram no log
+
+    Returns:
+        str: Texto da análise ou None em caso de erro
+    """
+    from utils.llm_dispatcher import get_llm_dispatcher, LLMDispatcherError
+    from utils.llm_metrics import LLMCallTimer
+    
+    timer = None
     try:
         client = get_openai_client()
         if not client:
-            st.error("Cliente OpenAI não inicializado")
+            _show_error("Cliente OpenAI não inicializado", interactive)
             return None
-            
-        with st.spinner("Analisando dados e calculando probabilidades..."):
-            logger.info("Enviando prompt para análise com GPT")
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um Agente Analista de Probabilidades Esportivas especializado. Trabalhe com quaisquer dados estatísticos disponíveis, mesmo que sejam limitados. Na ausência de dados completos, forneça análise com base nas odds implícitas e nos poucos dados disponíveis, sendo transparente sobre as limitações, mas ainda oferecendo recomendações práticas."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                timeout=60  # Timeout de 60 segundos
+        
+        from utils.section_generation import PARALLEL_SECTIONS_ENABLED, generate_analysis_by_sections
+        if parallel_sections is None:
+            parallel_sections = PARALLEL_SECTIONS_ENABLED
+        if parallel_sections and selected_markets:
+            # Cada seção ocupa sua própria vaga no despachante (ver custo em utils/section_generation.py)
+            logger.info("Enviando prompt para análise com GPT (seções paralelas)")
+            return generate_analysis_by_sections(
+                lambda text, response_format, section_timer: _request_analysis(
+                    client, text, response_format, section_timer
+                ),
+                prompt, selected_markets, tier=tier, queue_timeout=queue_timeout,
+                on_progress=stream_callback, model=LLM_MODEL, on_queue_position=on_queue_position
             )
-            logger.info("Resposta recebida do GPT com sucesso")
-            return response.choices[0].message.content
+        
+        dispatcher = get_llm_dispatcher()
+        timer = LLMCallTimer("stream" if stream_callback else "analysis", LLM_MODEL, tier)
+        with dispatcher.slot(tier, on_position=on_queue_position, timeout=queue_timeout):
+            timer.start()
+            analysis = _run_analysis(client, dispatcher, prompt, stream_callback, timer, interactive)
+        timer.record()
+        return analysis
+    except LLMDispatcherError as e:
+        logger.warning(f"Pedido de análise não atendido: {str(e)}")
+        if timer:
+            timer.record("overload")
+        if raise_on_overload:
+            raise
+        _show_error("O serviço de análise está sobrecarregado no momento. Tente novamente em instantes.", interactive)
+        return None
     except OpenAIError as e:
+        if timer:
+            timer.record("error")
         logger.error(f"Erro na API OpenAI: {str(e)}")
-        st.error(f"Erro na API OpenAI: {str(e)}")
+        _show_error(f"Erro na API OpenAI: {str(e)}", interactive)
         return None
     except Exception as e:
+        if timer:
+            timer.record("error")
         logger.error(f"Erro inesperado: {str(e)}")
-        st.error(f"Erro inesperado: {str(e)}")
+        _show_error(f"Erro inesperado: {str(e)}", interactive)
         return None
 
+
+def _show_error(message, interactive):
+    """Exibe o erro no Streamlit apenas dentro do app (o log já foi registrado)"""
+    if interactive:
+        st.error(message)
+
+
+def _run_analysis(client, dispatcher, prompt, stream_callback, timer=None, interactive=True):
+    """Executa a chamada ao GPT (com streaming ou bloqueante) já com a vaga obtida"""
+    logger.info(f"Tokens de entrada estimados: ~{estimate_tokens(ANALYST_SYSTEM_PROMPT) + estimate_tokens(prompt)}")
+    
+    if stream_callback:
+        logger.info("Enviando prompt para análise com GPT (streaming)")
+        started = time.time()
+        parts = []
+        last_render = 0.0
+        for delta in stream_analysis_with_gpt(client, prompt, timer):
+            if not parts:
+                logger.info(f"Primeiro trecho recebido em {time.time() - started:.2f}s")
+            parts.append(delta)
+            now = time.time()
+            if now - last_render >= STREAM_RENDER_INTERVAL:
+                stream_callback("".join(parts))
+                last_render = now
+        
+        analysis = "".join(parts)
+        stream_callback(analysis)
+        logger.info(f"Streaming concluído em {time.time() - started:.2f}s")
+        return analysis or None
+        
+    spinner = st.spinner("Analisando dados e calculando probabilidades...") if interactive else nullcontext()
+    with spinner:
+        logger.info("Enviando prompt para análise com GPT")
+        content = dispatcher.call_with_retry(lambda: _request_analysis(client, prompt, RESPONSE_FORMAT, timer))
+        logger.info("Resposta recebida do GPT com sucesso")
+        return content
+
+
+def _request_analysis(client, prompt, response_format, timer=None):
+    """Chamada bloqueante ao GPT; retorna o texto da resposta"""
+    response = client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=_analysis_messages(prompt),
+        temperature=0.3,
+        timeout=60,  # Timeout de 60 segundos
+        response_format=response_format
+    )
+    usage = getattr(response, "usage", None)
+    _log_token_usage(usage)
+    if timer:
+        timer.usage = usage
+    return response.choices[0].message.content
+
 # Função auxiliar para calcular probabilidades reais
 def calculate_real_prob(home_xg, away_xg, home_games, away_games):
     """Calcula probabilidades reais com handling melhorado para valores inválidos"""
@@ -917,468 +1102,6 @@ def check_data_quality(stats_dict):
     
     return False
 
-def format_analysis_response(analysis_text, home_team, away_team, selected_markets=None, original_probabilities=None, odds_data=None, implied_probabilities=None):
-    """
-    Formato atualizado que usa dados pré-calculados de probabilidades implícitas e
-    separa as oportunidades das justificativas detalhadas.
-    """
-    # Definir o limiar de valor como uma constante para fácil ajuste
-    VALUE_THRESHOLD = 10.0 # Aumentado de 5.0 para 10.0 para ser muito mais conservador
-    
-    try:
-        # Verificar se temos informações suficientes
-        if not analysis_text or not original_probabilities or not implied_probabilities:
-            logger.warning("Informações insuficientes para formatação completa")
-            return analysis_text
-        
-        selected_markets = selected_markets or {}
-        
-        # Criar uma análise completamente nova a partir dos dados que temos
-        new_analysis = []
-        
-        # Título
-        new_analysis.append(f"# Análise da Partida\n## {home_team} x {away_team}")
-        
-        # Análise de Mercados
-        markets_section = "# Análise de Mercados Disponíveis:\n"
-        
-        # Usar o odds_data original diretamente se disponível
-        if odds_data:
-            markets_section += odds_data
-        else:
-            # Ou reconstruir a partir das probabilidades implícitas
-            if selected_markets.get("money_line") and implied_probabilities:
-                markets_section += "- **Money Line (1X2):**\n"
-                if "home" in implied_probabilities:
-                    home_odd = 100.0 / implied_probabilities["home"]
-                    markets_section += f"  - Casa ({home_team}): @{home_odd:.2f}\n"
-                if "draw" in implied_probabilities:
-                    draw_odd = 100.0 / implied_probabilities["draw"]
-                    markets_section += f"  - Empate: @{draw_odd:.2f}\n"
-                if "away" in implied_probabilities:
-                    away_odd = 100.0 / implied_probabilities["away"]
-                    markets_section += f"  - Fora ({away_team}): @{away_odd:.2f}\n"
-            
-            if selected_markets.get("chance_dupla") and implied_probabilities:
-                markets_section += "- **Chance Dupla:**\n"
-                if "home_draw" in implied_probabilities:
-                    home_draw_odd = 100.0 / implied_probabilities["home_draw"]
-                    markets_section += f"  - 1X ({home_team} ou Empate): @{home_draw_odd:.2f}\n"
-                if "home_away" in implied_probabilities:
-                    home_away_odd = 100.0 / implied_probabilities["home_away"]
-                    markets_section += f"  - 12 ({home_team} ou {away_team}): @{home_away_odd:.2f}\n"
-                if "draw_away" in implied_probabilities:
-                    draw_away_odd = 100.0 / implied_probabilities["draw_away"]
-                    markets_section += f"  - X2 (Empate ou {away_team}): @{draw_away_odd:.2f}\n"
-            
-            if selected_markets.get("ambos_marcam") and implied_probabilities:
-                markets_section += "- **Ambos Marcam (BTTS):**\n"
-                if "btts_yes" in implied_probabilities:
-                    btts_yes_odd = 100.0 / implied_probabilities["btts_yes"]
-                    markets_section += f"  - Sim: @{btts_yes_odd:.2f}\n"
-                if "btts_no" in implied_probabilities:
-                    btts_no_odd = 100.0 / implied_probabilities["btts_no"]
-                    markets_section += f"  - Não: @{btts_no_odd:.2f}\n"
-                    
-            if selected_markets.get("over_under") and implied_probabilities:
-                markets_section += "- **Over/Under 2.5 Gols:**\n"
-                if "over_2_5" in implied_probabilities:
-                    over_odd = 100.0 / implied_probabilities["over_2_5"]
-                    markets_section += f"  - Over 2.5: @{over_odd:.2f}\n"
-                if "under_2_5" in implied_probabilities:
-                    under_odd = 100.0 / implied_probabilities["under_2_5"]
-                    markets_section += f"  - Under 2.5: @{under_odd:.2f}\n"
-                    
-            if selected_markets.get("escanteios") and implied_probabilities:
-                markets_section += "- **Escanteios (Over/Under 9.5):**\n"
-                if "over_9_5_corners" in implied_probabilities:
-                    over_odd = 100.0 / implied_probabilities["over_9_5_corners"]
-                    markets_section += f"  - Over 9.5: @{over_odd:.2f}\n"
-                if "under_9_5_corners" in implied_probabilities:
-                    under_odd = 100.0 / implied_probabilities["under_9_5_corners"]
-                    markets_section += f"  - Under 9.5: @{under_odd:.2f}\n"
-                    
-            if selected_markets.get("cartoes") and implied_probabilities:
-                markets_section += "- **Cartões (Over/Under 3.5):**\n"
-                if "over_3_5_cards" in implied_probabilities:
-                    over_odd = 100.0 / implied_probabilities["over_3_5_cards"]
-                    markets_section += f"  - Over 3.5: @{over_odd:.2f}\n"
-                if "under_3_5_cards" in implied_probabilities:
-                    under_odd = 100.0 / implied_probabilities["under_3_5_cards"]
-                    markets_section += f"  - Under 3.5: @{under_odd:.2f}\n"
-        
-        new_analysis.append(markets_section)
-        
-        # Probabilidades Calculadas vs Implícitas
-        probs_section = "# Probabilidades Calculadas (REAL vs IMPLÍCITA):\n"
-        opportunities = []
-        
-        # Extrair dados de análise comuns
-        analysis_data = original_probabilities.get("analysis_data", {})
-        
-        # Processar Money Line (1X2)
-        if selected_markets.get("money_line") and "moneyline" in original_probabilities:
-            probs_section += "## Money Line (1X2):\n"
-            
-            moneyline = original_probabilities["moneyline"]
-            
-            # Casa
-            home_real = moneyline.get("home_win", 0)
-            home_implicit = implied_probabilities.get("home", 0)
-            home_value = home_real > home_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **{home_team}**: Real {home_real:.1f}% vs Implícita {home_implicit:.1f}%{' (Valor)' if home_value else ''}\n"
-            
-            if home_value:
-                # Criar texto de oportunidade
-                opportunity = f"- **{home_team}**: Real {home_real:.1f}% vs Implícita {home_implicit:.1f}% (Valor de {home_real-home_implicit:.1f}%)"
-                # Formatar com justificativa condensada usando a nova função
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Empate
-            draw_real = moneyline.get("draw", 0)
-            draw_implicit = implied_probabilities.get("draw", 0)
-            draw_value = draw_real > draw_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Empate**: Real {draw_real:.1f}% vs Implícita {draw_implicit:.1f}%{' (Valor)' if draw_value else ''}\n"
-            
-            if draw_value:
-                # Criar texto de oportunidade
-                opportunity = f"- **Empate**: Real {draw_real:.1f}% vs Implícita {draw_implicit:.1f}% (Valor de {draw_real-draw_implicit:.1f}%)"
-                # Formatar com justificativa condensada
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Fora
-            away_real = moneyline.get("away_win", 0)
-            away_implicit = implied_probabilities.get("away", 0)
-            away_value = away_real > away_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **{away_team}**: Real {away_real:.1f}% vs Implícita {away_implicit:.1f}%{' (Valor)' if away_value else ''}\n"
-            
-            if away_value:
-                # Criar texto de oportunidade
-                opportunity = f"- **{away_team}**: Real {away_real:.1f}% vs Implícita {away_implicit:.1f}% (Valor de {away_real-away_implicit:.1f}%)"
-                # Formatar com justificativa condensada
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        # Double Chance
-        if selected_markets.get("chance_dupla") and "double_chance" in original_probabilities:
-            probs_section += "## Chance Dupla (Double Chance):\n"
-            
-            dc = original_probabilities["double_chance"]
-            
-            # 1X
-            hd_real = dc.get("home_or_draw", 0)
-            hd_implicit = implied_probabilities.get("home_draw", 0)
-            hd_value = hd_real > hd_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **{home_team} ou Empate**: Real {hd_real:.1f}% vs Implícita {hd_implicit:.1f}%{' (Valor)' if hd_value else ''}\n"
-            
-            if hd_value:
-                opportunity = f"- **{home_team} ou Empate**: Real {hd_real:.1f}% vs Implícita {hd_implicit:.1f}% (Valor de {hd_real-hd_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # 12
-            ha_real = dc.get("home_or_away", 0)
-            ha_implicit = implied_probabilities.get("home_away", 0)
-            ha_value = ha_real > ha_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **{home_team} ou {away_team}**: Real {ha_real:.1f}% vs Implícita {ha_implicit:.1f}%{' (Valor)' if ha_value else ''}\n"
-            
-            if ha_value:
-                opportunity = f"- **{home_team} ou {away_team}**: Real {ha_real:.1f}% vs Implícita {ha_implicit:.1f}% (Valor de {ha_real-ha_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # X2
-            da_real = dc.get("away_or_draw", 0)
-            da_implicit = implied_probabilities.get("draw_away", 0)
-            da_value = da_real > da_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Empate ou {away_team}**: Real {da_real:.1f}% vs Implícita {da_implicit:.1f}%{' (Valor)' if da_value else ''}\n"
-            
-            if da_value:
-                opportunity = f"- **Empate ou {away_team}**: Real {da_real:.1f}% vs Implícita {da_implicit:.1f}% (Valor de {da_real-da_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        # BTTS
-        if selected_markets.get("ambos_marcam") and "btts" in original_probabilities:
-            probs_section += "## Ambos Marcam (BTTS):\n"
-            
-            btts = original_probabilities["btts"]
-            
-            # Sim
-            yes_real = btts.get("yes", 0)
-            yes_implicit = implied_probabilities.get("btts_yes", 0)
-            yes_value = yes_real > yes_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Sim**: Real {yes_real:.1f}% vs Implícita {yes_implicit:.1f}%{' (Valor)' if yes_value else ''}\n"
-            
-            if yes_value:
-                opportunity = f"- **Ambos Marcam - Sim**: Real {yes_real:.1f}% vs Implícita {yes_implicit:.1f}% (Valor de {yes_real-yes_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Não
-            no_real = btts.get("no", 0)
-            no_implicit = implied_probabilities.get("btts_no", 0)
-            no_value = no_real > no_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Não**: Real {no_real:.1f}% vs Implícita {no_implicit:.1f}%{' (Valor)' if no_value else ''}\n"
-            
-            if no_value:
-                opportunity = f"- **Ambos Marcam - Não**: Real {no_real:.1f}% vs Implícita {no_implicit:.1f}% (Valor de {no_real-no_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        # Over/Under
-        if selected_markets.get("over_under") and "over_under" in original_probabilities:
-            probs_section += "## Over/Under 2.5 Gols:\n"
-            
-            ou = original_probabilities["over_under"]
-            
-            # Over 2.5
-            over_real = ou.get("over_2_5", 0)
-            over_implicit = implied_probabilities.get("over_2_5", 0)
-            over_value = over_real > over_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Over 2.5**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-            
-            if over_value:
-                opportunity = f"- **Over 2.5 Gols**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_real-over_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Under 2.5
-            under_real = ou.get("under_2_5", 0)
-            under_implicit = implied_probabilities.get("under_2_5", 0)
-            under_value = under_real > under_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Under 2.5**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-            
-            if under_value:
-                opportunity = f"- **Under 2.5 Gols**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_real-under_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        # Escanteios
-        if selected_markets.get("escanteios") and "corners" in original_probabilities:
-            probs_section += "## Escanteios (Over/Under 9.5):\n"
-            
-            corners = original_probabilities["corners"]
-            
-            # Over 9.5
-            over_real = corners.get("over_9_5", 0)
-            over_implicit = implied_probabilities.get("over_9_5_corners", 0)
-            over_value = over_real > over_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Over 9.5**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-            
-            if over_value:
-                opportunity = f"- **Over 9.5 Escanteios**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_real-over_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Under 9.5
-            under_real = corners.get("under_9_5", 0)
-            under_implicit = implied_probabilities.get("under_9_5_corners", 0)
-            under_value = under_real > under_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Under 9.5**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-            
-            if under_value:
-                opportunity = f"- **Under 9.5 Escanteios**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_real-under_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        # Cartões
-        if selected_markets.get("cartoes") and "cards" in original_probabilities:
-            probs_section += "## Cartões (Over/Under 3.5):\n"
-            
-            cards = original_probabilities["cards"]
-            
-            # Over 3.5
-            # CORREÇÃO: Usar a chave correta para o limiar 3.5 (assumindo que exista, ex: 'over_3_5')
-            # O código original usava 'over_4_5', o que estava inconsistente.
-            # Se a chave 'over_3_5' não existir, a lógica de cálculo ou a fonte de dados precisa ser revisada.
-            over_real = cards.get("over_3_5", 0) # Corrigido de "over_4_5"
-            over_implicit = implied_probabilities.get("over_3_5_cards", 0)
-            over_value = over_real > over_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Over 3.5**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}%{' (Valor)' if over_value else ''}\n"
-            
-            if over_value:
-                opportunity = f"- **Over 3.5 Cartões**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_real-over_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-            
-            # Under 3.5
-            # CORREÇÃO: Usar a chave correta para o limiar 3.5 (assumindo que exista, ex: 'under_3_5')
-            # O código original usava 'under_4_5', o que estava inconsistente.
-            # Se a chave 'under_3_5' não existir, a lógica de cálculo ou a fonte de dados precisa ser revisada.
-            under_real = cards.get("under_3_5", 0) # Corrigido de "under_4_5"
-            under_implicit = implied_probabilities.get("under_3_5_cards", 0)
-            under_value = under_real > under_implicit + VALUE_THRESHOLD
-            
-            probs_section += f"- **Under 3.5**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}%{' (Valor)' if under_value else ''}\n"
-            
-            if under_value:
-                opportunity = f"- **Under 3.5 Cartões**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_real-under_implicit:.1f}%)"
-                opportunity = format_opportunity_with_justification(
-                    opportunity, home_team, away_team, original_probabilities, implied_probabilities
-                )
-                opportunities.append(opportunity)
-        
-        new_analysis.append(probs_section)
-        
-        # Oportunidades Identificadas (com justificativas condensadas)
-        if opportunities:
-            new_analysis.append("# Oportunidades Identificadas:\n" + "\n".join(opportunities))
-        else:
-            new_analysis.append("# Oportunidades Identificadas:\nInfelizmente não detectamos valor em nenhuma dos seus inputs.")
-        
-        # Adicionar seção de justificativas detalhadas utilizando o módulo de justificativas
-        justifications = generate_justifications_for_opportunities(
-            opportunities, home_team, away_team, original_probabilities, implied_probabilities
-        )
-        
-        justifications_section = format_justifications_section(justifications)
-        if justifications_section:
-            new_analysis.append(justifications_section)
-        
-        # Nível de Confiança
-        if "analysis_data" in original_probabilities:
-            analysis_data = original_probabilities["analysis_data"]
-            home_consistency = analysis_data.get("home_consistency", 0)
-            away_consistency = analysis_data.get("away_consistency", 0)
-            home_form_points = analysis_data.get("home_form_points", 0) * 15
-            away_form_points = analysis_data.get("away_form_points", 0) * 15
-            
-            # Determinar nível de confiança com base nas consistências e formas
-            avg_consistency = (home_consistency + away_consistency) / 2
-            
-            if avg_consistency > 70 and (home_form_points >= 9 or away_form_points >= 9):
-                confidence_level = "Alto"
-            elif avg_consistency > 50 and (home_form_points >= 6 or away_form_points >= 6):
-                confidence_level = "Médio"
-            else:
-                confidence_level = "Baixo"
-            
-            confidence_text = f"# Nível de Confiança Geral: {confidence_level}\n"
-            confidence_text += f"- **Consistência**: {home_team}: {home_consistency:.1f}%, {away_team}: {away_consistency:.1f}%. Consistência é uma medida que indica quão previsível é o desempenho da equipe.\n"
-            confidence_text += f"- **Forma Recente**: {home_team}: {home_form_points:.1f}/15 como mandante, {away_team}: {away_form_points:.1f}/15 como visitante. Forma representa a pontuação dos últimos 5 jogos (vitória=3pts, empate=1pt, derrota=0pts).\n"
-            confidence_text += "- Valores mais altos em ambas métricas aumentam a confiança na previsão."
-            
-            new_analysis.append(confidence_text)
-        else:
-            new_analysis.append("# Nível de Confiança Geral: Médio\n- **Consistência**: A consistência mede quão previsível é o desempenho da equipe.\n- **Forma Recente**: A forma representa pontos dos últimos 5 jogos (vitória=3pts, empate=1pt, derrota=0pts).")
-        
-        # Retornar a análise completa
-        return '\n\n'.join(new_analysis)
-    
-    except Exception as e:
-        import traceback
-        logger.error(f"Erro ao formatar resposta de análise: {str(e)}")
-        logger.error(traceback.format_exc())
-        return analysis_text  # Retornar o texto original em caso de erro
-
-# Função auxiliar para aplicar a justificativa condensada à string de oportunidade
-def format_opportunity_with_justification(opportunity, home_team, away_team, original_probabilities, implied_probabilities):
-    """
-    Formata uma oportunidade com sua justificativa condensada.
-    """
-    # Extrair informações da oportunidade
-    # Exemplo de formato: "- **Empoli FC**: Real 31.3% vs Implícita 10.0% (Valor de 21.3%)"
-    
-    # Identificar o time ou mercado
-    if home_team in opportunity:
-        team_name = home_team
-    elif away_team in opportunity:
-        team_name = away_team
-    elif "Empate" in opportunity:
-        team_name = "Empate"
-    elif "Ambos Marcam - Sim" in opportunity:
-        team_name = "Ambos Marcam - Sim"
-    elif "Ambos Marcam - Não" in opportunity:
-        team_name = "Ambos Marcam - Não"
-    elif "Over" in opportunity:
-        team_name = opportunity.split("**")[1]
-    elif "Under" in opportunity:
-        team_name = opportunity.split("**")[1]
-    elif home_team + " ou Empate" in opportunity:
-        team_name = f"{home_team} ou Empate"
-    elif away_team + " ou Empate" in opportunity:
-        team_name = f"{away_team} ou Empate"
-    elif home_team + " ou " + away_team in opportunity:
-        team_name = f"{home_team} ou {away_team}"
-    else:
-        team_name = "Mercado"
-    
-    # Extrair probabilidades
-    import re
-    real_prob_match = re.search(r"Real (\d+\.\d+)%", opportunity)
-    implied_prob_match = re.search(r"Implícita (\d+\.\d+)%", opportunity)
-    
-    if real_prob_match and implied_prob_match:
-        real_prob = float(real_prob_match.group(1))
-        implied_prob = float(implied_prob_match.group(1))
-        
-        # Obter dados de análise
-        analysis_data = original_probabilities.get("analysis_data", {})
-        
-        # Obter expected goals se disponível
-        expected_goals = None
-        if "over_under" in original_probabilities:
-            expected_goals = original_probabilities["over_under"].get("expected_goals")
-        
-        # Gerar justificativa condensada
-        justification = generate_condensed_justification(
-            team_name, 
-            home_team, 
-            away_team, 
-            real_prob, 
-            implied_prob, 
-            analysis_data, 
-            original_probabilities, 
-            expected_goals
-        )
-        
-        # Adicionar justificativa à oportunidade
-        formatted_opportunity = f"{opportunity} *Justificativa: {justification}*"
-        return formatted_opportunity
-    
-    return opportunity  # Retornar original se não conseguir extrair probabilidades
 def format_enhanced_prompt(complete_analysis, home_team, away_team, odds_data, selected_markets):
     """
     Função aprimorada para formatar prompt de análise multi-mercados
@@ -1588,6 +1311,13 @@ import numpy as np  # Adicione esta importação se necessário
 import logging
 
 
+# Linhas fixas dos campos de odds do dashboard (utils/data.get_odds_data)
+DEFAULT_MARKET_LINES = {'cartoes': 3.5, 'escanteios': 9.5, 'gols': 2.5}
+
+# Peso das médias móveis (últimos 10 ou 5 jogos, utils/rolling_features.py)
+# sobre as médias da temporada nas expectativas de gols, escanteios e cartões
+RECENT_WINDOW_WEIGHT = 0.3
+
 def extract_threshold_from_odds(odds_data, market_type):
     """
     Extrai o threshold das odds fornecidas
@@ -1608,6 +1338,12 @@ def extract_threshold_from_odds(odds_data, market_type):
         logger.warning(f"Sem dados de odds para extrair threshold de {market_type}")
         return None
     
+    # Dicionário de get_odds_data: as linhas de cada mercado são fixas no formulário
+    if isinstance(odds_data, dict):
+        dict_market = {'gols': 'over_under'}.get(market_type, market_type)
+        if isinstance(odds_data.get(dict_market), dict):
+            return DEFAULT_MARKET_LINES[market_type]
+    
     # Converter para string se for dicionário
     if isinstance(odds_data, dict):
         odds_text = "\n".join([f"{k}: {v}" for k, v in odds_data.items()])
@@ -1651,7 +1387,7 @@ def extract_threshold_from_odds(odds_data, market_type):
     # Se não encontrou, registrar aviso
     logger.warning(f"Não foi possível extrair threshold para {market_type}")
     return None
-def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league_id='generic', match_conditions=None):
+def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league_id='generic', match_conditions=None, odds_data=None, strict_markets=True, apply_calibration=True, selected_markets=None):
     """
     Cálculo avançado de probabilidades utilizando método aprimorado de Dispersão e Ponderação
     
@@ -1661,6 +1397,15 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
         h2h_data (dict, optional): Dados de confronto direto
         league_id (str): Identificador da liga para ajustes específicos
         match_conditions (dict): Condições da partida (clima, etc.)
+        odds_data (str|dict, optional): Odds configuradas (definem os thresholds de cartões/escanteios)
+        strict_markets (bool): Se False, falta de dados de escanteios ou cartões
+            deixa só esse mercado como None em vez de levantar a exceção (backtest)
+        apply_calibration (bool): Aplicar os mapas de utils/calibration_store.py;
+            False retorna as probabilidades brutas, as únicas gravadas no
+            histórico de calibração
+        selected_markets (dict, optional): Mercados selecionados; escanteios e
+            cartões fora da seleção não são calculados nem retornados, e as
+            estatísticas deles não são lidas (None = todos os mercados)
         
     Returns:
         dict: Probabilidades calculadas para diferentes mercados
@@ -1669,6 +1414,14 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
         import math
         import numpy as np
         import logging
+        from utils.team_features import as_team_features, engine_features, market_selected
+        
+        # Registros tipados construídos uma única vez por time
+        feature_names = engine_features(selected_markets)
+        home_team = as_team_features(home_team, feature_names)
+        away_team = as_team_features(away_team, feature_names)
+        with_corners = market_selected(selected_markets, "escanteios")
+        with_cards = market_selected(selected_markets, "cartoes")
         
         # Verificando se h2h_data é válido
         if not isinstance(h2h_data, dict) or len(h2h_data) < 3:
@@ -1812,11 +1565,21 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
         # 10. CALCULAR PROBABILIDADES POR MERCADO
         
         # 10.1. Moneyline (1X2) - agora usando o fator de qualidade dos dados
+        # e, quando os dois times têm rating Elo, as probabilidades dos ratings
+        rating_probs = None
+        rating_weight = None
+        if home_team.has('elo_rating') and away_team.has('elo_rating'):
+            from utils.team_ratings import rating_1x2_probabilities, rating_1x2_weight
+            rating_probs = rating_1x2_probabilities(home_team.elo_rating, away_team.elo_rating)
+            rating_weight = rating_1x2_weight(home_team.get('elo_matches'), away_team.get('elo_matches'))
+        
         home_win_prob, draw_prob, away_win_prob = calculate_1x2_probabilities(
             home_total_score, away_total_score, 
             home_consistency, away_consistency,
             home_advantage_modifier, 
-            data_quality_factor=data_quality  # Novo parâmetro
+            data_quality_factor=data_quality,  # Novo parâmetro
+            rating_probs=rating_probs,
+            rating_weight=rating_weight
         )
         
         # 10.2. Expected goals e mercados relacionados
@@ -1850,31 +1613,16 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
         # Aumentar o peso do market_avg para reduzir a confiança nas previsões
         adjusted_btts_yes = btts_yes_prob * (data_quality * 0.7) + market_btts_yes * (1 - (data_quality * 0.7))
         adjusted_btts_no = 1 - adjusted_btts_yes
-        # Verificar se odds_data existe no escopo da função
-        if 'odds_data' not in locals() and 'odds_data' not in globals():
-            # Se não existir, obter das odds configuradas pelo usuário
-            import logging
-            logger = logging.getLogger("valueHunter.ai")
-            
-            # Obter das odds configuradas pelo usuário
+        # Se as odds não foram passadas, obter das odds configuradas pelo usuário
+        corners_probabilities = None
+        cards_probabilities = None
+        if (with_corners or with_cards) and not odds_data:
             try:
-                # Se houver um parâmetro de odds
-                if 'user_odds' in locals() or 'user_odds' in globals():
-                    odds_data = user_odds
-                else:
-                    # Criar uma string com as odds do jogo se possível
-                    from utils.data import get_configured_odds
-                    odds_data = get_configured_odds()
-                    if not odds_data:
-                        # Alternativa: usar a função match_details se disponível
-                        match_id = match_details.get("id") if match_details else None
-                        if match_id:
-                            from data import get_match_odds
-                            odds_data = get_match_odds(match_id)
-                            
-                    if not odds_data:
-                        logger.error("Não foi possível obter odds_data")
-                        raise ValueError("Não foi possível obter as odds configuradas. Configure as odds primeiro.")
+                from utils.data import get_configured_odds
+                odds_data = get_configured_odds()
+                if not odds_data:
+                    logger.error("Não foi possível obter odds_data")
+                    raise ValueError("Não foi possível obter as odds configuradas. Configure as odds primeiro.")
             except Exception as e:
                 logger.error(f"Erro ao obter odds_data: {str(e)}")
                 raise ValueError(f"Erro ao obter odds: {str(e)}")
@@ -1884,89 +1632,102 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
             cards_threshold = None
             corners_threshold = None
             
-            if odds_data:
-                try:
+            if not (with_corners or with_cards):
+                logger.info("Escanteios e cartões fora dos mercados selecionados")
+            elif odds_data:
+                # Mercado sem odds informadas (não selecionado): usar a linha padrão do formulário
+                if with_cards:
                     cards_threshold = extract_threshold_from_odds(odds_data, 'cartoes')
                     if cards_threshold:
                         logger.info(f"Threshold de cartões extraído: {cards_threshold}")
                     else:
-                        logger.error("Falha ao extrair threshold de cartões")
-                        raise ValueError("Não foi possível determinar o threshold de cartões das odds configuradas")
-                except Exception as e:
-                    logger.error(f"Erro ao extrair threshold de cartões: {str(e)}")
-                    raise ValueError(f"Erro ao extrair threshold de cartões: {str(e)}")
+                        cards_threshold = DEFAULT_MARKET_LINES['cartoes']
+                        logger.warning(f"Odds de cartões ausentes, usando linha padrão {cards_threshold}")
                 
-                try:
+                if with_corners:
                     corners_threshold = extract_threshold_from_odds(odds_data, 'escanteios')
                     if corners_threshold:
                         logger.info(f"Threshold de escanteios extraído: {corners_threshold}")
                     else:
-                        logger.error("Falha ao extrair threshold de escanteios")
-                        raise ValueError("Não foi possível determinar o threshold de escanteios das odds configuradas")
-                except Exception as e:
-                    logger.error(f"Erro ao extrair threshold de escanteios: {str(e)}")
-                    raise ValueError(f"Erro ao extrair threshold de escanteios: {str(e)}")
+                        corners_threshold = DEFAULT_MARKET_LINES['escanteios']
+                        logger.warning(f"Odds de escanteios ausentes, usando linha padrão {corners_threshold}")
             else:
                 logger.error("Dados de odds não disponíveis")
                 raise ValueError("Dados de odds não disponíveis. Configure as odds primeiro.")
             
-            # 10.5. Calcular múltiplos thresholds de escanteios
-            corners_probabilities = calculate_multi_threshold_corners(
-                home_team, away_team, league_factors[3]
-            )
-            
-            # Usar o threshold específico extraído para corners
-            corners_key = f"over_{str(corners_threshold).replace('.', '_')}"
-            if corners_key not in corners_probabilities:
-                # Se não tiver esse threshold específico, calcular para ele
+            if with_corners:
                 try:
-                    over_prob, under_prob, exp_corners = calculate_corners_probability_for_threshold(
-                        corners_probabilities.get("expected_corners"), corners_threshold
+                    # 10.5. Calcular múltiplos thresholds de escanteios
+                    corners_probabilities = calculate_multi_threshold_corners(
+                        home_team, away_team, league_factors[3]
                     )
-                    corners_probabilities[corners_key] = round(over_prob * 100, 1)
-                    corners_probabilities[f"under_{str(corners_threshold).replace('.', '_')}"] = round(under_prob * 100, 1)
-                except Exception as e:
-                    logger.error(f"Erro ao calcular probabilidade para threshold {corners_threshold}: {str(e)}")
-                    raise ValueError(f"Não foi possível calcular probabilidades para threshold de escanteios {corners_threshold}")
-            
-            # Extrair os valores para o threshold específico
-            over_corners_prob = corners_probabilities.get(corners_key) / 100.0
-            under_corners_key = corners_key.replace("over_", "under_")
-            under_corners_prob = corners_probabilities.get(under_corners_key) / 100.0
-            expected_corners = corners_probabilities.get("expected_corners")
             
-            # 10.6. Calcular múltiplos thresholds de cartões
-            cards_probabilities = calculate_multi_threshold_cards(
-                home_team, away_team, league_factors[2],
-                abs(home_total_score - away_total_score)
-            )
+                    # Usar o threshold específico extraído para corners
+                    corners_key = f"over_{str(corners_threshold).replace('.', '_')}"
+                    if corners_key not in corners_probabilities:
+                        # Se não tiver esse threshold específico, calcular para ele
+                        try:
+                            over_prob, under_prob, exp_corners = calculate_corners_probability_for_threshold(
+                                corners_probabilities.get("expected_corners"), corners_threshold
+                            )
+                            corners_probabilities[corners_key] = round(over_prob * 100, 1)
+                            corners_probabilities[f"under_{str(corners_threshold).replace('.', '_')}"] = round(under_prob * 100, 1)
+                        except Exception as e:
+                            logger.error(f"Erro ao calcular probabilidade para threshold {corners_threshold}: {str(e)}")
+                            raise ValueError(f"Não foi possível calcular probabilidades para threshold de escanteios {corners_threshold}")
+            
+                    # Extrair os valores para o threshold específico
+                    over_corners_prob = corners_probabilities.get(corners_key) / 100.0
+                    under_corners_key = corners_key.replace("over_", "under_")
+                    under_corners_prob = corners_probabilities.get(under_corners_key) / 100.0
+                    expected_corners = corners_probabilities.get("expected_corners")
+                except Exception as e:
+                    if strict_markets:
+                        raise
+                    # Sem dados de escanteios: os demais mercados seguem valendo
+                    logger.warning(f"Escanteios sem previsão: {str(e)}")
+                    corners_probabilities = None
             
-            # Usar o threshold específico extraído para cartões
-            cards_key = f"over_{str(cards_threshold).replace('.', '_')}"
-            if cards_key not in cards_probabilities:
-                # Se não tiver esse threshold específico, calcular para ele
+            if with_cards:
                 try:
-                    over_prob, under_prob, exp_cards = calculate_cards_probability_for_threshold(
-                        cards_probabilities.get("expected_cards"), cards_threshold
+                    # 10.6. Calcular múltiplos thresholds de cartões
+                    cards_probabilities = calculate_multi_threshold_cards(
+                        home_team, away_team, league_factors[2],
+                        abs(home_total_score - away_total_score)
                     )
-                    cards_probabilities[cards_key] = round(over_prob * 100, 1)
-                    cards_probabilities[f"under_{str(cards_threshold).replace('.', '_')}"] = round(under_prob * 100, 1)
-                except Exception as e:
-                    logger.error(f"Erro ao calcular probabilidade para threshold {cards_threshold}: {str(e)}")
-                    raise ValueError(f"Não foi possível calcular probabilidades para threshold de cartões {cards_threshold}")
             
-            # Extrair os valores para o threshold específico
-            over_cards_prob = cards_probabilities.get(cards_key) / 100.0
-            under_cards_key = cards_key.replace("over_", "under_")
-            under_cards_prob = cards_probabilities.get(under_cards_key) / 100.0
-            expected_cards = cards_probabilities.get("expected_cards")
+                    # Usar o threshold específico extraído para cartões
+                    cards_key = f"over_{str(cards_threshold).replace('.', '_')}"
+                    if cards_key not in cards_probabilities:
+                        # Se não tiver esse threshold específico, calcular para ele
+                        try:
+                            over_prob, under_prob, exp_cards = calculate_cards_probability_for_threshold(
+                                cards_probabilities.get("expected_cards"), cards_threshold
+                            )
+                            cards_probabilities[cards_key] = round(over_prob * 100, 1)
+                            cards_probabilities[f"under_{str(cards_threshold).replace('.', '_')}"] = round(under_prob * 100, 1)
+                        except Exception as e:
+                            logger.error(f"Erro ao calcular probabilidade para threshold {cards_threshold}: {str(e)}")
+                            raise ValueError(f"Não foi possível calcular probabilidades para threshold de cartões {cards_threshold}")
+            
+                    # Extrair os valores para o threshold específico
+                    over_cards_prob = cards_probabilities.get(cards_key) / 100.0
+                    under_cards_key = cards_key.replace("over_", "under_")
+                    under_cards_prob = cards_probabilities.get(under_cards_key) / 100.0
+                    expected_cards = cards_probabilities.get("expected_cards")
+                except Exception as e:
+                    if strict_markets:
+                        raise
+                    # Sem dados de cartões: os demais mercados seguem valendo
+                    logger.warning(f"Cartões sem previsão: {str(e)}")
+                    cards_probabilities = None
             
         except Exception as e:
             logger.error(f"Erro ao calcular probabilidades de escanteios/cartões: {str(e)}")
             raise  # Re-lança a exceção para tratamento adequado em níveis mais altos
         
         # 11. Retornar resultados completos
-        return {
+        probabilities = {
             "moneyline": {
                 "home_win": round(home_win_prob * 100, 1),
                 "draw": round(draw_prob * 100, 1),
@@ -2039,6 +1800,21 @@ def calculate_advanced_probabilities(home_team, away_team, h2h_data=None, league
                 }
             }
         }
+        
+        # Escanteios e cartões só quando selecionados (ausentes do retorno caso contrário)
+        if not with_cards:
+            del probabilities["cards"]
+        if not with_corners:
+            del probabilities["corners"]
+        
+        # 12. Mapas de calibração ajustados sobre as saídas brutas deste modelo
+        if apply_calibration:
+            from utils.calibration_store import stored_calibration_maps, calibrate_probabilities
+            calibrated_markets = calibrate_probabilities(probabilities, stored_calibration_maps(league_id))
+            if calibrated_markets:
+                logger.info(f"Calibração aplicada: {calibrated_markets}")
+        
+        return probabilities
                 
     except Exception as e:
         import logging
@@ -2060,8 +1836,8 @@ def calculate_league_factors(league_id, league_data=None):
     Returns:
         list: Lista de fatores de ajuste [gols, btts, cartões, escanteios]
     """
-    # Importações necessárias
-    from utils.footystats_api import LEAGUE_IDS, get_league_id_mapping
+    # Importações necessárias (sem acesso à rede em tempo de predição)
+    from utils.league_factors import get_table_league_factors
     import logging
     logger = logging.getLogger("valueHunter.ai")
     
@@ -2083,7 +1859,8 @@ def calculate_league_factors(league_id, league_data=None):
             league_data.get('corners_factor')
         ]
     
-    # Mapeamento de fatores específicos por liga
+    # Fatores fixos usados apenas quando a tabela offline (utils/league_factors.py)
+    # ainda não foi gerada para a liga
     # Usando os mesmos league_ids que estão em utils/footystats_api.py
     league_factors = {
         # Liga IDs estão no arquivo footystats_api.py
@@ -2126,30 +1903,26 @@ def calculate_league_factors(league_id, league_data=None):
         12338: [0.95, 0.9, 1.0, 0.95],  # Ligue 2
     }
     
-    # Verificar se a liga está no dicionário
     # Converter league_id para int para garantir compatibilidade
+    # Se league_id for um nome de liga, resolver pelo mapeamento estático
     try:
         league_id_int = int(league_id)
+    except (ValueError, TypeError):
+        # Importado apenas aqui: footystats_api consulta a API ao ser importado
+        from utils.footystats_api import LEAGUE_IDS
+        league_id_int = LEAGUE_IDS.get(league_id)
+    
+    if league_id_int is not None:
+        # 1. Tabela offline calculada a partir das partidas históricas
+        table_factors = get_table_league_factors(league_id_int)
+        if table_factors:
+            logger.info(f"Fatores da tabela offline para liga ID {league_id_int}")
+            return table_factors
+        
+        # 2. Fatores fixos
         if league_id_int in league_factors:
             logger.info(f"Fatores encontrados para liga ID {league_id_int}")
             return league_factors[league_id_int]
-    except (ValueError, TypeError):
-        # Se league_id não for um número, pode ser um código de string
-        pass
-        
-    # Se liga não encontrada, tentar buscar via mapeamento
-    try:
-        # Buscar o mapeamento completo (sem fallback)
-        league_mapping = get_league_id_mapping()
-        
-        # Se league_id é um nome de liga, tente encontrar o ID numérico
-        if league_id in league_mapping:
-            numeric_id = league_mapping[league_id]
-            if numeric_id in league_factors:
-                logger.info(f"Fatores encontrados para liga '{league_id}' (ID {numeric_id})")
-                return league_factors[numeric_id]
-    except Exception as e:
-        logger.error(f"Erro ao buscar mapeamento de ligas: {str(e)}")
     
     # Se a liga não é encontrada em lugar algum, lançar erro
     raise ValueError(f"Liga ID {league_id} não suportada e sem dados para calibração")
@@ -2224,6 +1997,10 @@ def calculate_over_under_probability(home_expected_goals, away_expected_goals, t
 def calculate_team_fatigue(team_data):
     """
     Calcula o fator de fadiga baseado em jogos recentes e viagens
+
+    days_since_last_match e matches_last_15_days vêm das janelas por time
+    (utils/rolling_features.py) quando o time está no histórico local; sem
+    elas, e para a distância de viagem, valem os valores padrão.
     """
     # Dias desde o último jogo
     days_since_last_match = team_data.get('days_since_last_match', 5)
@@ -2234,10 +2011,11 @@ def calculate_team_fatigue(team_data):
     # Distância de viagem para o jogo (em km)
     travel_distance = team_data.get('travel_distance', 100)
     
-    # Cálculo do fator de fadiga (0-1, onde 1 = sem fadiga)
-    rest_factor = min(1.0, days_since_last_match / 5)
-    schedule_factor = max(0.7, 1 - (recent_matches - 2) * 0.1)
-    travel_factor = max(0.8, 1 - (travel_distance / 1000) * 0.05)
+    # Cálculo do fator de fadiga (0-1, onde 1 = sem fadiga). Menos de 2 jogos
+    # em 15 dias (pausa de seleções, histórico curto) não vale como bônus
+    rest_factor = max(0.0, min(1.0, days_since_last_match / 5))
+    schedule_factor = max(0.7, min(1.0, 1 - (recent_matches - 2) * 0.1))
+    travel_factor = max(0.8, min(1.0, 1 - (travel_distance / 1000) * 0.05))
     
     # Fator combinado
     fatigue_factor = rest_factor * 0.4 + schedule_factor * 0.4 + travel_factor * 0.2
@@ -2282,7 +2060,7 @@ def calculate_team_consistency(team_data):
     recent_results = team_data.get('recent_results', [])
     
     if not recent_results or len(recent_results) < 5:
-        return 0.5  # Valor médio default
+        return 50  # Valor médio default (mesma escala 0-100 do cálculo abaixo)
     
     # Calcular pontos por jogo
     points_per_game = []
@@ -2311,21 +2089,63 @@ def calculate_team_consistency(team_data):
     
     return 60  # Valor moderado default
 
+def recent_average(team, stat):
+    """
+    Média móvel de uma estatística nos últimos jogos (janela de 10, ou de 5)
+
+    Args:
+        team (TeamFeatures): Registro do time
+        stat (str): Estatística de utils/rolling_features.ROLLING_STATS (ex.: "corners_for")
+
+    Returns:
+        float: Média por jogo ou None sem histórico local
+    """
+    return team.pick(f'{stat}_last10', f'{stat}_last5')
+
+def blend_recent_average(season_value, recent_value, weight=RECENT_WINDOW_WEIGHT):
+    """
+    Combina a média da temporada com a média móvel dos últimos jogos
+
+    Sem média móvel, mantém a da temporada; sem média da temporada (None ou 0),
+    usa a móvel.
+    """
+    if recent_value is None:
+        return season_value
+    if not season_value:
+        return recent_value
+    return season_value * (1 - weight) + recent_value * weight
+
 def calculate_advanced_expected_goals(home_team, away_team, league_factors):
     """
     Calcula expected goals considerando múltiplos fatores
     """
-    # Extrair estatísticas base
-    home_xg_per_game = home_team.get('xg_for_avg', home_team.get('goals_per_game', 1.3))
-    home_xga_per_game = home_team.get('xg_against_avg', home_team.get('conceded_per_game', 1.3))
-    away_xg_per_game = away_team.get('xg_for_avg', away_team.get('goals_per_game', 1.1))
-    away_xga_per_game = away_team.get('xg_against_avg', away_team.get('conceded_per_game', 1.5))
-    
-    # Ajustes para casa/fora
-    home_xg_per_game_home = home_team.get('home_xg_for_avg', home_xg_per_game * 1.1)
-    away_xg_per_game_away = away_team.get('away_xg_for_avg', away_xg_per_game * 0.9)
-    home_xga_per_game_home = home_team.get('home_xg_against_avg', home_xga_per_game * 0.9)
-    away_xga_per_game_away = away_team.get('away_xg_against_avg', away_xga_per_game * 1.1)
+    from utils.team_features import as_team_features
+    home_team = as_team_features(home_team)
+    away_team = as_team_features(away_team)
+    
+    # Médias móveis dos últimos jogos (xG, ou gols quando o xG não foi coletado)
+    home_recent_for = _first_present(recent_average(home_team, 'xg_for'), recent_average(home_team, 'goals_for'))
+    home_recent_against = _first_present(recent_average(home_team, 'xg_against'),
+                                         recent_average(home_team, 'goals_against'))
+    away_recent_for = _first_present(recent_average(away_team, 'xg_for'), recent_average(away_team, 'goals_for'))
+    away_recent_against = _first_present(recent_average(away_team, 'xg_against'),
+                                         recent_average(away_team, 'goals_against'))
+    
+    # Extrair estatísticas base (sem dado da temporada, a média móvel; sem nenhuma, o padrão)
+    home_xg_per_game = _first_present(home_team.pick('xg_for_avg', 'goals_per_game'), home_recent_for, 1.3)
+    home_xga_per_game = _first_present(home_team.pick('xg_against_avg', 'conceded_per_game'), home_recent_against, 1.3)
+    away_xg_per_game = _first_present(away_team.pick('xg_for_avg', 'goals_per_game'), away_recent_for, 1.1)
+    away_xga_per_game = _first_present(away_team.pick('xg_against_avg', 'conceded_per_game'), away_recent_against, 1.5)
+    
+    # Ajustes para casa/fora (a média móvel é geral: mesmos fatores de mando)
+    home_xg_per_game_home = blend_recent_average(
+        home_team.get('home_xg_for_avg', home_xg_per_game * 1.1), _scaled(home_recent_for, 1.1))
+    away_xg_per_game_away = blend_recent_average(
+        away_team.get('away_xg_for_avg', away_xg_per_game * 0.9), _scaled(away_recent_for, 0.9))
+    home_xga_per_game_home = blend_recent_average(
+        home_team.get('home_xg_against_avg', home_xga_per_game * 0.9), _scaled(home_recent_against, 0.9))
+    away_xga_per_game_away = blend_recent_average(
+        away_team.get('away_xg_against_avg', away_xga_per_game * 1.1), _scaled(away_recent_against, 1.1))
     
     # Calcular xG esperado para o jogo
     home_expected_goals = (home_xg_per_game_home + away_xga_per_game_away) / 2
@@ -2353,6 +2173,13 @@ def calculate_advanced_expected_goals(home_team, away_team, league_factors):
     
     return home_expected_goals, away_expected_goals
 
+def _first_present(*values):
+    """Primeiro valor diferente de None"""
+    return next((value for value in values if value is not None), None)
+
+def _scaled(value, factor):
+    return None if value is None else value * factor
+
 def calculate_form_points(form_str):
     """
     Calcula pontos baseados na forma específica (como mandante ou visitante)
@@ -2408,7 +2235,7 @@ def calculate_defensive_strength(team):
     # Força defensiva (inverso da fraqueza)
     return min(0.9, max(0.1, 1 - ((xga_per_game / 2.5) * 0.7 + (conceded_per_game / 2.5) * 0.3)))
 
-def calculate_1x2_probabilities(home_score, away_score, home_consistency, away_consistency, home_adv_mod=1.0, data_quality_factor=1.0):
+def calculate_1x2_probabilities(home_score, away_score, home_consistency, away_consistency, home_adv_mod=1.0, data_quality_factor=1.0, rating_probs=None, rating_weight=None):
     """
     Calculates 1X2 probabilities with adjusted distribution and data quality consideration
     
@@ -2419,6 +2246,10 @@ def calculate_1x2_probabilities(home_score, away_score, home_consistency, away_c
         away_consistency (float): Consistency rating for away team (0-100)
         home_adv_mod (float): Home advantage modifier (default: 1.0)
         data_quality_factor (float): Quality of data factor (0-1)
+        rating_probs (tuple, optional): (casa, empate, fora) dos ratings Elo
+            (utils/team_ratings.rating_1x2_probabilities)
+        rating_weight (float, optional): Peso de rating_probs (utils/team_ratings.rating_1x2_weight);
+            padrão RATING_1X2_WEIGHT
         
     Returns:
         tuple: (home_win_probability, draw_probability, away_win_probability)
@@ -2444,9 +2275,10 @@ def calculate_1x2_probabilities(home_score, away_score, home_consistency, away_c
     away_consistency = min(100, max(0, away_consistency))
     
     # Calculate draw based on consistencies
-    # More consistent teams = fewer draws
+    # More consistent teams = fewer draws. Consistência média (50) mantém o empate
+    # base em 25%; 90 (máxima de calculate_team_consistency) leva a 15%, 30 a 30%
     avg_consistency = (home_consistency + away_consistency) / 2
-    draw_factor = 1 - (avg_consistency / 100)  # Lower consistency = more draws
+    draw_factor = 1.5 - (avg_consistency / 100)  # Lower consistency = more draws
     
     # Base draw probability (typically 20-30% in football)
     base_draw = 0.25 * draw_factor
@@ -2493,6 +2325,15 @@ def calculate_1x2_probabilities(home_score, away_score, home_consistency, away_c
         draw = draw / total
         away_win = away_win / total
     
+    # Combinar com as probabilidades dos ratings Elo (histórico de resultados)
+    if rating_probs is not None:
+        if rating_weight is None:
+            from utils.team_ratings import RATING_1X2_WEIGHT as rating_weight
+        rating_home, rating_draw, rating_away = (float(p) for p in rating_probs)
+        home_win = home_win * (1 - rating_weight) + rating_home * rating_weight
+        draw = draw * (1 - rating_weight) + rating_draw * rating_weight
+        away_win = away_win * (1 - rating_weight) + rating_away * rating_weight
+    
     # Final sanity checks - make sure probabilities are reasonable
     # Even with low quality data, probabilities shouldn't be extreme
     if home_win > 0.75:
@@ -2567,16 +2408,9 @@ def calculate_data_quality(home_team, away_team, h2h_data=None):
         if team.get('xg_for_avg_overall', 0) == 0:
             quality_score *= 0.95
             issues_found.append(f"{team_name} team missing xG data")
-            
-        # Corner data
-        if team.get('corners_per_game', 0) == 0:
-            quality_score *= 0.95
-            issues_found.append(f"{team_name} team missing corner stats")
-            
-        # Card data
-        if team.get('cards_per_game', 0) == 0:
-            quality_score *= 0.95
-            issues_found.append(f"{team_name} team missing card stats")
+        
+        # Escanteios e cartões não entram: o fator pondera 1X2, gols e ambos
+        # marcam, que não dependem dessas estatísticas nem da seleção de mercados
     
     # Log data quality issues if any
     if issues_found:
@@ -2629,20 +2463,32 @@ def calculate_expected_corners_total(home_team, away_team, league_corner_factor=
     Calcula o total esperado de escanteios para uma partida
     """
     import logging
+    from utils.team_features import as_team_features
     logger = logging.getLogger("valueHunter.ai")
     
+    home_team = as_team_features(home_team)
+    away_team = as_team_features(away_team)
+    
     # Extrair dados com verificações
-    home_corners_for = home_team.get('cornersAVG_home', home_team.get('cornersAVG_overall', 0))
-    home_corners_against = home_team.get('cornersAgainstAVG_home', home_team.get('cornersAgainstAVG_overall', 0))
-    away_corners_for = away_team.get('cornersAVG_away', away_team.get('cornersAVG_overall', 0))
-    away_corners_against = away_team.get('cornersAgainstAVG_away', away_team.get('cornersAgainstAVG_overall', 0))
+    home_corners_for = home_team.pick('cornersAVG_home', 'cornersAVG_overall', default=0)
+    home_corners_against = home_team.pick('cornersAgainstAVG_home', 'cornersAgainstAVG_overall', default=0)
+    away_corners_for = away_team.pick('cornersAVG_away', 'cornersAVG_overall', default=0)
+    away_corners_against = away_team.pick('cornersAgainstAVG_away', 'cornersAgainstAVG_overall', default=0)
+    
+    # Combinar com as médias dos últimos jogos (histórico local), quando houver
+    home_corners_for = blend_recent_average(home_corners_for, recent_average(home_team, 'corners_for'))
+    home_corners_against = blend_recent_average(home_corners_against, recent_average(home_team, 'corners_against'))
+    away_corners_for = blend_recent_average(away_corners_for, recent_average(away_team, 'corners_for'))
+    away_corners_against = blend_recent_average(away_corners_against, recent_average(away_team, 'corners_against'))
     
     # Verificar dados suficientes
     if home_corners_for == 0 or home_corners_against == 0:
-        raise ValueError("Dados de escanteios insuficientes para o time da casa")
+        raise ValueError(f"Dados de escanteios insuficientes para o time da casa "
+                         f"(ausentes: {home_team.missing(('cornersAVG_overall', 'cornersAgainstAVG_overall'))})")
     
     if away_corners_for == 0 or away_corners_against == 0:
-        raise ValueError("Dados de escanteios insuficientes para o time visitante")
+        raise ValueError(f"Dados de escanteios insuficientes para o time visitante "
+                         f"(ausentes: {away_team.missing(('cornersAVG_overall', 'cornersAgainstAVG_overall'))})")
     
     logger.info(f"Escanteios - Casa: {home_corners_for}/{home_corners_against}")
     logger.info(f"Escanteios - Fora: {away_corners_for}/{away_corners_against}")
@@ -2812,8 +2658,12 @@ def calculate_expected_cards_total(home_team, away_team, league_card_factor=1.0,
     Calcula o total esperado de cartões para uma partida
     """
     import logging
+    from utils.team_features import as_team_features
     logger = logging.getLogger("valueHunter.ai")
     
+    home_team = as_team_features(home_team)
+    away_team = as_team_features(away_team)
+    
     # Extrair dados de cartões
     if home_team.get('home_played', 0) > 0 and home_team.get('cardsTotal_home', 0) > 0:
         home_cards = home_team['cardsTotal_home'] / home_team['home_played']
@@ -2824,6 +2674,7 @@ def calculate_expected_cards_total(home_team, away_team, league_card_factor=1.0,
     else:
         home_cards = home_team.get('cards_per_game', 0)
         logger.info(f"Usando média geral de cartões: {home_cards:.2f}")
+    home_cards = blend_recent_average(home_cards, recent_average(home_team, 'cards'))
         
     if home_cards == 0:
         raise ValueError("Dados de cartões insuficientes para o time da casa")
@@ -2837,6 +2688,7 @@ def calculate_expected_cards_total(home_team, away_team, league_card_factor=1.0,
     else:
         away_cards = away_team.get('cards_per_game', 0)
         logger.info(f"Usando média geral de cartões: {away_cards:.2f}")
+    away_cards = blend_recent_average(away_cards, recent_average(away_team, 'cards'))
         
     if away_cards == 0:
         raise ValueError("Dados de cartões insuficientes para o time visitante")
@@ -3115,9 +2967,10 @@ class AdvancedPredictionSystem:
         self.database = database_connection
         self.config = config or {}
         
-        # Verificar se temos conexão com banco de dados
+        # Sem conexão explícita, usar o armazenamento local de calibração
         if not self.database:
-            raise ValueError("Conexão com banco de dados é obrigatória")
+            from utils.calibration_store import CalibrationStore
+            self.database = CalibrationStore(self.config.get("calibration_db"))
             
         # Carregar dados de calibração
         self.calibration_data = self._load_calibration_data()
@@ -3537,6 +3390,10 @@ class AdvancedPredictionSystem:
         under_4_5_cards_prob = normal_cdf(z_score_cards) * 100
         over_4_5_cards_prob = 100 - under_4_5_cards_prob
         
+        # Consistência baseada na variação da forma recente (0-1)
+        home_consistency = calculate_team_consistency({"recent_results": home_form}) / 100
+        away_consistency = calculate_team_consistency({"recent_results": away_form}) / 100
+        
         # 6.6. Chance Dupla (Double Chance) - Derivado diretamente de 1X2
         home_draw_prob = home_win_prob + draw_prob
         away_draw_prob = away_win_prob + draw_prob
@@ -3583,91 +3440,52 @@ class AdvancedPredictionSystem:
             }
         }
     
-    def update_calibration(self, prediction_history, actual_results):
-        """Atualiza parâmetros de calibração baseado em resultados históricos"""
-        if len(prediction_history) < 50:
-            raise ValueError("Dados insuficientes para recalibração (mínimo 50)")
-        
-        # Coletar dados para recalibração
-        market_data = {}
+    def update_calibration(self, prediction_history, actual_results, method="platt", league_id=None):
+        """
+        Grava previsões e resultados no histórico e recalibra os mercados com ele
         
-        # Preparar dados por mercado
-        for market in ['goals', 'btts', 'corners', 'cards', 'result']:
-            market_data[market] = {
-                'predictions': [],
-                'outcomes': []
-            }
+        Os mapas são aplicados em calculate_advanced_probabilities; o histórico
+        precisa ser a saída bruta dela (apply_calibration=False), e não a deste
+        sistema nem saídas já calibradas, que empilhariam um mapa sobre o outro.
         
-        # Extrair previsões e resultados
-        for pred, result in zip(prediction_history, actual_results):
-            # Moneyline
-            if 'moneyline' in pred and 'moneyline' in result:
-                # Home win
-                market_data['result']['predictions'].append(pred['moneyline']['home_win'] / 100)
-                market_data['result']['outcomes'].append(1 if result['moneyline']['home_win'] else 0)
-                
-                # Draw
-                market_data['result']['predictions'].append(pred['moneyline']['draw'] / 100)
-                market_data['result']['outcomes'].append(1 if result['moneyline']['draw'] else 0)
-                
-                # Away win
-                market_data['result']['predictions'].append(pred['moneyline']['away_win'] / 100)
-                market_data['result']['outcomes'].append(1 if result['moneyline']['away_win'] else 0)
-            
-            # Over 2.5
-            if 'over_under' in pred and 'over_under' in result:
-                market_data['goals']['predictions'].append(pred['over_under']['over_2_5'] / 100)
-                market_data['goals']['outcomes'].append(1 if result['over_under']['over_2_5'] else 0)
-            
-            # BTTS
-            if 'btts' in pred and 'btts' in result:
-                market_data['btts']['predictions'].append(pred['btts']['yes'] / 100)
-                market_data['btts']['outcomes'].append(1 if result['btts']['yes'] else 0)
-            
-            # Corners
-            if 'corners' in pred and 'corners' in result:
-                market_data['corners']['predictions'].append(pred['corners']['over_9_5'] / 100)
-                market_data['corners']['outcomes'].append(1 if result['corners']['over_9_5'] else 0)
-            
-            # Cards
-            if 'cards' in pred and 'cards' in result:
-                market_data['cards']['predictions'].append(pred['cards']['over_4_5'] / 100)
-                market_data['cards']['outcomes'].append(1 if result['cards']['over_4_5'] else 0)
+        Args:
+            prediction_history (list): Saídas de calculate_advanced_probabilities(..., apply_calibration=False)
+            actual_results (list): Resultados com a mesma estrutura (valores booleanos)
+            method (str): 'platt' ou 'isotonic'
+            league_id (int, optional): Gravar como calibração específica da liga
+        """
+        from utils.calibration_store import CALIBRATION_KEYS
         
-        # Realizar otimização para cada mercado
-        new_calibration = {}
+        if len(prediction_history) < 50:
+            raise ValueError("Dados insuficientes para recalibração (mínimo 50)")
         
-        for market, data in market_data.items():
-            if len(data['predictions']) < 30:
-                raise ValueError(f"Dados insuficientes para recalibrar mercado {market}")
-                
-            # Calcular brier score
-            brier_score = sum((p - o) ** 2 for p, o in zip(data['predictions'], data['outcomes'])) / len(data['predictions'])
-            
-            # Calcular calibração média
-            mean_pred = sum(data['predictions']) / len(data['predictions'])
-            mean_outcome = sum(data['outcomes']) / len(data['outcomes'])
-            
-            # Estimar novos parâmetros de inclinação e deslocamento
-            # Isto é uma simplificação - na prática, deveria usar otimização mais sofisticada
-            adjustment = mean_outcome - mean_pred
-            
-            new_slope = self.calibration_data[market]['slope']
-            new_shift = self.calibration_data[market]['shift'] + adjustment
-            
-            new_calibration[market] = {
-                'slope': new_slope,
-                'shift': new_shift,
-                'brier_score': brier_score,
-                'sample_size': len(data['predictions'])
-            }
+        if not hasattr(self.database, "record_predictions") or not hasattr(self.database, "recalibrate"):
+            raise ValueError("Banco de dados sem histórico de previsões para recalibração")
         
-        # Salvar nova calibração
-        if self.database:
-            self.database.save_calibration_data(new_calibration)
-            self.calibration_data = new_calibration
+        # Extrair previsões e resultados em uma única passagem
+        market_data = {market: ([], []) for market in CALIBRATION_KEYS}
+        for pred, result in zip(prediction_history, actual_results):
+            for market, keys in CALIBRATION_KEYS.items():
+                for section, key in keys:
+                    value = (pred.get(section) or {}).get(key)
+                    outcome = (result.get(section) or {}).get(key)
+                    if isinstance(value, (int, float)) and outcome is not None:
+                        market_data[market][0].append(value / 100)
+                        market_data[market][1].append(1 if outcome else 0)
+        
+        for market, (predictions, outcomes) in market_data.items():
+            if predictions:
+                self.database.record_predictions(market, predictions, outcomes, league_id)
+        
+        # Recalibração vetorizada com todo o histórico bruto do mercado
+        new_calibration = self.database.recalibrate(method, min_samples=30, league_id=league_id)
+        
+        if league_id is not None:
+            self.calibration_data.setdefault(f"league_{league_id}", {}).update(new_calibration)
         else:
-            raise ValueError("Sem banco de dados para salvar calibração")
+            self.calibration_data.update(new_calibration)
+        
+        return new_calibration
         
 # Função para calcular o fator H2H
 def calculate_h2h_factor(home_team, away_team, h2h_data, league_id=None):
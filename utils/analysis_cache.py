@@ -0,0 +1,256 @@
+# utils/analysis_cache.py - Cache compartilhado de análises da IA
+"""
+Cache persistente (SQLite) das análises geradas pelo GPT, compartilhado entre
+usuários. A chave é um hash canônico de (partida, mercados selecionados, odds
+agrupadas em faixas, snapshot das probabilidades, versão do template do prompt),
+de modo que pedidos para a mesma partida com odds praticamente iguais reutilizam
+a mesma análise sem uma nova chamada ao modelo.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.analysis_cache")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+ANALYSIS_CACHE_DB_FILE = os.path.join(DATA_DIR, "analysis_cache.db")
+
+# Validade de uma análise (odds e escalações mudam ao longo do dia)
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+# Número máximo de análises mantidas (as menos acessadas recentemente saem primeiro)
+DEFAULT_MAX_ENTRIES = 2000
+
+# Largura das faixas de odds: 1.83 e 1.85 caem na mesma faixa (1.85)
+ODDS_BUCKET = 0.05
+
+# Casas decimais do snapshot de probabilidades (em %)
+PROBABILITY_DECIMALS = 1
+
+_ODDS_PATTERN = re.compile(r"@\s*(\d+(?:[.,]\d+)?)")
+
+
+def bucket_odds(odds_data, bucket=ODDS_BUCKET):
+    """
+    Normaliza o texto de odds, arredondando cada cotação para a faixa mais próxima
+
+    Args:
+        odds_data (str|dict): Odds no formato do dashboard ("Casa: @1.85 ...") ou dicionário
+        bucket (float): Largura da faixa
+
+    Returns:
+        str|dict: Odds normalizadas, com o mesmo formato da entrada
+    """
+    if not odds_data:
+        return ""
+
+    if isinstance(odds_data, dict):
+        normalized = {}
+        for key, value in odds_data.items():
+            try:
+                normalized[key] = round(round(float(value) / bucket) * bucket, 2)
+            except (ValueError, TypeError):
+                normalized[key] = bucket_odds(value, bucket) if isinstance(value, (str, dict)) else value
+        return normalized
+
+    def replace(match):
+        value = float(match.group(1).replace(",", "."))
+        return f"@{round(value / bucket) * bucket:.2f}"
+
+    text = _ODDS_PATTERN.sub(replace, str(odds_data))
+    # Espaços e quebras de linha não mudam a análise
+    return " ".join(text.split())
+
+
+# Campos do snapshot derivados das próprias odds (já representadas, em faixas, na chave)
+_ODDS_DERIVED_FIELDS = frozenset({"implied_odds"})
+
+
+def analysis_fixture(league_id, home_team, away_team):
+    """
+    Identificação da partida usada na chave do cache
+
+    Usa o ID da temporada (e não o nome exibido da liga, que tem variações),
+    para que o dashboard e a pré-geração (utils/pregeneration.py) gerem a mesma chave.
+    """
+    return {"league_id": league_id, "home_team": home_team, "away_team": away_team}
+
+
+def _round_probabilities(value, decimals):
+    """Arredonda recursivamente os valores numéricos de um snapshot de probabilidades"""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), decimals)
+    if isinstance(value, dict):
+        return {str(k): _round_probabilities(v, decimals) for k, v in value.items()
+                if k not in _ODDS_DERIVED_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_round_probabilities(v, decimals) for v in value]
+    return str(value)
+
+
+def make_cache_key(fixture, selected_markets, odds_data, probabilities, template_version):
+    """
+    Calcula a chave canônica de uma análise
+
+    Args:
+        fixture (dict): Identificação da partida (ver analysis_fixture)
+        selected_markets (dict): Mercados selecionados {mercado: bool}
+        odds_data (str|dict): Odds informadas pelo usuário
+        probabilities (dict): Probabilidades calculadas enviadas ao prompt
+        template_version (str): Versão do template do prompt
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    payload = {
+        "fixture": {str(k): str(v).strip().lower() for k, v in (fixture or {}).items()},
+        "markets": sorted(k for k, v in (selected_markets or {}).items() if v),
+        "odds": bucket_odds(odds_data),
+        "probabilities": _round_probabilities(probabilities or {}, PROBABILITY_DECIMALS),
+        "template": str(template_version)
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache de análises com validade (TTL) e remoção das entradas menos usadas
+    """
+
+    def __init__(self, db_path=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path or ANALYSIS_CACHE_DB_FILE
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    cache_key TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    fixture TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_access ON analyses (last_access)")
+
+    def get(self, key):
+        """
+        Retorna a análise armazenada ou None se ausente/expirada
+
+        Args:
+            key (str): Chave gerada por make_cache_key
+
+        Returns:
+            str|None: Texto da análise
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT analysis, expires_at FROM analyses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            analysis, expires_at = row
+            if expires_at <= now:
+                conn.execute("DELETE FROM analyses WHERE cache_key = ?", (key,))
+                return None
+
+            conn.execute(
+                "UPDATE analyses SET last_access = ?, hits = hits + 1 WHERE cache_key = ?", (now, key)
+            )
+
+        logger.info(f"Análise encontrada no cache ({key[:12]})")
+        return analysis
+
+    def put(self, key, analysis, fixture=None, ttl_seconds=None):
+        """
+        Armazena uma análise e aplica a política de remoção
+
+        Args:
+            key (str): Chave gerada por make_cache_key
+            analysis (str): Texto da análise
+            fixture (dict): Identificação da partida (apenas informativo)
+            ttl_seconds (int): Validade específica desta entrada
+        """
+        if not analysis:
+            return
+
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO analyses
+                   (cache_key, analysis, fixture, created_at, expires_at, last_access, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, 0)""",
+                (key, analysis, json.dumps(fixture or {}, ensure_ascii=False), now, now + ttl, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Remove entradas expiradas e, acima do limite, as menos acessadas"""
+        conn.execute("DELETE FROM analyses WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                """DELETE FROM analyses WHERE cache_key IN
+                   (SELECT cache_key FROM analyses ORDER BY last_access ASC LIMIT ?)""",
+                (excess,)
+            )
+            logger.info(f"{excess} análises removidas do cache (limite {self.max_entries})")
+
+    def invalidate(self, key=None):
+        """Remove uma análise específica ou todo o cache"""
+        with self._lock, self._connect() as conn:
+            if key is None:
+                conn.execute("DELETE FROM analyses")
+            else:
+                conn.execute("DELETE FROM analyses WHERE cache_key = ?", (key,))
+
+    def stats(self):
+        """Resumo do cache: entradas válidas, expiradas e total de acertos"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            total, valid, hits = conn.execute(
+                "SELECT COUNT(*), SUM(expires_at > ?), COALESCE(SUM(hits), 0) FROM analyses", (now,)
+            ).fetchone()
+        return {"entries": total, "valid": valid or 0, "expired": total - (valid or 0), "hits": hits}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Instância única do cache no processo (compartilhada entre as sessões do Streamlit)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AnalysisCache()
+        return _shared_cache
@@ -0,0 +1,277 @@
+# utils/analysis_schema.py - Contrato de saída estruturada da análise da IA
+"""
+Esquema JSON pedido ao LLM (response_format) e validação da resposta em
+objetos tipados, renderizados diretamente pelo dashboard. Substitui o
+pós-processamento do markdown livre com expressões regulares: o custo de
+exibição não depende mais de como o modelo formata o texto.
+"""
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.analysis_schema")
+
+CONFIDENCE_LEVELS = ("Baixo", "Médio", "Alto")
+
+# Diferença tolerada (pontos percentuais) entre os números do modelo e os calculados
+PROBABILITY_TOLERANCE = 0.5
+
+ANALYSIS_JSON_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["summary", "sections", "opportunities", "confidence"],
+    "properties": {
+        "summary": {"type": "string"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["title", "content"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "content": {"type": "string"}
+                }
+            }
+        },
+        "opportunities": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["market", "selection", "real_prob", "implied_prob", "edge", "justification"],
+                "properties": {
+                    "market": {"type": "string"},
+                    "selection": {"type": "string"},
+                    "real_prob": {"type": "number"},
+                    "implied_prob": {"type": "number"},
+                    "edge": {"type": "number"},
+                    "justification": {"type": "string"}
+                }
+            }
+        },
+        "confidence": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["level", "rationale"],
+            "properties": {
+                "level": {"type": "string", "enum": list(CONFIDENCE_LEVELS)},
+                "rationale": {"type": "string"}
+            }
+        }
+    }
+}
+
+# Parâmetro response_format da API de chat (saída estruturada estrita)
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "match_analysis", "strict": True, "schema": ANALYSIS_JSON_SCHEMA}
+}
+
+
+class AnalysisSchemaError(ValueError):
+    """Resposta do modelo fora do contrato de saída"""
+
+
+@dataclass
+class AnalysisSection:
+    title: str
+    content: str
+
+
+@dataclass
+class Opportunity:
+    market: str
+    selection: str
+    real_prob: float
+    implied_prob: float
+    edge: float
+    justification: str = ""
+
+
+@dataclass
+class Confidence:
+    level: str
+    rationale: str = ""
+
+
+@dataclass
+class StructuredAnalysis:
+    summary: str
+    sections: list = field(default_factory=list)
+    opportunities: list = field(default_factory=list)
+    confidence: Confidence = None
+
+    def to_markdown(self, home_team, away_team):
+        """
+        Texto da análise para exibição
+
+        Args:
+            home_team (str): Time da casa
+            away_team (str): Time visitante
+
+        Returns:
+            str: Markdown
+        """
+        parts = [f"# Análise da Partida\n## {home_team} x {away_team}"]
+        if self.summary:
+            parts.append(self.summary)
+
+        for section in self.sections:
+            parts.append(f"# {section.title}\n{section.content}")
+
+        opportunities = "# Oportunidades Identificadas:\n"
+        if self.opportunities:
+            for opp in self.opportunities:
+                opportunities += (f"- **{opp.selection}** ({opp.market}): Real {opp.real_prob:.1f}% vs "
+                                  f"Implícita {opp.implied_prob:.1f}% (Valor de {opp.edge:.1f}%)\n")
+                if opp.justification:
+                    opportunities += f"  - {opp.justification}\n"
+        else:
+            opportunities += "Infelizmente não detectamos valor em nenhuma das suas apostas."
+        parts.append(opportunities)
+
+        if self.confidence:
+            parts.append(f"# Nível de Confiança Geral: {self.confidence.level}\n{self.confidence.rationale}")
+        return "\n\n".join(parts)
+
+
+def _require(data, key, expected_type, context):
+    value = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(value, expected_type) or isinstance(value, bool):
+        raise AnalysisSchemaError(f"Campo '{context}{key}' ausente ou inválido")
+    return value
+
+
+def _section(data):
+    return AnalysisSection(
+        title=_require(data, "title", str, "sections[].").strip(),
+        content=_require(data, "content", str, "sections[].").strip()
+    )
+
+
+def _opportunity(data):
+    return Opportunity(
+        market=_require(data, "market", str, "opportunities[].").strip(),
+        selection=_require(data, "selection", str, "opportunities[].").strip(),
+        real_prob=float(_require(data, "real_prob", (int, float), "opportunities[].")),
+        implied_prob=float(_require(data, "implied_prob", (int, float), "opportunities[].")),
+        edge=float(_require(data, "edge", (int, float), "opportunities[].")),
+        justification=_require(data, "justification", str, "opportunities[].").strip()
+    )
+
+
+def parse_structured_analysis(text):
+    """
+    Valida a resposta do modelo e converte em objetos tipados
+
+    Args:
+        text (str): JSON retornado pelo modelo
+
+    Returns:
+        StructuredAnalysis: Análise validada
+
+    Raises:
+        AnalysisSchemaError: JSON inválido ou fora do esquema
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError) as e:
+        raise AnalysisSchemaError(f"Resposta não é JSON válido: {str(e)}")
+    if not isinstance(data, dict):
+        raise AnalysisSchemaError("Resposta não é um objeto JSON")
+
+    confidence = _require(data, "confidence", dict, "")
+    level = _require(confidence, "level", str, "confidence.")
+    if level not in CONFIDENCE_LEVELS:
+        raise AnalysisSchemaError(f"Nível de confiança inválido: {level}")
+
+    return StructuredAnalysis(
+        summary=_require(data, "summary", str, "").strip(),
+        sections=[_section(item) for item in _require(data, "sections", list, "")],
+        opportunities=[_opportunity(item) for item in _require(data, "opportunities", list, "")],
+        confidence=Confidence(level=level, rationale=_require(confidence, "rationale", str, "confidence.").strip())
+    )
+
+
+_SECTIONS_START = re.compile(r'"sections"\s*:\s*\[')
+
+
+def completed_sections(partial_text):
+    """
+    Seções já completas de uma resposta ainda em streaming
+
+    Args:
+        partial_text (str): Prefixo do JSON recebido até o momento
+
+    Returns:
+        list: AnalysisSection completas, na ordem da resposta
+    """
+    match = _SECTIONS_START.search(partial_text or "")
+    if not match:
+        return []
+
+    decoder = json.JSONDecoder()
+    sections = []
+    position = match.end()
+    while True:
+        while position < len(partial_text) and partial_text[position] in " \t\r\n,":
+            position += 1
+        if position >= len(partial_text) or partial_text[position] != "{":
+            return sections
+        try:
+            item, position = decoder.raw_decode(partial_text, position)
+            sections.append(_section(item))
+        except (ValueError, AnalysisSchemaError):
+            return sections
+
+
+def _normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+
+def reconcile_opportunities(analysis, market_rows):
+    """
+    Confere as oportunidades do modelo com as probabilidades calculadas
+
+    Os números exibidos são sempre os calculados (o modelo pode arredondar ou
+    copiar errado); oportunidades sem valor nos cálculos são descartadas e as
+    calculadas que o modelo omitiu entram sem justificativa.
+
+    Args:
+        analysis (StructuredAnalysis): Análise validada
+        market_rows (list): Resultado de utils/fast_analysis.evaluate_markets
+
+    Returns:
+        StructuredAnalysis: A mesma análise, com as oportunidades corrigidas
+    """
+    rows = {_normalize_name(row["name"]): row for row in market_rows}
+    reconciled = []
+    for opp in analysis.opportunities:
+        row = rows.get(_normalize_name(opp.selection))
+        if row is None:
+            logger.warning(f"Oportunidade sem mercado correspondente descartada: {opp.selection}")
+            continue
+        if not row["value"]:
+            logger.warning(f"Oportunidade sem valor nos cálculos descartada: {opp.selection}")
+            continue
+        if abs(row["real_prob"] - opp.real_prob) > PROBABILITY_TOLERANCE or \
+                abs(row["implied_prob"] - opp.implied_prob) > PROBABILITY_TOLERANCE:
+            logger.info(f"Probabilidades do modelo corrigidas para {opp.selection}")
+        opp.market = row["title"]
+        opp.real_prob = row["real_prob"]
+        opp.implied_prob = row["implied_prob"]
+        opp.edge = row["edge"]
+        reconciled.append(opp)
+
+    # Oportunidades calculadas que o modelo não citou
+    cited = {_normalize_name(opp.selection) for opp in reconciled}
+    for row in market_rows:
+        if row["value"] and _normalize_name(row["name"]) not in cited:
+            reconciled.append(Opportunity(row["title"], row["name"], row["real_prob"],
+                                          row["implied_prob"], row["edge"]))
+
+    analysis.opportunities = reconciled
+    return analysis
@@ -0,0 +1,567 @@
+# utils/backtest.py - Backtest do modelo de probabilidades
+"""
+Reproduz em ordem cronológica as partidas concluídas das temporadas em cache
+(league-matches), reconstrói as estatísticas pré-jogo de cada time sem usar
+informação futura (incluindo os ratings Elo), executa
+calculate_advanced_probabilities e avalia Brier, log-loss e curvas de
+calibração por mercado e por liga.
+
+O replay avalia as probabilidades brutas do modelo (sem os mapas de
+utils/calibration_store.py), que são as gravadas com --record para ajustar
+esses mapas.
+
+Os fatores de liga ficam desligados no replay: a tabela offline
+(utils/league_factors.py) é calculada com as temporadas inteiras, inclusive as
+partidas posteriores à prevista.
+
+Cada temporada roda em um processo separado (ProcessPoolExecutor).
+
+Uso:
+    python -m utils.backtest                          # todas as ligas em cache
+    python -m utils.backtest --leagues 12325 12337    # ligas específicas
+    python -m utils.backtest --output backtest.json --record
+"""
+import os
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.calibration_store import CALIBRATION_LINES
+from utils.team_features import TeamFeatures
+from utils.team_ratings import EloRatings
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.backtest")
+
+# Linhas avaliadas em cada mercado (as mesmas usadas por padrão no dashboard e
+# aquelas em que os mapas de calibração são ajustados)
+BACKTEST_LINES = CALIBRATION_LINES
+
+# Odds sintéticas apenas para definir os thresholds de cartões/escanteios
+BACKTEST_ODDS = (
+    f"Over {BACKTEST_LINES['cards']} Cartões\n"
+    f"Over {BACKTEST_LINES['corners']} Escanteios"
+)
+
+# Jogos mínimos de cada time antes de começar a prever
+MIN_HISTORY_MATCHES = 3
+
+# Número de faixas das curvas de calibração
+CALIBRATION_BINS = 10
+
+# Probabilidades limitadas para o log-loss não divergir
+_EPS = 1e-6
+
+BACKTEST_MARKETS = ["result", "goals", "btts", "corners", "cards"]
+
+
+def _valid_stat(value):
+    """A API usa -1 (ou ausência) para estatísticas não coletadas"""
+    return isinstance(value, (int, float)) and value >= 0
+
+
+class TeamHistory:
+    """
+    Histórico de um time acumulado partida a partida durante o replay
+    """
+
+    def __init__(self):
+        self.results = []          # 'W', 'D', 'L' em ordem cronológica
+        self.home_results = []
+        self.away_results = []
+        self.goals_for = 0
+        self.goals_against = 0
+        self.home_played = 0
+        self.away_played = 0
+        self.xg_for = 0.0
+        self.xg_against = 0.0
+        self.xg_matches = 0
+        self.possession = 0.0
+        self.possession_matches = 0
+        self.corners_for = {"home": 0, "away": 0}
+        self.corners_against = {"home": 0, "away": 0}
+        self.corners_matches = {"home": 0, "away": 0}
+        self.cards = {"home": 0, "away": 0}
+        self.cards_matches = {"home": 0, "away": 0}
+        self.last_match_unix = None
+
+    @property
+    def played(self):
+        return len(self.results)
+
+    def update(self, match, is_home):
+        """Incorpora uma partida concluída ao histórico"""
+        side, other = ("team_a", "team_b") if is_home else ("team_b", "team_a")
+        venue = "home" if is_home else "away"
+
+        goals_for = match["homeGoalCount"] if is_home else match["awayGoalCount"]
+        goals_against = match["awayGoalCount"] if is_home else match["homeGoalCount"]
+
+        if goals_for > goals_against:
+            result = "W"
+        elif goals_for == goals_against:
+            result = "D"
+        else:
+            result = "L"
+
+        self.results.append(result)
+        (self.home_results if is_home else self.away_results).append(result)
+        self.goals_for += goals_for
+        self.goals_against += goals_against
+
+        if is_home:
+            self.home_played += 1
+        else:
+            self.away_played += 1
+
+        xg_for = match.get(f"{side}_xg")
+        xg_against = match.get(f"{other}_xg")
+        if _valid_stat(xg_for) and _valid_stat(xg_against) and (xg_for or xg_against):
+            self.xg_for += xg_for
+            self.xg_against += xg_against
+            self.xg_matches += 1
+
+        possession = match.get(f"{side}_possession")
+        if _valid_stat(possession) and possession > 0:
+            self.possession += possession
+            self.possession_matches += 1
+
+        corners_for = match.get(f"{side}_corners")
+        corners_against = match.get(f"{other}_corners")
+        if _valid_stat(corners_for) and _valid_stat(corners_against):
+            self.corners_for[venue] += corners_for
+            self.corners_against[venue] += corners_against
+            self.corners_matches[venue] += 1
+
+        cards = match.get(f"{side}_cards_num")
+        if _valid_stat(cards):
+            self.cards[venue] += cards
+            self.cards_matches[venue] += 1
+
+        self.last_match_unix = match.get("date_unix") or self.last_match_unix
+
+    def to_features(self, is_home, match_unix=None):
+        """
+        Estatísticas pré-jogo no formato esperado por calculate_advanced_probabilities
+
+        Args:
+            is_home (bool): Se o time joga em casa na partida prevista
+            match_unix (int, optional): Data da partida prevista (para o descanso)
+
+        Returns:
+            TeamFeatures: Estatísticas do time
+        """
+        played = max(1, self.played)
+        wins = self.results.count("W")
+
+        corners_matches = self.corners_matches["home"] + self.corners_matches["away"]
+        corners_for = self.corners_for["home"] + self.corners_for["away"]
+        corners_against = self.corners_against["home"] + self.corners_against["away"]
+        cards_matches = self.cards_matches["home"] + self.cards_matches["away"]
+        cards_total = self.cards["home"] + self.cards["away"]
+
+        features = {
+            "form": "".join(self.results[-5:]),
+            "recent_results": self.results[-10:][::-1],
+            "played": self.played,
+            "matches_played": self.played,
+            "wins": wins,
+            "draws": self.results.count("D"),
+            "losses": self.results.count("L"),
+            "win_pct": wins / played * 100,
+            "goals_scored": self.goals_for,
+            "goals_conceded": self.goals_against,
+            "goals_per_game": self.goals_for / played,
+            "conceded_per_game": self.goals_against / played,
+            "home_played": self.home_played,
+            "away_played": self.away_played,
+            "possession": self.possession / self.possession_matches if self.possession_matches else 50,
+            "cards_per_game": cards_total / cards_matches if cards_matches else 0,
+            "cornersAVG_overall": corners_for / corners_matches if corners_matches else 0,
+            "cornersAgainstAVG_overall": corners_against / corners_matches if corners_matches else 0,
+            "corners_per_game": corners_for / corners_matches if corners_matches else 0
+        }
+
+        # Forma específica como mandante/visitante
+        if is_home:
+            features["home_form"] = "".join(self.home_results[-5:])
+        else:
+            features["away_form"] = "".join(self.away_results[-5:])
+
+        if self.xg_matches:
+            features["xg"] = self.xg_for / self.xg_matches * played
+            features["xga"] = self.xg_against / self.xg_matches * played
+            features["xg_for_avg_overall"] = self.xg_for / self.xg_matches
+        else:
+            # Sem xG na temporada, usar gols como aproximação
+            features["xg"] = self.goals_for
+            features["xga"] = self.goals_against
+
+        # Médias de escanteios e cartões por mando
+        for venue in ("home", "away"):
+            if self.corners_matches[venue]:
+                features[f"cornersAVG_{venue}"] = self.corners_for[venue] / self.corners_matches[venue]
+                features[f"cornersAgainstAVG_{venue}"] = self.corners_against[venue] / self.corners_matches[venue]
+            if self.cards_matches[venue]:
+                features[f"{venue}_cards_per_game"] = self.cards[venue] / self.cards_matches[venue]
+
+        if match_unix and self.last_match_unix:
+            features["days_since_last_match"] = max(0, (match_unix - self.last_match_unix) / 86400)
+
+        return TeamFeatures(**features)
+
+
+def match_outcomes(match):
+    """
+    Resultados binários de uma partida concluída nos mercados avaliados
+
+    Returns:
+        dict: {mercado: 0/1 ou None se o dado não existir}; 'result' é 0/1/2 (casa/empate/fora)
+    """
+    home_goals = match["homeGoalCount"]
+    away_goals = match["awayGoalCount"]
+
+    if home_goals > away_goals:
+        result = 0
+    elif home_goals == away_goals:
+        result = 1
+    else:
+        result = 2
+
+    outcomes = {
+        "result": result,
+        "goals": int(home_goals + away_goals > BACKTEST_LINES["goals"]),
+        "btts": int(home_goals > 0 and away_goals > 0),
+        "corners": None,
+        "cards": None
+    }
+
+    if _valid_stat(match.get("team_a_corners")) and _valid_stat(match.get("team_b_corners")):
+        outcomes["corners"] = int(match["team_a_corners"] + match["team_b_corners"] > BACKTEST_LINES["corners"])
+
+    if _valid_stat(match.get("team_a_cards_num")) and _valid_stat(match.get("team_b_cards_num")):
+        outcomes["cards"] = int(match["team_a_cards_num"] + match["team_b_cards_num"] > BACKTEST_LINES["cards"])
+
+    return outcomes
+
+
+def prediction_to_market_probabilities(probabilities):
+    """
+    Extrai da saída do modelo as probabilidades (0-1) dos mercados avaliados
+
+    Returns:
+        dict: {'result': [casa, empate, fora], 'goals': p, 'btts': p, 'corners': p, 'cards': p};
+              None no mercado cuja linha não está na saída (a partida não é avaliada nele)
+    """
+    def line_key(line):
+        return f"over_{str(line).replace('.', '_')}"
+
+    def line_probability(market, line):
+        value = (probabilities.get(market) or {}).get(line_key(line))
+        return value / 100 if isinstance(value, (int, float)) else None
+
+    moneyline = probabilities["moneyline"]
+    return {
+        "result": [moneyline["home_win"] / 100, moneyline["draw"] / 100, moneyline["away_win"] / 100],
+        "goals": line_probability("over_under", BACKTEST_LINES["goals"]),
+        "btts": probabilities["btts"]["yes"] / 100,
+        "corners": line_probability("corners", BACKTEST_LINES["corners"]),
+        "cards": line_probability("cards", BACKTEST_LINES["cards"])
+    }
+
+
+def replay_season(matches, league_id):
+    """
+    Reproduz uma temporada em ordem cronológica sem look-ahead
+
+    Args:
+        matches (list): Partidas do league-matches
+        league_id (int): ID da temporada (apenas informativo: os fatores da
+            tabela offline usariam partidas futuras, então o modelo roda com
+            fatores neutros)
+
+    Returns:
+        dict: {mercado: {'predictions': [...], 'outcomes': [...]}}, 'skipped': int
+    """
+    from utils.ai import calculate_advanced_probabilities
+
+    completed = [
+        m for m in matches
+        if isinstance(m, dict) and m.get("status") == "complete"
+        and _valid_stat(m.get("homeGoalCount")) and _valid_stat(m.get("awayGoalCount"))
+    ]
+    completed.sort(key=lambda m: (m.get("date_unix") or 0, m.get("id") or 0))
+
+    histories = {}
+    h2h = {}
+    # Ratings Elo da própria temporada (cada temporada roda em um processo, sem
+    # as anteriores), atualizados depois de cada previsão
+    ratings = EloRatings()
+    records = {market: {"predictions": [], "outcomes": []} for market in BACKTEST_MARKETS}
+    skipped = 0
+
+    for match in completed:
+        home_id, away_id = match.get("homeID"), match.get("awayID")
+        home_history = histories.setdefault(home_id, TeamHistory())
+        away_history = histories.setdefault(away_id, TeamHistory())
+
+        if home_history.played >= MIN_HISTORY_MATCHES and away_history.played >= MIN_HISTORY_MATCHES:
+            match_unix = match.get("date_unix")
+            pair = h2h.get((home_id, away_id), {"total_matches": 0, "home_wins": 0, "away_wins": 0, "draws": 0})
+
+            try:
+                home_features = home_history.to_features(True, match_unix)
+                away_features = away_history.to_features(False, match_unix)
+                # Como no app: rating só para times com partidas processadas, peso pelo número delas
+                for features, team_id in ((home_features, home_id), (away_features, away_id)):
+                    for name, value in ratings.features(team_id).items():
+                        features[name] = value
+                probabilities = calculate_advanced_probabilities(
+                    home_features,
+                    away_features,
+                    h2h_data=dict(pair),
+                    league_id="generic",
+                    odds_data=BACKTEST_ODDS,
+                    strict_markets=False,
+                    apply_calibration=False
+                )
+                market_probs = prediction_to_market_probabilities(probabilities)
+                outcomes = match_outcomes(match)
+
+                for market in BACKTEST_MARKETS:
+                    if outcomes[market] is None or market_probs[market] is None:
+                        continue
+                    records[market]["predictions"].append(market_probs[market])
+                    records[market]["outcomes"].append(outcomes[market])
+            except Exception as e:
+                # Sem dados suficientes para o 1X2 e gols - a partida é ignorada (escanteios
+                # ou cartões ausentes só tiram a partida desses mercados)
+                logger.debug(f"Partida {match.get('id')} ignorada: {str(e)}")
+                skipped += 1
+
+        # Atualizar o histórico somente depois da previsão
+        home_history.update(match, True)
+        away_history.update(match, False)
+        ratings.update(home_id, away_id, match["homeGoalCount"], match["awayGoalCount"])
+
+        for key, winner in (((home_id, away_id), "home"), ((away_id, home_id), "away")):
+            pair = h2h.setdefault(key, {"total_matches": 0, "home_wins": 0, "away_wins": 0, "draws": 0})
+            pair["total_matches"] += 1
+            if match["homeGoalCount"] == match["awayGoalCount"]:
+                pair["draws"] += 1
+            elif (match["homeGoalCount"] > match["awayGoalCount"]) == (winner == "home"):
+                pair["home_wins"] += 1
+            else:
+                pair["away_wins"] += 1
+
+    records["skipped"] = skipped
+    return records
+
+
+def _backtest_season_worker(league_id):
+    """Executado em um processo do pool: carrega a temporada (armazém local ou cache) e faz o replay"""
+    from utils.footystats_api import load_cached_league_matches
+    from utils.match_warehouse import load_warehouse_matches
+
+    # O modelo registra muitos logs INFO por partida; no backtest só interessam avisos
+    logging.getLogger("valueHunter").setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    matches = load_warehouse_matches(league_id) or load_cached_league_matches(league_id)
+    if not matches:
+        return league_id, None, 0.0
+
+    records = replay_season(matches, league_id)
+    return league_id, records, time.perf_counter() - started
+
+
+def calibration_curve(predictions, outcomes, bins=CALIBRATION_BINS):
+    """
+    Curva de calibração em faixas fixas de probabilidade
+
+    Returns:
+        list: [{'bin', 'mean_prediction', 'observed_rate', 'count'}] para faixas não vazias
+    """
+    p = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+
+    idx = np.minimum((p * bins).astype(np.int64), bins - 1)
+    counts = np.bincount(idx, minlength=bins)
+    pred_sums = np.bincount(idx, weights=p, minlength=bins)
+    outcome_sums = np.bincount(idx, weights=y, minlength=bins)
+
+    curve = []
+    for b in np.nonzero(counts)[0]:
+        curve.append({
+            "bin": round(b / bins, 2),
+            "mean_prediction": round(float(pred_sums[b] / counts[b]), 4),
+            "observed_rate": round(float(outcome_sums[b] / counts[b]), 4),
+            "count": int(counts[b])
+        })
+    return curve
+
+
+def score_market(market, predictions, outcomes):
+    """
+    Brier, log-loss e curva de calibração de um mercado
+
+    O mercado 'result' (1X2) é avaliado como multiclasse e a curva usa as três
+    probabilidades como previsões binárias independentes.
+    """
+    if not predictions:
+        return None
+
+    p = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(outcomes)
+
+    if market == "result":
+        one_hot = np.zeros_like(p)
+        one_hot[np.arange(len(y)), y.astype(np.int64)] = 1
+        brier = float(np.mean(np.sum((p - one_hot) ** 2, axis=1)))
+        log_loss = float(-np.mean(np.log(np.clip(p[np.arange(len(y)), y.astype(np.int64)], _EPS, 1))))
+        curve = calibration_curve(p.ravel(), one_hot.ravel())
+    else:
+        y = y.astype(np.float64)
+        clipped = np.clip(p, _EPS, 1 - _EPS)
+        brier = float(np.mean((p - y) ** 2))
+        log_loss = float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)))
+        curve = calibration_curve(p, y)
+
+    return {
+        "matches": len(predictions),
+        "brier_score": round(brier, 5),
+        "log_loss": round(log_loss, 5),
+        "calibration_curve": curve
+    }
+
+
+def summarize_records(records_by_league):
+    """
+    Agrega as métricas por liga e no total
+
+    Args:
+        records_by_league (dict): {league_id: saída de replay_season}
+
+    Returns:
+        dict: {'overall': {mercado: métricas}, 'leagues': {league_id: {mercado: métricas}}}
+    """
+    summary = {"overall": {}, "leagues": {}}
+    pooled = {market: {"predictions": [], "outcomes": []} for market in BACKTEST_MARKETS}
+
+    for league_id, records in records_by_league.items():
+        league_summary = {"skipped": records.get("skipped", 0)}
+        for market in BACKTEST_MARKETS:
+            data = records[market]
+            league_summary[market] = score_market(market, data["predictions"], data["outcomes"])
+            pooled[market]["predictions"].extend(data["predictions"])
+            pooled[market]["outcomes"].extend(data["outcomes"])
+        summary["leagues"][str(league_id)] = league_summary
+
+    for market in BACKTEST_MARKETS:
+        summary["overall"][market] = score_market(
+            market, pooled[market]["predictions"], pooled[market]["outcomes"]
+        )
+
+    return summary
+
+
+def record_to_calibration_store(records_by_league, store=None):
+    """
+    Grava as previsões do backtest no CalibrationStore para recalibração posterior
+
+    As previsões são as brutas de calculate_advanced_probabilities, o modelo ao
+    qual os mapas são aplicados. O mercado 'result' é gravado como três
+    previsões binárias (casa/empate/fora).
+    """
+    from utils.calibration_store import CalibrationStore
+
+    store = store or CalibrationStore()
+    for league_id, records in records_by_league.items():
+        for market in BACKTEST_MARKETS:
+            data = records[market]
+            if not data["predictions"]:
+                continue
+
+            if market == "result":
+                p = np.asarray(data["predictions"], dtype=np.float64)
+                y = np.asarray(data["outcomes"], dtype=np.int64)
+                one_hot = np.zeros_like(p)
+                one_hot[np.arange(len(y)), y] = 1
+                store.record_predictions(market, p.ravel(), one_hot.ravel(), int(league_id))
+            else:
+                store.record_predictions(market, data["predictions"], data["outcomes"], int(league_id))
+
+    return store
+
+
+def run_backtest(league_ids=None, workers=None, record=False):
+    """
+    Executa o backtest de várias temporadas em paralelo
+
+    Args:
+        league_ids (list, optional): IDs de temporada (padrão: todas do registro)
+        workers (int, optional): Número de processos (padrão: CPUs disponíveis)
+        record (bool): Se True, grava as previsões no CalibrationStore
+
+    Returns:
+        dict: Métricas gerais e por liga, com tempos de execução
+    """
+    from utils.league_factors import get_registry_league_ids
+
+    if league_ids is None:
+        league_ids = get_registry_league_ids()
+
+    started = time.perf_counter()
+    records_by_league = {}
+    timings = {}
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(league_ids)))) as executor:
+        for league_id, records, elapsed in executor.map(_backtest_season_worker, league_ids):
+            if records is None:
+                logger.warning(f"Sem partidas em cache para a liga {league_id}, ignorando")
+                continue
+            records_by_league[league_id] = records
+            timings[str(league_id)] = round(elapsed, 2)
+
+    summary = summarize_records(records_by_league)
+    summary["timings"] = timings
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    if record and records_by_league:
+        record_to_calibration_store(records_by_league)
+
+    logger.info(f"Backtest concluído: {len(records_by_league)} ligas em {summary['elapsed_seconds']}s")
+    return summary
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backtest do modelo de probabilidades")
+    parser.add_argument("--leagues", type=int, nargs="*", help="IDs de temporada (padrão: todo o registro)")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos")
+    parser.add_argument("--output", help="Arquivo JSON para gravar o relatório completo")
+    parser.add_argument("--record", action="store_true", help="Gravar as previsões no CalibrationStore")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = run_backtest(args.leagues or None, args.workers, args.record)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    print(f"Ligas: {len(summary['leagues'])} | Tempo: {summary['elapsed_seconds']}s")
+    for market in BACKTEST_MARKETS:
+        metrics = summary["overall"][market]
+        if metrics:
+            print(f"{market:8s} n={metrics['matches']:6d} brier={metrics['brier_score']:.4f} "
+                  f"log-loss={metrics['log_loss']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
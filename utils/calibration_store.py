@@ -0,0 +1,527 @@
+# utils/calibration_store.py - Armazenamento local de calibração
+"""
+Implementação local (SQLite) da interface de banco de dados usada pelo
+AdvancedPredictionSystem (get_calibration_data, get_league_factors,
+save_calibration_data), mais a recalibração vetorizada por mercado
+(Platt ou isotônica) e a aplicação dos mapas calibrados via tabelas de lookup.
+
+Os mapas valem para um único modelo, calculate_advanced_probabilities
+(utils/ai.py), que os aplica à sua saída. O histórico de previsões guarda só
+as probabilidades brutas desse modelo (antes dos mapas), vindas do backtest
+ou de update_calibration; ajustar sobre saídas já calibradas empilharia um
+mapa sobre o outro a cada recalibração.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.calibration")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+CALIBRATION_DB_FILE = os.path.join(DATA_DIR, "calibration.db")
+
+# Mercados calibrados
+CALIBRATION_MARKETS = ['goals', 'btts', 'corners', 'cards', 'result']
+
+# Linha de cada mercado over/under em que os mapas são ajustados e aplicados
+CALIBRATION_LINES = {'goals': 2.5, 'corners': 9.5, 'cards': 4.5}
+
+# Seção e chave de cada mercado na saída de calculate_advanced_probabilities
+# ('result' usa as três saídas do 1X2)
+CALIBRATION_KEYS = {
+    'result': [('moneyline', 'home_win'), ('moneyline', 'draw'), ('moneyline', 'away_win')],
+    'goals': [('over_under', f"over_{str(CALIBRATION_LINES['goals']).replace('.', '_')}")],
+    'btts': [('btts', 'yes')],
+    'corners': [('corners', f"over_{str(CALIBRATION_LINES['corners']).replace('.', '_')}")],
+    'cards': [('cards', f"over_{str(CALIBRATION_LINES['cards']).replace('.', '_')}")]
+}
+
+# Complemento de cada saída binária calibrada
+_COMPLEMENTS = {'over_': 'under_', 'yes': 'no'}
+
+# Parâmetros iniciais (os mesmos de calibrated_logistic em utils/ai.py)
+DEFAULT_CALIBRATION = {
+    'goals': {'slope': 0.6, 'shift': 0.0},
+    'btts': {'slope': 0.7, 'shift': 0.1},
+    'corners': {'slope': 0.45, 'shift': 0.05},
+    'cards': {'slope': 0.5, 'shift': -0.1},
+    'result': {'slope': 0.65, 'shift': 0.0}
+}
+
+# Resolução das tabelas de lookup (probabilidades 0.000, 0.005, ..., 1.000)
+LOOKUP_SIZE = 201
+
+# Limites numéricos para evitar logit infinito
+_EPS = 1e-6
+
+
+def brier_score(predictions, outcomes):
+    """Brier score vetorizado"""
+    p = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+    if p.size == 0:
+        return None
+    return float(np.mean((p - y) ** 2))
+
+
+def fit_platt(predictions, outcomes, iterations=25, prior_strength=1.0):
+    """
+    Ajuste de Platt: P(y=1) = sigmoid(a * logit(p) + b), por Newton-Raphson vetorizado
+
+    Args:
+        predictions (array): Probabilidades previstas (0-1)
+        outcomes (array): Resultados observados (0/1)
+        iterations (int): Número máximo de iterações
+        prior_strength (float): Penalidade L2 em direção à identidade (a=1, b=0),
+                                evita divergência com previsões pouco variadas
+
+    Returns:
+        tuple: (a, b)
+    """
+    p = np.clip(np.asarray(predictions, dtype=np.float64), _EPS, 1 - _EPS)
+    y = np.asarray(outcomes, dtype=np.float64)
+
+    x = np.log(p / (1 - p))
+    X = np.column_stack([x, np.ones_like(x)])
+    identity = np.array([1.0, 0.0])
+    w = identity.copy()
+
+    def objective(weights):
+        # Log-loss penalizada (logaddexp evita overflow para |z| grande)
+        z = X @ weights
+        loss = np.sum(np.logaddexp(0, z) - y * z)
+        return loss + 0.5 * prior_strength * np.sum((weights - identity) ** 2)
+
+    current = objective(w)
+    for _ in range(iterations):
+        q = 1.0 / (1.0 + np.exp(-np.clip(X @ w, -30, 30)))
+        gradient = X.T @ (q - y) + prior_strength * (w - identity)
+        hessian = (X * (q * (1 - q))[:, None]).T @ X + np.eye(2) * prior_strength
+        step = np.linalg.solve(hessian, gradient)
+
+        # Busca em linha: reduzir o passo até a perda diminuir
+        t = 1.0
+        while t > 1e-4:
+            candidate = w - t * step
+            value = objective(candidate)
+            if value <= current:
+                break
+            t *= 0.5
+        else:
+            break
+
+        w, current = candidate, value
+        if np.max(np.abs(t * step)) < 1e-8:
+            break
+
+    return float(w[0]), float(w[1])
+
+
+def fit_isotonic(predictions, outcomes):
+    """
+    Regressão isotônica (pool adjacent violators) sobre as previsões ordenadas
+
+    Args:
+        predictions (array): Probabilidades previstas (0-1)
+        outcomes (array): Resultados observados (0/1)
+
+    Returns:
+        tuple: (x, y) pontos da função monotônica ajustada
+    """
+    p = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+
+    order = np.argsort(p, kind="mergesort")
+    p_sorted = p[order]
+    y_sorted = y[order]
+
+    # Agrupar previsões iguais antes do PAV para reduzir o número de blocos
+    unique_p, start_idx, counts = np.unique(p_sorted, return_index=True, return_counts=True)
+    sums = np.add.reduceat(y_sorted, start_idx)
+
+    block_sum = []
+    block_count = []
+    block_x = []
+    for x_value, s, c in zip(unique_p, sums, counts):
+        block_sum.append(s)
+        block_count.append(c)
+        block_x.append(x_value)
+        # Fundir blocos enquanto houver violação da monotonicidade
+        while len(block_sum) > 1 and block_sum[-2] / block_count[-2] > block_sum[-1] / block_count[-1]:
+            s_last, c_last = block_sum.pop(), block_count.pop()
+            block_x.pop()
+            block_sum[-1] += s_last
+            block_count[-1] += c_last
+
+    # Cada bloco vira um ponto (início do bloco, média do bloco)
+    x_points = np.asarray(block_x, dtype=np.float64)
+    y_points = np.asarray(block_sum, dtype=np.float64) / np.asarray(block_count, dtype=np.float64)
+    return x_points, y_points
+
+
+def build_lookup_table(method, params):
+    """
+    Pré-computa a função de calibração em uma grade fixa de probabilidades
+
+    Args:
+        method (str): 'platt' ou 'isotonic'
+        params (dict): Parâmetros ajustados
+
+    Returns:
+        list: LOOKUP_SIZE probabilidades calibradas
+    """
+    grid = np.linspace(0.0, 1.0, LOOKUP_SIZE)
+
+    if method == "platt":
+        g = np.clip(grid, _EPS, 1 - _EPS)
+        z = np.clip(params["slope"] * np.log(g / (1 - g)) + params["shift"], -30, 30)
+        table = 1.0 / (1.0 + np.exp(-z))
+    elif method == "isotonic":
+        table = np.interp(grid, params["x"], params["y"])
+    else:
+        table = grid
+
+    return [round(float(v), 5) for v in np.clip(table, 0.0, 1.0)]
+
+
+def recalibrate_market(predictions, outcomes, method="platt"):
+    """
+    Recalibra um mercado a partir do histórico de previsões e resultados
+
+    Args:
+        predictions (array): Probabilidades previstas (0-1)
+        outcomes (array): Resultados observados (0/1)
+        method (str): 'platt' ou 'isotonic'
+
+    Returns:
+        dict: Parâmetros de calibração com tabela de lookup e métricas
+    """
+    p = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+
+    if p.size != y.size:
+        raise ValueError("Previsões e resultados com tamanhos diferentes")
+
+    calibration = {
+        "method": method,
+        "brier_score": brier_score(p, y),
+        "sample_size": int(p.size),
+        "mean_prediction": float(p.mean()),
+        "mean_outcome": float(y.mean())
+    }
+
+    if method == "platt":
+        slope, shift = fit_platt(p, y)
+        calibration["slope"] = slope
+        calibration["shift"] = shift
+        lookup = build_lookup_table("platt", calibration)
+    elif method == "isotonic":
+        x_points, y_points = fit_isotonic(p, y)
+        lookup = build_lookup_table("isotonic", {"x": x_points, "y": y_points})
+        # Mantém slope/shift para compatibilidade com quem lê apenas esses campos
+        calibration["slope"] = 1.0
+        calibration["shift"] = 0.0
+    else:
+        raise ValueError(f"Método de calibração desconhecido: {method}")
+
+    calibration["lookup"] = lookup
+    calibration["brier_score_calibrated"] = brier_score(apply_calibration_map(p, calibration), y)
+    return calibration
+
+
+def apply_calibration_map(prob, calibration):
+    """
+    Aplica a calibração via tabela de lookup (interpolação linear na grade)
+
+    Args:
+        prob (float|array): Probabilidade(s) 0-1
+        calibration (dict): Parâmetros com a chave 'lookup'
+
+    Returns:
+        float|array: Probabilidade(s) calibrada(s); inalterada(s) se não houver tabela
+    """
+    lookup = calibration.get("lookup") if isinstance(calibration, dict) else None
+    if not lookup:
+        return prob
+
+    table = np.asarray(lookup, dtype=np.float64)
+    position = np.clip(np.asarray(prob, dtype=np.float64), 0.0, 1.0) * (len(table) - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, len(table) - 1)
+    frac = position - low
+    result = table[low] * (1 - frac) + table[high] * frac
+
+    if np.ndim(prob) == 0:
+        return float(result)
+    return result
+
+
+def calibrate_probabilities(probabilities, calibration):
+    """
+    Aplica os mapas ajustados à saída de calculate_advanced_probabilities
+
+    O 1X2 é mapeado saída a saída e renormalizado (e a chance dupla recalculada);
+    os mercados over/under só na linha de CALIBRATION_LINES, com o under como
+    complemento.
+
+    Args:
+        probabilities (dict): Saída bruta (percentuais, alterada no lugar)
+        calibration (dict): {mercado: params com 'lookup'}
+
+    Returns:
+        list: Mercados calibrados
+    """
+    calibrated = []
+    for market, keys in CALIBRATION_KEYS.items():
+        params = calibration.get(market)
+        sections = [probabilities.get(section) for section, _ in keys]
+        if not params or not params.get("lookup") or not all(
+                isinstance(section, dict) and isinstance(section.get(key), (int, float))
+                for section, (_, key) in zip(sections, keys)):
+            continue
+
+        values = [apply_calibration_map(section[key] / 100, params) for section, (_, key) in zip(sections, keys)]
+        if market == "result":
+            total = sum(values)
+            if total <= 0:
+                continue
+            values = [value / total for value in values]
+
+        for section, (_, key), value in zip(sections, keys, values):
+            section[key] = round(value * 100, 1)
+            for prefix, complement in _COMPLEMENTS.items():
+                if key.startswith(prefix):
+                    section[complement + key[len(prefix):]] = round(100 - value * 100, 1)
+        calibrated.append(market)
+
+    moneyline = probabilities.get("moneyline")
+    if "result" in calibrated and isinstance(probabilities.get("double_chance"), dict):
+        probabilities["double_chance"] = {
+            "home_or_draw": round(moneyline["home_win"] + moneyline["draw"], 1),
+            "away_or_draw": round(moneyline["away_win"] + moneyline["draw"], 1),
+            "home_or_away": round(moneyline["home_win"] + moneyline["away_win"], 1)
+        }
+    return calibrated
+
+
+class CalibrationStore:
+    """
+    Banco local de calibração compatível com AdvancedPredictionSystem
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or CALIBRATION_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS calibration (
+                    scope TEXT NOT NULL,
+                    market TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (scope, market)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    league_id INTEGER,
+                    market TEXT NOT NULL,
+                    predicted REAL NOT NULL,
+                    outcome INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_market ON predictions (market, league_id)")
+
+    def get_calibration_data(self):
+        """
+        Retorna a calibração global por mercado e as calibrações por liga
+        (chaves 'league_<id>'). Ligas sem calibração própria herdam a global.
+
+        Returns:
+            dict: {mercado: params, 'league_<id>': {mercado: params}}
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT scope, market, params FROM calibration").fetchall()
+
+        calibration = {market: dict(params) for market, params in DEFAULT_CALIBRATION.items()}
+        league_scopes = {}
+        for scope, market, params in rows:
+            if scope == "global":
+                calibration[market] = json.loads(params)
+            else:
+                league_scopes.setdefault(scope, {})[market] = json.loads(params)
+
+        # Cada liga com fatores conhecidos recebe a calibração global como base
+        for league_id in self.get_league_factors():
+            league_scopes.setdefault(f"league_{league_id}", {})
+
+        for scope, markets in league_scopes.items():
+            calibration[scope] = {market: markets.get(market, calibration[market])
+                                  for market in CALIBRATION_MARKETS}
+
+        return calibration
+
+    def get_league_factors(self):
+        """
+        Retorna os fatores por liga da tabela offline (utils/league_factors.py)
+
+        Returns:
+            dict: {league_id (int): [gols, btts, cartões, escanteios]}
+        """
+        from utils.league_factors import load_league_factor_table
+
+        factors = {}
+        for league_id, entry in load_league_factor_table().get("leagues", {}).items():
+            factors[int(league_id)] = [
+                entry["goals_factor"],
+                entry["btts_factor"],
+                entry["cards_factor"],
+                entry["corners_factor"]
+            ]
+        return factors
+
+    def save_calibration_data(self, calibration_data, scope="global"):
+        """
+        Grava a calibração de um ou mais mercados
+
+        Args:
+            calibration_data (dict): {mercado: params}
+            scope (str): 'global' ou 'league_<id>'
+        """
+        now = time.time()
+        rows = [(scope, market, json.dumps(params), now) for market, params in calibration_data.items()]
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO calibration (scope, market, params, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        logger.info(f"Calibração salva ({scope}): {list(calibration_data.keys())}")
+
+    def record_predictions(self, market, predictions, outcomes, league_id=None):
+        """
+        Registra previsões (0-1) e resultados (0/1) de um mercado em lote
+
+        Args:
+            market (str): Mercado ('goals', 'btts', 'corners', 'cards', 'result')
+            predictions (array): Probabilidades previstas
+            outcomes (array): Resultados observados
+            league_id (int, optional): ID da liga
+        """
+        now = time.time()
+        rows = [(league_id, market, float(p), int(o), now) for p, o in zip(predictions, outcomes)]
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO predictions (league_id, market, predicted, outcome, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def load_predictions(self, market, league_id=None):
+        """
+        Carrega o histórico de previsões de um mercado como arrays NumPy
+
+        Returns:
+            tuple: (previsões, resultados)
+        """
+        query = "SELECT predicted, outcome FROM predictions WHERE market = ?"
+        params = [market]
+        if league_id is not None:
+            query += " AND league_id = ?"
+            params.append(league_id)
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return np.empty(0), np.empty(0)
+
+        data = np.asarray(rows, dtype=np.float64)
+        return data[:, 0], data[:, 1]
+
+    def recalibrate(self, method="platt", min_samples=30, league_id=None):
+        """
+        Recalibra todos os mercados com o histórico armazenado e grava o resultado
+
+        Args:
+            method (str): 'platt' ou 'isotonic'
+            min_samples (int): Amostra mínima por mercado
+            league_id (int, optional): Recalibrar apenas uma liga
+
+        Returns:
+            dict: Nova calibração dos mercados com amostra suficiente
+        """
+        new_calibration = {}
+        for market in CALIBRATION_MARKETS:
+            predictions, outcomes = self.load_predictions(market, league_id)
+            if predictions.size < min_samples:
+                logger.info(f"Amostra insuficiente para {market}: {predictions.size}")
+                continue
+            new_calibration[market] = recalibrate_market(predictions, outcomes, method)
+
+        if new_calibration:
+            scope = f"league_{league_id}" if league_id is not None else "global"
+            self.save_calibration_data(new_calibration, scope)
+
+        return new_calibration
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_calibration_store():
+    """Instância única do banco de calibração no processo"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = CalibrationStore()
+        return _shared_store
+
+
+def stored_calibration_maps(league_id=None):
+    """
+    Mapas ajustados para as previsões de calculate_advanced_probabilities
+
+    Não cria o banco: sem recalibração gravada, retorna {} sem tocar no disco.
+    Ligas com calibração própria usam a dela; as demais, a global.
+
+    Args:
+        league_id (int|str, optional): ID da liga
+
+    Returns:
+        dict: {mercado: params} só dos mercados já recalibrados (com 'lookup')
+    """
+    if _shared_store is None and not os.path.exists(CALIBRATION_DB_FILE):
+        return {}
+
+    try:
+        calibration = get_calibration_store().get_calibration_data()
+    except (sqlite3.Error, ValueError) as e:
+        logger.error(f"Erro ao carregar a calibração: {str(e)}")
+        return {}
+
+    markets = calibration.get(f"league_{league_id}") or calibration
+    return {market: markets[market] for market in CALIBRATION_MARKETS
+            if isinstance(markets.get(market), dict) and markets[market].get("lookup")}
@@ -0,0 +1,760 @@
+# utils/extraction_plan.py - Plano compilado de extração do payload da FootyStats
+"""
+Mapa declarativo de cada campo canônico (home_team/away_team/h2h de
+simplify_api_data) para os apelidos aceitos e os caminhos conhecidos do
+payload de get_complete_match_analysis (utils/enhanced_api_client.py).
+
+O plano é compilado uma vez na importação e aplicado em uma única passada
+pelos contêineres conhecidos, com acesso direto por chave. A busca genérica
+na árvore inteira (generic_search) fica apenas como fallback, quando os
+campos essenciais ainda estão ausentes (payload em formato desconhecido).
+
+AliasIndex (índice reverso apelido -> campo canônico, com prioridade) é a
+base de todas as variantes de extração de utils/prompt_adapter.py.
+
+Com os mercados selecionados, só os campos usados por eles (MARKET_FAMILIES)
+e pelas entradas do motor de probabilidades são extraídos na hora; os demais
+ficam pendentes em LazyFields e são resolvidos no primeiro acesso.
+"""
+import logging
+
+from utils.tree_walker import walk_tree
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.extraction_plan")
+
+# Campo canônico do time -> apelidos aceitos, em ordem de prioridade
+TEAM_FIELD_ALIASES = {
+    # Basic stats
+    "played": ["played", "matches_played", "matchesPlayed", "seasonMatchesPlayed_overall", "MP", "games"],
+    "wins": ["wins", "seasonWinsNum_overall", "W", "victories", "won", "team_wins"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D", "drawn", "empates", "team_draws"],
+    "losses": ["losses", "seasonLossesNum_overall", "L", "defeats", "lost", "derrotas"],
+    "goals_scored": ["goals_scored", "seasonScoredNum_overall", "GF", "goals_for", "goalsFor", "goals"],
+    "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "GA", "goals_against", "goalsAgainst"],
+
+    # Form/Runs
+    "form": ["form", "recent_form", "last5", "team_form", "current_form"],
+    "formRun_overall": ["formRun_overall", "form_run", "form_string", "recent_results"],
+
+    # Percentages
+    "win_pct": ["win_pct", "winPercentage", "win_percentage", "victory_percentage"],
+    "draw_pct": ["draw_pct", "drawPercentage", "draw_percentage"],
+    "loss_pct": ["loss_pct", "lossPercentage", "loss_percentage", "defeat_percentage"],
+    "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct", "seasonCSPercentage_overall"],
+    "btts_pct": ["btts_pct", "btts_percentage", "both_teams_to_score_pct", "seasonBTTSPercentage_overall"],
+    "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct", "seasonOver25Percentage_overall"],
+
+    # Points per game
+    "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game", "pts_per_game"],
+    "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg", "last5_ppg"],
+
+    # League position
+    "leaguePosition_overall": ["leaguePosition_overall", "league_position", "position", "rank"],
+
+    # Home stats
+    "home_played": ["home_played", "seasonMatchesPlayed_home", "home_matches", "matches_home"],
+    "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home", "home_victories"],
+    "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home", "home_drawn"],
+    "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home", "home_lost"],
+    "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "home_goals_for", "goals_for_home"],
+    "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "home_goals_against"],
+    "home_form": ["home_form", "formRun_home", "home_recent_form", "form_home"],
+    "formRun_home": ["formRun_home", "home_form_run", "home_form_string"],
+
+    # Away stats
+    "away_played": ["away_played", "seasonMatchesPlayed_away", "away_matches", "matches_away"],
+    "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away", "away_victories"],
+    "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away", "away_drawn"],
+    "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away", "away_lost"],
+    "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "away_goals_for", "goals_for_away"],
+    "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "away_goals_against"],
+    "away_form": ["away_form", "formRun_away", "away_recent_form", "form_away"],
+    "formRun_away": ["formRun_away", "away_form_run", "away_form_string"],
+
+    # xG stats (VERY IMPORTANT)
+    "xg": ["xg", "xG", "expected_goals", "xg_for", "xGF"],
+    "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals"],
+    "xga": ["xga", "xGA", "expected_goals_against", "xg_against", "xGAg"],
+    "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against"],
+    "home_xg": ["home_xg", "xg_home", "xg_for_home", "home_expected_goals"],
+    "xg_for_home": ["xg_for_home", "home_xg", "xg_home", "home_expected_goals"],
+    "away_xg": ["away_xg", "xg_away", "xg_for_away", "away_expected_goals"],
+    "xg_for_away": ["xg_for_away", "away_xg", "xg_away", "away_expected_goals"],
+    "home_xga": ["home_xga", "xga_home", "xg_against_home"],
+    "xg_against_home": ["xg_against_home", "home_xga", "xga_home"],
+    "away_xga": ["away_xga", "xga_away", "xg_against_away"],
+    "xg_against_away": ["xg_against_away", "away_xga", "xga_away"],
+    "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game"],
+    "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game"],
+
+    # Card stats (IMPORTANT)
+    "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards", "cardsAVG_overall"],
+    "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "cardsAVG_home"],
+    "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "cardsAVG_away"],
+    "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total", "cards"],
+    "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home"],
+    "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away"],
+    "yellow_cards": ["yellow_cards", "yellows", "cards_yellow", "CrdY", "YellowCards"],
+    "red_cards": ["red_cards", "reds", "cards_red", "CrdR", "RedCards"],
+    "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage"],
+
+    # Corner stats (IMPORTANT)
+    "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners", "cornersTotalAVG_overall"],
+    "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "cornersTotalAVG_home"],
+    "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "cornersTotalAVG_away"],
+    "corners_for": ["corners_for", "cornersTotal_overall", "corners", "CK", "Corners"],
+    "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total"],
+    "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game"],
+    "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home"],
+    "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away"],
+    "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg"],
+    "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home"],
+    "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away"],
+    "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage"],
+
+    # Other important stats
+    "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg"],
+    "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg"],
+    "possession": ["possession", "possessionAVG_overall", "possession_avg", "Poss"]
+}
+
+# Famílias de campos do time por uso no prompt (utils/ai.format_highly_optimized_prompt).
+# "core" é sempre extraída; campos fora de todas as famílias só sob demanda
+TEAM_FIELD_FAMILIES = {
+    "core": (
+        "played", "wins", "draws", "losses", "goals_scored", "goals_conceded",
+        "form", "home_form", "away_form", "win_pct", "draw_pct", "loss_pct",
+        "possession", "leaguePosition_overall",
+        "home_played", "home_wins", "home_draws", "home_losses", "home_goals_scored", "home_goals_conceded",
+        "away_played", "away_wins", "away_draws", "away_losses", "away_goals_scored", "away_goals_conceded",
+        "xg", "xga", "xg_for_avg_overall", "away_xg", "away_xga",
+    ),
+    "result": ("seasonPPG_overall", "seasonRecentPPG"),
+    "goals": ("clean_sheets_pct", "btts_pct", "over_2_5_pct", "shotsAVG_overall", "shotsOnTargetAVG_overall"),
+    "cards": (
+        "cards_per_game", "home_cards_per_game", "away_cards_per_game",
+        "cardsTotal_overall", "cardsTotal_home", "cardsTotal_away",
+        "yellow_cards", "red_cards", "over_3_5_cards_pct",
+    ),
+    "corners": (
+        "corners_per_game", "home_corners_per_game", "away_corners_per_game", "corners_for", "corners_against",
+        "cornersAVG_overall", "cornersAVG_home", "cornersAVG_away",
+        "cornersAgainstAVG_overall", "cornersAgainstAVG_home", "cornersAgainstAVG_away", "over_9_5_corners_pct",
+    ),
+}
+
+# Mercado (chave de selected_markets) -> famílias de campos que ele usa
+MARKET_FAMILIES = {
+    "money_line": ("result",),
+    "chance_dupla": ("result",),
+    "over_under": ("goals",),
+    "ambos_marcam": ("goals",),
+    "cartoes": ("cards",),
+    "escanteios": ("corners",),
+}
+
+# Campos de sequência de resultados (texto); os demais são numéricos
+TEXT_FIELDS = frozenset(["form", "home_form", "away_form", "formRun_overall", "formRun_home", "formRun_away"])
+
+# Campo canônico do H2H -> apelidos aceitos
+H2H_FIELD_ALIASES = {
+    "total_matches": ["total_matches", "matches", "total", "matches_played", "numberOfMatches"],
+    "home_wins": ["home_wins", "homeWins", "home_team_wins", "team_a_wins", "local_wins"],
+    "away_wins": ["away_wins", "awayWins", "away_team_wins", "team_b_wins", "visitor_wins"],
+    "draws": ["draws", "draw", "empates", "equal", "tied", "drawn"],
+    "avg_goals": ["avg_goals", "average_goals", "goals_avg", "goals_per_match", "mean_goals"],
+    "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "over25_percentage", "o25_pct"],
+    "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_percentage", "both_score_pct"],
+    "avg_cards": ["avg_cards", "average_cards", "cards_avg", "cards_per_match", "mean_cards"],
+    "avg_corners": ["avg_corners", "average_corners", "corners_avg", "corners_per_match"]
+}
+
+# Sub-dicionários de estatísticas examinados dentro de cada contêiner de time
+STATS_SUBKEYS = ("stats", "statistics", "seasonStats", "additional_info")
+
+# Raízes dos dados de cada time; "{side}" = home_team/away_team, "{short}" = home/away.
+# Contêineres posteriores sobrescrevem os anteriores (mesma ordem da busca direta original)
+TEAM_SOURCE_ROOTS = (
+    ("{side}",),
+    ("basic_stats", "{side}"),
+)
+
+# Contêineres que apenas completam campos ausentes ou zerados, em ordem de prioridade
+# (antes encontrados pela busca recursiva: advanced_stats e lastx de team_form)
+TEAM_FILL_ROOTS = (
+    ("advanced_stats", "{short}"),
+    ("team_form", "{short}", 0),
+)
+
+H2H_SOURCE_PATHS = (
+    ("h2h",),
+    ("basic_stats", "h2h"),
+)
+
+# Estrutura h2h do endpoint match (head_to_head e match_details.h2h)
+H2H_FILL_PATHS = (
+    ("head_to_head",),
+    ("head_to_head", "previous_matches_results"),
+    ("head_to_head", "betting_stats"),
+    ("match_details", "h2h"),
+    ("match_details", "h2h", "previous_matches_results"),
+    ("match_details", "h2h", "betting_stats"),
+)
+
+# Sem estes campos os cálculos de probabilidade não têm base: a busca genérica é acionada
+ESSENTIAL_TEAM_FIELDS = ("played", "goals_scored", "goals_conceded")
+
+_SIDES = (("home_team", "home"), ("away_team", "away"))
+
+# Termos do caminho que identificam dados de confronto direto na busca genérica
+H2H_PATH_KEYWORDS = ("h2h", "head", "vs")
+
+# Profundidade de STATS_SUBKEYS examinada abaixo de cada raiz (stats.stats, stats.additional_info...)
+_SUBKEY_DEPTH = 2
+
+
+def _compile_roots(roots, side, short):
+    return tuple(
+        tuple(part.format(side=side, short=short) if isinstance(part, str) else part for part in root)
+        for root in roots
+    )
+
+
+_PLACEHOLDER_VALUES = ("", "?????")
+
+
+class AliasIndex:
+    """
+    Índice reverso apelido -> campos canônicos, compilado uma vez na importação
+
+    Cada apelido guarda os campos que ele alimenta e a sua prioridade na lista
+    de apelidos do campo. Um contêiner é percorrido uma única vez, com uma
+    consulta ao dicionário por chave; para cada campo vale o apelido de maior
+    prioridade com valor válido (o mesmo resultado de testar os apelidos em ordem).
+
+    Args:
+        aliases (dict): Campo canônico -> apelidos em ordem de prioridade
+        text_fields (iterable): Campos de texto (os demais são numéricos)
+    """
+
+    __slots__ = ("fields", "index", "_subsets")
+
+    def __init__(self, aliases, text_fields=TEXT_FIELDS):
+        text_fields = frozenset(text_fields)
+        self.fields = tuple(aliases)
+        index = {}
+        for field, names in aliases.items():
+            is_text = field in text_fields
+            for priority, alias in enumerate(names):
+                index.setdefault(alias, []).append((field, priority, is_text))
+        self.index = {alias: tuple(entries) for alias, entries in index.items()}
+        self._subsets = {}
+
+    def subset(self, fields):
+        """
+        Índice restrito a alguns campos canônicos (mesmas prioridades)
+
+        Memorizado por conjunto de campos: as combinações de mercados são poucas.
+
+        Args:
+            fields (iterable): Campos canônicos mantidos
+
+        Returns:
+            AliasIndex: Índice com apenas os apelidos desses campos
+        """
+        fields = frozenset(fields)
+        restricted = self._subsets.get(fields)
+        if restricted is None:
+            restricted = AliasIndex.__new__(AliasIndex)
+            restricted.fields = tuple(field for field in self.fields if field in fields)
+            restricted.index = {}
+            for alias, entries in self.index.items():
+                kept = tuple(entry for entry in entries if entry[0] in fields)
+                if kept:
+                    restricted.index[alias] = kept
+            restricted._subsets = {}
+            self._subsets[fields] = restricted
+        return restricted
+
+    def isdisjoint(self, source):
+        """True se o contêiner não tem nenhum apelido conhecido"""
+        return self.index.keys().isdisjoint(source)
+
+    def resolve(self, source, skip=None, as_float=False, skip_empty=False, origins=None):
+        """
+        Campos canônicos presentes no contêiner
+
+        Valores None, 'N/A' e '' são ignorados; campos de texto aceitam apenas
+        texto e os numéricos aceitam números ou texto conversível.
+
+        Args:
+            source (dict): Contêiner do payload
+            skip (container): Campos a ignorar (ex.: os já presentes no destino)
+            as_float (bool): Converter os números para float
+            skip_empty (bool): Ignorar zeros e a forma vazia ("?????")
+            origins (dict): Se informado, recebe campo -> apelido de onde veio o valor
+
+        Returns:
+            dict: Campo canônico -> valor
+        """
+        if not isinstance(source, dict) or not source:
+            return {}
+        index = self.index
+        skip = skip if skip is not None else ()
+        found = {}
+        ranks = {}
+        # Interseção das chaves em C: o laço só visita os apelidos presentes
+        for key in index.keys() & source.keys():
+            value = source[key]
+            if value is None:
+                continue
+            is_str = isinstance(value, str)
+            if is_str and (value == 'N/A' or value == ''):
+                continue
+            for field, priority, is_text in index[key]:
+                if field in skip or ranks.get(field, priority + 1) <= priority:
+                    continue
+                if is_text:
+                    if not is_str or (skip_empty and value in _PLACEHOLDER_VALUES):
+                        continue
+                    converted = value
+                elif not is_str and not as_float and isinstance(value, (int, float)):
+                    converted = value
+                else:
+                    try:
+                        converted = float(value)
+                    except (ValueError, TypeError):
+                        continue
+                if skip_empty and not is_text and converted == 0:
+                    continue
+                ranks[field] = priority
+                found[field] = converted
+                if origins is not None:
+                    origins[field] = key
+        return found
+
+
+class LazyFields(dict):
+    """
+    Dicionário de campos com parte deles resolvida sob demanda
+
+    Os campos pendentes não estão no dicionário até o primeiro acesso a
+    qualquer um deles (get, in, [], setdefault, pop), quando o resolvedor
+    roda uma única vez para todos. Percorrer o dicionário inteiro (items,
+    keys, len, json, dict(), cópia, pickle) também resolve tudo antes, de modo
+    que o conteúdo visível é sempre o mesmo da extração completa. Campos já
+    presentes nunca são sobrescritos pelo resolvedor.
+
+    O resolvedor mantém referência ao payload original até ser executado.
+
+    Args:
+        data (dict): Campos já resolvidos
+        pending (iterable): Campos pendentes
+        resolver (callable): Função sem argumentos que retorna campo -> valor
+    """
+
+    __slots__ = ("_pending", "_resolver")
+
+    def __init__(self, data=(), pending=(), resolver=None):
+        super().__init__(data)
+        self._pending = frozenset(pending)
+        self._resolver = resolver if self._pending else None
+
+    @property
+    def pending(self):
+        """Campos ainda não resolvidos"""
+        return self._pending if self._resolver is not None else frozenset()
+
+    def _resolve(self):
+        resolver = self._resolver
+        if resolver is None:
+            return
+        values = resolver()
+        setdefault = dict.setdefault
+        for field in self._pending:
+            if field in values:
+                setdefault(self, field, values[field])
+        # Só depois de preencher: um acesso concorrente resolve de novo, sem ver campos faltando
+        self._resolver = None
+        logger.debug(f"Campos sob demanda resolvidos: {len(self._pending)}")
+
+    def _resolve_for(self, key):
+        if self._resolver is not None and key in self._pending and not dict.__contains__(self, key):
+            self._resolve()
+
+    def resolved_items(self):
+        """Itens já resolvidos, sem resolver os pendentes"""
+        return dict.items(self)
+
+    def __missing__(self, key):
+        if self._resolver is not None and key in self._pending:
+            self._resolve()
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        self._resolve_for(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._resolve_for(key)
+        return dict.__contains__(self, key)
+
+    def setdefault(self, key, default=None):
+        self._resolve_for(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self._resolve_for(key)
+        return dict.pop(self, key, *default)
+
+    def __delitem__(self, key):
+        self._resolve_for(key)
+        dict.__delitem__(self, key)
+
+    def __bool__(self):
+        return dict.__len__(self) > 0 or len(self) > 0
+
+    # Operações sobre o dicionário inteiro: resolvem tudo antes
+    def keys(self):
+        self._resolve()
+        return dict.keys(self)
+
+    def items(self):
+        self._resolve()
+        return dict.items(self)
+
+    def values(self):
+        self._resolve()
+        return dict.values(self)
+
+    def __iter__(self):
+        self._resolve()
+        return dict.__iter__(self)
+
+    def __reversed__(self):
+        self._resolve()
+        return dict.__reversed__(self)
+
+    def __len__(self):
+        self._resolve()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._resolve()
+        if isinstance(other, LazyFields):
+            other._resolve()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __or__(self, other):
+        self._resolve()
+        return dict(self) | other
+
+    def __ror__(self, other):
+        self._resolve()
+        return other | dict(self)
+
+    def popitem(self):
+        self._resolve()
+        return dict.popitem(self)
+
+    def copy(self):
+        self._resolve()
+        return dict(self)
+
+    def __repr__(self):
+        self._resolve()
+        return dict.__repr__(self)
+
+    def __reduce_ex__(self, protocol):
+        # Cópias e pickle viram dict simples (sem o resolvedor e o payload)
+        self._resolve()
+        return dict, (dict(self),)
+
+
+def resolved_items(data):
+    """
+    Itens de um dicionário de campos sem resolver os pendentes (LazyFields)
+
+    Para contagens e logs que não devem disparar a extração sob demanda.
+    """
+    if isinstance(data, LazyFields):
+        return data.resolved_items()
+    return data.items()
+
+
+_MARKET_FIELDS = {}
+
+
+def fields_for_markets(selected_markets, families=TEAM_FIELD_FAMILIES, required=()):
+    """
+    Campos usados pelos mercados selecionados (a família "core" sempre entra)
+
+    Memorizado por famílias envolvidas: as combinações de mercados são poucas.
+
+    Args:
+        selected_markets (dict): Mercados selecionados {mercado: bool}
+        families (dict): Família -> campos (padrão TEAM_FIELD_FAMILIES)
+        required (tuple): Campos sempre necessários (ex.: entradas do motor de probabilidades)
+
+    Returns:
+        frozenset: Campos a extrair na hora
+    """
+    names = {"core"}
+    for market, selected in (selected_markets or {}).items():
+        if selected:
+            names.update(MARKET_FAMILIES.get(market, ()))
+    key = (frozenset(names), id(families), required)
+    fields = _MARKET_FIELDS.get(key)
+    if fields is None:
+        fields = set(required)
+        for name in names:
+            fields.update(families.get(name, ()))
+        fields = _MARKET_FIELDS[key] = frozenset(fields)
+    return fields
+
+
+# Plano compilado (na importação)
+TEAM_INDEX = AliasIndex(TEAM_FIELD_ALIASES)
+H2H_INDEX = AliasIndex(H2H_FIELD_ALIASES)
+_TEAM_FIELDS = frozenset(TEAM_INDEX.fields)
+_PENDING_FIELDS = {}
+_TEAM_PLAN = {
+    side: (_compile_roots(TEAM_SOURCE_ROOTS, side, short), _compile_roots(TEAM_FILL_ROOTS, side, short))
+    for side, short in _SIDES
+}
+
+
+def _collect_containers(source, depth, out):
+    """Contêiner seguido dos sub-dicionários de estatísticas, na ordem da recursão original"""
+    out.append(source)
+    if depth:
+        for subkey in STATS_SUBKEYS:
+            child = source.get(subkey)
+            if isinstance(child, dict):
+                _collect_containers(child, depth - 1, out)
+    return out
+
+
+def resolve_path(data, path):
+    """Contêiner no caminho (chaves de dicionário ou índices de lista); None se ausente"""
+    for key in path:
+        if isinstance(key, int):
+            if not isinstance(data, list) or len(data) <= key:
+                return None
+            data = data[key]
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def _missing(target, field):
+    return field not in target or target[field] == 0
+
+
+def extract_fields(source, target, index, fill_only=False, keep_existing=False):
+    """
+    Copia os campos canônicos de um contêiner para o destino
+
+    Args:
+        source (dict): Contêiner do payload
+        target (dict): Destino (campos canônicos)
+        index (AliasIndex): Índice do plano (TEAM_INDEX ou H2H_INDEX)
+        fill_only (bool): Apenas campos ausentes ou zerados no destino
+        keep_existing (bool): Não sobrescrever campos já presentes no destino
+    """
+    if fill_only:
+        skip = {field for field, value in target.items() if value != 0}
+        if skip.issuperset(index.fields):
+            # Nada a completar (comum com o índice restrito aos mercados selecionados)
+            return
+    elif keep_existing:
+        skip = target
+    else:
+        skip = None
+    target.update(index.resolve(source, skip=skip))
+
+
+def extract_team(api_data, side, fields=None):
+    """
+    Campos canônicos de um time pelos caminhos conhecidos do payload
+
+    Args:
+        api_data (dict): complete_analysis
+        side (str): "home_team" ou "away_team"
+        fields (iterable): Apenas estes campos (None = todos os do plano)
+
+    Returns:
+        dict: Campos encontrados
+    """
+    index = TEAM_INDEX if fields is None else TEAM_INDEX.subset(fields)
+    source_roots, fill_roots = _TEAM_PLAN[side]
+    sources = []
+    for path in source_roots:
+        root = resolve_path(api_data, path)
+        if root is not None:
+            _collect_containers(root, _SUBKEY_DEPTH, sources)
+    fills = []
+    for path in fill_roots:
+        root = resolve_path(api_data, path)
+        if root is not None:
+            _collect_containers(root, 1, fills)
+
+    team = {}
+    # Do contêiner de maior prioridade (o último) para o primeiro: cada campo é
+    # resolvido uma vez, com o mesmo resultado de aplicar todos em ordem sobrescrevendo.
+    # Contêineres sem nenhum apelido conhecido são descartados sem percorrer o plano
+    for source in reversed(sources):
+        if not index.isdisjoint(source):
+            extract_fields(source, team, index, keep_existing=True)
+    for source in fills:
+        if not index.isdisjoint(source):
+            extract_fields(source, team, index, fill_only=True)
+    return team
+
+
+def defer_team_fields(team, api_data, side, fields, complete=None):
+    """
+    Registro do time com os campos do plano fora de fields resolvidos sob demanda
+
+    Cada campo é resolvido de forma independente dos demais, então extrair os
+    pendentes depois dá o mesmo resultado da extração completa.
+
+    Args:
+        team (dict): Campos já extraídos (ver extract_team com fields)
+        api_data (dict): complete_analysis
+        side (str): "home_team" ou "away_team"
+        fields (frozenset): Campos já extraídos
+        complete (callable, optional): Completa os campos resolvidos (ex.: médias
+            por jogo calculadas a partir deles); recebe e retorna o dict
+
+    Returns:
+        LazyFields: Campos do time
+    """
+    pending = _PENDING_FIELDS.get(fields)
+    if pending is None:
+        pending = _PENDING_FIELDS[fields] = _TEAM_FIELDS - fields
+
+    def resolve():
+        values = extract_team(api_data, side, pending)
+        return complete(values) if complete is not None else values
+
+    return LazyFields(team, pending, resolve)
+
+
+def extract_h2h(api_data):
+    """Campos canônicos do confronto direto pelos caminhos conhecidos do payload"""
+    h2h = {}
+    for path in reversed(H2H_SOURCE_PATHS):
+        source = resolve_path(api_data, path)
+        if source is not None and not H2H_INDEX.isdisjoint(source):
+            extract_fields(source, h2h, H2H_INDEX, keep_existing=True)
+    for path in H2H_FILL_PATHS:
+        source = resolve_path(api_data, path)
+        if source is not None and not H2H_INDEX.isdisjoint(source):
+            extract_fields(source, h2h, H2H_INDEX, fill_only=True)
+    return h2h
+
+
+def missing_essential(team):
+    """Campos essenciais ausentes ou zerados de um time"""
+    return [field for field in ESSENTIAL_TEAM_FIELDS if _missing(team, field)]
+
+
+def generic_search(api_data, home_team_name, away_team_name):
+    """
+    Busca em toda a árvore (fallback para payloads em formato desconhecido)
+
+    Cada dicionário é atribuído ao time da casa, ao visitante ou ao H2H pelo
+    nome do time ou pelo caminho ("home", "away", "h2h"...). O percurso é
+    iterativo e limitado (utils/tree_walker.py).
+
+    Returns:
+        tuple: (campos da casa, campos do visitante, campos do H2H)
+    """
+    home_lower = home_team_name.lower()
+    away_lower = away_team_name.lower()
+    home_data, away_data, h2h_data = {}, {}, {}
+
+    def visit(obj, path):
+        is_home = False
+        is_away = False
+
+        name = obj.get("name")
+        if isinstance(name, str):
+            # By team name
+            name = name.lower()
+            if home_lower in name:
+                is_home = True
+            elif away_lower in name:
+                is_away = True
+
+        # By path name
+        path_lower = path.lower()
+        if not (is_home or is_away):
+            if "home" in path_lower:
+                is_home = True
+            elif "away" in path_lower:
+                is_away = True
+
+        if is_home:
+            _extract_team_recursive(obj, home_data)
+        elif is_away:
+            _extract_team_recursive(obj, away_data)
+        elif any(keyword in path_lower for keyword in H2H_PATH_KEYWORDS):
+            extract_fields(obj, h2h_data, H2H_INDEX)
+
+    walk_tree(api_data, on_dict=visit)
+    return home_data, away_data, h2h_data
+
+
+def _extract_team_recursive(source, target):
+    extract_fields(source, target, TEAM_INDEX)
+    for subkey in STATS_SUBKEYS:
+        if isinstance(source.get(subkey), dict):
+            _extract_team_recursive(source[subkey], target)
+
+
+def extract_with_plan(api_data, home_team_name, away_team_name, fields=None):
+    """
+    Extração pelo plano compilado e, se faltarem campos essenciais, busca genérica
+
+    Args:
+        api_data (dict): complete_analysis
+        home_team_name (str): Time da casa
+        away_team_name (str): Time visitante
+        fields (frozenset): Campos do time a extrair (None = todos); ver fields_for_markets
+
+    Returns:
+        tuple: (campos da casa, campos do visitante, campos do H2H)
+    """
+    home = extract_team(api_data, "home_team", fields)
+    away = extract_team(api_data, "away_team", fields)
+    h2h = extract_h2h(api_data)
+
+    missing = missing_essential(home) + missing_essential(away)
+    if missing:
+        logger.info(f"Campos essenciais ausentes nos caminhos conhecidos ({sorted(set(missing))}), "
+                    f"usando busca genérica")
+        if fields is not None:
+            # Formato desconhecido: extração completa, para a busca genérica só
+            # completar o que o plano não achou (como sem seleção de mercados)
+            home = extract_team(api_data, "home_team")
+            away = extract_team(api_data, "away_team")
+        found = generic_search(api_data, home_team_name, away_team_name)
+        for target, deep in zip((home, away, h2h), found):
+            for field, value in deep.items():
+                if _missing(target, field):
+                    target[field] = value
+
+    return home, away, h2h
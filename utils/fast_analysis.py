@@ -0,0 +1,368 @@
+# utils/fast_analysis.py - Análise rápida (sem IA)
+"""
+Renderização determinística da análise completa (mercados, probabilidades,
+oportunidades, justificativas, confiança e viabilidade) a partir das
+probabilidades calculadas e das odds informadas, sem chamada ao LLM.
+
+É o mesmo relatório exibido após a análise da IA (o texto final do dashboard é
+montado a partir das probabilidades), por isso a análise rápida termina em
+milissegundos e serve de alternativa quando a fila do LLM está saturada ou o
+prazo do pedido é curto. Funções puras, sem Streamlit.
+"""
+import os
+import re
+import math
+import logging
+
+from utils.justifications import generate_detailed_justification
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.fast_analysis")
+
+# Diferença mínima (pontos percentuais) entre probabilidade real e implícita para haver valor
+VALUE_EDGE_THRESHOLD = 2.0
+
+# Fração dos créditos cobrada na análise rápida (arredondada para cima, mínimo 1)
+FAST_ANALYSIS_CREDIT_FACTOR = 0.5
+
+# Duração média de uma análise da IA e prazo padrão de um pedido (segundos)
+LLM_AVERAGE_SECONDS = float(os.environ.get("LLM_AVERAGE_SECONDS", "15"))
+ANALYSIS_DEADLINE_SECONDS = float(os.environ.get("ANALYSIS_DEADLINE_SECONDS", "60"))
+
+# Linhas fixas dos mercados over/under em utils/data.get_odds_data
+_DEFAULT_LINES = {"over_under": 2.5, "escanteios": 9.5, "cartoes": 3.5}
+
+# Mercados de resultado: (mercado, título, grupo das probabilidades, [(campo da odd,
+# chave da probabilidade, rótulo, padrão no texto de odds, tipo da justificativa)])
+_OUTCOME_MARKETS = [
+    ("money_line", "Money Line (1X2)", "moneyline", [
+        ("home", "home_win", "{home}", r"(?:Casa|Home).*?@(\d+\.?\d*)", "home_win"),
+        ("draw", "draw", "Empate", r"Empate.*?@(\d+\.?\d*)", "draw"),
+        ("away", "away_win", "{away}", r"(?:Fora|Away).*?@(\d+\.?\d*)", "away_win"),
+    ]),
+    ("chance_dupla", "Chance Dupla", "double_chance", [
+        ("home_draw", "home_or_draw", "{home} ou Empate", r"1X.*?@(\d+\.?\d*)", "home_or_draw"),
+        ("home_away", "home_or_away", "{home} ou {away}", r"12.*?@(\d+\.?\d*)", "home_or_away"),
+        ("draw_away", "away_or_draw", "Empate ou {away}", r"X2.*?@(\d+\.?\d*)", "away_or_draw"),
+    ]),
+    ("ambos_marcam", "Ambos Marcam (BTTS)", "btts", [
+        ("yes", "yes", "Ambos Marcam - Sim", r"Sim.*?@(\d+\.?\d*)", "yes"),
+        ("no", "no", "Ambos Marcam - Não", r"Não.*?@(\d+\.?\d*)", "no"),
+    ]),
+]
+
+# Mercados de linha: (mercado, título, grupo das probabilidades, unidade, tipo da justificativa)
+_LINE_MARKETS = [
+    ("over_under", "Over/Under Gols", "over_under", "Gols", "goals"),
+    ("escanteios", "Escanteios", "corners", "Escanteios", "corners"),
+    ("cartoes", "Cartões", "cards", "Cartões", "cards"),
+]
+
+# Níveis de viabilidade: (probabilidade mínima, margem mínima, rótulo, avaliação, recomendação)
+_VIABILITY_LEVELS = [
+    (70, 7, "🔥🔥🔥 EXCELENTE", "Alta probabilidade e grande margem",
+     "Oportunidade excelente para apostar. Considere uma aposta com valor mais alto."),
+    (60, 5, "🔥🔥 MUITO BOA", "Boa probabilidade e margem significativa",
+     "Boa oportunidade para apostar. Valor recomendado."),
+    (50, 3, "🔥 BOA", "Probabilidade e margem razoáveis",
+     "Considere uma aposta com valor moderado."),
+]
+
+_VIABILITY_LEGEND = (
+    "# LEGENDA DE VIABILIDADE\n"
+    "- 🔥🔥🔥 EXCELENTE: Alta probabilidade (>70%) e grande margem (>7%)\n"
+    "- 🔥🔥 MUITO BOA: Boa probabilidade (>60%) e margem significativa (>5%)\n"
+    "- 🔥 BOA: Probabilidade e margem razoáveis (>50% e >3%)\n"
+    "- ⚠️ RAZOÁVEL: Ou boa probabilidade ou boa margem\n"
+    "- ❌ BAIXA: Probabilidade e margem insuficientes\n"
+)
+
+
+def fast_analysis_credits(num_markets):
+    """Créditos cobrados por uma análise rápida com num_markets mercados"""
+    return max(1, math.ceil(num_markets * FAST_ANALYSIS_CREDIT_FACTOR))
+
+
+def fast_analysis_reason(dispatcher_stats, tier="free", deadline_seconds=ANALYSIS_DEADLINE_SECONDS,
+                         average_seconds=LLM_AVERAGE_SECONDS):
+    """
+    Indica se o pedido deve ir direto para a análise rápida
+
+    Args:
+        dispatcher_stats (dict): Resultado de LLMDispatcher.stats()
+        tier (str): Tier do usuário
+        deadline_seconds (float): Tempo máximo aceitável até a análise ficar pronta
+        average_seconds (float): Duração média de uma análise da IA
+
+    Returns:
+        str|None: Motivo (para exibir ao usuário) ou None se a IA deve ser usada
+    """
+    from utils.llm_dispatcher import tier_priority
+
+    if dispatcher_stats["queued"] >= dispatcher_stats["max_queue"]:
+        return "fila de análises da IA cheia"
+
+    # Pedidos atendidos antes deste: os de prioridade igual ou maior já na fila
+    priority = tier_priority(tier)
+    ahead = sum(count for queued_tier, count in dispatcher_stats["queued_by_tier"].items()
+                if tier_priority(queued_tier) <= priority)
+    if dispatcher_stats["active"] < dispatcher_stats["max_concurrency"] and not ahead:
+        return None
+
+    rounds = math.ceil((ahead + 1) / dispatcher_stats["max_concurrency"])
+    expected_seconds = rounds * average_seconds + average_seconds
+    if expected_seconds > deadline_seconds:
+        return f"espera estimada pela IA de {expected_seconds:.0f}s"
+    return None
+
+
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value > 0 else 0.0
+
+
+def _market_odd(odds_data, market, field, pattern):
+    """Odd de um resultado, a partir do dicionário de get_odds_data ou do texto de odds"""
+    if isinstance(odds_data, dict):
+        return _to_float((odds_data.get(market) or {}).get(field))
+    match = re.search(pattern, odds_data or "")
+    return _to_float(match.group(1)) if match else 0.0
+
+
+def _market_line(odds_data, market, unit):
+    """Linha (ex.: 2.5) e odds over/under de um mercado de linha"""
+    if isinstance(odds_data, dict):
+        market_odds = odds_data.get(market) or {}
+        return _DEFAULT_LINES[market], _to_float(market_odds.get("over")), _to_float(market_odds.get("under"))
+
+    text = odds_data or ""
+    line_match = re.search(rf"Over\s+(\d+\.?\d*)\s+{unit}", text)
+    if not line_match:
+        return None, 0.0, 0.0
+    over_match = re.search(rf"Over\s+\d+\.?\d*\s+{unit}:.*?@(\d+\.?\d*)", text)
+    under_match = re.search(rf"Under\s+\d+\.?\d*\s+{unit}:.*?@(\d+\.?\d*)", text)
+    return (float(line_match.group(1)),
+            _to_float(over_match.group(1)) if over_match else 0.0,
+            _to_float(under_match.group(1)) if under_match else 0.0)
+
+
+def _line_probabilities(probabilities, line):
+    """Probabilidades (%) de over/under numa linha; None quando não calculadas"""
+    line_str = str(line).replace(".", "_")
+
+    # Formato antigo de calculate_cards_probability: (over, under, esperado) em frações
+    if isinstance(probabilities, tuple) and len(probabilities) >= 2:
+        return probabilities[0] * 100, probabilities[1] * 100
+    if not isinstance(probabilities, dict):
+        return None, None
+
+    over_real = probabilities.get(f"over_{line_str}")
+    under_real = probabilities.get(f"under_{line_str}")
+    if over_real is None and under_real is not None:
+        over_real = 100.0 - under_real
+    if under_real is None and over_real is not None:
+        under_real = 100.0 - over_real
+    return over_real, under_real
+
+
+def evaluate_markets(selected_markets, original_probabilities, odds_data, home_team, away_team):
+    """
+    Compara probabilidade real e implícita de cada resultado dos mercados selecionados
+
+    Args:
+        selected_markets (dict): Mercados selecionados
+        original_probabilities (dict): Resultado de calculate_advanced_probabilities
+        odds_data (dict|str): Odds de get_odds_data ou texto ("Casa: @2.10 ...")
+        home_team (str): Time da casa
+        away_team (str): Time visitante
+
+    Returns:
+        list: Dicionários {market, title, name, odd, real_prob, implied_prob, edge, value,
+              justification_market, justification_bet}, na ordem de exibição
+    """
+    rows = []
+
+    def add_row(market, title, name, odd, real_prob, justification_market, justification_bet):
+        implied_prob = 100.0 / odd if odd else 0.0
+        edge = real_prob - implied_prob
+        rows.append({
+            "market": market,
+            "title": title,
+            "name": name,
+            "odd": odd,
+            "real_prob": real_prob,
+            "implied_prob": implied_prob,
+            "edge": edge,
+            "value": bool(odd) and edge > VALUE_EDGE_THRESHOLD,
+            "justification_market": justification_market,
+            "justification_bet": justification_bet,
+        })
+
+    for market, title, group, outcomes in _OUTCOME_MARKETS:
+        probabilities = original_probabilities.get(group)
+        if not selected_markets.get(market) or not isinstance(probabilities, dict):
+            continue
+        for field, prob_key, label, pattern, bet_type in outcomes:
+            name = label.format(home=home_team, away=away_team)
+            add_row(market, title, name, _market_odd(odds_data, market, field, pattern),
+                    probabilities.get(prob_key, 0), group, bet_type)
+
+    for market, title, group, unit, justification_market in _LINE_MARKETS:
+        if not selected_markets.get(market) or group not in original_probabilities:
+            continue
+        line, over_odd, under_odd = _market_line(odds_data, market, unit)
+        if line is None:
+            continue
+        over_real, under_real = _line_probabilities(original_probabilities[group], line)
+        if over_real is None:
+            logger.warning(f"Sem probabilidade calculada para {title} na linha {line}")
+            continue
+        line_str = str(line).replace(".", "_")
+        add_row(market, title, f"Over {line} {unit}", over_odd, over_real,
+                justification_market, f"over_{line_str}")
+        add_row(market, title, f"Under {line} {unit}", under_odd, under_real,
+                justification_market, f"under_{line_str}")
+
+    return rows
+
+
+def confidence_level(analysis_data):
+    """
+    Nível de confiança geral a partir da consistência e da forma recente das equipes
+
+    Returns:
+        tuple: (nível, consistência casa %, consistência fora %, forma casa /15, forma fora /15)
+    """
+    def as_percent(value):
+        value = _to_float(value)
+        return value * 100 if value <= 1.0 else value
+
+    def as_form_points(value):
+        # calculate_advanced_probabilities guarda a forma normalizada (pontos / 15)
+        value = _to_float(value)
+        return value * 15 if value <= 1.0 else min(value, 15.0)
+
+    home_consistency = as_percent(analysis_data.get("home_consistency"))
+    away_consistency = as_percent(analysis_data.get("away_consistency"))
+    home_form = as_form_points(analysis_data.get("home_form_points"))
+    away_form = as_form_points(analysis_data.get("away_form_points"))
+
+    avg_consistency = (home_consistency + away_consistency) / 2
+    if avg_consistency > 70 and (home_form >= 9 or away_form >= 9):
+        level = "Alto"
+    elif avg_consistency > 50 and (home_form >= 6 or away_form >= 6):
+        level = "Médio"
+    else:
+        level = "Baixo"
+    return level, home_consistency, away_consistency, home_form, away_form
+
+
+def _viability(real_prob, edge):
+    for min_prob, min_edge, label, assessment, recommendation in _VIABILITY_LEVELS:
+        if real_prob > min_prob and edge > min_edge:
+            return label, assessment, recommendation
+    return "⚠️ RAZOÁVEL", "Ou boa probabilidade ou boa margem", "Apostar com cautela e valor reduzido."
+
+
+def _grouped(rows):
+    """Agrupa as linhas por título de mercado, mantendo a ordem"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row["title"], []).append(row)
+    return groups.items()
+
+
+def render_analysis_report(home_team, away_team, selected_markets, original_probabilities, odds_data,
+                           include_justifications=True):
+    """
+    Monta o texto completo da análise (markdown) sem chamar o LLM
+
+    Args:
+        home_team (str): Time da casa
+        away_team (str): Time visitante
+        selected_markets (dict): Mercados selecionados
+        original_probabilities (dict): Resultado de calculate_advanced_probabilities
+        odds_data (dict|str): Odds de get_odds_data ou texto
+        include_justifications (bool): Incluir as justificativas detalhadas das oportunidades
+
+    Returns:
+        str: Análise formatada
+    """
+    rows = evaluate_markets(selected_markets, original_probabilities, odds_data, home_team, away_team)
+    opportunities = [row for row in rows if row["value"]]
+    sections = [f"# Análise da Partida\n## {home_team} x {away_team}"]
+
+    # Mercados e odds
+    markets_section = "# Análise de Mercados Disponíveis:\n"
+    for title, market_rows in _grouped(rows):
+        markets_section += f"- **{title}:**\n"
+        for row in market_rows:
+            if row["odd"]:
+                markets_section += f"  - {row['name']}: @{row['odd']:.2f}\n"
+    sections.append(markets_section)
+
+    # Probabilidades real vs implícita
+    probs_section = "# Probabilidades Calculadas (REAL vs IMPLÍCITA):\n"
+    for title, market_rows in _grouped(rows):
+        probs_section += f"## {title}:\n"
+        for row in market_rows:
+            probs_section += (f"- **{row['name']}**: Real {row['real_prob']:.1f}% vs "
+                              f"Implícita {row['implied_prob']:.1f}%{' (Valor)' if row['value'] else ''}\n")
+    sections.append(probs_section)
+
+    # Oportunidades
+    opportunities_section = "# Oportunidades Identificadas:\n"
+    if opportunities:
+        for title, market_rows in _grouped(opportunities):
+            opportunities_section += f"## {title}:\n"
+            for row in market_rows:
+                opportunities_section += (f"- **{row['name']}**: Real {row['real_prob']:.1f}% vs "
+                                          f"Implícita {row['implied_prob']:.1f}% (Valor de {row['edge']:.1f}%)\n")
+    else:
+        opportunities_section += "Infelizmente não detectamos valor em nenhuma das suas apostas."
+    sections.append(opportunities_section)
+
+    # Justificativas
+    if include_justifications and opportunities:
+        justifications = []
+        for row in opportunities:
+            justification = generate_detailed_justification(
+                row["justification_market"], row["justification_bet"], home_team, away_team,
+                row["real_prob"], row["implied_prob"], original_probabilities
+            )
+            if justification:
+                justifications.append(justification)
+        if justifications:
+            sections.append("# Justificativas Detalhadas para Oportunidades:\n" + "\n".join(justifications))
+
+    # Confiança
+    analysis_data = original_probabilities.get("analysis_data")
+    if analysis_data:
+        level, home_consistency, away_consistency, home_form, away_form = confidence_level(analysis_data)
+        sections.append(
+            f"# Nível de Confiança Geral: {level}\n"
+            f"- **Consistência**: {home_team}: {home_consistency:.1f}%, {away_team}: {away_consistency:.1f}%\n"
+            f"- **Forma Recente**: {home_team}: {home_form:.1f}/15, {away_team}: {away_form:.1f}/15\n"
+            "- Valores mais altos de consistência e forma indicam maior confiança na previsão."
+        )
+    else:
+        sections.append("# Nível de Confiança Geral: Médio\n"
+                        "- Dados insuficientes para determinar a consistência das equipes.")
+
+    # Viabilidade
+    viability_section = "# AVALIAÇÃO DE VIABILIDADE DE APOSTAS\n"
+    if opportunities:
+        for row in opportunities:
+            label, assessment, recommendation = _viability(row["real_prob"], row["edge"])
+            viability_section += f"## {row['name']} - {label}\n"
+            viability_section += f"- Probabilidade: {row['real_prob']:.1f}% | Margem: {row['edge']:.1f}%\n"
+            viability_section += f"- Avaliação: {assessment}\n"
+            viability_section += f"- Recomendação: {recommendation}\n"
+    else:
+        viability_section += "Não foram identificadas oportunidades com valor significativo para avaliação.\n"
+    sections.append(viability_section + "\n" + _VIABILITY_LEGEND)
+
+    return "\n".join(sections)
@@ -1957,6 +1957,51 @@ def get_round_matches(league_id, round_id):
         logger.error(traceback.format_exc())
         return []
 
+def load_cached_league_matches(season_id, max_age=None):
+    """
+    Lê as partidas de uma temporada (endpoint league-matches) apenas do cache local,
+    sem nenhuma requisição à API
+
+    Args:
+        season_id (int): ID da temporada/liga
+        max_age (float, optional): Idade máxima do cache em segundos (None = qualquer idade)
+
+    Returns:
+        list: Lista de partidas ou None se não houver cache
+    """
+    if max_age is None:
+        max_age = float("inf")
+
+    cached_data = get_from_cache("league-matches", {"season_id": season_id}, max_age)
+    if cached_data and isinstance(cached_data.get("data"), list):
+        return cached_data["data"]
+
+    return None
+
+def fetch_league_matches(season_id, use_cache=True):
+    """
+    Obtém as partidas de uma temporada, preferindo o cache e gravando o resultado nele
+
+    Args:
+        season_id (int): ID da temporada/liga
+        use_cache (bool): Se deve usar o cache
+
+    Returns:
+        list: Lista de partidas ou lista vazia em caso de erro
+    """
+    if use_cache:
+        matches = load_cached_league_matches(season_id)
+        if matches is not None:
+            return matches
+
+    data = api_request("league-matches", {"season_id": season_id}, use_cache=use_cache)
+    if data and isinstance(data.get("data"), list):
+        logger.info(f"Obtidas {len(data['data'])} partidas da temporada {season_id}")
+        return data["data"]
+
+    logger.error(f"Falha ao obter partidas da temporada {season_id}")
+    return []
+
 # Função avançada que combina várias fontes de dados
 def get_complete_match_analysis(home_team, away_team, selected_league):
     """
@@ -0,0 +1,351 @@
+# utils/h2h_store.py - Histórico local de confrontos diretos
+"""
+H2H servido a partir do histórico local de partidas concluídas (endpoint
+league-matches), em vez de buscar no payload da análise qualquer coisa que
+pareça uma lista de partidas.
+
+Cada partida ingerida atualiza os agregados do par de times (IDs da FootyStats,
+na ordem menor/maior): total de jogos, vitórias de cada lado, empates, gols,
+over 2.5, BTTS, cartões e escanteios. A consulta do H2H de uma partida é uma
+leitura por chave primária, sem percorrer partidas. A ingestão é idempotente
+(uma linha por match_id): reprocessar uma temporada só acrescenta as partidas
+concluídas desde a última vez.
+
+Uso (job em lote):
+    python -m utils.h2h_store           # usa apenas o cache local de league-matches
+    python -m utils.h2h_store --fetch   # busca na API as temporadas sem cache
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from utils.league_factors import extract_match_totals
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.h2h_store")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+H2H_DB_FILE = os.path.join(DATA_DIR, "h2h.db")
+
+# Colunas somadas por par (a mesma ordem de _pair_increment)
+_AGGREGATE_COLUMNS = (
+    "matches", "low_wins", "high_wins", "draws", "goals", "over_2_5", "btts",
+    "cards_matches", "cards", "corners_matches", "corners"
+)
+
+
+def pair_key(team_a_id, team_b_id):
+    """Chave do par, independente do mando: (menor ID, maior ID)"""
+    team_a_id, team_b_id = int(team_a_id), int(team_b_id)
+    return (team_a_id, team_b_id) if team_a_id <= team_b_id else (team_b_id, team_a_id)
+
+
+def _pair_increment(match):
+    """
+    Incremento dos agregados do par para uma partida concluída
+
+    Args:
+        match (dict): Partida do league-matches
+
+    Returns:
+        tuple: ((menor ID, maior ID), valores na ordem de _AGGREGATE_COLUMNS)
+               ou None se a partida não estiver concluída ou não tiver os IDs dos times
+    """
+    totals = extract_match_totals(match)
+    if not totals:
+        return None
+
+    try:
+        home_id = int(match["homeID"])
+        away_id = int(match["awayID"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if home_id == away_id:
+        return None
+
+    home_goals = match["homeGoalCount"]
+    away_goals = match["awayGoalCount"]
+    low, high = pair_key(home_id, away_id)
+    # Vitória do time de menor/maior ID, qualquer que tenha sido o mando
+    home_won = home_goals > away_goals
+    away_won = away_goals > home_goals
+    low_won = home_won if home_id == low else away_won
+    high_won = away_won if home_id == low else home_won
+
+    cards = totals["cards"]
+    corners = totals["corners"]
+    return (low, high), (
+        1,
+        1 if low_won else 0,
+        1 if high_won else 0,
+        1 if not (home_won or away_won) else 0,
+        totals["goals"],
+        1 if totals["goals"] > 2.5 else 0,
+        1 if totals["btts"] else 0,
+        0 if cards is None else 1,
+        cards or 0,
+        0 if corners is None else 1,
+        corners or 0,
+    )
+
+
+class H2HStore:
+    """
+    Agregados de confronto direto por par de times, atualizados por partida
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or H2H_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS h2h_matches (
+                    match_id INTEGER PRIMARY KEY,
+                    team_low INTEGER NOT NULL,
+                    team_high INTEGER NOT NULL,
+                    season_id INTEGER,
+                    date_unix INTEGER
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_h2h_matches_pair ON h2h_matches (team_low, team_high, date_unix)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS h2h_pairs (
+                    team_low INTEGER NOT NULL,
+                    team_high INTEGER NOT NULL,
+                    matches INTEGER NOT NULL,
+                    low_wins INTEGER NOT NULL,
+                    high_wins INTEGER NOT NULL,
+                    draws INTEGER NOT NULL,
+                    goals REAL NOT NULL,
+                    over_2_5 INTEGER NOT NULL,
+                    btts INTEGER NOT NULL,
+                    cards_matches INTEGER NOT NULL,
+                    cards REAL NOT NULL,
+                    corners_matches INTEGER NOT NULL,
+                    corners REAL NOT NULL,
+                    last_match_unix INTEGER,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (team_low, team_high)
+                )
+            """)
+
+    def ingest_matches(self, matches, season_id=None):
+        """
+        Acrescenta partidas concluídas aos agregados (partidas já ingeridas são ignoradas)
+
+        Args:
+            matches (list): Partidas do league-matches
+            season_id (int, optional): Temporada das partidas (apenas informativo)
+
+        Returns:
+            int: Partidas novas
+        """
+        now = time.time()
+        columns = ", ".join(_AGGREGATE_COLUMNS)
+        placeholders = ", ".join("?" for _ in _AGGREGATE_COLUMNS)
+        increments = ", ".join(f"{column} = {column} + excluded.{column}" for column in _AGGREGATE_COLUMNS)
+        upsert = f"""
+            INSERT INTO h2h_pairs (team_low, team_high, {columns}, last_match_unix, updated_at)
+            VALUES (?, ?, {placeholders}, ?, ?)
+            ON CONFLICT (team_low, team_high) DO UPDATE SET {increments},
+                last_match_unix = MAX(COALESCE(last_match_unix, 0), COALESCE(excluded.last_match_unix, 0)),
+                updated_at = excluded.updated_at
+        """
+
+        added = 0
+        with self._lock, self._connect() as conn:
+            for match in matches or []:
+                increment = _pair_increment(match)
+                if not increment or match.get("id") is None:
+                    continue
+                (low, high), values = increment
+                date_unix = match.get("date_unix")
+
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO h2h_matches (match_id, team_low, team_high, season_id, date_unix) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (int(match["id"]), low, high, season_id, date_unix)
+                )
+                if cursor.rowcount != 1:
+                    continue
+
+                conn.execute(upsert, (low, high, *values, date_unix, now))
+                added += 1
+
+        if added:
+            logger.info(f"{added} partidas novas no histórico de confrontos"
+                        f"{f' (temporada {season_id})' if season_id else ''}")
+        return added
+
+    def get_h2h(self, home_team_id, away_team_id):
+        """
+        H2H de uma partida a partir dos agregados do par
+
+        Args:
+            home_team_id (int): ID do time da casa na partida analisada
+            away_team_id (int): ID do time visitante na partida analisada
+
+        Returns:
+            dict: Campos do H2H (home_wins/away_wins do ponto de vista desta
+                  partida; porcentagens de 0 a 100; avg_cards/avg_corners só se
+                  houver dados) ou None se o par não tem jogos
+        """
+        low, high = pair_key(home_team_id, away_team_id)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_AGGREGATE_COLUMNS)} FROM h2h_pairs WHERE team_low = ? AND team_high = ?",
+                (low, high)
+            ).fetchone()
+
+        if not row or not row[0]:
+            return None
+
+        (matches, low_wins, high_wins, draws, goals, over_2_5, btts,
+         cards_matches, cards, corners_matches, corners) = row
+        home_is_low = int(home_team_id) == low
+        h2h = {
+            "total_matches": matches,
+            "home_wins": low_wins if home_is_low else high_wins,
+            "away_wins": high_wins if home_is_low else low_wins,
+            "draws": draws,
+            "avg_goals": round(goals / matches, 2),
+            "over_2_5_pct": round(over_2_5 / matches * 100, 1),
+            "btts_pct": round(btts / matches * 100, 1),
+        }
+        # Cartões e escanteios só quando coletados em algum confronto
+        if cards_matches:
+            h2h["avg_cards"] = round(cards / cards_matches, 2)
+        if corners_matches:
+            h2h["avg_corners"] = round(corners / corners_matches, 2)
+        return h2h
+
+    def recent_meetings(self, home_team_id, away_team_id, limit=5):
+        """
+        Últimos confrontos ingeridos do par (pelo índice do par)
+
+        Returns:
+            list: [(match_id, season_id, date_unix)] do mais recente para o mais antigo
+        """
+        low, high = pair_key(home_team_id, away_team_id)
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "SELECT match_id, season_id, date_unix FROM h2h_matches "
+                "WHERE team_low = ? AND team_high = ? ORDER BY date_unix DESC LIMIT ?",
+                (low, high, limit)
+            ).fetchall()
+
+    def stats(self):
+        """Resumo do histórico: partidas e pares"""
+        with self._lock, self._connect() as conn:
+            matches = conn.execute("SELECT COUNT(*) FROM h2h_matches").fetchone()[0]
+            pairs = conn.execute("SELECT COUNT(*) FROM h2h_pairs").fetchone()[0]
+        return {"matches": matches, "pairs": pairs}
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_h2h_store():
+    """Instância única do histórico no processo"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = H2HStore()
+        return _shared_store
+
+
+def stored_h2h_for_payload(api_data):
+    """
+    H2H do histórico local para a partida de um payload complete_analysis
+
+    Não cria o banco: sem histórico ingerido, retorna None sem tocar no disco.
+
+    Args:
+        api_data (dict): Payload com basic_stats.home_team.id e basic_stats.away_team.id
+
+    Returns:
+        dict: Campos do H2H (ver H2HStore.get_h2h) ou None
+    """
+    try:
+        basic_stats = api_data["basic_stats"]
+        home_team_id = int(basic_stats["home_team"]["id"])
+        away_team_id = int(basic_stats["away_team"]["id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if _shared_store is None and not os.path.exists(H2H_DB_FILE):
+        return None
+
+    try:
+        return get_h2h_store().get_h2h(home_team_id, away_team_id)
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao consultar o histórico de confrontos: {str(e)}")
+        return None
+
+
+def build_h2h_history(league_ids=None, fetch_missing=False, store=None):
+    """
+    Job em lote: ingere as partidas concluídas de todas as ligas do registro
+
+    Args:
+        league_ids (list, optional): IDs de temporada (padrão: todo o registro)
+        fetch_missing (bool): Se True, busca na API as temporadas que não estão no cache
+        store (H2HStore, optional): Histórico de destino (padrão: o compartilhado)
+
+    Returns:
+        int: Partidas novas
+    """
+    from utils.league_factors import get_registry_league_ids
+    from utils.footystats_api import load_cached_league_matches, fetch_league_matches
+    from utils.match_warehouse import load_warehouse_matches
+
+    store = store or get_h2h_store()
+    if league_ids is None:
+        league_ids = get_registry_league_ids()
+
+    added = 0
+    for league_id in league_ids:
+        matches = load_warehouse_matches(league_id)
+        if not matches:
+            matches = fetch_league_matches(league_id) if fetch_missing else load_cached_league_matches(league_id)
+        if not matches:
+            logger.warning(f"Sem partidas em cache para a liga {league_id}, ignorando")
+            continue
+        added += store.ingest_matches(matches, season_id=league_id)
+
+    return added
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Atualiza o histórico local de confrontos diretos")
+    parser.add_argument("--fetch", action="store_true", help="Buscar na API as temporadas sem cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    added = build_h2h_history(fetch_missing=args.fetch)
+    summary = get_h2h_store().stats()
+    print(f"Partidas novas: {added} | Total: {summary['matches']} partidas, {summary['pairs']} pares")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 import logging
 import re
 
+logger = logging.getLogger("valueHunter.ai")
+
 def generate_justifications_for_opportunities(opportunities, home_team, away_team, original_probabilities, implied_probabilities):
     """
     Gera justificativas detalhadas para as oportunidades identificadas.
@@ -245,7 +247,7 @@ def generate_detailed_justification(market_type, bet_type, home_team, away_team,
             
             if direction == "over":
                 title = f"### Justificativa para Over {threshold} Escanteios"
-                content = (
+                content = generate_over_corners_justification(
                     home_team, away_team, threshold, real_prob, implied_prob, 
                     original_probabilities, analysis_data
                 )
@@ -0,0 +1,336 @@
+# utils/league_factors.py - Tabela offline de fatores por liga
+"""
+Calcula os fatores de ajuste por liga (gols, BTTS, cartões, escanteios) a partir
+das partidas já concluídas no cache de league-matches e os grava em uma tabela
+versionada. Em tempo de predição a tabela é apenas lida do disco, uma única vez
+por processo, sem nenhuma requisição à API.
+
+Uso (job em lote):
+    python -m utils.league_factors           # usa apenas o cache local
+    python -m utils.league_factors --fetch   # busca na API as temporadas sem cache
+"""
+import os
+import json
+import logging
+from datetime import datetime
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.league_factors")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+# Versão do formato da tabela - incrementar quando o cálculo mudar
+LEAGUE_FACTORS_VERSION = 1
+LEAGUE_FACTORS_FILE = os.path.join(DATA_DIR, "league_factors.json")
+
+# Partidas "virtuais" na média global usadas para encolher ligas com poucos jogos
+SHRINKAGE_MATCHES = 20
+
+# Limites para evitar fatores extremos
+MIN_FACTOR = 0.7
+MAX_FACTOR = 1.3
+
+# Tabela carregada em memória (uma vez por processo)
+_league_factor_table = None
+
+
+def extract_match_totals(match):
+    """
+    Extrai os totais de uma partida concluída do league-matches
+
+    Args:
+        match (dict): Partida no formato da API FootyStats
+
+    Returns:
+        dict: goals, btts, cards e corners (None quando o dado não existe)
+              ou None se a partida não estiver concluída
+    """
+    if not isinstance(match, dict) or match.get("status") != "complete":
+        return None
+
+    home_goals = match.get("homeGoalCount")
+    away_goals = match.get("awayGoalCount")
+    if not isinstance(home_goals, (int, float)) or not isinstance(away_goals, (int, float)):
+        return None
+    if home_goals < 0 or away_goals < 0:
+        return None
+
+    # A API usa -1 para estatísticas não coletadas
+    cards = None
+    home_cards = match.get("team_a_cards_num")
+    away_cards = match.get("team_b_cards_num")
+    if isinstance(home_cards, (int, float)) and isinstance(away_cards, (int, float)):
+        if home_cards >= 0 and away_cards >= 0:
+            cards = home_cards + away_cards
+
+    corners = None
+    home_corners = match.get("team_a_corners")
+    away_corners = match.get("team_b_corners")
+    if isinstance(home_corners, (int, float)) and isinstance(away_corners, (int, float)):
+        if home_corners >= 0 and away_corners >= 0:
+            corners = home_corners + away_corners
+
+    return {
+        "goals": home_goals + away_goals,
+        "btts": home_goals > 0 and away_goals > 0,
+        "cards": cards,
+        "corners": corners
+    }
+
+
+def summarize_league_matches(matches):
+    """
+    Agrega as partidas concluídas de uma liga
+
+    Args:
+        matches (list): Partidas do league-matches
+
+    Returns:
+        dict: Somas e contagens por estatística
+    """
+    summary = {
+        "matches": 0, "goals": 0.0, "btts": 0,
+        "cards_matches": 0, "cards": 0.0,
+        "corners_matches": 0, "corners": 0.0
+    }
+
+    for match in matches or []:
+        totals = extract_match_totals(match)
+        if not totals:
+            continue
+
+        summary["matches"] += 1
+        summary["goals"] += totals["goals"]
+        summary["btts"] += 1 if totals["btts"] else 0
+
+        if totals["cards"] is not None:
+            summary["cards_matches"] += 1
+            summary["cards"] += totals["cards"]
+
+        if totals["corners"] is not None:
+            summary["corners_matches"] += 1
+            summary["corners"] += totals["corners"]
+
+    return summary
+
+
+def _shrunk_factor(league_mean, global_mean, sample_size):
+    """Razão liga/global encolhida em direção a 1.0 conforme o tamanho da amostra"""
+    if not global_mean or not sample_size:
+        return 1.0
+
+    raw = league_mean / global_mean
+    weight = sample_size / (sample_size + SHRINKAGE_MATCHES)
+    factor = 1.0 + (raw - 1.0) * weight
+
+    return round(max(MIN_FACTOR, min(MAX_FACTOR, factor)), 3)
+
+
+def compute_league_factor_table(matches_by_league):
+    """
+    Calcula a tabela de fatores para todas as ligas a partir das partidas concluídas
+
+    Args:
+        matches_by_league (dict): {league_id: lista de partidas}
+
+    Returns:
+        dict: Tabela versionada com médias globais e fatores por liga
+    """
+    summaries = {}
+    for league_id, matches in matches_by_league.items():
+        summary = summarize_league_matches(matches)
+        if summary["matches"] > 0:
+            summaries[int(league_id)] = summary
+
+    # Médias globais ponderadas pelo número de partidas
+    total_matches = sum(s["matches"] for s in summaries.values())
+    total_cards_matches = sum(s["cards_matches"] for s in summaries.values())
+    total_corners_matches = sum(s["corners_matches"] for s in summaries.values())
+
+    global_means = {
+        "matches": total_matches,
+        "avg_goals": sum(s["goals"] for s in summaries.values()) / total_matches if total_matches else 0.0,
+        "btts_rate": sum(s["btts"] for s in summaries.values()) / total_matches if total_matches else 0.0,
+        "avg_cards": sum(s["cards"] for s in summaries.values()) / total_cards_matches if total_cards_matches else 0.0,
+        "avg_corners": sum(s["corners"] for s in summaries.values()) / total_corners_matches if total_corners_matches else 0.0
+    }
+
+    leagues = {}
+    for league_id, s in summaries.items():
+        avg_goals = s["goals"] / s["matches"]
+        btts_rate = s["btts"] / s["matches"]
+        avg_cards = s["cards"] / s["cards_matches"] if s["cards_matches"] else None
+        avg_corners = s["corners"] / s["corners_matches"] if s["corners_matches"] else None
+
+        leagues[str(league_id)] = {
+            "goals_factor": _shrunk_factor(avg_goals, global_means["avg_goals"], s["matches"]),
+            "btts_factor": _shrunk_factor(btts_rate, global_means["btts_rate"], s["matches"]),
+            "cards_factor": _shrunk_factor(avg_cards, global_means["avg_cards"], s["cards_matches"]) if avg_cards is not None else 1.0,
+            "corners_factor": _shrunk_factor(avg_corners, global_means["avg_corners"], s["corners_matches"]) if avg_corners is not None else 1.0,
+            "matches": s["matches"],
+            "avg_goals": round(avg_goals, 3),
+            "btts_rate": round(btts_rate, 3),
+            "avg_cards": round(avg_cards, 3) if avg_cards is not None else None,
+            "avg_corners": round(avg_corners, 3) if avg_corners is not None else None
+        }
+
+    return {
+        "version": LEAGUE_FACTORS_VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "global": {k: round(v, 3) if isinstance(v, float) else v for k, v in global_means.items()},
+        "leagues": leagues
+    }
+
+
+def get_registry_league_ids():
+    """
+    Retorna os IDs únicos de todas as ligas do registro (LEAGUE_IDS)
+
+    Returns:
+        list: IDs de temporada ordenados
+    """
+    from utils.footystats_api import LEAGUE_IDS
+    return sorted(set(LEAGUE_IDS.values()))
+
+
+def build_league_factor_table(league_ids=None, fetch_missing=False):
+    """
+    Job em lote: calcula e grava a tabela de fatores para todas as ligas do registro
+
+    Args:
+        league_ids (list, optional): IDs de temporada (padrão: todo o registro)
+        fetch_missing (bool): Se True, busca na API as temporadas que não estão no cache
+
+    Returns:
+        dict: Tabela gravada
+    """
+    from utils.footystats_api import load_cached_league_matches, fetch_league_matches
+    from utils.match_warehouse import load_warehouse_matches
+
+    if league_ids is None:
+        league_ids = get_registry_league_ids()
+
+    matches_by_league = {}
+    for league_id in league_ids:
+        # Armazém local primeiro (utils/match_warehouse.py), depois o cache da API
+        matches = load_warehouse_matches(league_id)
+        if not matches:
+            if fetch_missing:
+                matches = fetch_league_matches(league_id)
+            else:
+                matches = load_cached_league_matches(league_id)
+
+        if not matches:
+            logger.warning(f"Sem partidas em cache para a liga {league_id}, ignorando")
+            continue
+
+        matches_by_league[league_id] = matches
+
+    table = compute_league_factor_table(matches_by_league)
+    save_league_factor_table(table)
+
+    logger.info(f"Tabela de fatores gerada para {len(table['leagues'])} ligas "
+                f"({table['global']['matches']} partidas)")
+    return table
+
+
+def save_league_factor_table(table, path=None):
+    """Grava a tabela de fatores em disco de forma atômica"""
+    global _league_factor_table
+
+    path = path or LEAGUE_FACTORS_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+    _league_factor_table = table
+    logger.info(f"Tabela de fatores salva em {path}")
+
+
+def load_league_factor_table(path=None, force_reload=False):
+    """
+    Carrega a tabela de fatores (apenas na primeira chamada, depois usa a memória)
+
+    Args:
+        path (str, optional): Caminho do arquivo da tabela
+        force_reload (bool): Se True, relê o arquivo
+
+    Returns:
+        dict: Tabela de fatores (vazia se o arquivo não existir ou for de outra versão)
+    """
+    global _league_factor_table
+
+    if _league_factor_table is not None and not force_reload:
+        return _league_factor_table
+
+    path = path or LEAGUE_FACTORS_FILE
+    table = {"version": LEAGUE_FACTORS_VERSION, "leagues": {}}
+
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+
+            if loaded.get("version") == LEAGUE_FACTORS_VERSION:
+                table = loaded
+                logger.info(f"Tabela de fatores carregada: {len(table.get('leagues', {}))} ligas")
+            else:
+                logger.warning(f"Versão da tabela de fatores incompatível: {loaded.get('version')}")
+        else:
+            logger.warning(f"Tabela de fatores não encontrada em {path}")
+    except Exception as e:
+        logger.error(f"Erro ao carregar tabela de fatores: {str(e)}")
+
+    _league_factor_table = table
+    return table
+
+
+def get_table_league_factors(league_id):
+    """
+    Busca os fatores de uma liga na tabela offline
+
+    Args:
+        league_id (int|str): ID numérico da liga
+
+    Returns:
+        list: [gols, btts, cartões, escanteios] ou None se a liga não estiver na tabela
+    """
+    entry = load_league_factor_table().get("leagues", {}).get(str(league_id))
+    if not entry:
+        return None
+
+    return [
+        entry["goals_factor"],
+        entry["btts_factor"],
+        entry["cards_factor"],
+        entry["corners_factor"]
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera a tabela offline de fatores por liga")
+    parser.add_argument("--fetch", action="store_true", help="Buscar na API as temporadas sem cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    table = build_league_factor_table(fetch_missing=args.fetch)
+
+    print(f"Ligas: {len(table['leagues'])} | Partidas: {table['global']['matches']}")
+    for league_id, entry in sorted(table["leagues"].items()):
+        print(f"{league_id}: gols={entry['goals_factor']} btts={entry['btts_factor']} "
+              f"cartões={entry['cards_factor']} escanteios={entry['corners_factor']} "
+              f"({entry['matches']} jogos)")
+
+
+if __name__ == "__main__":
+    main()
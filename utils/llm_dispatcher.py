@@ -0,0 +1,388 @@
+# utils/llm_dispatcher.py - Despachante de chamadas ao LLM
+"""
+Controle de acesso ao LLM compartilhado por todas as sessões do processo:
+limite de chamadas simultâneas, fila com prioridade por tier (pro > standard >
+free) e posição reportada à interface, descarte de pedidos quando a fila está
+cheia e novas tentativas com backoff exponencial em erros 429/5xx.
+
+A chamada é executada na thread da própria sessão (o Streamlit exige o
+contexto da sessão para atualizar a tela); o despachante apenas controla
+quando cada sessão pode chamar o provedor.
+"""
+import os
+import json
+import time
+import heapq
+import random
+import logging
+import threading
+import itertools
+from contextlib import contextmanager
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.llm_dispatcher")
+
+# Prioridade por tier (menor = atendido primeiro); tiers de utils/data.UserManager,
+# mais "background" para tarefas em lote, por último na fila do mesmo processo (a
+# pré-geração em utils/pregeneration.py roda em processo próprio e não disputa esta fila)
+TIER_PRIORITY = {"pro": 0, "standard": 1, "free": 2, "background": 3}
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+DEFAULT_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "20"))
+DEFAULT_QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", "120"))
+
+# Novas tentativas em erros transitórios do provedor
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+
+# Intervalo de reavaliação da posição na fila
+_POSITION_POLL_SECONDS = 0.5
+
+
+class LLMDispatcherError(Exception):
+    """Erro base do despachante"""
+
+
+class QueueFullError(LLMDispatcherError):
+    """Fila cheia: o pedido foi descartado (load shedding)"""
+
+
+class QueueTimeoutError(LLMDispatcherError):
+    """O pedido esperou na fila além do tempo máximo"""
+
+
+def tier_priority(tier):
+    """Prioridade numérica de um tier (tiers desconhecidos são tratados como free)"""
+    return TIER_PRIORITY.get(tier or "free", TIER_PRIORITY["free"])
+
+
+def _status_code(error):
+    """Extrai o status HTTP de um erro do cliente OpenAI (ou compatível)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error):
+    """
+    Indica se o erro é transitório: limite de taxa (429), erro do servidor (5xx),
+    timeout ou falha de conexão
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError")
+
+
+def _retry_after(error):
+    """Tempo de espera sugerido pelo provedor (cabeçalho Retry-After), se houver"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tier", "shed")
+
+    def __init__(self, priority, seq, tier):
+        self.priority = priority
+        self.seq = seq
+        self.tier = tier
+        self.shed = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMDispatcher:
+    """
+    Limita as chamadas simultâneas ao LLM e ordena a espera por tier
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, max_queue=DEFAULT_MAX_QUEUE,
+                 queue_timeout=DEFAULT_QUEUE_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._active = 0
+        self._seq = itertools.count()
+        self._stats = {"served": 0, "shed": 0, "timeouts": 0, "retries": 0, "failures": 0}
+
+    # Fila e admissão
+
+    def _position(self, waiter):
+        return 1 + sum(1 for other in self._waiting if other < waiter)
+
+    def _remove(self, waiter):
+        self._waiting.remove(waiter)
+        heapq.heapify(self._waiting)
+
+    def acquire(self, tier="free", on_position=None, timeout=None):
+        """
+        Aguarda uma vaga para chamar o LLM
+
+        Args:
+            tier (str): Tier do usuário (pro, standard, free)
+            on_position (callable): Chamado com a posição na fila (1 = próximo) sempre que ela muda
+            timeout (float): Espera máxima na fila em segundos (padrão queue_timeout)
+
+        Raises:
+            QueueFullError: Fila cheia e sem pedido de menor prioridade para descartar
+            QueueTimeoutError: Tempo de espera esgotado
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        priority = tier_priority(tier)
+
+        with self._cond:
+            if self._active < self.max_concurrency and not self._waiting:
+                self._active += 1
+                return
+
+            if len(self._waiting) >= self.max_queue:
+                # Descartar o último pedido de menor prioridade, se houver, em favor deste
+                lowest = max(self._waiting) if self._waiting else None
+                if lowest is None or lowest.priority <= priority:
+                    self._stats["shed"] += 1
+                    logger.warning(f"Fila do LLM cheia ({len(self._waiting)}), pedido {tier} descartado")
+                    raise QueueFullError("Fila de análises cheia")
+                self._remove(lowest)
+                lowest.shed = True
+                self._stats["shed"] += 1
+                logger.warning(f"Pedido {lowest.tier} descartado da fila em favor de pedido {tier}")
+                self._cond.notify_all()
+
+            waiter = _Waiter(priority, next(self._seq), tier)
+            heapq.heappush(self._waiting, waiter)
+
+        last_position = None
+        while True:
+            with self._cond:
+                if waiter.shed:
+                    raise QueueFullError("Pedido descartado da fila por pedidos prioritários")
+
+                if self._active < self.max_concurrency and self._waiting[0] is waiter:
+                    heapq.heappop(self._waiting)
+                    self._active += 1
+                    self._cond.notify_all()
+                    return
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._remove(waiter)
+                    self._stats["timeouts"] += 1
+                    self._cond.notify_all()
+                    raise QueueTimeoutError(f"Tempo de espera na fila esgotado ({timeout:.0f}s)")
+
+                position = self._position(waiter)
+                if position == last_position:
+                    wait = _POSITION_POLL_SECONDS
+                    if deadline is not None:
+                        wait = min(wait, max(0.0, deadline - time.monotonic()))
+                    self._cond.wait(wait)
+                    continue
+
+            # Notificar fora do lock: o callback pode atualizar a interface
+            last_position = position
+            if on_position:
+                try:
+                    on_position(position)
+                except Exception as e:
+                    logger.warning(f"Erro no callback de posição da fila: {str(e)}")
+
+    def release(self):
+        """Libera a vaga obtida com acquire"""
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, tier="free", on_position=None, timeout=None):
+        """Context manager que obtém e libera uma vaga (ver acquire)"""
+        self.acquire(tier, on_position=on_position, timeout=timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    # Execução com novas tentativas
+
+    def call_with_retry(self, func):
+        """
+        Executa func(), repetindo com backoff exponencial em erros transitórios
+
+        Args:
+            func (callable): Chamada ao provedor (sem argumentos)
+
+        Returns:
+            Resultado de func()
+        """
+        attempt = 0
+        while True:
+            try:
+                result = func()
+                with self._cond:
+                    self._stats["served"] += 1
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._cond:
+                        self._stats["failures"] += 1
+                    raise
+
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                with self._cond:
+                    self._stats["retries"] += 1
+                logger.warning(f"Erro transitório do LLM ({_status_code(e) or type(e).__name__}), "
+                               f"tentativa {attempt}/{self.max_retries} em {delay:.1f}s")
+                time.sleep(delay)
+
+    def run(self, func, tier="free", on_position=None, timeout=None):
+        """
+        Aguarda uma vaga e executa func() com novas tentativas
+
+        Args:
+            func (callable): Chamada ao provedor (sem argumentos)
+            tier (str): Tier do usuário
+            on_position (callable): Callback de posição na fila
+            timeout (float): Espera máxima na fila
+
+        Returns:
+            Resultado de func()
+        """
+        with self.slot(tier, on_position=on_position, timeout=timeout):
+            return self.call_with_retry(func)
+
+    def stats(self):
+        """Estado atual: chamadas em andamento, pedidos na fila e contadores"""
+        with self._cond:
+            queued = {}
+            for waiter in self._waiting:
+                queued[waiter.tier] = queued.get(waiter.tier, 0) + 1
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "queued_by_tier": queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                **self._stats
+            }
+
+
+class StubLLMClient:
+    """
+    Cliente local com a mesma interface de client.chat.completions.create,
+    para testes sem acesso ao provedor
+
+    Args:
+        response (str|callable): Texto retornado, ou função que recebe os argumentos
+                                 da chamada (messages, response_format, ...) e retorna o texto
+        latency (float): Duração simulada da chamada em segundos
+        failures (list): Status HTTP a simular nas primeiras chamadas (ex.: [429, 503])
+        seconds_per_word (float): Duração adicional por palavra gerada (respostas
+                                  longas demoram mais, como no provedor)
+    """
+
+    class _StatusError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"Erro simulado {status_code}")
+            self.status_code = status_code
+
+    def __init__(self, response="Análise simulada.", latency=0.0, failures=None, seconds_per_word=0.0):
+        self.response = response
+        self.latency = latency
+        self.seconds_per_word = seconds_per_word
+        self.failures = list(failures or [])
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failure = self.failures.pop(0) if self.failures else None
+        if failure:
+            raise self._StatusError(failure)
+
+        if callable(self.response):
+            response = self.response(kwargs)
+        else:
+            response = self.response
+            # Saída estruturada pedida: responder com um exemplo válido do esquema
+            response_format = kwargs.get("response_format") or {}
+            if response_format.get("type") == "json_schema":
+                schema = response_format["json_schema"]["schema"]
+                response = json.dumps(_schema_example(schema, self.response), ensure_ascii=False)
+
+        words = response.split(" ")
+        duration = self.latency + self.seconds_per_word * len(words)
+        # Consumo aproximado (~4 caracteres por token na entrada, 1 token por palavra na saída)
+        usage = _StubObject(
+            prompt_tokens=sum(len(m.get("content") or "") for m in kwargs.get("messages", [])) // 4,
+            completion_tokens=len(words),
+            prompt_tokens_details=_StubObject(cached_tokens=0)
+        )
+        if stream:
+            include_usage = (kwargs.get("stream_options") or {}).get("include_usage")
+            return self._stream(words, duration, usage if include_usage else None)
+
+        time.sleep(duration)
+        return _StubObject(choices=[_StubObject(message=_StubObject(content=response))], usage=usage)
+
+    def _stream(self, words, duration, usage=None):
+        delay = duration / max(1, len(words))
+        for index, word in enumerate(words):
+            time.sleep(delay)
+            text = word if index == len(words) - 1 else word + " "
+            yield _StubObject(choices=[_StubObject(delta=_StubObject(content=text))])
+        if usage:
+            yield _StubObject(choices=[], usage=usage)
+
+
+def _schema_example(schema, text):
+    """Instância mínima válida de um esquema JSON (objetos, listas, enums, textos e números)"""
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _schema_example(prop, text) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_schema_example(schema["items"], text)]
+    if kind in ("number", "integer"):
+        return 0
+    if kind == "boolean":
+        return False
+    return text
+
+
+class _StubObject:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_llm_dispatcher():
+    """Instância única do despachante no processo (compartilhada entre as sessões)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = LLMDispatcher()
+        return _dispatcher
@@ -0,0 +1,271 @@
+# utils/llm_metrics.py - Métricas das chamadas ao LLM
+"""
+Registro de cada chamada ao LLM (espera na fila, tempo até o primeiro trecho,
+latência total, tokens de entrada/saída, modelo e custo) e de cada análise do
+dashboard (tempo de busca de dados vs tempo de IA, acerto do cache de análises),
+num arquivo JSONL local somente de acréscimo.
+
+Os resumos (percentis p50/p95/p99 e custo por dia) são calculados na leitura e
+exibidos no painel administrativo (pages/_admin.py).
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+from datetime import datetime
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.llm_metrics")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+LLM_METRICS_FILE = os.path.join(DATA_DIR, "llm_metrics.jsonl")
+
+# Preço em US$ por milhão de tokens (entrada, entrada em cache, saída)
+MODEL_PRICES = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+}
+
+PERCENTILES = (50, 95, 99)
+
+# Tipos de registro
+KIND_LLM_CALL = "llm_call"
+KIND_ANALYSIS = "analysis"
+
+# Campos de tempo resumidos em percentis, por tipo de registro
+TIMING_FIELDS = {
+    KIND_LLM_CALL: ("queue_wait", "first_token", "latency"),
+    KIND_ANALYSIS: ("fetch_seconds", "llm_seconds", "total_seconds"),
+}
+
+
+def usage_tokens(usage):
+    """
+    Tokens informados pelo provedor
+
+    Args:
+        usage: Objeto usage da resposta da API (ou None)
+
+    Returns:
+        dict: {"input_tokens", "cached_tokens", "output_tokens"}
+    """
+    if not usage:
+        return {"input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "input_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) if details else 0) or 0,
+        "output_tokens": getattr(usage, "completion_tokens", 0) or 0
+    }
+
+
+def call_cost(model, input_tokens, cached_tokens, output_tokens):
+    """Custo estimado de uma chamada em US$ (tokens em cache cobrados com desconto)"""
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+    uncached = max(0, input_tokens - cached_tokens)
+    return (uncached * prices["input"] + cached_tokens * prices["cached_input"]
+            + output_tokens * prices["output"]) / 1_000_000
+
+
+class LLMCallTimer:
+    """
+    Cronômetro de uma chamada ao LLM, preenchido ao longo da chamada e
+    gravado ao final com record()
+
+    Args:
+        kind (str): Origem da chamada (analysis, stream, section:<nome>, ...)
+        model (str): Modelo chamado
+        tier (str): Tier do usuário
+    """
+
+    def __init__(self, kind, model, tier=None):
+        self.kind = kind
+        self.model = model
+        self.tier = tier
+        self.created = time.monotonic()
+        self.started = None
+        self.first_token_at = None
+        self.usage = None
+
+    def start(self):
+        """Marca o fim da espera na fila (vaga obtida, chamada ao provedor começando)"""
+        self.started = time.monotonic()
+
+    def first_token(self):
+        """Marca o primeiro trecho recebido (apenas a primeira chamada conta)"""
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def record(self, status="ok", store=None):
+        """Grava o registro da chamada no arquivo de métricas"""
+        now = time.monotonic()
+        started = self.started if self.started is not None else self.created
+        tokens = usage_tokens(self.usage)
+        record = {
+            "kind": KIND_LLM_CALL,
+            "source": self.kind,
+            "model": self.model,
+            "tier": self.tier,
+            "status": status,
+            "queue_wait": round(started - self.created, 4),
+            "first_token": round(self.first_token_at - started, 4) if self.first_token_at else None,
+            "latency": round(now - started, 4),
+            **tokens,
+            "cost": round(call_cost(self.model, **tokens), 6)
+        }
+        (store or get_llm_metrics_store()).append(record)
+        return record
+
+
+class LLMMetricsStore:
+    """
+    Arquivo JSONL de métricas, somente de acréscimo (uma linha por registro)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or LLM_METRICS_FILE
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """Acrescenta um registro (com data/hora) ao arquivo; falhas só geram aviso"""
+        record = {"ts": time.time(), **record}
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar métrica do LLM: {str(e)}")
+
+    def read(self, since=None):
+        """
+        Lê os registros do arquivo
+
+        Args:
+            since (float): Apenas registros a partir deste timestamp
+
+        Returns:
+            list: Registros (linhas inválidas são ignoradas)
+        """
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or record.get("ts", 0) >= since:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+
+def percentile(values, p):
+    """Percentil p (0-100) com interpolação linear; None se não houver valores"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(records, kind=KIND_LLM_CALL):
+    """
+    Percentis dos tempos de um tipo de registro
+
+    Args:
+        records (list): Registros lidos do arquivo
+        kind (str): KIND_LLM_CALL ou KIND_ANALYSIS
+
+    Returns:
+        dict: {campo: {"p50", "p95", "p99", "count"}}
+    """
+    selected = [r for r in records if r.get("kind") == kind]
+    summary = {}
+    for name in TIMING_FIELDS[kind]:
+        values = [r[name] for r in selected if isinstance(r.get(name), (int, float))]
+        summary[name] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+        summary[name]["count"] = len(values)
+    return summary
+
+
+def daily_costs(records):
+    """
+    Consumo agregado por dia (data local)
+
+    Returns:
+        list: [{"date", "calls", "errors", "input_tokens", "cached_tokens",
+                "output_tokens", "cost", "analyses", "cache_hits"}], do dia mais recente ao mais antigo
+    """
+    days = {}
+    for record in records:
+        date = datetime.fromtimestamp(record.get("ts", 0)).strftime("%Y-%m-%d")
+        day = days.setdefault(date, {
+            "date": date, "calls": 0, "errors": 0, "input_tokens": 0, "cached_tokens": 0,
+            "output_tokens": 0, "cost": 0.0, "analyses": 0, "cache_hits": 0
+        })
+        if record.get("kind") == KIND_LLM_CALL:
+            day["calls"] += 1
+            if record.get("status") != "ok":
+                day["errors"] += 1
+            for name in ("input_tokens", "cached_tokens", "output_tokens"):
+                day[name] += record.get(name) or 0
+            day["cost"] += record.get("cost") or 0.0
+        elif record.get("kind") == KIND_ANALYSIS:
+            day["analyses"] += 1
+            if record.get("cache") == "hit":
+                day["cache_hits"] += 1
+
+    for day in days.values():
+        day["cost"] = round(day["cost"], 4)
+    return sorted(days.values(), key=lambda day: day["date"], reverse=True)
+
+
+def record_analysis(fetch_seconds, llm_seconds, total_seconds, cache, mode, markets, store=None):
+    """
+    Registra as etapas de uma análise do dashboard
+
+    Args:
+        fetch_seconds (float): Busca de estatísticas
+        llm_seconds (float): Tempo em analyze_with_gpt (0 com cache ou análise rápida)
+        total_seconds (float): Do clique até a exibição
+        cache (str): "hit" (análise do cache), "miss" ou None (cache não consultado)
+        mode (str): "ia" ou "rapida"
+        markets (int): Número de mercados selecionados
+    """
+    (store or get_llm_metrics_store()).append({
+        "kind": KIND_ANALYSIS,
+        "fetch_seconds": round(fetch_seconds, 4),
+        "llm_seconds": round(llm_seconds, 4),
+        "total_seconds": round(total_seconds, 4),
+        "cache": cache,
+        "mode": mode,
+        "markets": markets
+    })
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_metrics_store():
+    """Instância única do arquivo de métricas no processo"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = LLMMetricsStore()
+        return _shared_store
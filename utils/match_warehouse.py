@@ -0,0 +1,459 @@
+# utils/match_warehouse.py - Armazém local de partidas (league-matches)
+"""
+Histórico local (SQLite) das partidas do endpoint league-matches de todas as
+ligas do registro, para que forma, H2H, fatores de liga, backtests e calibração
+leiam do disco em vez de baixar a temporada inteira da API a cada uso.
+
+Cada partida é uma linha com colunas tipadas (times, data, placar, xG,
+cartões, escanteios, odds) e o JSON original, com índices por time, data,
+temporada e par de times.
+
+Sincronização incremental: para cada temporada é guardada a marca d'água (data
+da última partida concluída armazenada) e o próximo pontapé inicial ainda sem
+resultado. Uma temporada só é baixada de novo quando uma partida agendada já
+deveria ter terminado; temporadas encerradas ou sem jogos desde a última
+sincronização não geram requisição. As partidas que passam a concluídas
+alimentam o histórico de confrontos (utils/h2h_store.py), as janelas de
+features por time (utils/rolling_features.py) e os ratings Elo
+(utils/team_ratings.py).
+
+Uso (job em lote):
+    python -m utils.match_warehouse                  # sincroniza as temporadas com jogos novos
+    python -m utils.match_warehouse --force          # baixa todas as temporadas do registro
+    python -m utils.match_warehouse --leagues 12325 12337
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.match_warehouse")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+MATCH_WAREHOUSE_DB_FILE = os.path.join(DATA_DIR, "match_warehouse.db")
+
+# Tempo após o pontapé inicial até a partida constar como concluída na API
+COMPLETION_DELAY_SECONDS = 3 * 60 * 60
+
+# Intervalo mínimo entre duas sincronizações da mesma temporada (partidas adiadas
+# continuam "incomplete" com data no passado e não devem gerar uma requisição por execução)
+MIN_RESYNC_SECONDS = 6 * 60 * 60
+
+# Coluna tipada -> campo do league-matches (valores negativos = não coletado)
+MATCH_COLUMNS = {
+    "home_goals": "homeGoalCount",
+    "away_goals": "awayGoalCount",
+    "home_xg": "team_a_xg",
+    "away_xg": "team_b_xg",
+    "home_cards": "team_a_cards_num",
+    "away_cards": "team_b_cards_num",
+    "home_corners": "team_a_corners",
+    "away_corners": "team_b_corners",
+    "odds_home": "odds_ft_1",
+    "odds_draw": "odds_ft_x",
+    "odds_away": "odds_ft_2",
+}
+
+# Colunas que podem ser lidas como arrays por load_columns
+NUMERIC_COLUMNS = ("match_id", "season_id", "date_unix", "home_id", "away_id") + tuple(MATCH_COLUMNS)
+
+
+def _stat(value):
+    """Valor numérico de uma estatística (None se ausente ou não coletado)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return None
+    return value
+
+
+def _match_row(match, season_id):
+    """
+    Linha da tabela matches para uma partida do league-matches
+
+    Returns:
+        tuple: Valores na ordem de _ROW_COLUMNS ou None se faltar ID da partida ou dos times
+    """
+    try:
+        match_id = int(match["id"])
+        home_id = int(match["homeID"])
+        away_id = int(match["awayID"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    date_unix = match.get("date_unix")
+    date_unix = int(date_unix) if isinstance(date_unix, (int, float)) else None
+    return (
+        match_id, season_id, date_unix, match.get("status"),
+        home_id, away_id, min(home_id, away_id), max(home_id, away_id),
+        match.get("home_name"), match.get("away_name"),
+        *(_stat(match.get(field)) for field in MATCH_COLUMNS.values()),
+        json.dumps(match, ensure_ascii=False, separators=(",", ":")),
+    )
+
+
+_ROW_COLUMNS = (
+    "match_id", "season_id", "date_unix", "status",
+    "home_id", "away_id", "team_low", "team_high", "home_name", "away_name",
+    *MATCH_COLUMNS, "raw"
+)
+
+
+class MatchWarehouse:
+    """
+    Partidas do league-matches por temporada, com sincronização incremental
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or MATCH_WAREHOUSE_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        stat_columns = ",\n".join(f"                    {column} REAL" for column in MATCH_COLUMNS)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS matches (
+                    match_id INTEGER PRIMARY KEY,
+                    season_id INTEGER NOT NULL,
+                    date_unix INTEGER,
+                    status TEXT,
+                    home_id INTEGER NOT NULL,
+                    away_id INTEGER NOT NULL,
+                    team_low INTEGER NOT NULL,
+                    team_high INTEGER NOT NULL,
+                    home_name TEXT,
+                    away_name TEXT,
+{stat_columns},
+                    raw TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season ON matches (season_id, date_unix)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date_unix)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home_id, date_unix)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away_id, date_unix)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_pair ON matches (team_low, team_high, date_unix)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seasons (
+                    season_id INTEGER PRIMARY KEY,
+                    watermark_unix INTEGER,
+                    next_kickoff_unix INTEGER,
+                    completed INTEGER NOT NULL,
+                    total INTEGER NOT NULL,
+                    synced_at REAL NOT NULL
+                )
+            """)
+
+    def store_matches(self, matches, season_id):
+        """
+        Grava (ou atualiza) as partidas de uma temporada e a marca d'água
+
+        Args:
+            matches (list): Partidas do league-matches
+            season_id (int): ID da temporada
+
+        Returns:
+            list: Partidas que passaram a constar como concluídas nesta gravação
+        """
+        rows = []
+        completed = {}
+        for match in matches or []:
+            if not isinstance(match, dict):
+                continue
+            row = _match_row(match, season_id)
+            if row is None:
+                continue
+            rows.append(row)
+            if match.get("status") == "complete":
+                completed[row[0]] = match
+
+        columns = ", ".join(_ROW_COLUMNS)
+        placeholders = ", ".join("?" for _ in _ROW_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _ROW_COLUMNS[1:])
+
+        with self._lock, self._connect() as conn:
+            known = {match_id for (match_id,) in conn.execute(
+                "SELECT match_id FROM matches WHERE season_id = ? AND status = 'complete'", (season_id,)
+            )}
+            conn.executemany(
+                f"INSERT INTO matches ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (match_id) DO UPDATE SET {updates}",
+                rows
+            )
+            watermark, completed_count, total = conn.execute(
+                "SELECT MAX(CASE WHEN status = 'complete' THEN date_unix END), "
+                "SUM(status = 'complete'), COUNT(*) FROM matches WHERE season_id = ?",
+                (season_id,)
+            ).fetchone()
+            # Próxima partida sem resultado depois da última concluída (adiadas antigas não contam)
+            next_kickoff = conn.execute(
+                "SELECT MIN(date_unix) FROM matches WHERE season_id = ? AND status != 'complete' "
+                "AND date_unix > COALESCE(?, 0)",
+                (season_id, watermark)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO seasons "
+                "(season_id, watermark_unix, next_kickoff_unix, completed, total, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (season_id, watermark, next_kickoff, completed_count or 0, total, time.time())
+            )
+
+        return [match for match_id, match in completed.items() if match_id not in known]
+
+    def season_state(self, season_id):
+        """
+        Estado de sincronização de uma temporada
+
+        Returns:
+            dict: watermark_unix, next_kickoff_unix, completed, total, synced_at ou None se nunca sincronizada
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT watermark_unix, next_kickoff_unix, completed, total, synced_at "
+                "FROM seasons WHERE season_id = ?", (season_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("watermark_unix", "next_kickoff_unix", "completed", "total", "synced_at"), row))
+
+    def seasons_to_sync(self, season_ids, now=None):
+        """
+        Temporadas que podem ter partidas concluídas novas desde a última sincronização
+
+        Args:
+            season_ids (list): Temporadas candidatas
+            now (float, optional): Instante de referência (padrão: agora)
+
+        Returns:
+            list: Temporadas nunca sincronizadas ou com um pontapé inicial já passado
+        """
+        now = time.time() if now is None else now
+        due = []
+        for season_id in season_ids:
+            state = self.season_state(season_id)
+            if state is None:
+                due.append(season_id)
+            elif (state["next_kickoff_unix"] is not None
+                  and state["next_kickoff_unix"] + COMPLETION_DELAY_SECONDS <= now
+                  and state["synced_at"] + MIN_RESYNC_SECONDS <= now):
+                due.append(season_id)
+        return due
+
+    def sync(self, season_ids=None, force=False, fetch=None, update_h2h=True, update_features=True,
+             update_ratings=True):
+        """
+        Sincronização incremental com a API
+
+        Args:
+            season_ids (list, optional): Temporadas (padrão: todo o registro)
+            force (bool): Baixar todas as temporadas, mesmo sem jogos novos
+            fetch (callable, optional): fetch(season_id) -> partidas (padrão: league-matches sem cache)
+            update_h2h (bool): Acrescentar as partidas concluídas novas ao histórico de confrontos
+            update_features (bool): Acrescentar as partidas concluídas novas às janelas por time
+            update_ratings (bool): Aplicar as partidas concluídas novas aos ratings Elo
+
+        Returns:
+            dict: {season_id: partidas concluídas novas} das temporadas baixadas
+        """
+        if season_ids is None:
+            from utils.league_factors import get_registry_league_ids
+            season_ids = get_registry_league_ids()
+        if fetch is None:
+            from utils.footystats_api import fetch_league_matches
+
+            def fetch(season_id):
+                return fetch_league_matches(season_id, use_cache=False)
+
+        due = list(season_ids) if force else self.seasons_to_sync(season_ids)
+        logger.info(f"Sincronizando {len(due)} de {len(season_ids)} temporadas")
+
+        summary = {}
+        for season_id in due:
+            matches = fetch(season_id)
+            if not matches:
+                logger.warning(f"Sem partidas da API para a temporada {season_id}")
+                continue
+            new_completed = self.store_matches(matches, season_id)
+            summary[season_id] = len(new_completed)
+
+            if update_h2h and new_completed:
+                from utils.h2h_store import get_h2h_store
+                get_h2h_store().ingest_matches(new_completed, season_id=season_id)
+            if update_features and new_completed:
+                from utils.rolling_features import get_rolling_feature_store
+                get_rolling_feature_store().ingest_matches(new_completed)
+            if update_ratings and new_completed:
+                from utils.team_ratings import get_team_rating_store
+                get_team_rating_store().ingest_matches(new_completed)
+
+        return summary
+
+    def load_league_matches(self, season_id, completed_only=False):
+        """
+        Partidas de uma temporada no formato original do league-matches
+
+        Returns:
+            list: Partidas em ordem cronológica (vazia se a temporada não está no armazém)
+        """
+        query = "SELECT raw FROM matches WHERE season_id = ?"
+        if completed_only:
+            query += " AND status = 'complete'"
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY date_unix, match_id", (season_id,)).fetchall()
+        return [json.loads(raw) for (raw,) in rows]
+
+    def team_matches(self, team_id, before=None, limit=None):
+        """
+        Partidas concluídas de um time (casa ou fora), da mais recente para a mais antiga
+
+        Args:
+            team_id (int): ID do time
+            before (int, optional): Apenas partidas antes deste date_unix
+            limit (int, optional): Número máximo de partidas
+
+        Returns:
+            list: Partidas no formato original
+        """
+        before = before if before is not None else 2 ** 62
+        query = (
+            "SELECT raw, date_unix FROM matches WHERE home_id = ? AND status = 'complete' AND date_unix < ? "
+            "UNION ALL "
+            "SELECT raw, date_unix FROM matches WHERE away_id = ? AND status = 'complete' AND date_unix < ? "
+            "ORDER BY date_unix DESC"
+        )
+        params = [team_id, before, team_id, before]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [json.loads(raw) for raw, _ in rows]
+
+    def pair_matches(self, team_a_id, team_b_id, limit=None):
+        """Confrontos concluídos entre dois times, do mais recente para o mais antigo"""
+        low, high = min(int(team_a_id), int(team_b_id)), max(int(team_a_id), int(team_b_id))
+        query = ("SELECT raw FROM matches WHERE team_low = ? AND team_high = ? AND status = 'complete' "
+                 "ORDER BY date_unix DESC")
+        params = [low, high]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [json.loads(raw) for (raw,) in rows]
+
+    def load_columns(self, columns, season_ids=None, completed_only=True):
+        """
+        Colunas numéricas das partidas como arrays NumPy (uma consulta, sem decodificar JSON)
+
+        Args:
+            columns (list): Colunas de NUMERIC_COLUMNS
+            season_ids (list, optional): Apenas estas temporadas
+            completed_only (bool): Apenas partidas concluídas
+
+        Returns:
+            dict: {coluna: array float64 (NaN onde não coletado)}, em ordem cronológica
+        """
+        unknown = [column for column in columns if column not in NUMERIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {unknown}")
+
+        query = f"SELECT {', '.join(columns)} FROM matches"
+        conditions = []
+        params = []
+        if completed_only:
+            conditions.append("status = 'complete'")
+        if season_ids is not None:
+            season_ids = list(season_ids)
+            conditions.append(f"season_id IN ({', '.join('?' for _ in season_ids)})")
+            params.extend(season_ids)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date_unix, match_id"
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        data = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(columns))
+        return {column: data[:, i] for i, column in enumerate(columns)}
+
+    def stats(self):
+        """Resumo do armazém: temporadas, partidas e partidas concluídas"""
+        with self._lock, self._connect() as conn:
+            seasons = conn.execute("SELECT COUNT(*) FROM seasons").fetchone()[0]
+            total, completed = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 'complete'), 0) FROM matches"
+            ).fetchone()
+        return {"seasons": seasons, "matches": total, "completed": completed}
+
+
+_shared_warehouse = None
+_shared_lock = threading.Lock()
+
+
+def get_match_warehouse():
+    """Instância única do armazém no processo"""
+    global _shared_warehouse
+    with _shared_lock:
+        if _shared_warehouse is None:
+            _shared_warehouse = MatchWarehouse()
+        return _shared_warehouse
+
+
+def load_warehouse_matches(season_id):
+    """
+    Partidas de uma temporada do armazém, para os jobs que antes liam o cache da API
+
+    Não cria o banco: sem armazém (ou sem a temporada), retorna None.
+
+    Returns:
+        list: Partidas no formato do league-matches ou None
+    """
+    if _shared_warehouse is None and not os.path.exists(MATCH_WAREHOUSE_DB_FILE):
+        return None
+    try:
+        matches = get_match_warehouse().load_league_matches(season_id)
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao ler o armazém de partidas: {str(e)}")
+        return None
+    return matches or None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sincroniza o armazém local de partidas")
+    parser.add_argument("--leagues", type=int, nargs="*", help="IDs de temporada (padrão: todo o registro)")
+    parser.add_argument("--force", action="store_true", help="Baixar todas as temporadas, mesmo sem jogos novos")
+    parser.add_argument("--no-h2h", action="store_true", help="Não atualizar o histórico de confrontos")
+    parser.add_argument("--no-features", action="store_true", help="Não atualizar as janelas de features por time")
+    parser.add_argument("--no-ratings", action="store_true", help="Não atualizar os ratings Elo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    warehouse = get_match_warehouse()
+    summary = warehouse.sync(args.leagues or None, force=args.force, update_h2h=not args.no_h2h,
+                             update_features=not args.no_features, update_ratings=not args.no_ratings)
+
+    for season_id, added in sorted(summary.items()):
+        state = warehouse.season_state(season_id)
+        print(f"{season_id}: {added} concluídas novas ({state['completed']}/{state['total']} partidas)")
+    totals = warehouse.stats()
+    print(f"Temporadas: {totals['seasons']} | Partidas: {totals['matches']} ({totals['completed']} concluídas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# utils/openai_stub.py - Servidor local compatível com a API de chat do OpenAI
+"""
+Servidor HTTP local que imita POST /v1/chat/completions (resposta completa e
+streaming SSE), para testes de carga e latência do pipeline do dashboard sem
+acesso ao provedor. O cliente de utils/ai.py aponta para ele com a variável
+OPENAI_BASE_URL (ex.: http://127.0.0.1:8089/v1).
+
+Configurável:
+- latência até o primeiro token com distribuição log-normal (mediana e sigma)
+- velocidade de geração (tokens por segundo; 1 palavra = 1 token)
+- proporção de respostas 429 (com cabeçalho Retry-After)
+- respostas prontas (arquivo JSON com lista de textos, ou texto simples),
+  usadas em rodízio; com response_format json_schema e texto que não é JSON,
+  responde com um exemplo válido do esquema pedido
+
+Uso (a partir da raiz do repositório):
+    python -m utils.openai_stub --port 8089 --latency 1.5 --sigma 0.4 --tokens-per-second 60
+    python -m utils.openai_stub --rate-limit 0.1 --responses respostas.json
+"""
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.llm_dispatcher import _schema_example
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.openai_stub")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8089
+DEFAULT_RESPONSE = "Análise simulada pelo servidor local."
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    """
+    Servidor com a configuração da simulação e contadores de uso
+
+    Args:
+        address (tuple): (host, porta); porta 0 escolhe uma livre
+        latency (float): Mediana da latência até o primeiro token em segundos
+        sigma (float): Dispersão da distribuição log-normal (0 = latência fixa)
+        tokens_per_second (float): Velocidade de geração (0 = instantânea)
+        rate_limit (float): Proporção de pedidos respondidos com 429 (0 a 1)
+        retry_after (float): Valor do cabeçalho Retry-After nas respostas 429
+        responses (list): Textos retornados em rodízio
+        seed (int): Semente do gerador aleatório (resultados reproduzíveis)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), latency=1.0, sigma=0.0, tokens_per_second=0.0,
+                 rate_limit=0.0, retry_after=1.0, responses=None, seed=None):
+        super().__init__(address, _StubRequestHandler)
+        self.latency = latency
+        self.sigma = sigma
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.responses = list(responses or [DEFAULT_RESPONSE])
+        self._random = random.Random(seed)
+        self._next_response = itertools.cycle(range(len(self.responses)))
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.counters = {"requests": 0, "rate_limited": 0, "streams": 0, "active": 0, "max_active": 0}
+
+    @property
+    def base_url(self):
+        """URL para OPENAI_BASE_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def sample_latency(self):
+        """Latência até o primeiro token (log-normal em torno da mediana)"""
+        if self.latency <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.latency
+        with self._lock:
+            return self._random.lognormvariate(math.log(self.latency), self.sigma)
+
+    def should_rate_limit(self):
+        with self._lock:
+            return self.rate_limit > 0 and self._random.random() < self.rate_limit
+
+    def next_response(self):
+        with self._lock:
+            return self.responses[next(self._next_response)], next(self._ids)
+
+    def count(self, name, delta=1):
+        with self._lock:
+            self.counters[name] += delta
+            if name == "active":
+                self.counters["max_active"] = max(self.counters["max_active"], self.counters["active"])
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+
+    server_version = "OpenAIStub/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        elif self.path.rstrip("/") in ("/health", "/stats"):
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": {"message": f"Rota desconhecida: {self.path}", "type": "not_found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Rota desconhecida: {self.path}", "type": "not_found"}})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "JSON inválido", "type": "invalid_request_error"}})
+            return
+
+        server = self.server
+        server.count("requests")
+        if server.should_rate_limit():
+            server.count("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit simulado", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                headers={"Retry-After": f"{server.retry_after:g}"}
+            )
+            return
+
+        server.count("active")
+        try:
+            text, request_id = server.next_response()
+            content = _response_content(text, request.get("response_format"))
+            words = content.split(" ")
+            usage = _usage(request.get("messages") or [], len(words))
+            completion_id = f"chatcmpl-stub-{request_id}"
+            model = request.get("model") or "gpt-4o"
+
+            time.sleep(server.sample_latency())
+            if request.get("stream"):
+                server.count("streams")
+                include_usage = (request.get("stream_options") or {}).get("include_usage")
+                self._stream(completion_id, model, words, usage if include_usage else None)
+            else:
+                if server.tokens_per_second > 0:
+                    time.sleep(len(words) / server.tokens_per_second)
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": usage
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Cliente desconectou durante a resposta")
+        finally:
+            server.count("active", -1)
+
+    def _stream(self, completion_id, model, words, usage):
+        """Envia a resposta em eventos SSE, uma palavra por evento, no ritmo configurado"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        created = int(time.time())
+
+        def event(choices, **extra):
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                       "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        delay = 1.0 / self.server.tokens_per_second if self.server.tokens_per_second > 0 else 0.0
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for index, word in enumerate(words):
+            if delay and index:
+                time.sleep(delay)
+            text = word if index == len(words) - 1 else word + " "
+            event([{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage:
+            event([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def _response_content(text, response_format):
+    """Texto pronto, ou exemplo do esquema pedido quando o texto não é JSON"""
+    if not response_format or response_format.get("type") != "json_schema":
+        return text
+    try:
+        json.loads(text)
+        return text
+    except ValueError:
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(_schema_example(schema, text), ensure_ascii=False)
+
+
+def _usage(messages, completion_tokens):
+    """Consumo aproximado (~4 caracteres por token na entrada)"""
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages if isinstance(m, dict)) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0}
+    }
+
+
+def load_responses(path):
+    """Respostas prontas de um arquivo: lista JSON de textos ou texto simples (uma resposta)"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return [content]
+    if isinstance(data, list):
+        return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in data]
+    return [json.dumps(data, ensure_ascii=False)]
+
+
+def start_stub_server(host=DEFAULT_HOST, port=0, **options):
+    """
+    Inicia o servidor em uma thread de fundo
+
+    Args:
+        host (str): Endereço
+        port (int): Porta (0 = qualquer porta livre)
+        **options: Configuração da simulação (ver OpenAIStubServer)
+
+    Returns:
+        OpenAIStubServer: Servidor em execução (encerrar com shutdown())
+    """
+    server = OpenAIStubServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True)
+    thread.start()
+    logger.info(f"Servidor OpenAI simulado em {server.base_url}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API de chat do OpenAI")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=1.0, help="Mediana até o primeiro token (s)")
+    parser.add_argument("--sigma", type=float, default=0.0, help="Dispersão log-normal da latência")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Velocidade de geração")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Proporção de respostas 429 (0 a 1)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429 (s)")
+    parser.add_argument("--responses", help="Arquivo com respostas prontas (lista JSON ou texto)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = OpenAIStubServer(
+        (args.host, args.port), latency=args.latency, sigma=args.sigma,
+        tokens_per_second=args.tokens_per_second, rate_limit=args.rate_limit,
+        retry_after=args.retry_after, responses=load_responses(args.responses) if args.responses else None,
+        seed=args.seed
+    )
+    print(f"Servidor OpenAI simulado em {server.base_url} (Ctrl+C para encerrar)")
+    print(f"Use: OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# utils/opportunities.py - Identificação de oportunidades de valor
+"""
+Compara as probabilidades calculadas pelo modelo com as probabilidades implícitas
+das odds e monta a seção de oportunidades da análise. Funções puras, sem Streamlit.
+"""
+
+import re
+
+# Odds por mercado: (chave em get_odds_data, chave da probabilidade implícita, padrão no texto de odds)
+_IMPLIED_ODDS_FIELDS = {
+    "money_line": [
+        ("home", "home", r"(?:Casa|Home).*?@(\d+\.?\d*)"),
+        ("draw", "draw", r"Empate.*?@(\d+\.?\d*)"),
+        ("away", "away", r"(?:Fora|Away).*?@(\d+\.?\d*)"),
+    ],
+    "chance_dupla": [
+        ("home_draw", "home_draw", r"1X.*?@(\d+\.?\d*)"),
+        ("home_away", "home_away", r"12.*?@(\d+\.?\d*)"),
+        ("draw_away", "draw_away", r"X2.*?@(\d+\.?\d*)"),
+    ],
+    "ambos_marcam": [
+        ("yes", "btts_yes", r"Sim.*?@(\d+\.?\d*)"),
+        ("no", "btts_no", r"Não.*?@(\d+\.?\d*)"),
+    ],
+}
+
+
+def calculate_implied_probabilities(odds_data, selected_markets):
+    """
+    Calcula as probabilidades implícitas (%) das odds dos mercados selecionados
+
+    Args:
+        odds_data (dict|str): Odds no formato de get_odds_data ({mercado: {campo: odd}})
+                              ou texto ("Casa: @2.10 ...")
+        selected_markets (dict): Mercados selecionados
+
+    Returns:
+        dict: {home, draw, away, home_draw, home_away, draw_away, btts_yes, btts_no} presentes
+    """
+    implied_probabilities = {}
+    if not odds_data:
+        return implied_probabilities
+
+    for market, fields in _IMPLIED_ODDS_FIELDS.items():
+        if not selected_markets.get(market):
+            continue
+
+        market_odds = (odds_data.get(market) or {}) if isinstance(odds_data, dict) else None
+        for odds_key, implied_key, pattern in fields:
+            if market_odds is not None:
+                odd = market_odds.get(odds_key, 0)
+            else:
+                match = re.search(pattern, odds_data)
+                odd = match.group(1) if match else 0
+            try:
+                odd = float(odd)
+            except (TypeError, ValueError):
+                continue
+            if odd > 0:
+                implied_probabilities[implied_key] = 100.0 / odd
+
+    return implied_probabilities
+
+
+def generate_all_opportunities(selected_markets, original_probabilities, implied_probabilities, 
+                              home_team, away_team, odds_data):
+    """
+    Gera apenas as oportunidades com valor para os mercados selecionados.
+    
+    Returns:
+        tuple: (texto_oportunidades, lista_oportunidades_valor)
+    """
+    import re
+    
+    # Lista para armazenar oportunidades com valor
+    value_opportunities = []
+    valid_opportunities = []  # Para armazenar textos das oportunidades com valor
+    
+    # 1. Money Line (se selecionado)
+    if selected_markets.get("money_line") and "moneyline" in original_probabilities:
+        # Casa
+        home_real = original_probabilities["moneyline"].get("home_win", 0)
+        home_implicit = implied_probabilities.get("home", 0)
+        home_edge = home_real - home_implicit
+        if home_edge > 2:
+            opp_text = f"- **{home_team}**: Real {home_real:.1f}% vs Implícita {home_implicit:.1f}% (Valor de {home_edge:.1f}%)"
+            valid_opportunities.append(("Money Line (1X2)", opp_text))
+            value_opportunities.append({
+                "name": f"{home_team}",
+                "market": "Money Line",
+                "real_prob": home_real,
+                "implied_prob": home_implicit,
+                "edge": home_edge
+            })
+        
+        # Empate
+        draw_real = original_probabilities["moneyline"].get("draw", 0)
+        draw_implicit = implied_probabilities.get("draw", 0)
+        draw_edge = draw_real - draw_implicit
+        if draw_edge > 2:
+            opp_text = f"- **Empate**: Real {draw_real:.1f}% vs Implícita {draw_implicit:.1f}% (Valor de {draw_edge:.1f}%)"
+            valid_opportunities.append(("Money Line (1X2)", opp_text))
+            value_opportunities.append({
+                "name": "Empate",
+                "market": "Money Line",
+                "real_prob": draw_real,
+                "implied_prob": draw_implicit,
+                "edge": draw_edge
+            })
+        
+        # Fora
+        away_real = original_probabilities["moneyline"].get("away_win", 0)
+        away_implicit = implied_probabilities.get("away", 0)
+        away_edge = away_real - away_implicit
+        if away_edge > 2:
+            opp_text = f"- **{away_team}**: Real {away_real:.1f}% vs Implícita {away_implicit:.1f}% (Valor de {away_edge:.1f}%)"
+            valid_opportunities.append(("Money Line (1X2)", opp_text))
+            value_opportunities.append({
+                "name": f"{away_team}",
+                "market": "Money Line",
+                "real_prob": away_real,
+                "implied_prob": away_implicit,
+                "edge": away_edge
+            })
+    
+    # 2. Chance Dupla (se selecionado)
+    if selected_markets.get("chance_dupla") and "double_chance" in original_probabilities:
+        # 1X
+        hd_real = original_probabilities["double_chance"].get("home_or_draw", 0)
+        hd_implicit = implied_probabilities.get("home_draw", 0)
+        hd_edge = hd_real - hd_implicit
+        if hd_edge > 2:
+            opp_text = f"- **{home_team} ou Empate**: Real {hd_real:.1f}% vs Implícita {hd_implicit:.1f}% (Valor de {hd_edge:.1f}%)"
+            valid_opportunities.append(("Chance Dupla", opp_text))
+            value_opportunities.append({
+                "name": f"{home_team} ou Empate",
+                "market": "Chance Dupla",
+                "real_prob": hd_real,
+                "implied_prob": hd_implicit,
+                "edge": hd_edge
+            })
+        
+        # 12
+        ha_real = original_probabilities["double_chance"].get("home_or_away", 0)
+        ha_implicit = implied_probabilities.get("home_away", 0)
+        ha_edge = ha_real - ha_implicit
+        if ha_edge > 2:
+            opp_text = f"- **{home_team} ou {away_team}**: Real {ha_real:.1f}% vs Implícita {ha_implicit:.1f}% (Valor de {ha_edge:.1f}%)"
+            valid_opportunities.append(("Chance Dupla", opp_text))
+            value_opportunities.append({
+                "name": f"{home_team} ou {away_team}",
+                "market": "Chance Dupla",
+                "real_prob": ha_real,
+                "implied_prob": ha_implicit,
+                "edge": ha_edge
+            })
+        
+        # X2
+        da_real = original_probabilities["double_chance"].get("away_or_draw", 0)
+        da_implicit = implied_probabilities.get("draw_away", 0)
+        da_edge = da_real - da_implicit
+        if da_edge > 2:
+            opp_text = f"- **Empate ou {away_team}**: Real {da_real:.1f}% vs Implícita {da_implicit:.1f}% (Valor de {da_edge:.1f}%)"
+            valid_opportunities.append(("Chance Dupla", opp_text))
+            value_opportunities.append({
+                "name": f"Empate ou {away_team}",
+                "market": "Chance Dupla",
+                "real_prob": da_real,
+                "implied_prob": da_implicit,
+                "edge": da_edge
+            })
+    
+    # 3. Ambos Marcam (se selecionado)
+    if selected_markets.get("ambos_marcam") and "btts" in original_probabilities:
+        # Sim
+        yes_real = original_probabilities["btts"].get("yes", 0)
+        yes_implicit = implied_probabilities.get("btts_yes", 0)
+        yes_edge = yes_real - yes_implicit
+        if yes_edge > 2:
+            opp_text = f"- **Sim**: Real {yes_real:.1f}% vs Implícita {yes_implicit:.1f}% (Valor de {yes_edge:.1f}%)"
+            valid_opportunities.append(("Ambos Marcam (BTTS)", opp_text))
+            value_opportunities.append({
+                "name": "Ambos Marcam - Sim",
+                "market": "BTTS",
+                "real_prob": yes_real,
+                "implied_prob": yes_implicit,
+                "edge": yes_edge
+            })
+        
+        # Não
+        no_real = original_probabilities["btts"].get("no", 0)
+        no_implicit = implied_probabilities.get("btts_no", 0)
+        no_edge = no_real - no_implicit
+        if no_edge > 2:
+            opp_text = f"- **Não**: Real {no_real:.1f}% vs Implícita {no_implicit:.1f}% (Valor de {no_edge:.1f}%)"
+            valid_opportunities.append(("Ambos Marcam (BTTS)", opp_text))
+            value_opportunities.append({
+                "name": "Ambos Marcam - Não",
+                "market": "BTTS",
+                "real_prob": no_real,
+                "implied_prob": no_implicit,
+                "edge": no_edge
+            })
+    
+    # 4. Over/Under (se selecionado)
+    if selected_markets.get("over_under") and "over_under" in original_probabilities:
+        # Extrair linha do texto de odds
+        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Gols", odds_data)
+        if line_match:
+            line = float(line_match.group(1))
+            line_str = str(line).replace('.', '_')
+            
+            # Over
+            over_real = original_probabilities["over_under"].get(f"over_{line_str}", 0)
+            if over_real == 0:  # Fallback para over_2_5 se específico não existir
+                over_real = original_probabilities["over_under"].get("over_2_5", 0)
+            over_implicit = implied_probabilities.get(f"over_{line_str}", 0)
+            over_edge = over_real - over_implicit
+            if over_edge > 2:
+                opp_text = f"- **Over {line} Gols**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
+                valid_opportunities.append(("Over/Under Gols", opp_text))
+                value_opportunities.append({
+                    "name": f"Over {line} Gols",
+                    "market": "Over/Under",
+                    "real_prob": over_real,
+                    "implied_prob": over_implicit,
+                    "edge": over_edge
+                })
+            
+            # Under
+            under_real = original_probabilities["over_under"].get(f"under_{line_str}", 0)
+            if under_real == 0:  # Fallback ou cálculo
+                under_real = 100.0 - over_real
+            under_implicit = implied_probabilities.get(f"under_{line_str}", 0)
+            under_edge = under_real - under_implicit
+            if under_edge > 2:
+                opp_text = f"- **Under {line} Gols**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
+                valid_opportunities.append(("Over/Under Gols", opp_text))
+                value_opportunities.append({
+                    "name": f"Under {line} Gols",
+                    "market": "Over/Under",
+                    "real_prob": under_real,
+                    "implied_prob": under_implicit,
+                    "edge": under_edge
+                })
+    
+    # 5. Escanteios (se selecionado)
+    if selected_markets.get("escanteios") and "corners" in original_probabilities:
+        # Extrair linha do texto de odds
+        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Escanteios", odds_data)
+        if line_match:
+            line = float(line_match.group(1))
+            line_str = str(line).replace('.', '_')
+            
+            # Calcular over e under para escanteios
+            if f"over_{line_str}" in original_probabilities["corners"]:
+                over_real = original_probabilities["corners"][f"over_{line_str}"] * 100
+            else:
+                # Use o padrão para over_9_5 e ajuste
+                base_over = original_probabilities["corners"].get("over_9_5", 50)
+                if isinstance(base_over, float) and base_over <= 1.0:
+                    base_over = base_over * 100
+                if line < 9.5:
+                    over_real = min(95, base_over + ((9.5 - line) * 10))
+                else:
+                    over_real = max(5, base_over - ((line - 9.5) * 10))
+            
+            over_implicit = implied_probabilities.get(f"corners_over_{line_str}", 0)
+            over_edge = over_real - over_implicit
+            if over_edge > 2:
+                opp_text = f"- **Over {line} Escanteios**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
+                valid_opportunities.append(("Escanteios", opp_text))
+                value_opportunities.append({
+                    "name": f"Over {line} Escanteios",
+                    "market": "Escanteios",
+                    "real_prob": over_real,
+                    "implied_prob": over_implicit,
+                    "edge": over_edge
+                })
+            
+            # Under
+            under_real = 100.0 - over_real
+            under_implicit = implied_probabilities.get(f"corners_under_{line_str}", 0)
+            under_edge = under_real - under_implicit
+            if under_edge > 2:
+                opp_text = f"- **Under {line} Escanteios**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
+                valid_opportunities.append(("Escanteios", opp_text))
+                value_opportunities.append({
+                    "name": f"Under {line} Escanteios",
+                    "market": "Escanteios",
+                    "real_prob": under_real,
+                    "implied_prob": under_implicit,
+                    "edge": under_edge
+                })
+    
+    # 6. Cartões (se selecionado)
+    if selected_markets.get("cartoes") and "cards" in original_probabilities:
+        # Extrair linha do texto de odds
+        line_match = re.search(r"Over\s+(\d+\.?\d*)\s+Cartões", odds_data)
+        if line_match:
+            line = float(line_match.group(1))
+            line_str = str(line).replace('.', '_')
+            
+            # Calcular over e under para cartões
+            if isinstance(original_probabilities["cards"], dict):
+                if f"over_{line_str}" in original_probabilities["cards"]:
+                    over_real = original_probabilities["cards"][f"over_{line_str}"] * 100
+                else:
+                    # Aproximação baseada em expected_cards
+                    expected_cards = original_probabilities["cards"].get("expected_cards", 3.5)
+                    if expected_cards > line + 1.5:
+                        over_real = 75
+                    elif expected_cards > line:
+                        over_real = 60
+                    elif expected_cards + 1.5 < line:
+                        over_real = 25
+                    else:
+                        over_real = 40
+            else:
+                # Valor padrão se não tivermos dados específicos
+                over_real = 50
+            
+            over_implicit = implied_probabilities.get(f"cards_over_{line_str}", 0)
+            over_edge = over_real - over_implicit
+            if over_edge > 2:
+                opp_text = f"- **Over {line} Cartões**: Real {over_real:.1f}% vs Implícita {over_implicit:.1f}% (Valor de {over_edge:.1f}%)"
+                valid_opportunities.append(("Cartões", opp_text))
+                value_opportunities.append({
+                    "name": f"Over {line} Cartões",
+                    "market": "Cartões",
+                    "real_prob": over_real,
+                    "implied_prob": over_implicit,
+                    "edge": over_edge
+                })
+            
+            # Under
+            under_real = 100.0 - over_real
+            under_implicit = implied_probabilities.get(f"cards_under_{line_str}", 0)
+            under_edge = under_real - under_implicit
+            if under_edge > 2:
+                opp_text = f"- **Under {line} Cartões**: Real {under_real:.1f}% vs Implícita {under_implicit:.1f}% (Valor de {under_edge:.1f}%)"
+                valid_opportunities.append(("Cartões", opp_text))
+                value_opportunities.append({
+                    "name": f"Under {line} Cartões",
+                    "market": "Cartões",
+                    "real_prob": under_real,
+                    "implied_prob": under_implicit,
+                    "edge": under_edge
+                })
+    
+    # Construir o texto final apenas com oportunidades que têm valor
+    opportunities_text = "# Oportunidades Identificadas:\n"
+    
+    if valid_opportunities:
+        # Agrupar oportunidades por mercado
+        from collections import defaultdict
+        grouped_opps = defaultdict(list)
+        
+        for market, opp_text in valid_opportunities:
+            grouped_opps[market].append(opp_text)
+        
+        # Adicionar cada mercado e suas oportunidades
+        for market, opps in grouped_opps.items():
+            opportunities_text += f"## {market}:\n"
+            opportunities_text += "\n".join(opps) + "\n"
+    else:
+        opportunities_text += "Infelizmente não detectamos valor em nenhuma das suas apostas."
+    
+    # Retornar tanto o texto quanto a lista de oportunidades com valor
+    return opportunities_text, value_opportunities
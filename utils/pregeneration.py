@@ -0,0 +1,338 @@
+# utils/pregeneration.py - Pré-geração de análises para as próximas partidas
+"""
+Tarefa em lote para horários de baixo movimento: para as próximas partidas das
+ligas selecionadas, busca as estatísticas, calcula as probabilidades e gera a
+análise da IA para os conjuntos de mercados mais comuns, gravando o resultado
+no cache compartilhado (utils/analysis_cache.py). Nos horários de pico, os
+cliques nessas partidas viram leituras do cache.
+
+As odds vêm da própria API (campos odds_* das partidas) no mesmo formato de
+get_odds_data, e a chave do cache é calculada pelo mesmo caminho do dashboard.
+
+A tarefa roda em um processo próprio, com seu próprio despachante: o tier
+"background" só a ordena em relação às chamadas desse processo, não coloca os
+pedidos atrás dos usuários do app. O que evita a disputa com o tráfego
+interativo (limite de requisições do provedor) é a janela de baixo movimento
+(OFF_PEAK_HOURS) e o orçamento de chamadas e de tempo de cada execução.
+
+Uso (a partir da raiz do repositório):
+    python -m utils.pregeneration --hours 72 --max-llm-calls 40
+    python -m utils.pregeneration --leagues 14231 12325 --force
+"""
+import os
+import json
+import time
+import logging
+from datetime import datetime
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.pregeneration")
+
+# Conjuntos de mercados mais pedidos (cada um gera uma análise por partida)
+COMMON_MARKET_SETS = [
+    {"money_line": True},
+    {"money_line": True, "over_under": True, "ambos_marcam": True},
+    {"money_line": True, "chance_dupla": True, "over_under": True, "ambos_marcam": True},
+]
+
+# Campos de odds das partidas da API, no formato de utils/data.get_odds_data
+MATCH_ODDS_FIELDS = {
+    "money_line": {"home": "odds_ft_1", "draw": "odds_ft_x", "away": "odds_ft_2"},
+    "over_under": {"over": "odds_ft_over25", "under": "odds_ft_under25"},
+    "chance_dupla": {"home_draw": "odds_doublechance_1x", "home_away": "odds_doublechance_12",
+                     "draw_away": "odds_doublechance_x2"},
+    "ambos_marcam": {"yes": "odds_btts_yes", "no": "odds_btts_no"},
+    "escanteios": {"over": "odds_corners_over_95", "under": "odds_corners_under_95"},
+}
+
+# Orçamento padrão de cada execução
+DEFAULT_HORIZON_HOURS = int(os.environ.get("PREGEN_HORIZON_HOURS", "72"))
+DEFAULT_MAX_LLM_CALLS = int(os.environ.get("PREGEN_MAX_LLM_CALLS", "50"))
+DEFAULT_MAX_SECONDS = int(os.environ.get("PREGEN_MAX_SECONDS", "3600"))
+
+# Janela de baixo movimento (hora local, [início, fim)); fora dela a tarefa não roda sem --force
+OFF_PEAK_HOURS = tuple(int(h) for h in os.environ.get("PREGEN_OFF_PEAK_HOURS", "2,8").split(","))
+
+# Validade das análises pré-geradas (até pouco depois do início das partidas)
+PREGEN_TTL_SECONDS = 24 * 60 * 60
+
+
+def is_off_peak(now=None, window=OFF_PEAK_HOURS):
+    """Indica se o horário está na janela de baixo movimento"""
+    hour = (now or datetime.now()).hour
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def match_odds(match, selected_markets):
+    """
+    Monta as odds de uma partida da API no formato de get_odds_data
+
+    Args:
+        match (dict): Partida do endpoint league-matches
+        selected_markets (dict): Mercados selecionados
+
+    Returns:
+        dict: {mercado: {campo: odd}} ou None se faltar odd de algum mercado
+    """
+    odds_data = {}
+    for market, selected in selected_markets.items():
+        if not selected:
+            continue
+        fields = MATCH_ODDS_FIELDS.get(market)
+        if not fields:
+            return None
+
+        market_odds = {}
+        for key, api_field in fields.items():
+            try:
+                value = float(match.get(api_field) or 0)
+            except (TypeError, ValueError):
+                value = 0
+            if value <= 1:
+                return None
+            market_odds[key] = round(value, 2)
+        odds_data[market] = market_odds
+
+    return odds_data or None
+
+
+def upcoming_fixtures(season_id, horizon_hours=DEFAULT_HORIZON_HOURS, now=None):
+    """
+    Próximas partidas de uma temporada dentro do horizonte, da mais próxima para a mais distante
+
+    Args:
+        season_id (int): ID da temporada/liga
+        horizon_hours (int): Horizonte em horas
+
+    Returns:
+        list: Partidas do endpoint league-matches
+    """
+    from utils.footystats_api import get_upcoming_matches
+
+    now = now or time.time()
+    limit = now + horizon_hours * 3600
+    fixtures = [
+        match for match in get_upcoming_matches(season_id)
+        if match.get("date_unix") and now <= match["date_unix"] <= limit
+        and match.get("home_name") and match.get("away_name")
+    ]
+    fixtures.sort(key=lambda match: match["date_unix"])
+    return fixtures
+
+
+def fetch_fixture_stats(home_team, away_team, season_id, league_name="", selected_markets=None):
+    """
+    Estatísticas da partida no formato usado pelo dashboard (fetch_stats_data), sem Streamlit
+
+    Args:
+        selected_markets (dict): Mercados que vão usar as estatísticas (None = todos os campos na hora)
+
+    Returns:
+        dict: Dados simplificados (home_team, away_team, h2h, match_info) ou None
+    """
+    from utils.enhanced_api_client import get_complete_match_analysis
+    from utils.prompt_adapter import simplify_api_data
+
+    complete_analysis = get_complete_match_analysis(home_team, away_team, season_id, force_refresh=False)
+    if not isinstance(complete_analysis, dict):
+        return None
+
+    stats_data = simplify_api_data(complete_analysis, home_team, away_team, selected_markets)
+    stats_data["match_info"]["league"] = league_name
+    stats_data["match_info"]["league_id"] = season_id
+    return stats_data
+
+
+def prepare_analysis(stats_data, home_team, away_team, league_id, odds_data, selected_markets):
+    """
+    Probabilidades, prompt e chave de cache de uma análise (mesmo caminho do dashboard)
+
+    Returns:
+        tuple: (chave do cache, identificação da partida, prompt, probabilidades)
+    """
+    from utils.ai import calculate_advanced_probabilities, format_highly_optimized_prompt, PROMPT_TEMPLATE_VERSION
+    from utils.prompt_adapter import extract_team_features
+    from utils.opportunities import calculate_implied_probabilities
+    from utils.analysis_cache import make_cache_key, analysis_fixture
+
+    home_features, away_features = extract_team_features(stats_data, selected_markets)
+    probabilities = calculate_advanced_probabilities(
+        home_features, away_features, league_id=league_id, odds_data=odds_data,
+        selected_markets=selected_markets
+    )
+
+    implied_probabilities = calculate_implied_probabilities(odds_data, selected_markets)
+    if implied_probabilities:
+        probabilities.setdefault("analysis_data", {})["implied_odds"] = implied_probabilities
+
+    fixture = analysis_fixture(league_id, home_team, away_team)
+    key = make_cache_key(fixture, selected_markets, odds_data, probabilities, PROMPT_TEMPLATE_VERSION)
+    prompt = format_highly_optimized_prompt(stats_data, home_team, away_team, odds_data, selected_markets)
+    return key, fixture, prompt, probabilities
+
+
+def pregenerate_fixture(match, season_id, league_name, market_sets, cache, budget):
+    """
+    Pré-gera as análises de uma partida para cada conjunto de mercados
+
+    Args:
+        match (dict): Partida do endpoint league-matches
+        season_id (int): ID da temporada
+        league_name (str): Nome da liga (informativo)
+        market_sets (list): Conjuntos de mercados
+        cache (AnalysisCache): Cache de destino
+        budget (dict): Orçamento restante ({"llm_calls": int, "deadline": float}); atualizado aqui
+
+    Returns:
+        dict: Contadores {generated, cached, skipped, failed}
+    """
+    from utils.ai import analyze_with_gpt
+
+    home_team, away_team = match["home_name"], match["away_name"]
+    counts = {"generated": 0, "cached": 0, "skipped": 0, "failed": 0}
+
+    stats_data = None
+    for selected_markets in market_sets:
+        if budget["llm_calls"] <= 0 or time.time() >= budget["deadline"]:
+            break
+
+        odds_data = match_odds(match, selected_markets)
+        if not odds_data:
+            counts["skipped"] += 1
+            continue
+
+        # Estatísticas buscadas uma vez por partida, apenas se algum conjunto tiver odds
+        if stats_data is None:
+            all_markets = {market: True for markets in market_sets for market, selected in markets.items() if selected}
+            stats_data = fetch_fixture_stats(home_team, away_team, season_id, league_name, all_markets)
+            if not stats_data:
+                logger.warning(f"Sem estatísticas para {home_team} vs {away_team}")
+                counts["failed"] += len(market_sets)
+                return counts
+
+        key, fixture, prompt, probabilities = prepare_analysis(
+            stats_data, home_team, away_team, season_id, odds_data, selected_markets
+        )
+        if cache.get(key):
+            counts["cached"] += 1
+            continue
+
+        budget["llm_calls"] -= 1
+        analysis = analyze_with_gpt(
+            prompt,
+            original_probabilities=probabilities,
+            selected_markets=selected_markets,
+            home_team=home_team,
+            away_team=away_team,
+            tier="background",
+            interactive=False
+        )
+        if not analysis:
+            counts["failed"] += 1
+            continue
+
+        # Válida até pouco depois do início da partida
+        ttl = max(3600, int(match["date_unix"] - time.time()) + 3 * 3600)
+        cache.put(key, analysis, fixture=fixture, ttl_seconds=min(ttl, PREGEN_TTL_SECONDS))
+        counts["generated"] += 1
+        logger.info(f"Análise pré-gerada: {home_team} vs {away_team} ({', '.join(selected_markets)})")
+
+    return counts
+
+
+def default_season_ids():
+    """IDs das temporadas das ligas selecionadas (sem repetição)"""
+    from utils.footystats_api import get_user_selected_leagues_direct, LEAGUE_IDS
+
+    season_ids = {}
+    for league_name in get_user_selected_leagues_direct():
+        season_id = LEAGUE_IDS.get(league_name)
+        if season_id and season_id not in season_ids:
+            season_ids[season_id] = league_name
+    return season_ids
+
+
+def run_pregeneration(season_ids=None, horizon_hours=DEFAULT_HORIZON_HOURS, max_llm_calls=DEFAULT_MAX_LLM_CALLS,
+                      max_seconds=DEFAULT_MAX_SECONDS, market_sets=None, cache=None):
+    """
+    Pré-gera análises para as próximas partidas dentro do orçamento
+
+    Args:
+        season_ids (dict|list): {season_id: nome da liga} ou lista de IDs (padrão: ligas selecionadas)
+        horizon_hours (int): Considerar partidas das próximas N horas
+        max_llm_calls (int): Máximo de chamadas ao LLM nesta execução
+        max_seconds (int): Tempo máximo da execução
+        market_sets (list): Conjuntos de mercados (padrão COMMON_MARKET_SETS)
+        cache (AnalysisCache): Cache de destino (padrão: cache compartilhado)
+
+    Returns:
+        dict: Resumo da execução
+    """
+    from utils.analysis_cache import get_analysis_cache
+
+    started = time.time()
+    cache = cache or get_analysis_cache()
+    market_sets = market_sets or COMMON_MARKET_SETS
+    if season_ids is None:
+        season_ids = default_season_ids()
+    elif not isinstance(season_ids, dict):
+        season_ids = {season_id: str(season_id) for season_id in season_ids}
+
+    budget = {"llm_calls": max_llm_calls, "deadline": started + max_seconds}
+    summary = {"fixtures": 0, "generated": 0, "cached": 0, "skipped": 0, "failed": 0}
+
+    # Partidas de todas as ligas em ordem cronológica: as mais próximas primeiro
+    fixtures = []
+    for season_id, league_name in season_ids.items():
+        try:
+            fixtures.extend((match, season_id, league_name) for match in upcoming_fixtures(season_id, horizon_hours))
+        except Exception as e:
+            logger.error(f"Erro ao buscar partidas da liga {season_id}: {str(e)}")
+    fixtures.sort(key=lambda item: item[0]["date_unix"])
+    logger.info(f"{len(fixtures)} partidas nas próximas {horizon_hours}h em {len(season_ids)} ligas")
+
+    for match, season_id, league_name in fixtures:
+        if budget["llm_calls"] <= 0 or time.time() >= budget["deadline"]:
+            logger.info("Orçamento da pré-geração esgotado")
+            break
+        try:
+            counts = pregenerate_fixture(match, season_id, league_name, market_sets, cache, budget)
+        except Exception as e:
+            logger.error(f"Erro na pré-geração de {match.get('home_name')} vs {match.get('away_name')}: {str(e)}")
+            summary["failed"] += 1
+            continue
+        summary["fixtures"] += 1
+        for name, value in counts.items():
+            summary[name] += value
+
+    summary["llm_calls"] = max_llm_calls - budget["llm_calls"]
+    summary["elapsed_seconds"] = round(time.time() - started, 1)
+    logger.info(f"Pré-geração concluída: {summary}")
+    return summary
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pré-geração de análises para as próximas partidas")
+    parser.add_argument("--leagues", type=int, nargs="*", help="IDs de temporada (padrão: ligas selecionadas)")
+    parser.add_argument("--hours", type=int, default=DEFAULT_HORIZON_HOURS, help="Horizonte em horas")
+    parser.add_argument("--max-llm-calls", type=int, default=DEFAULT_MAX_LLM_CALLS, help="Máximo de chamadas ao LLM")
+    parser.add_argument("--max-seconds", type=int, default=DEFAULT_MAX_SECONDS, help="Tempo máximo da execução")
+    parser.add_argument("--force", action="store_true", help="Executar mesmo fora da janela de baixo movimento")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.force and not is_off_peak():
+        print(f"Fora da janela de baixo movimento {OFF_PEAK_HOURS[0]}h-{OFF_PEAK_HOURS[1]}h (use --force)")
+        return
+
+    summary = run_pregeneration(args.leagues or None, args.hours, args.max_llm_calls, args.max_seconds)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
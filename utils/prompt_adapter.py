@@ -1,6 +1,9 @@
 import logging
 import json
 
+from utils.extraction_plan import TEXT_FIELDS, AliasIndex, LazyFields, fields_for_markets, resolved_items
+from utils.tree_walker import walk_tree
+
 # Configuração de logging
 logger = logging.getLogger("valueHunter.prompt_adapter")
 
@@ -73,12 +76,21 @@ def transform_to_highly_optimized_data(api_data, home_team_name, away_team_name,
             "over_9_5_corners_pct", "home_corners_per_game", "away_corners_per_game"
         }
         
-        # Extract home team stats - use all essential stats
-        home_stats = extract_expanded_team_stats(api_data, "home", essential_stats)
+        # Com mercados selecionados, só os campos deles e das entradas do motor
+        # de probabilidades são extraídos agora; os demais sob demanda
+        eager_stats = essential_stats
+        if selected_markets is not None:
+            from utils.team_features import engine_features
+            eager_stats = essential_stats & fields_for_markets(
+                selected_markets, EXPANDED_STAT_FAMILIES, required=engine_features(selected_markets)
+            )
+        
+        # Extract home team stats
+        home_stats = extract_lazy_team_stats(api_data, "home", essential_stats, eager_stats)
         optimized_data["home_team"] = home_stats
         
-        # Extract away team stats - use all essential stats
-        away_stats = extract_expanded_team_stats(api_data, "away", essential_stats)
+        # Extract away team stats
+        away_stats = extract_lazy_team_stats(api_data, "away", essential_stats, eager_stats)
         optimized_data["away_team"] = away_stats
         
         # Extract complete h2h data
@@ -92,8 +104,8 @@ def transform_to_highly_optimized_data(api_data, home_team_name, away_team_name,
         ensure_critical_fields(optimized_data, home_team_name, away_team_name)
         
         # Debug log - Verificar campos extraídos
-        logger.info(f"Home stats extracted: {list(home_stats.keys())}")
-        logger.info(f"Away stats extracted: {list(away_stats.keys())}")
+        logger.info(f"Home stats extracted: {[k for k, _ in resolved_items(home_stats)]}")
+        logger.info(f"Away stats extracted: {[k for k, _ in resolved_items(away_stats)]}")
         logger.info(f"H2H stats extracted: {list(optimized_data['h2h'].keys())}")
         
         logger.info(f"Created complete data structure for {home_team_name} vs {away_team_name}")
@@ -562,53 +574,12 @@ def extract_h2h_data(api_data, formatted_data):
     import logging
     logger = logging.getLogger("valueHunter.prompt_adapter")
     
-    # Função de busca profunda específica para dados H2H
-    def find_h2h_object(obj, path=""):
-        h2h_objects = []
-        
-        if isinstance(obj, dict):
-            # Identificadores de objetos H2H
-            h2h_identifiers = ["h2h", "head_to_head", "head2head", "confronto", "vs", "versus", "previous_meetings"]
-            
-            # Verificar se o próprio objeto é H2H
-            for identifier in h2h_identifiers:
-                if identifier in path.lower():
-                    has_h2h_fields = any(field in obj for field in [
-                        "total_matches", "matches_total", "total", "count",
-                        "home_wins", "away_wins", "draws", 
-                        "avg_goals", "over_2_5_pct", "btts_pct"
-                    ])
-                    
-                    if has_h2h_fields:
-                        h2h_objects.append((obj, path))
-                        logger.info(f"Encontrado objeto H2H em {path}")
-                        break
-            
-            # Verificar campos que indicam dados H2H (mesmo se o caminho não contém h2h)
-            has_key_fields = (
-                ("total_matches" in obj or "matches_total" in obj) and
-                (("home_wins" in obj and "away_wins" in obj) or 
-                 ("team_a_wins" in obj and "team_b_wins" in obj))
-            )
-            if has_key_fields:
-                h2h_objects.append((obj, path))
-                logger.info(f"Encontrado objeto com campos H2H em {path}")
-            
-            # Procurar em subchaves
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                h2h_objects.extend(find_h2h_object(value, new_path))
-                
-        elif isinstance(obj, list):
-            # Procurar em cada item da lista
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                h2h_objects.extend(find_h2h_object(item, new_path))
-                
-        return h2h_objects
-    
-    # Encontrar todos os possíveis objetos H2H
-    h2h_objects = find_h2h_object(api_data)
+    # Uma passada pela árvore: objetos H2H e arrays de partidas (usados se o H2H ficar zerado)
+    h2h_objects = []
+    match_arrays = []
+    walk_tree(api_data,
+              on_dict=(_h2h_object_visitor(h2h_objects), _match_dict_visitor(match_arrays)),
+              on_list=_match_list_visitor(match_arrays))
     
     if h2h_objects:
         logger.info(f"Encontrados {len(h2h_objects)} possíveis objetos H2H")
@@ -697,7 +668,7 @@ def extract_h2h_data(api_data, formatted_data):
         logger.warning("Todos os campos H2H permanecem com valor zero")
         
         # Tentar encontrar array de partidas anteriores que possa ser usado para calcular H2H
-        previous_matches = find_previous_matches(api_data)
+        previous_matches = find_previous_matches(api_data, match_arrays)
         if previous_matches:
             # Calcular estatísticas H2H a partir das partidas encontradas
             calculate_h2h_from_matches(previous_matches, formatted_data["h2h"], 
@@ -712,8 +683,14 @@ def extract_complete_h2h_data(api_data, formatted_data, home_team_name, away_tea
     import logging
     logger = logging.getLogger("valueHunter.prompt_adapter")
     
-    # 1. FASE 1: Tentar extrair dados H2H normalmente
-    extract_h2h_data(api_data, formatted_data)
+    # 1. FASE 1: Histórico local de confrontos (utils/h2h_store.py) ou extração do payload
+    from utils.h2h_store import stored_h2h_for_payload
+    stored_h2h = stored_h2h_for_payload(api_data)
+    if stored_h2h:
+        formatted_data["h2h"].update(stored_h2h)
+        logger.info(f"H2H do histórico local: {stored_h2h['total_matches']} confrontos")
+    else:
+        extract_h2h_data(api_data, formatted_data)
     
     # Verificar se conseguimos extrair algo
     h2h = formatted_data["h2h"]
@@ -860,12 +837,88 @@ def extract_complete_h2h_data(api_data, formatted_data, home_team_name, away_tea
         
         logger.info(f"Gerados dados sintéticos H2H: {estimated_matches} partidas, " +
                   f"{home_wins} vitórias casa, {away_wins} vitórias fora, {draws} empates")
-def find_previous_matches(api_data):
+# Identificadores de objetos H2H no caminho
+_H2H_PATH_IDENTIFIERS = ("h2h", "head_to_head", "head2head", "confronto", "vs", "versus", "previous_meetings")
+_H2H_OBJECT_FIELDS = (
+    "total_matches", "matches_total", "total", "count",
+    "home_wins", "away_wins", "draws", 
+    "avg_goals", "over_2_5_pct", "btts_pct"
+)
+
+# Chaves que provavelmente contêm partidas anteriores e campos típicos de partida
+_MATCH_ARRAY_KEYS = ("previous_matches", "matches", "h2h_matches", "past_matches", "history")
+_MATCH_FIELDS = ("home_team", "away_team", "score", "result", "date", "home_score", "away_score")
+
+def _h2h_object_visitor(h2h_objects):
+    """
+    Callback de walk_tree que acumula (objeto, caminho) dos dicionários com cara de H2H
+    
+    Args:
+        h2h_objects (list): Lista preenchida durante o percurso
+    """
+    import logging
+    logger = logging.getLogger("valueHunter.prompt_adapter")
+    
+    def visit(obj, path):
+        # Verificar se o próprio objeto é H2H
+        path_lower = path.lower()
+        if any(identifier in path_lower for identifier in _H2H_PATH_IDENTIFIERS):
+            if any(field in obj for field in _H2H_OBJECT_FIELDS):
+                h2h_objects.append((obj, path))
+                logger.debug(f"Encontrado objeto H2H em {path}")
+        
+        # Verificar campos que indicam dados H2H (mesmo se o caminho não contém h2h)
+        has_key_fields = (
+            ("total_matches" in obj or "matches_total" in obj) and
+            (("home_wins" in obj and "away_wins" in obj) or 
+             ("team_a_wins" in obj and "team_b_wins" in obj))
+        )
+        if has_key_fields:
+            h2h_objects.append((obj, path))
+            logger.debug(f"Encontrado objeto com campos H2H em {path}")
+    
+    return visit
+
+def _looks_like_match_array(items):
+    """True se a lista não está vazia, só tem dicionários e o primeiro tem campos de partida"""
+    if not items or not all(isinstance(m, dict) for m in items):
+        return False
+    sample = items[0]
+    return any(f in sample for f in _MATCH_FIELDS)
+
+def _match_dict_visitor(match_arrays):
+    """Callback de walk_tree (dicionários) que acumula arrays de partidas em chaves conhecidas"""
+    import logging
+    logger = logging.getLogger("valueHunter.prompt_adapter")
+    
+    def visit(obj, path):
+        for key in _MATCH_ARRAY_KEYS:
+            if key in obj and isinstance(obj[key], list) and _looks_like_match_array(obj[key]):
+                match_arrays.append((obj[key], f"{path}.{key}"))
+                logger.debug(f"Encontrado array de partidas em {path}.{key}")
+    
+    return visit
+
+def _match_list_visitor(match_arrays):
+    """Callback de walk_tree (listas) que acumula listas com cara de array de partidas"""
+    import logging
+    logger = logging.getLogger("valueHunter.prompt_adapter")
+    
+    def visit(obj, path):
+        if _looks_like_match_array(obj):
+            match_arrays.append((obj, path))
+            logger.debug(f"Encontrado array de partidas em {path}")
+    
+    return visit
+
+def find_previous_matches(api_data, match_arrays=None):
     """
     Busca arrays de partidas anteriores que possam ser usados para calcular estatísticas H2H
     
     Args:
         api_data (dict): Dados originais da API
+        match_arrays (list): Arrays já encontrados em outra passada pela árvore
+            ([(array, caminho)]); None para percorrer api_data
         
     Returns:
         list: Lista de partidas encontradas ou lista vazia
@@ -873,54 +926,11 @@ def find_previous_matches(api_data):
     import logging
     logger = logging.getLogger("valueHunter.prompt_adapter")
     
-    # Função de busca recursiva
-    def search_for_matches(obj, path=""):
-        matches_arrays = []
-        
-        if isinstance(obj, dict):
-            # Verificar chaves que provavelmente contêm partidas anteriores
-            match_keys = ["previous_matches", "matches", "h2h_matches", "past_matches", "history"]
-            
-            for key in match_keys:
-                if key in obj and isinstance(obj[key], list) and len(obj[key]) > 0:
-                    # Verificar se parece um array de partidas
-                    if all(isinstance(m, dict) for m in obj[key]):
-                        # Verificar se contém campos típicos de partida
-                        sample = obj[key][0]
-                        has_match_fields = any(f in sample for f in [
-                            "home_team", "away_team", "score", "result", "date", "home_score", "away_score"
-                        ])
-                        
-                        if has_match_fields:
-                            matches_arrays.append((obj[key], f"{path}.{key}"))
-                            logger.info(f"Encontrado array de partidas em {path}.{key}")
-            
-            # Continuar busca em subchaves
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                matches_arrays.extend(search_for_matches(value, new_path))
-                
-        elif isinstance(obj, list):
-            # Verificar se a própria lista parece um array de partidas
-            if len(obj) > 0 and all(isinstance(m, dict) for m in obj):
-                sample = obj[0]
-                has_match_fields = any(f in sample for f in [
-                    "home_team", "away_team", "score", "result", "date", "home_score", "away_score"
-                ])
-                
-                if has_match_fields:
-                    matches_arrays.append((obj, path))
-                    logger.info(f"Encontrado array de partidas em {path}")
-            
-            # Continuar busca em cada item
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                matches_arrays.extend(search_for_matches(item, new_path))
-                
-        return matches_arrays
-    
     # Buscar em todo o objeto
-    match_arrays = search_for_matches(api_data)
+    if match_arrays is None:
+        match_arrays = []
+        walk_tree(api_data, on_dict=_match_dict_visitor(match_arrays),
+                  on_list=_match_list_visitor(match_arrays))
     
     # Retornar o primeiro array encontrado (geralmente o mais relevante)
     if match_arrays:
@@ -1154,6 +1164,62 @@ def calculate_derived_stats(team_stats):
     if team_stats["played"] > 0 and team_stats["corners_per_game"] == 0 and team_stats["corners_total"] > 0:
         team_stats["corners_per_game"] = round(team_stats["corners_total"] / team_stats["played"], 2)
 
+# Map API fields to our essential stats with multiple possible keys
+EXPANDED_TEAM_ALIASES = {
+    "played": ["matches_played", "seasonMatchesPlayed_overall", "MP"],
+    "wins": ["wins", "seasonWinsNum_overall", "W"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D"],
+    "losses": ["losses", "seasonLossesNum_overall", "L"],
+    "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals"],
+    "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA"],
+    "xg": ["xG", "xg", "xg_for_overall", "expected_goals"],
+    "xga": ["xGA", "xga", "xg_against_avg_overall"],
+    "possession": ["possession", "possessionAVG_overall", "Poss"],
+    "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall"],
+    "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall"],
+    "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall"],
+    "home_played": ["matches_played_home", "seasonMatchesPlayed_home"],
+    "home_wins": ["home_wins", "seasonWinsNum_home"],
+    "home_draws": ["home_draws", "seasonDrawsNum_home"],
+    "home_losses": ["home_losses", "seasonLossesNum_home"],
+    "home_goals_scored": ["goals_scored_home", "seasonGoals_home"],
+    "home_goals_conceded": ["goals_conceded_home", "seasonConceded_home"],
+    "away_played": ["matches_played_away", "seasonMatchesPlayed_away"],
+    "away_wins": ["away_wins", "seasonWinsNum_away"],
+    "away_draws": ["away_draws", "seasonDrawsNum_away"],
+    "away_losses": ["away_losses", "seasonLossesNum_away"],
+    "away_goals_scored": ["goals_scored_away", "seasonGoals_away"],
+    "away_goals_conceded": ["goals_conceded_away", "seasonConceded_away"],
+    "cards_total": ["cards_total", "seasonCrdYNum_overall", "CrdY"],
+    "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY"],
+    "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR"],
+    "over_3_5_cards_pct": ["over_3_5_cards_percentage"],
+    "corners_total": ["corners_total"],
+    "corners_for": ["corners_for", "seasonCornersFor_overall", "CK"],
+    "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
+    "over_9_5_corners_pct": ["over_9_5_corners_percentage"],
+}
+_EXPANDED_TEAM_INDEX = AliasIndex(EXPANDED_TEAM_ALIASES)
+
+# Famílias dos campos de extract_expanded_team_stats por mercado (ver MARKET_FAMILIES)
+EXPANDED_STAT_FAMILIES = {
+    "core": (
+        "played", "wins", "draws", "losses", "goals_scored", "goals_conceded",
+        "home_played", "home_wins", "home_draws", "home_losses", "home_goals_scored", "home_goals_conceded",
+        "away_played", "away_wins", "away_draws", "away_losses", "away_goals_scored", "away_goals_conceded",
+        "xg", "xga", "ppda", "possession",
+    ),
+    "goals": ("clean_sheets_pct", "btts_pct", "over_2_5_pct"),
+    "cards": (
+        "cards_total", "cards_per_game", "yellow_cards", "red_cards",
+        "over_3_5_cards_pct", "home_cards_per_game", "away_cards_per_game",
+    ),
+    "corners": (
+        "corners_total", "corners_per_game", "corners_for", "corners_against",
+        "over_9_5_corners_pct", "home_corners_per_game", "away_corners_per_game",
+    ),
+}
+
 def extract_expanded_team_stats(api_data, team_type, essential_stats):
     """
     Extract comprehensive team statistics with fallbacks for missing data.
@@ -1201,54 +1267,8 @@ def extract_expanded_team_stats(api_data, team_type, essential_stats):
                 # Debug log
                 logger.info(f"{team_type} raw_stats keys: {list(raw_stats.keys() if isinstance(raw_stats, dict) else [])}")
                 
-                # Map API fields to our essential stats with multiple possible keys
-                field_mapping = {
-                    "played": ["matches_played", "seasonMatchesPlayed_overall", "MP"],
-                    "wins": ["wins", "seasonWinsNum_overall", "W"],
-                    "draws": ["draws", "seasonDrawsNum_overall", "D"],
-                    "losses": ["losses", "seasonLossesNum_overall", "L"],
-                    "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals"],
-                    "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA"],
-                    "xg": ["xG", "xg", "xg_for_overall", "expected_goals"],
-                    "xga": ["xGA", "xga", "xg_against_avg_overall"],
-                    "possession": ["possession", "possessionAVG_overall", "Poss"],
-                    "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall"],
-                    "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall"],
-                    "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall"],
-                    "home_played": ["matches_played_home", "seasonMatchesPlayed_home"],
-                    "home_wins": ["home_wins", "seasonWinsNum_home"],
-                    "home_draws": ["home_draws", "seasonDrawsNum_home"],
-                    "home_losses": ["home_losses", "seasonLossesNum_home"],
-                    "home_goals_scored": ["goals_scored_home", "seasonGoals_home"],
-                    "home_goals_conceded": ["goals_conceded_home", "seasonConceded_home"],
-                    "away_played": ["matches_played_away", "seasonMatchesPlayed_away"],
-                    "away_wins": ["away_wins", "seasonWinsNum_away"],
-                    "away_draws": ["away_draws", "seasonDrawsNum_away"],
-                    "away_losses": ["away_losses", "seasonLossesNum_away"],
-                    "away_goals_scored": ["goals_scored_away", "seasonGoals_away"],
-                    "away_goals_conceded": ["goals_conceded_away", "seasonConceded_away"],
-                    "cards_total": ["cards_total", "seasonCrdYNum_overall", "CrdY"],
-                    "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY"],
-                    "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR"],
-                    "over_3_5_cards_pct": ["over_3_5_cards_percentage"],
-                    "corners_total": ["corners_total"],
-                    "corners_for": ["corners_for", "seasonCornersFor_overall", "CK"],
-                    "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
-                    "over_9_5_corners_pct": ["over_9_5_corners_percentage"],
-                }
-                
-                # Extract fields using mapping
-                for stat_name, api_keys in field_mapping.items():
-                    for key in api_keys:
-                        if key in raw_stats:
-                            value = raw_stats[key]
-                            # Validate and convert value
-                            if value is not None and value != 'N/A':
-                                try:
-                                    stats[stat_name] = float(value)
-                                    break  # Found valid value, stop looking
-                                except (ValueError, TypeError):
-                                    pass  # Continue to next key if value can't be converted
+                # Extract fields using the precompiled alias index (single pass)
+                stats.update(_EXPANDED_TEAM_INDEX.subset(essential_stats).resolve(raw_stats, as_float=True))
         
         # Try to get PPDA from advanced_stats if available
         if "advanced_stats" in api_data and team_type in api_data["advanced_stats"]:
@@ -1264,15 +1284,49 @@ def extract_expanded_team_stats(api_data, team_type, essential_stats):
         
         # Calculate derived statistics
         # Example: if we have enough games played, calculate per-game stats
-        if stats["played"] > 0:
-            if stats["cards_total"] > 0:
+        if stats.get("played", 0) > 0:
+            if stats.get("cards_total", 0) > 0:
                 stats["cards_per_game"] = round(stats["cards_total"] / stats["played"], 2)
-            if stats["corners_for"] > 0 or stats["corners_against"] > 0:
-                stats["corners_total"] = stats["corners_for"] + stats["corners_against"]
+            if stats.get("corners_for", 0) > 0 or stats.get("corners_against", 0) > 0:
+                stats["corners_total"] = stats.get("corners_for", 0) + stats.get("corners_against", 0)
                 stats["corners_per_game"] = round(stats["corners_total"] / stats["played"], 2)
     
     return stats
 
+def extract_lazy_team_stats(api_data, team_type, essential_stats, eager_stats):
+    """
+    extract_expanded_team_stats com parte dos campos resolvida sob demanda
+    
+    Args:
+        api_data (dict): Original API data
+        team_type (str): "home" or "away"
+        essential_stats (set): Todos os campos do registro
+        eager_stats (set): Campos extraídos agora (os demais no primeiro acesso)
+        
+    Returns:
+        dict: Stats dictionary (LazyFields quando há campos pendentes)
+    """
+    stats = extract_expanded_team_stats(api_data, team_type, eager_stats)
+    pending = frozenset(essential_stats) - frozenset(eager_stats)
+    if not pending:
+        return stats
+    # "played" entra na extração tardia para as médias por jogo
+    return LazyFields(stats, pending,
+                      lambda: extract_expanded_team_stats(api_data, team_type, pending | {"played"}))
+
+# Map API fields to our fields
+EXPANDED_H2H_ALIASES = {
+    "total_matches": ["total_matches", "matches"],
+    "home_wins": ["home_wins"],
+    "away_wins": ["away_wins"],
+    "draws": ["draws"],
+    "over_2_5_pct": ["over_2_5_percentage"],
+    "btts_pct": ["btts_percentage"],
+    "avg_cards": ["average_cards"],
+    "avg_corners": ["average_corners"]
+}
+_EXPANDED_H2H_INDEX = AliasIndex(EXPANDED_H2H_ALIASES)
+
 def extract_expanded_h2h(api_data):
     """
     Extract comprehensive head-to-head data.
@@ -1311,27 +1365,8 @@ def extract_expanded_h2h(api_data):
     
     # If we found H2H data, extract it
     if h2h_data and isinstance(h2h_data, dict):
-        # Map API fields to our fields
-        field_mapping = {
-            "total_matches": ["total_matches", "matches"],
-            "home_wins": ["home_wins"],
-            "away_wins": ["away_wins"],
-            "draws": ["draws"],
-            "over_2_5_pct": ["over_2_5_percentage"],
-            "btts_pct": ["btts_percentage"],
-            "avg_cards": ["average_cards"],
-            "avg_corners": ["average_corners"]
-        }
-        
         # Extract each field
-        for h2h_field, api_keys in field_mapping.items():
-            for key in api_keys:
-                if key in h2h_data and h2h_data[key] is not None:
-                    try:
-                        h2h[h2h_field] = float(h2h_data[key])
-                        break
-                    except (ValueError, TypeError):
-                        pass
+        h2h.update(_EXPANDED_H2H_INDEX.resolve(h2h_data, as_float=True))
         
         # Extract recent matches if available
         if "matches" in h2h_data and isinstance(h2h_data["matches"], list):
@@ -1354,6 +1389,15 @@ def extract_form_string(api_data, team_type):
     import logging
     logger = logging.getLogger("valueHunter.prompt_adapter")
     
+    # Fonte 0: janelas locais por time (utils/rolling_features.py)
+    from utils.rolling_features import stored_features_for_payload
+    stored_features = stored_features_for_payload(api_data)
+    if stored_features:
+        form = stored_features[0 if team_type == "home" else 1].get("form")
+        if form and len(form) >= 5:
+            logger.info(f"Forma das janelas locais ({team_type}): {form}")
+            return form
+    
     # Fonte 1: team_last_matches (melhor fonte)
     if "team_last_matches" in api_data and team_type in api_data["team_last_matches"]:
         matches = api_data["team_last_matches"][team_type]
@@ -1500,6 +1544,158 @@ def ensure_recent_matches(formatted_data, home_team_name, away_team_name):
                 
             formatted_data["h2h"]["recent_matches"] = recent_matches
 
+# Mapeamento de campo da API para campo no nosso formato
+TEAM_DATA_ALIASES = {
+    # Estatísticas Gerais
+    "played": ["played", "seasonMatchesPlayed_overall", "matches_played", "MP"],
+    "seasonMatchesPlayed_overall": ["seasonMatchesPlayed_overall", "matches_played", "MP"],
+    "wins": ["wins", "seasonWinsNum_overall", "W"],
+    "seasonWinsNum_overall": ["seasonWinsNum_overall", "wins", "W"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D"],
+    "seasonDrawsNum_overall": ["seasonDrawsNum_overall", "draws", "D"],
+    "losses": ["losses", "seasonLossesNum_overall", "L"],
+    "seasonLossesNum_overall": ["seasonLossesNum_overall", "losses", "L"],
+    "win_pct": ["win_percentage", "winPercentage"],
+    "draw_pct": ["draw_percentage", "drawPercentage"],
+    "loss_pct": ["loss_percentage", "lossPercentage"],
+    "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game"],
+    "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg"],
+    "leaguePosition_overall": ["leaguePosition_overall", "league_position"],
+
+    # Estatísticas Casa/Fora
+    "home_played": ["home_played", "seasonMatchesPlayed_home", "matches_played_home"],
+    "away_played": ["away_played", "seasonMatchesPlayed_away", "matches_played_away"],
+    "seasonMatchesPlayed_home": ["seasonMatchesPlayed_home", "home_played", "matches_played_home"],
+    "seasonMatchesPlayed_away": ["seasonMatchesPlayed_away", "away_played", "matches_played_away"],
+    "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
+    "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
+    "seasonWinsNum_home": ["seasonWinsNum_home", "home_wins", "wins_home"],
+    "seasonWinsNum_away": ["seasonWinsNum_away", "away_wins", "wins_away"],
+    "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
+    "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
+    "seasonDrawsNum_home": ["seasonDrawsNum_home", "home_draws", "draws_home"],
+    "seasonDrawsNum_away": ["seasonDrawsNum_away", "away_draws", "draws_away"],
+    "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
+    "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
+    "seasonLossesNum_home": ["seasonLossesNum_home", "home_losses", "losses_home"],
+    "seasonLossesNum_away": ["seasonLossesNum_away", "away_losses", "losses_away"],
+    "seasonPPG_home": ["seasonPPG_home", "home_ppg", "points_per_game_home"],
+    "seasonPPG_away": ["seasonPPG_away", "away_ppg", "points_per_game_away"],
+    "leaguePosition_home": ["leaguePosition_home", "home_league_position"],
+    "leaguePosition_away": ["leaguePosition_away", "away_league_position"],
+    "home_form": ["home_form", "formRun_home", "current_form_home"],
+    "away_form": ["away_form", "formRun_away", "current_form_away"],
+    "formRun_home": ["formRun_home", "home_form", "current_form_home"],
+    "formRun_away": ["formRun_away", "away_form", "current_form_away"],
+
+    # Estatísticas de Gols
+    "goals_scored": ["goals_scored", "seasonScoredNum_overall", "scored", "GF"],
+    "seasonScoredNum_overall": ["seasonScoredNum_overall", "goals_scored", "scored", "GF"],
+    "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "conceded", "GA"],
+    "seasonConcededNum_overall": ["seasonConcededNum_overall", "goals_conceded", "conceded", "GA"],
+    "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "goals_scored_home"],
+    "seasonScoredNum_home": ["seasonScoredNum_home", "home_goals_scored", "goals_scored_home"],
+    "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "goals_scored_away"],
+    "seasonScoredNum_away": ["seasonScoredNum_away", "away_goals_scored", "goals_scored_away"],
+    "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "goals_conceded_home"],
+    "seasonConcededNum_home": ["seasonConcededNum_home", "home_goals_conceded", "goals_conceded_home"],
+    "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "goals_conceded_away"],
+    "seasonConcededNum_away": ["seasonConcededNum_away", "away_goals_conceded", "goals_conceded_away"],
+    "goals_per_game": ["goals_per_game", "gpg", "goals_per_match"],
+    "conceded_per_game": ["conceded_per_game", "cpg", "conceded_per_match"],
+    "seasonGoalsTotal_overall": ["seasonGoalsTotal_overall", "total_goals"],
+    "seasonGoalsTotal_home": ["seasonGoalsTotal_home", "total_goals_home"],
+    "seasonGoalsTotal_away": ["seasonGoalsTotal_away", "total_goals_away"],
+    "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct"],
+    "seasonCSPercentage_overall": ["seasonCSPercentage_overall", "clean_sheet_percentage", "cs_pct"],
+    "seasonCS_overall": ["seasonCS_overall", "clean_sheets", "cs"],
+    "seasonCS_home": ["seasonCS_home", "home_clean_sheets", "cs_home"],
+    "seasonCS_away": ["seasonCS_away", "away_clean_sheets", "cs_away"],
+    "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct"],
+    "seasonBTTSPercentage_overall": ["seasonBTTSPercentage_overall", "btts_percentage", "both_teams_to_score_pct"],
+    "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct"],
+    "seasonOver25Percentage_overall": ["seasonOver25Percentage_overall", "over_2_5_percentage", "o25_pct"],
+
+    # Expected Goals
+    "xg": ["xg", "xG", "expected_goals", "xg_for"],
+    "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals"],
+    "xga": ["xga", "xGA", "expected_goals_against", "xg_against"],
+    "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against"],
+    "home_xg": ["home_xg", "xg_home", "xg_for_home"],
+    "xg_for_home": ["xg_for_home", "home_xg", "xg_home"],
+    "away_xg": ["away_xg", "xg_away", "xg_for_away"],
+    "xg_for_away": ["xg_for_away", "away_xg", "xg_away"],
+    "home_xga": ["home_xga", "xga_home", "xg_against_home"],
+    "xg_against_home": ["xg_against_home", "home_xga", "xga_home"],
+    "away_xga": ["away_xga", "xga_away", "xg_against_away"],
+    "xg_against_away": ["xg_against_away", "away_xga", "xga_away"],
+    "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game"],
+    "xg_for_avg_home": ["xg_for_avg_home", "xg_per_game_home", "expected_goals_per_game_home"],
+    "xg_for_avg_away": ["xg_for_avg_away", "xg_per_game_away", "expected_goals_per_game_away"],
+    "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game", "expected_goals_against_per_game"],
+    "xg_against_avg_home": ["xg_against_avg_home", "xga_per_game_home", "expected_goals_against_per_game_home"],
+    "xg_against_avg_away": ["xg_against_avg_away", "xga_per_game_away", "expected_goals_against_per_game_away"],
+
+    # Estatísticas de Cartões
+    "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards"],
+    "cardsAVG_overall": ["cardsAVG_overall", "cards_per_game", "cards_avg"],
+    "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "home_cards_avg"],
+    "cardsAVG_home": ["cardsAVG_home", "home_cards_per_game", "cards_per_game_home"],
+    "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "away_cards_avg"],
+    "cardsAVG_away": ["cardsAVG_away", "away_cards_per_game", "cards_per_game_away"],
+    "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total"],
+    "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home"],
+    "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away"],
+    "yellow_cards": ["yellow_cards", "yellows", "cards_yellow"],
+    "red_cards": ["red_cards", "reds", "cards_red"],
+    "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage", "o35_cards_pct"],
+
+    # Estatísticas de Escanteios
+    "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners"],
+    "cornersTotalAVG_overall": ["cornersTotalAVG_overall", "corners_per_game", "corners_avg"],
+    "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "home_corners_avg"],
+    "cornersTotalAVG_home": ["cornersTotalAVG_home", "home_corners_per_game", "corners_per_game_home"],
+    "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "away_corners_avg"],
+    "cornersTotalAVG_away": ["cornersTotalAVG_away", "away_corners_per_game", "corners_per_game_away"],
+    "corners_for": ["corners_for", "cornersTotal_overall", "corners"],
+    "cornersTotal_overall": ["cornersTotal_overall", "corners_for", "corners"],
+    "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total"],
+    "cornersAgainst_overall": ["cornersAgainst_overall", "corners_against", "corners_against_total"],
+    "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game"],
+    "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home"],
+    "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away"],
+    "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg", "corners_against_per_game"],
+    "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home", "corners_against_per_game_home"],
+    "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away", "corners_against_per_game_away"],
+    "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage", "o95_corners_pct"],
+
+    # Estatísticas de Chutes
+    "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg"],
+    "shotsAVG_home": ["shotsAVG_home", "shots_per_game_home", "shots_avg_home"],
+    "shotsAVG_away": ["shotsAVG_away", "shots_per_game_away", "shots_avg_away"],
+    "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg"],
+    "shotsOnTargetAVG_home": ["shotsOnTargetAVG_home", "shots_on_target_per_game_home", "sot_avg_home"],
+    "shotsOnTargetAVG_away": ["shotsOnTargetAVG_away", "shots_on_target_per_game_away", "sot_avg_away"],
+
+    # Posse de Bola
+    "possession": ["possession", "possessionAVG_overall", "possession_avg"],
+    "possessionAVG_overall": ["possessionAVG_overall", "possession", "possession_avg"],
+    "home_possession": ["home_possession", "possessionAVG_home", "possession_home"],
+    "possessionAVG_home": ["possessionAVG_home", "home_possession", "possession_home"],
+    "away_possession": ["away_possession", "possessionAVG_away", "possession_away"],
+    "possessionAVG_away": ["possessionAVG_away", "away_possession", "possession_away"],
+}
+_TEAM_DATA_INDEX = AliasIndex(TEAM_DATA_ALIASES)
+
+# Mapeamento para stats avançadas
+TEAM_DATA_ADVANCED_ALIASES = {
+    "xg": ["xg", "xG", "expected_goals"],
+    "xga": ["xga", "xGA", "expected_goals_against"],
+    "ppda": ["ppda", "passes_per_defensive_action", "PPDA"],
+    "possession": ["possession", "possessionAVG", "possession_avg"]
+}
+_TEAM_DATA_ADVANCED_INDEX = AliasIndex(TEAM_DATA_ADVANCED_ALIASES)
+
 def extract_team_data(api_data, formatted_data, team_type):
     """
     Extrai dados completos de um time a partir dos dados da API
@@ -1536,187 +1732,14 @@ def extract_team_data(api_data, formatted_data, team_type):
         
         # Extrair todos os campos de estatísticas disponíveis
         if stats_data:
-            # Mapeamento de campo da API para campo no nosso formato
-            field_mapping = {
-                # Estatísticas Gerais
-                "played": ["played", "seasonMatchesPlayed_overall", "matches_played", "MP"],
-                "seasonMatchesPlayed_overall": ["seasonMatchesPlayed_overall", "matches_played", "MP"],
-                "wins": ["wins", "seasonWinsNum_overall", "W"],
-                "seasonWinsNum_overall": ["seasonWinsNum_overall", "wins", "W"],
-                "draws": ["draws", "seasonDrawsNum_overall", "D"],
-                "seasonDrawsNum_overall": ["seasonDrawsNum_overall", "draws", "D"],
-                "losses": ["losses", "seasonLossesNum_overall", "L"],
-                "seasonLossesNum_overall": ["seasonLossesNum_overall", "losses", "L"],
-                "win_pct": ["win_percentage", "winPercentage"],
-                "draw_pct": ["draw_percentage", "drawPercentage"],
-                "loss_pct": ["loss_percentage", "lossPercentage"],
-                "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game"],
-                "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg"],
-                "leaguePosition_overall": ["leaguePosition_overall", "league_position"],
-                
-                # Estatísticas Casa/Fora
-                "home_played": ["home_played", "seasonMatchesPlayed_home", "matches_played_home"],
-                "away_played": ["away_played", "seasonMatchesPlayed_away", "matches_played_away"],
-                "seasonMatchesPlayed_home": ["seasonMatchesPlayed_home", "home_played", "matches_played_home"],
-                "seasonMatchesPlayed_away": ["seasonMatchesPlayed_away", "away_played", "matches_played_away"],
-                "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
-                "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
-                "seasonWinsNum_home": ["seasonWinsNum_home", "home_wins", "wins_home"],
-                "seasonWinsNum_away": ["seasonWinsNum_away", "away_wins", "wins_away"],
-                "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
-                "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
-                "seasonDrawsNum_home": ["seasonDrawsNum_home", "home_draws", "draws_home"],
-                "seasonDrawsNum_away": ["seasonDrawsNum_away", "away_draws", "draws_away"],
-                "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
-                "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
-                "seasonLossesNum_home": ["seasonLossesNum_home", "home_losses", "losses_home"],
-                "seasonLossesNum_away": ["seasonLossesNum_away", "away_losses", "losses_away"],
-                "seasonPPG_home": ["seasonPPG_home", "home_ppg", "points_per_game_home"],
-                "seasonPPG_away": ["seasonPPG_away", "away_ppg", "points_per_game_away"],
-                "leaguePosition_home": ["leaguePosition_home", "home_league_position"],
-                "leaguePosition_away": ["leaguePosition_away", "away_league_position"],
-                "home_form": ["home_form", "formRun_home", "current_form_home"],
-                "away_form": ["away_form", "formRun_away", "current_form_away"],
-                "formRun_home": ["formRun_home", "home_form", "current_form_home"],
-                "formRun_away": ["formRun_away", "away_form", "current_form_away"],
-                
-                # Estatísticas de Gols
-                "goals_scored": ["goals_scored", "seasonScoredNum_overall", "scored", "GF"],
-                "seasonScoredNum_overall": ["seasonScoredNum_overall", "goals_scored", "scored", "GF"],
-                "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "conceded", "GA"],
-                "seasonConcededNum_overall": ["seasonConcededNum_overall", "goals_conceded", "conceded", "GA"],
-                "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "goals_scored_home"],
-                "seasonScoredNum_home": ["seasonScoredNum_home", "home_goals_scored", "goals_scored_home"],
-                "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "goals_scored_away"],
-                "seasonScoredNum_away": ["seasonScoredNum_away", "away_goals_scored", "goals_scored_away"],
-                "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "goals_conceded_home"],
-                "seasonConcededNum_home": ["seasonConcededNum_home", "home_goals_conceded", "goals_conceded_home"],
-                "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "goals_conceded_away"],
-                "seasonConcededNum_away": ["seasonConcededNum_away", "away_goals_conceded", "goals_conceded_away"],
-                "goals_per_game": ["goals_per_game", "gpg", "goals_per_match"],
-                "conceded_per_game": ["conceded_per_game", "cpg", "conceded_per_match"],
-                "seasonGoalsTotal_overall": ["seasonGoalsTotal_overall", "total_goals"],
-                "seasonGoalsTotal_home": ["seasonGoalsTotal_home", "total_goals_home"],
-                "seasonGoalsTotal_away": ["seasonGoalsTotal_away", "total_goals_away"],
-                "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct"],
-                "seasonCSPercentage_overall": ["seasonCSPercentage_overall", "clean_sheet_percentage", "cs_pct"],
-                "seasonCS_overall": ["seasonCS_overall", "clean_sheets", "cs"],
-                "seasonCS_home": ["seasonCS_home", "home_clean_sheets", "cs_home"],
-                "seasonCS_away": ["seasonCS_away", "away_clean_sheets", "cs_away"],
-                "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct"],
-                "seasonBTTSPercentage_overall": ["seasonBTTSPercentage_overall", "btts_percentage", "both_teams_to_score_pct"],
-                "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct"],
-                "seasonOver25Percentage_overall": ["seasonOver25Percentage_overall", "over_2_5_percentage", "o25_pct"],
-                
-                # Expected Goals
-                "xg": ["xg", "xG", "expected_goals", "xg_for"],
-                "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals"],
-                "xga": ["xga", "xGA", "expected_goals_against", "xg_against"],
-                "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against"],
-                "home_xg": ["home_xg", "xg_home", "xg_for_home"],
-                "xg_for_home": ["xg_for_home", "home_xg", "xg_home"],
-                "away_xg": ["away_xg", "xg_away", "xg_for_away"],
-                "xg_for_away": ["xg_for_away", "away_xg", "xg_away"],
-                "home_xga": ["home_xga", "xga_home", "xg_against_home"],
-                "xg_against_home": ["xg_against_home", "home_xga", "xga_home"],
-                "away_xga": ["away_xga", "xga_away", "xg_against_away"],
-                "xg_against_away": ["xg_against_away", "away_xga", "xga_away"],
-                "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game"],
-                "xg_for_avg_home": ["xg_for_avg_home", "xg_per_game_home", "expected_goals_per_game_home"],
-                "xg_for_avg_away": ["xg_for_avg_away", "xg_per_game_away", "expected_goals_per_game_away"],
-                "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game", "expected_goals_against_per_game"],
-                "xg_against_avg_home": ["xg_against_avg_home", "xga_per_game_home", "expected_goals_against_per_game_home"],
-                "xg_against_avg_away": ["xg_against_avg_away", "xga_per_game_away", "expected_goals_against_per_game_away"],
-                
-                # Estatísticas de Cartões
-                "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards"],
-                "cardsAVG_overall": ["cardsAVG_overall", "cards_per_game", "cards_avg"],
-                "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "home_cards_avg"],
-                "cardsAVG_home": ["cardsAVG_home", "home_cards_per_game", "cards_per_game_home"],
-                "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "away_cards_avg"],
-                "cardsAVG_away": ["cardsAVG_away", "away_cards_per_game", "cards_per_game_away"],
-                "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total"],
-                "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home"],
-                "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away"],
-                "yellow_cards": ["yellow_cards", "yellows", "cards_yellow"],
-                "red_cards": ["red_cards", "reds", "cards_red"],
-                "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage", "o35_cards_pct"],
-                
-                # Estatísticas de Escanteios
-                "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners"],
-                "cornersTotalAVG_overall": ["cornersTotalAVG_overall", "corners_per_game", "corners_avg"],
-                "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "home_corners_avg"],
-                "cornersTotalAVG_home": ["cornersTotalAVG_home", "home_corners_per_game", "corners_per_game_home"],
-                "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "away_corners_avg"],
-                "cornersTotalAVG_away": ["cornersTotalAVG_away", "away_corners_per_game", "corners_per_game_away"],
-                "corners_for": ["corners_for", "cornersTotal_overall", "corners"],
-                "cornersTotal_overall": ["cornersTotal_overall", "corners_for", "corners"],
-                "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total"],
-                "cornersAgainst_overall": ["cornersAgainst_overall", "corners_against", "corners_against_total"],
-                "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game"],
-                "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home"],
-                "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away"],
-                "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg", "corners_against_per_game"],
-                "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home", "corners_against_per_game_home"],
-                "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away", "corners_against_per_game_away"],
-                "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage", "o95_corners_pct"],
-                
-                # Estatísticas de Chutes
-                "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg"],
-                "shotsAVG_home": ["shotsAVG_home", "shots_per_game_home", "shots_avg_home"],
-                "shotsAVG_away": ["shotsAVG_away", "shots_per_game_away", "shots_avg_away"],
-                "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg"],
-                "shotsOnTargetAVG_home": ["shotsOnTargetAVG_home", "shots_on_target_per_game_home", "sot_avg_home"],
-                "shotsOnTargetAVG_away": ["shotsOnTargetAVG_away", "shots_on_target_per_game_away", "sot_avg_away"],
-                
-                # Posse de Bola
-                "possession": ["possession", "possessionAVG_overall", "possession_avg"],
-                "possessionAVG_overall": ["possessionAVG_overall", "possession", "possession_avg"],
-                "home_possession": ["home_possession", "possessionAVG_home", "possession_home"],
-                "possessionAVG_home": ["possessionAVG_home", "home_possession", "possession_home"],
-                "away_possession": ["away_possession", "possessionAVG_away", "possession_away"],
-                "possessionAVG_away": ["possessionAVG_away", "away_possession", "possession_away"],
-            }
-            
-            # Extrai cada campo, buscando em múltiplos nomes possíveis
-            for target_field, source_fields in field_mapping.items():
-                for field in source_fields:
-                    if field in stats_data:
-                        value = stats_data[field]
-                        try:
-                            # Caso especial para campos de texto como form
-                            if target_field in ["form", "home_form", "away_form", "formRun_overall", "formRun_home", "formRun_away"]:
-                                if isinstance(value, str):
-                                    target_dict[target_field] = value
-                                break
-                            # Para valores numéricos
-                            elif value is not None and value != 'N/A':
-                                target_dict[target_field] = float(value)
-                                break
-                        except (ValueError, TypeError):
-                            # Ignorar conversão falha
-                            pass
+            # Extrai cada campo pelo índice de apelidos (uma passada pelo dicionário)
+            target_dict.update(_TEAM_DATA_INDEX.resolve(stats_data, as_float=True))
     
     # Buscar em advanced_stats
     if "advanced_stats" in api_data and team_type in api_data["advanced_stats"]:
         adv_stats = api_data["advanced_stats"][team_type]
-        
-        # Mapeamento para stats avançadas
-        adv_mapping = {
-            "xg": ["xg", "xG", "expected_goals"],
-            "xga": ["xga", "xGA", "expected_goals_against"],
-            "ppda": ["ppda", "passes_per_defensive_action", "PPDA"],
-            "possession": ["possession", "possessionAVG", "possession_avg"]
-        }
-        
-        for target_field, source_fields in adv_mapping.items():
-            for field in source_fields:
-                if field in adv_stats and adv_stats[field] is not None:
-                    try:
-                        target_dict[target_field] = float(adv_stats[field])
-                        break
-                    except (ValueError, TypeError):
-                        pass
+        target_dict.update(_TEAM_DATA_ADVANCED_INDEX.resolve(adv_stats, as_float=True))
+
 def get_value(data_dict, possible_keys, default=0):
     """
     Helper function to get a value from a dictionary using multiple possible keys
@@ -1750,6 +1773,7 @@ def get_value(data_dict, possible_keys, default=0):
 def get_nested_value(data_dict, possible_keys, default=0):
     """
     Get a value from a nested dictionary using multiple possible keys
+    (same lookup as get_value)
     
     Args:
         data_dict (dict): Dictionary to search
@@ -1759,23 +1783,13 @@ def get_nested_value(data_dict, possible_keys, default=0):
     Returns:
         Value from dictionary or default
     """
-    if not data_dict or not isinstance(data_dict, dict):
-        return default
-    
-    for key in possible_keys:
-        if key in data_dict:
-            # Handle 'N/A' and other non-numeric values
-            value = data_dict[key]
-            if value == 'N/A' or value is None:
-                return default
-            
-            # Try to convert to float
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                pass
-    
-    return default
+    return get_value(data_dict, possible_keys, default)
+
+def _fill_missing_fields(target_dict, found):
+    """Copia os campos encontrados que estão ausentes ou zerados no destino"""
+    for field, value in found.items():
+        if field not in target_dict or target_dict[field] == 0:
+            target_dict[field] = value
 
 def round_stat(value, precision=0):
     """
@@ -1799,6 +1813,19 @@ def round_stat(value, precision=0):
     except (ValueError, TypeError):
         return 0
 
+# Campos do H2H em transform_to_optimized_data
+OPTIMIZED_H2H_ALIASES = {
+    "total_matches": ["total_matches"],
+    "home_wins": ["home_wins"],
+    "away_wins": ["away_wins"],
+    "draws": ["draws"],
+    "over_2_5_pct": ["over_2_5_percentage"],
+    "btts_pct": ["btts_percentage"],
+    "avg_cards": ["average_cards"],
+    "avg_corners": ["average_corners"]
+}
+_OPTIMIZED_H2H_INDEX = AliasIndex(OPTIMIZED_H2H_ALIASES)
+
 def transform_to_optimized_data(api_data, home_team_name, away_team_name, selected_markets=None):
     """
     Transform API data into a more optimized, flattened structure
@@ -1980,14 +2007,9 @@ def transform_to_optimized_data(api_data, home_team_name, away_team_name, select
         if "head_to_head" in api_data:
             h2h_data = api_data["head_to_head"]
             
-            optimized_data["h2h"]["total_matches"] = get_value(h2h_data, ["total_matches"])
-            optimized_data["h2h"]["home_wins"] = get_value(h2h_data, ["home_wins"])
-            optimized_data["h2h"]["away_wins"] = get_value(h2h_data, ["away_wins"])
-            optimized_data["h2h"]["draws"] = get_value(h2h_data, ["draws"])
-            optimized_data["h2h"]["over_2_5_pct"] = get_value(h2h_data, ["over_2_5_percentage"])
-            optimized_data["h2h"]["btts_pct"] = get_value(h2h_data, ["btts_percentage"])
-            optimized_data["h2h"]["avg_cards"] = get_value(h2h_data, ["average_cards"])
-            optimized_data["h2h"]["avg_corners"] = get_value(h2h_data, ["average_corners"])
+            found = _OPTIMIZED_H2H_INDEX.resolve(h2h_data, as_float=True)
+            for field in _OPTIMIZED_H2H_INDEX.fields:
+                optimized_data["h2h"][field] = found.get(field, 0)
         
         # Extract form data
         if "team_form" in api_data:
@@ -2139,6 +2161,55 @@ def validate_data_types(data_dict):
     
     return data_dict
 
+# Campos de extract_all_stats; "{side}" = "home" ou "away"
+ALL_STATS_ALIASES = {
+    # Basic stats
+    "played": ["matches_played", "seasonMatchesPlayed_overall", "MP"],
+    "wins": ["wins", "seasonWinsNum_overall", "W"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D"],
+    "losses": ["losses", "seasonLossesNum_overall", "L"],
+    "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls"],
+    "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA"],
+    
+    # Goal trends
+    "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall"],
+    "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall"],
+    "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall"],
+    
+    # Home/Away specific
+    "{side}_played": ["matches_played_{side}", "seasonMatchesPlayed_{side}"],
+    "{side}_wins": ["{side}_wins", "seasonWinsNum_{side}"],
+    "{side}_draws": ["{side}_draws", "seasonDrawsNum_{side}"],
+    "{side}_losses": ["{side}_losses", "seasonLossesNum_{side}"],
+    "{side}_goals_scored": ["goals_scored_{side}", "seasonGoals_{side}"],
+    "{side}_goals_conceded": ["goals_conceded_{side}", "seasonConceded_{side}"],
+    
+    # Advanced stats
+    "xg": ["xG", "xg", "xg_for_overall"],
+    "xga": ["xGA", "xga", "xg_against_avg_overall"],
+    "possession": ["possession", "possessionAVG_overall", "Poss"],
+    
+    # Card stats (cards_total soma os vermelhos de _red_cards_total)
+    "cards_total": ["cards_total", "seasonCrdYNum_overall", "CrdY"],
+    "_red_cards_total": ["seasonCrdRNum_overall", "CrdR"],
+    "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY"],
+    "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR"],
+    "over_3_5_cards_pct": ["over_3_5_cards_percentage"],
+    
+    # Corner stats
+    "corners_for": ["corners_for", "seasonCornersFor_overall", "CK"],
+    "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
+    "over_9_5_corners_pct": ["over_9_5_corners_percentage"],
+}
+
+def _all_stats_index(side):
+    return AliasIndex({
+        field.format(side=side): [alias.format(side=side) for alias in aliases]
+        for field, aliases in ALL_STATS_ALIASES.items()
+    })
+
+_ALL_STATS_INDEX = {side: _all_stats_index(side) for side in ("home", "away")}
+
 def extract_all_stats(target_dict, data_dict, team_type):
     """
     Extract all stats from data dictionary to target dictionary
@@ -2148,38 +2219,14 @@ def extract_all_stats(target_dict, data_dict, team_type):
         data_dict (dict): Source data dictionary
         team_type (str): "home" or "away"
     """
-    # Basic stats
-    target_dict["played"] = get_value(data_dict, ["matches_played", "seasonMatchesPlayed_overall", "MP"])
-    target_dict["wins"] = get_value(data_dict, ["wins", "seasonWinsNum_overall", "W"])
-    target_dict["draws"] = get_value(data_dict, ["draws", "seasonDrawsNum_overall", "D"])
-    target_dict["losses"] = get_value(data_dict, ["losses", "seasonLossesNum_overall", "L"])
-    target_dict["goals_scored"] = get_value(data_dict, ["goals_scored", "seasonGoals_overall", "Gls"])
-    target_dict["goals_conceded"] = get_value(data_dict, ["goals_conceded", "seasonConceded_overall", "GA"])
-    
-    # Goal trends
-    target_dict["clean_sheets_pct"] = get_value(data_dict, ["clean_sheet_percentage", "seasonCSPercentage_overall"])
-    target_dict["btts_pct"] = get_value(data_dict, ["btts_percentage", "seasonBTTSPercentage_overall"])
-    target_dict["over_2_5_pct"] = get_value(data_dict, ["over_2_5_percentage", "seasonOver25Percentage_overall"])
-    
-    # Home/Away specific
-    prefix = team_type  # "home" or "away"
-    target_dict[f"{prefix}_played"] = get_value(data_dict, [f"matches_played_{prefix}", f"seasonMatchesPlayed_{prefix}"])
-    target_dict[f"{prefix}_wins"] = get_value(data_dict, [f"{prefix}_wins", f"seasonWinsNum_{prefix}"])
-    target_dict[f"{prefix}_draws"] = get_value(data_dict, [f"{prefix}_draws", f"seasonDrawsNum_{prefix}"])
-    target_dict[f"{prefix}_losses"] = get_value(data_dict, [f"{prefix}_losses", f"seasonLossesNum_{prefix}"])
-    target_dict[f"{prefix}_goals_scored"] = get_value(data_dict, [f"goals_scored_{prefix}", f"seasonGoals_{prefix}"])
-    target_dict[f"{prefix}_goals_conceded"] = get_value(data_dict, [f"goals_conceded_{prefix}", f"seasonConceded_{prefix}"])
-    
-    # Advanced stats
-    target_dict["xg"] = get_value(data_dict, ["xG", "xg", "xg_for_overall"])
-    target_dict["xga"] = get_value(data_dict, ["xGA", "xga", "xg_against_avg_overall"])
-    target_dict["possession"] = get_value(data_dict, ["possession", "possessionAVG_overall", "Poss"])
+    index = _ALL_STATS_INDEX.get(team_type) or _all_stats_index(team_type)
+    found = index.resolve(data_dict, as_float=True)
     
-    # Card stats
-    target_dict["cards_total"] = get_value(data_dict, ["cards_total", "seasonCrdYNum_overall", "CrdY"]) + get_value(data_dict, ["seasonCrdRNum_overall", "CrdR"], 0)
-    target_dict["yellow_cards"] = get_value(data_dict, ["yellow_cards", "seasonCrdYNum_overall", "CrdY"])
-    target_dict["red_cards"] = get_value(data_dict, ["red_cards", "seasonCrdRNum_overall", "CrdR"])
-    target_dict["over_3_5_cards_pct"] = get_value(data_dict, ["over_3_5_cards_percentage"])
+    # Campos ausentes ficam zerados
+    for field in index.fields:
+        if not field.startswith("_"):
+            target_dict[field] = found.get(field, 0)
+    target_dict["cards_total"] += found.get("_red_cards_total", 0)
     
     # If matches played exists, calculate per-game averages
     matches_played = target_dict["played"]
@@ -2187,10 +2234,7 @@ def extract_all_stats(target_dict, data_dict, team_type):
         target_dict["cards_per_game"] = round(target_dict["cards_total"] / matches_played, 2)
         
     # Corner stats
-    target_dict["corners_for"] = get_value(data_dict, ["corners_for", "seasonCornersFor_overall", "CK"])
-    target_dict["corners_against"] = get_value(data_dict, ["corners_against", "seasonCornersAgainst_overall"])
     target_dict["corners_total"] = target_dict["corners_for"] + target_dict["corners_against"]
-    target_dict["over_9_5_corners_pct"] = get_value(data_dict, ["over_9_5_corners_percentage"])
     
     # Calculate per-game averages for corners if matches played
     if matches_played > 0:
@@ -2404,6 +2448,61 @@ def extract_traditional_stats(api_data, result):
         if "away" in api_data["team_form"] and isinstance(api_data["team_form"]["away"], list):
             extract_form_data(api_data["team_form"]["away"], result["away_team"], "form")
 
+# Mapeamento ampliado de campos para extração
+TEAM_STATS_ALIASES = {
+    "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games"],
+    "wins": ["wins", "seasonWinsNum_overall", "W", "Wins", "team_wins"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws"],
+    "losses": ["losses", "seasonLossesNum_overall", "L", "Defeats", "Losses"],
+    "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals", "GF", "GoalsFor"],
+    "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA", "GoalsAgainst"],
+    "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall", "clean_sheets_pct"],
+    "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall", "btts_pct"],
+    "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall", "over_2_5_goals_pct"],
+    "xg": ["xG", "xg", "xg_for_overall", "expected_goals", "ExpG"],
+    "xga": ["xGA", "xga", "xg_against_avg_overall", "expected_goals_against"],
+    "possession": ["possession", "possessionAVG_overall", "Poss", "possession_avg"],
+    "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY", "YellowCards"],
+    "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR", "RedCards"],
+    "over_3_5_cards_pct": ["over_3_5_cards_percentage", "over35CardsPercentage_overall"],
+    "corners_for": ["corners_for", "seasonCornersFor_overall", "CK", "Corners"],
+    "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
+    "over_9_5_corners_pct": ["over_9_5_corners_percentage", "over95CornersPercentage_overall"],
+}
+
+# Campos específicos do tipo de time (casa/visitante)
+TEAM_STATS_SIDE_ALIASES = {
+    "home": {
+        "home_played": ["home_played", "matches_played_home", "seasonMatchesPlayed_home", "home_matches"],
+        "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
+        "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
+        "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
+        "home_goals_scored": ["home_goals_scored", "goals_scored_home", "seasonGoals_home"],
+        "home_goals_conceded": ["home_goals_conceded", "goals_conceded_home", "seasonConceded_home"],
+    },
+    "away": {
+        "away_played": ["away_played", "matches_played_away", "seasonMatchesPlayed_away", "away_matches"],
+        "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
+        "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
+        "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
+        "away_goals_scored": ["away_goals_scored", "goals_scored_away", "seasonGoals_away"],
+        "away_goals_conceded": ["away_goals_conceded", "goals_conceded_away", "seasonConceded_away"],
+    },
+}
+_TEAM_STATS_INDEX = AliasIndex(TEAM_STATS_ALIASES)
+_TEAM_STATS_SIDE_INDEX = {
+    side: AliasIndex({**TEAM_STATS_ALIASES, **aliases}) for side, aliases in TEAM_STATS_SIDE_ALIASES.items()
+}
+
+# Campos que podem estar em additional_info
+TEAM_STATS_ADDITIONAL_ALIASES = {
+    "xg": ["xg_for_overall"],
+    "xga": ["xg_against_overall"],
+    "over_3_5_cards_pct": ["over35CardsPercentage_overall"],
+    "over_9_5_corners_pct": ["over95CornersPercentage_overall"]
+}
+_TEAM_STATS_ADDITIONAL_INDEX = AliasIndex(TEAM_STATS_ADDITIONAL_ALIASES)
+
 def extract_team_stats(team_data, target_dict, team_type):
     """Extrai estatísticas de um time com tratamento de diferentes estruturas de dados"""
     # Importação necessária
@@ -2437,130 +2536,39 @@ def extract_team_stats(team_data, target_dict, team_type):
         logger.warning(f"Nenhuma estatística encontrada para o time {team_type}")
         return
     
-    # Mapeamento ampliado de campos para extração
-    field_mapping = {
-        "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games"],
-        "wins": ["wins", "seasonWinsNum_overall", "W", "Wins", "team_wins"],
-        "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws"],
-        "losses": ["losses", "seasonLossesNum_overall", "L", "Defeats", "Losses"],
-        "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals", "GF", "GoalsFor"],
-        "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA", "GoalsAgainst"],
-        "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall", "clean_sheets_pct"],
-        "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall", "btts_pct"],
-        "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall", "over_2_5_goals_pct"],
-        "xg": ["xG", "xg", "xg_for_overall", "expected_goals", "ExpG"],
-        "xga": ["xGA", "xga", "xg_against_avg_overall", "expected_goals_against"],
-        "possession": ["possession", "possessionAVG_overall", "Poss", "possession_avg"],
-        "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY", "YellowCards"],
-        "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR", "RedCards"],
-        "over_3_5_cards_pct": ["over_3_5_cards_percentage", "over35CardsPercentage_overall"],
-        "corners_for": ["corners_for", "seasonCornersFor_overall", "CK", "Corners"],
-        "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
-        "over_9_5_corners_pct": ["over_9_5_corners_percentage", "over95CornersPercentage_overall"],
-    }
-    
-    # Adicionar campos específicos do tipo de time (casa/visitante)
-    if team_type == "home":
-        specific_fields = {
-            "home_played": ["home_played", "matches_played_home", "seasonMatchesPlayed_home", "home_matches"],
-            "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
-            "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
-            "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
-            "home_goals_scored": ["home_goals_scored", "goals_scored_home", "seasonGoals_home"],
-            "home_goals_conceded": ["home_goals_conceded", "goals_conceded_home", "seasonConceded_home"],
-        }
-        field_mapping.update(specific_fields)
-    elif team_type == "away":
-        specific_fields = {
-            "away_played": ["away_played", "matches_played_away", "seasonMatchesPlayed_away", "away_matches"],
-            "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
-            "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
-            "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
-            "away_goals_scored": ["away_goals_scored", "goals_scored_away", "seasonGoals_away"],
-            "away_goals_conceded": ["away_goals_conceded", "goals_conceded_away", "seasonConceded_away"],
-        }
-        field_mapping.update(specific_fields)
-    
-    # Extrair estatísticas
-    for target_field, source_fields in field_mapping.items():
-        # Verificar primeiro em stats_data
-        for field in source_fields:
-            if field in stats_data:
-                value = stats_data[field]
-                try:
-                    if value is not None and value != 'N/A':
-                        target_dict[target_field] = float(value)
-                        break  # Encontrou este campo, continuar para o próximo
-                except (ValueError, TypeError):
-                    pass
-        
-        # Se não encontrou, buscar também no time_data
-        if target_field not in target_dict or target_dict[target_field] == 0:
-            for field in source_fields:
-                if field in team_data:
-                    value = team_data[field]
-                    try:
-                        if value is not None and value != 'N/A':
-                            target_dict[target_field] = float(value)
-                            break
-                    except (ValueError, TypeError):
-                        pass
+    # Extrair estatísticas: primeiro em stats_data, depois no time_data
+    # para os campos ausentes ou zerados
+    index = _TEAM_STATS_SIDE_INDEX.get(team_type, _TEAM_STATS_INDEX)
+    target_dict.update(index.resolve(stats_data, as_float=True))
+    _fill_missing_fields(target_dict, index.resolve(team_data, as_float=True))
     
     # Buscar em additional_info se disponível
     if "stats" in team_data and isinstance(team_data["stats"], dict) and "additional_info" in team_data["stats"]:
         additional_info = team_data["stats"]["additional_info"]
-        
-        # Campos que podem estar em additional_info
-        additional_fields = {
-            "xg": ["xg_for_overall"],
-            "xga": ["xg_against_overall"],
-            "over_3_5_cards_pct": ["over35CardsPercentage_overall"],
-            "over_9_5_corners_pct": ["over95CornersPercentage_overall"]
-        }
-        
-        for target_field, source_fields in additional_fields.items():
-            if target_field not in target_dict or target_dict[target_field] == 0:
-                for field in source_fields:
-                    if field in additional_info:
-                        value = additional_info[field]
-                        try:
-                            if value is not None and value != 'N/A':
-                                target_dict[target_field] = float(value)
-                                break
-                        except (ValueError, TypeError):
-                            pass
+        _fill_missing_fields(target_dict, _TEAM_STATS_ADDITIONAL_INDEX.resolve(additional_info, as_float=True))
+
+# Métricas avançadas (ppda sempre; as demais só completam campos ausentes ou zerados)
+ADVANCED_STATS_ALIASES = {
+    "ppda": ["ppda", "passes_per_defensive_action", "PPDA"],
+    "xg": ["xg", "expected_goals", "xG"],
+    "xga": ["xga", "expected_goals_against", "xGA"],
+    "possession": ["possession", "possessionAVG_overall", "Poss"]
+}
+_ADVANCED_STATS_INDEX = AliasIndex(ADVANCED_STATS_ALIASES)
 
 def extract_advanced_stats(advanced_data, target_dict):
     """Extrai estatísticas avançadas"""
     if not advanced_data or not isinstance(advanced_data, dict):
         return
     
+    found = _ADVANCED_STATS_INDEX.resolve(advanced_data, as_float=True)
+    
     # PPDA (Passes por Ação Defensiva)
-    ppda_keys = ["ppda", "passes_per_defensive_action", "PPDA"]
-    for key in ppda_keys:
-        if key in advanced_data and advanced_data[key] is not None:
-            try:
-                target_dict["ppda"] = float(advanced_data[key])
-                break
-            except (ValueError, TypeError):
-                pass
+    if "ppda" in found:
+        target_dict["ppda"] = found.pop("ppda")
     
     # Outras métricas avançadas
-    other_metrics = {
-        "xg": ["xg", "expected_goals", "xG"],
-        "xga": ["xga", "expected_goals_against", "xGA"],
-        "possession": ["possession", "possessionAVG_overall", "Poss"]
-    }
-    
-    for target_key, source_keys in other_metrics.items():
-        if target_key not in target_dict or target_dict[target_key] == 0:
-            for key in source_keys:
-                if key in advanced_data and advanced_data[key] is not None:
-                    try:
-                        target_dict[target_key] = float(advanced_data[key])
-                        break
-                    except (ValueError, TypeError):
-                        pass
+    _fill_missing_fields(target_dict, found)
 
 def extract_h2h_data(api_data, formatted_data):
     """
@@ -2646,66 +2654,51 @@ def extract_from_anywhere(api_data, result, home_team_name, away_team_name):
     
     logger.info("Executando busca agressiva de estatísticas em toda a estrutura de dados")
     
-    # Função para buscar estatísticas recursivamente
-    def search_stats(obj, path="", home_stats=None, away_stats=None):
-        if home_stats is None:
-            home_stats = {}
-        if away_stats is None:
-            away_stats = {}
+    home_found = {}
+    away_found = {}
+    
+    # Callback do percurso: cada dicionário que pode conter estatísticas de um time
+    def search_stats(obj, path):
+        # Verificar se este objeto pode conter estatísticas de um time
+        has_stats = False
+        for key in ["played", "matches_played", "wins", "goals_scored", "xg"]:
+            if key in obj:
+                has_stats = True
+                break
+        
+        if has_stats:
+            # Tentar determinar a qual time pertencem estas estatísticas
+            is_home = False
+            is_away = False
             
-        if isinstance(obj, dict):
-            # Verificar se este objeto pode conter estatísticas de um time
-            has_stats = False
-            for key in ["played", "matches_played", "wins", "goals_scored", "xg"]:
-                if key in obj:
-                    has_stats = True
-                    break
+            # Verificar pelo nome do time
+            if "name" in obj and isinstance(obj["name"], str):
+                if obj["name"] == home_team_name or home_team_name in obj["name"]:
+                    is_home = True
+                elif obj["name"] == away_team_name or away_team_name in obj["name"]:
+                    is_away = True
             
-            if has_stats:
-                # Tentar determinar a qual time pertencem estas estatísticas
-                is_home = False
-                is_away = False
-                
-                # Verificar pelo nome do time
-                if "name" in obj and isinstance(obj["name"], str):
-                    if obj["name"] == home_team_name or home_team_name in obj["name"]:
-                        is_home = True
-                    elif obj["name"] == away_team_name or away_team_name in obj["name"]:
-                        is_away = True
-                
-                # Verificar pelo caminho
-                if not (is_home or is_away):
-                    if "home" in path.lower():
-                        is_home = True
-                    elif "away" in path.lower() or "visit" in path.lower():
-                        is_away = True
-                
-                # Se determinamos o time, extrair estatísticas
-                if is_home:
-                    logger.info(f"Encontradas possíveis estatísticas do time da casa em {path}")
-                    extract_stats_from_dict(obj, home_stats)
-                elif is_away:
-                    logger.info(f"Encontradas possíveis estatísticas do time visitante em {path}")
-                    extract_stats_from_dict(obj, away_stats)
-                else:
-                    # Se não conseguimos determinar, mas parece estatística, fazer log
-                    logger.info(f"Encontrado objeto com possíveis estatísticas (time indeterminado) em {path}")
+            # Verificar pelo caminho
+            if not (is_home or is_away):
+                path_lower = path.lower()
+                if "home" in path_lower:
+                    is_home = True
+                elif "away" in path_lower or "visit" in path_lower:
+                    is_away = True
             
-            # Continuando a busca em todas as chaves
-            for k, v in obj.items():
-                new_path = f"{path}.{k}" if path else k
-                search_stats(v, new_path, home_stats, away_stats)
-                
-        elif isinstance(obj, list):
-            # Buscar em listas também
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                search_stats(item, new_path, home_stats, away_stats)
-        
-        return home_stats, away_stats
+            # Se determinamos o time, extrair estatísticas
+            if is_home:
+                logger.debug(f"Encontradas possíveis estatísticas do time da casa em {path}")
+                extract_stats_from_dict(obj, home_found)
+            elif is_away:
+                logger.debug(f"Encontradas possíveis estatísticas do time visitante em {path}")
+                extract_stats_from_dict(obj, away_found)
+            else:
+                # Se não conseguimos determinar, mas parece estatística, fazer log
+                logger.debug(f"Encontrado objeto com possíveis estatísticas (time indeterminado) em {path}")
     
     # Executar busca
-    home_found, away_found = search_stats(api_data)
+    walk_tree(api_data, on_dict=search_stats)
     
     # Verificar se encontramos algo útil
     home_found_count = count_non_zero_fields(home_found)
@@ -2731,42 +2724,32 @@ def extract_from_anywhere(api_data, result, home_team_name, away_team_name):
                 result["away_team"][k] = v
         logger.info(f"Atualizados {away_found_count} campos para o time visitante")
 
+# Mapeamento de campos comuns
+STATS_FROM_DICT_ALIASES = {
+    "played": ["played", "matches_played", "games_played", "MP", "PJ", "matches"],
+    "wins": ["wins", "W", "team_wins", "won"],
+    "draws": ["draws", "D", "team_draws"],
+    "losses": ["losses", "L", "defeats", "lost"],
+    "goals_scored": ["goals_scored", "goals_for", "scored", "GF", "goals"],
+    "goals_conceded": ["goals_conceded", "goals_against", "conceded", "GA"],
+    "xg": ["xg", "xG", "expected_goals"],
+    "xga": ["xga", "xGA", "expected_goals_against"],
+    "possession": ["possession", "possessionAVG", "avg_possession", "posesion"],
+    "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct"],
+    "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct"],
+    "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct"],
+    "yellow_cards": ["yellow_cards", "yellows", "cards_yellow"],
+    "red_cards": ["red_cards", "reds", "cards_red"]
+}
+_STATS_FROM_DICT_INDEX = AliasIndex(STATS_FROM_DICT_ALIASES)
+
 def extract_stats_from_dict(source_dict, target_dict):
     """Extrai estatísticas de um dicionário para outro usando mapeamento de campos"""
     if not isinstance(source_dict, dict):
         return
     
-    # Mapeamento de campos comuns
-    field_mapping = {
-        "played": ["played", "matches_played", "games_played", "MP", "PJ", "matches"],
-        "wins": ["wins", "W", "team_wins", "won"],
-        "draws": ["draws", "D", "team_draws"],
-        "losses": ["losses", "L", "defeats", "lost"],
-        "goals_scored": ["goals_scored", "goals_for", "scored", "GF", "goals"],
-        "goals_conceded": ["goals_conceded", "goals_against", "conceded", "GA"],
-        "xg": ["xg", "xG", "expected_goals"],
-        "xga": ["xga", "xGA", "expected_goals_against"],
-        "possession": ["possession", "possessionAVG", "avg_possession", "posesion"],
-        "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct"],
-        "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct"],
-        "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct"],
-        "yellow_cards": ["yellow_cards", "yellows", "cards_yellow"],
-        "red_cards": ["red_cards", "reds", "cards_red"]
-    }
-    
-    # Extrair cada campo
-    for target_field, source_fields in field_mapping.items():
-        for field in source_fields:
-            if field in source_dict:
-                value = source_dict[field]
-                try:
-                    if value is not None and value != 'N/A':
-                        float_val = float(value)
-                        if float_val != 0:  # Ignorar valores zero
-                            target_dict[target_field] = float_val
-                            break
-                except (ValueError, TypeError):
-                    pass
+    # Extrair cada campo (valores zero são ignorados)
+    target_dict.update(_STATS_FROM_DICT_INDEX.resolve(source_dict, as_float=True, skip_empty=True))
 
 def extract_h2h_from_anywhere(api_data, result):
     """Busca dados de H2H em qualquer lugar da estrutura"""
@@ -2777,42 +2760,30 @@ def extract_h2h_from_anywhere(api_data, result):
     # Primeiro, procurar estruturas específicas de H2H
     h2h_objects = []
     
-    def find_h2h_objects(obj, path=""):
-        if isinstance(obj, dict):
-            # Verificar se parece ser um objeto H2H
-            is_h2h = False
-            h2h_indicators = ["h2h", "head_to_head", "previous_matches", "confrontos"]
-            
-            # Verificar pelo nome da chave
-            for indicator in h2h_indicators:
-                if indicator in path.lower():
-                    is_h2h = True
-                    break
-            
-            # Verificar pelo conteúdo típico de H2H
-            if not is_h2h:
-                h2h_fields = ["total_matches", "home_wins", "away_wins", "draws"]
-                field_count = sum(1 for field in h2h_fields if field in obj)
-                if field_count >= 2:  # Se tem pelo menos 2 campos típicos de H2H
-                    is_h2h = True
-            
-            if is_h2h:
-                logger.info(f"Possível objeto H2H encontrado em {path}")
-                h2h_objects.append(obj)
-            
-            # Continuar buscando recursivamente
-            for k, v in obj.items():
-                new_path = f"{path}.{k}" if path else k
-                find_h2h_objects(v, new_path)
-                
-        elif isinstance(obj, list):
-            # Buscar em listas também
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                find_h2h_objects(item, new_path)
+    def find_h2h_objects(obj, path):
+        # Verificar se parece ser um objeto H2H
+        is_h2h = False
+        h2h_indicators = ["h2h", "head_to_head", "previous_matches", "confrontos"]
+        
+        # Verificar pelo nome da chave
+        for indicator in h2h_indicators:
+            if indicator in path.lower():
+                is_h2h = True
+                break
+        
+        # Verificar pelo conteúdo típico de H2H
+        if not is_h2h:
+            h2h_fields = ["total_matches", "home_wins", "away_wins", "draws"]
+            field_count = sum(1 for field in h2h_fields if field in obj)
+            if field_count >= 2:  # Se tem pelo menos 2 campos típicos de H2H
+                is_h2h = True
+        
+        if is_h2h:
+            logger.debug(f"Possível objeto H2H encontrado em {path}")
+            h2h_objects.append(obj)
     
     # Iniciar busca
-    find_h2h_objects(api_data)
+    walk_tree(api_data, on_dict=find_h2h_objects)
     
     # Processar objetos H2H encontrados
     for h2h_obj in h2h_objects:
@@ -3505,96 +3476,85 @@ def extract_deep_team_data(api_data, home_team_name, away_team_name, log_details
                                     except (ValueError, TypeError):
                                         pass
         
-        # FASE 3: Busca profunda e recursiva em toda a estrutura
-        def deep_search(obj, path=""):
-            if isinstance(obj, dict):
-                # Verificar se o objeto contém um nome de time
-                if "name" in obj and isinstance(obj["name"], str):
-                    team_name = obj["name"]
-                    
-                    # Verificar se é um dos times que estamos procurando
-                    is_home = False
-                    is_away = False
-                    
-                    # Comparação exata
-                    if team_name == home_team_name:
+        # FASE 3: Busca profunda em toda a estrutura (percurso iterativo e limitado)
+        def deep_search(obj, path):
+            # Verificar se o objeto contém um nome de time
+            if "name" in obj and isinstance(obj["name"], str):
+                team_name = obj["name"]
+                
+                # Verificar se é um dos times que estamos procurando
+                is_home = False
+                is_away = False
+                
+                # Comparação exata
+                if team_name == home_team_name:
+                    is_home = True
+                elif team_name == away_team_name:
+                    is_away = True
+                
+                # Comparação parcial (necessário para alguns endpoints)
+                if not (is_home or is_away):
+                    if home_team_name.lower() in team_name.lower() or team_name.lower() in home_team_name.lower():
                         is_home = True
-                    elif team_name == away_team_name:
+                    elif away_team_name.lower() in team_name.lower() or team_name.lower() in away_team_name.lower():
                         is_away = True
+                
+                # Se encontramos um time, extrair estatísticas
+                if is_home or is_away:
+                    target_dict = home_found if is_home else away_found
+                    logger.debug(f"Encontrado {'time da casa' if is_home else 'time visitante'} pelo nome: {team_name} em {path}")
                     
-                    # Comparação parcial (necessário para alguns endpoints)
-                    if not (is_home or is_away):
-                        if home_team_name.lower() in team_name.lower() or team_name.lower() in home_team_name.lower():
-                            is_home = True
-                        elif away_team_name.lower() in team_name.lower() or team_name.lower() in away_team_name.lower():
-                            is_away = True
+                    # Extrair estatísticas diretamente do objeto
+                    extract_stats_recursive(obj, target_dict, path)
+            
+            # Verificar se este objeto contém palavras-chave relacionadas a casa/fora
+            path_lower = path.lower()
+            if not ("h2h" in path_lower or "vs" in path_lower):
+                is_home_related = "home" in path_lower or "casa" in path_lower
+                is_away_related = "away" in path_lower or "fora" in path_lower or "visit" in path_lower
+                
+                if is_home_related or is_away_related:
+                    # Verificar se tem estatísticas
+                    has_stats = any(key in obj for key in ["played", "matches_played", "wins", "goals_scored", "xg", "form"])
                     
-                    # Se encontramos um time, extrair estatísticas
-                    if is_home or is_away:
-                        target_dict = home_found if is_home else away_found
-                        logger.info(f"Encontrado {'time da casa' if is_home else 'time visitante'} pelo nome: {team_name} em {path}")
-                        
-                        # Extrair estatísticas diretamente do objeto
+                    if has_stats:
+                        target_dict = home_found if is_home_related else away_found
+                        logger.debug(f"Encontradas estatísticas para {'casa' if is_home_related else 'visitante'} em {path}")
                         extract_stats_recursive(obj, target_dict, path)
+            
+            # Verificar se este objeto parece ser dados H2H
+            if ("h2h" in path_lower or "head" in path_lower or "vs" in path_lower) and not h2h_found:
+                # Verificar se tem estatísticas H2H
+                has_h2h = any(key in obj for key in ["total_matches", "home_wins", "away_wins", "draws"])
                 
-                # Verificar se este objeto contém palavras-chave relacionadas a casa/fora
-                if not ("h2h" in path.lower() or "vs" in path.lower()):
-                    is_home_related = "home" in path.lower() or "casa" in path.lower()
-                    is_away_related = "away" in path.lower() or "fora" in path.lower() or "visit" in path.lower()
+                if has_h2h:
+                    logger.debug(f"Encontrados dados H2H em {path}")
                     
-                    if is_home_related or is_away_related:
-                        # Verificar se tem estatísticas
-                        has_stats = any(key in obj for key in ["played", "matches_played", "wins", "goals_scored", "xg", "form"])
-                        
-                        if has_stats:
-                            target_dict = home_found if is_home_related else away_found
-                            logger.info(f"Encontradas estatísticas para {'casa' if is_home_related else 'visitante'} em {path}")
-                            extract_stats_recursive(obj, target_dict, path)
-                
-                # Verificar se este objeto parece ser dados H2H
-                if ("h2h" in path.lower() or "head" in path.lower() or "vs" in path.lower()) and not h2h_found:
-                    # Verificar se tem estatísticas H2H
-                    has_h2h = any(key in obj for key in ["total_matches", "home_wins", "away_wins", "draws"])
+                    # Extrair campos H2H com uma lista ampla de possíveis nomes
+                    h2h_fields = {
+                        "total_matches": ["total_matches", "totalMatches", "matches", "total", "count", "jogos", "partidas"],
+                        "home_wins": ["home_wins", "homeWins", "home", "local", "casa"],
+                        "away_wins": ["away_wins", "awayWins", "away", "visitante", "fora"],
+                        "draws": ["draws", "draw", "equal", "empates", "empate"],
+                        "avg_goals": ["avg_goals", "avgGoals", "goals_avg", "media_gols", "mediaGols"],
+                        "over_2_5_pct": ["over_2_5_percentage", "over25", "mais2_5"],
+                        "btts_pct": ["btts_percentage", "btts", "ambos_marcam"],
+                        "avg_cards": ["avg_cards", "avgCards", "media_cartoes"],
+                        "avg_corners": ["avg_corners", "avgCorners", "media_escanteios"]
+                    }
                     
-                    if has_h2h:
-                        logger.info(f"Encontrados dados H2H em {path}")
-                        
-                        # Extrair campos H2H com uma lista ampla de possíveis nomes
-                        h2h_fields = {
-                            "total_matches": ["total_matches", "totalMatches", "matches", "total", "count", "jogos", "partidas"],
-                            "home_wins": ["home_wins", "homeWins", "home", "local", "casa"],
-                            "away_wins": ["away_wins", "awayWins", "away", "visitante", "fora"],
-                            "draws": ["draws", "draw", "equal", "empates", "empate"],
-                            "avg_goals": ["avg_goals", "avgGoals", "goals_avg", "media_gols", "mediaGols"],
-                            "over_2_5_pct": ["over_2_5_percentage", "over25", "mais2_5"],
-                            "btts_pct": ["btts_percentage", "btts", "ambos_marcam"],
-                            "avg_cards": ["avg_cards", "avgCards", "media_cartoes"],
-                            "avg_corners": ["avg_corners", "avgCorners", "media_escanteios"]
-                        }
-                        
-                        for target, sources in h2h_fields.items():
-                            for src in sources:
-                                if src in obj:
-                                    try:
-                                        if obj[src] is not None and obj[src] != 'N/A':
-                                            h2h_found[target] = float(obj[src])
-                                            break
-                                    except (ValueError, TypeError):
-                                        pass
-                
-                # Continuar buscando recursivamente em todas as chaves
-                for key, value in obj.items():
-                    new_path = f"{path}.{key}" if path else key
-                    deep_search(value, new_path)
-            
-            elif isinstance(obj, list):
-                # Buscar em cada item da lista
-                for i, item in enumerate(obj):
-                    new_path = f"{path}[{i}]"
-                    deep_search(item, new_path)
-        
+                    for target, sources in h2h_fields.items():
+                        for src in sources:
+                            if src in obj:
+                                try:
+                                    if obj[src] is not None and obj[src] != 'N/A':
+                                        h2h_found[target] = float(obj[src])
+                                        break
+                                except (ValueError, TypeError):
+                                    pass
+
         # Iniciar busca profunda
-        deep_search(api_data)
+        walk_tree(api_data, on_dict=deep_search)
         
         # FASE 4: Verificar dados específicos de forma (form)
         
@@ -3726,6 +3686,151 @@ def extract_deep_team_data(api_data, home_team_name, away_team_name, log_details
         logger.error(f"Erro durante a extração profunda: {str(e)}")
         logger.error(traceback.format_exc())
         return result       
+# Mapeamento abrangente de campo estatístico → possíveis nomes na API
+RECURSIVE_STATS_ALIASES = {
+    # Estatísticas Gerais
+    "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games", "total_matches", "games"],
+    "seasonMatchesPlayed_overall": ["seasonMatchesPlayed_overall", "matches_played", "MP", "games_played", "total_matches"],
+    "wins": ["wins", "seasonWinsNum_overall", "W", "Wins", "win", "team_wins", "won", "victorias", "vitorias"],
+    "seasonWinsNum_overall": ["seasonWinsNum_overall", "wins", "W", "won", "victorias", "total_wins"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws", "draw", "team_draws", "empates", "tied"],
+    "seasonDrawsNum_overall": ["seasonDrawsNum_overall", "draws", "D", "drawn", "empates", "total_draws"],
+    "losses": ["losses", "seasonLossesNum_overall", "L", "Losses", "loss", "team_losses", "defeats", "derrotas", "lost"],
+    "seasonLossesNum_overall": ["seasonLossesNum_overall", "losses", "L", "lost", "derrotas", "total_losses"],
+    "win_pct": ["win_percentage", "winPercentage", "win_pct", "win_rate", "victory_rate", "pct_wins"],
+    "draw_pct": ["draw_percentage", "drawPercentage", "draw_pct", "draw_rate", "pct_draws"],
+    "loss_pct": ["loss_percentage", "lossPercentage", "loss_pct", "loss_rate", "defeat_rate", "pct_losses"],
+    "form": ["form", "recent_form", "formRun_overall", "form_string", "team_form", "last_matches"],
+    "formRun_overall": ["formRun_overall", "form", "recent_form", "form_string", "overall_form"],
+    "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game", "pts_per_game", "average_points"],
+    "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg", "recent_points_per_game", "last5_ppg"],
+    "leaguePosition_overall": ["leaguePosition_overall", "league_position", "position", "rank", "table_position"],
+
+    # Casa/Fora específicos
+    "home_played": ["home_played", "seasonMatchesPlayed_home", "matches_played_home", "games_home", "home_games"],
+    "seasonMatchesPlayed_home": ["seasonMatchesPlayed_home", "home_played", "matches_played_home", "home_games"],
+    "away_played": ["away_played", "seasonMatchesPlayed_away", "matches_played_away", "games_away", "away_games"],
+    "seasonMatchesPlayed_away": ["seasonMatchesPlayed_away", "away_played", "matches_played_away", "away_games"],
+    "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home", "home_won", "victorias_casa"],
+    "seasonWinsNum_home": ["seasonWinsNum_home", "home_wins", "wins_home", "home_victories"],
+    "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away", "away_won", "victorias_fuera"],
+    "seasonWinsNum_away": ["seasonWinsNum_away", "away_wins", "wins_away", "away_victories"],
+    "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home", "home_drawn", "empates_casa"],
+    "seasonDrawsNum_home": ["seasonDrawsNum_home", "home_draws", "draws_home", "home_tied"],
+    "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away", "away_drawn", "empates_fuera"],
+    "seasonDrawsNum_away": ["seasonDrawsNum_away", "away_draws", "draws_away", "away_tied"],
+    "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home", "home_lost", "derrotas_casa"],
+    "seasonLossesNum_home": ["seasonLossesNum_home", "home_losses", "losses_home", "home_defeats"],
+    "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away", "away_lost", "derrotas_fuera"],
+    "seasonLossesNum_away": ["seasonLossesNum_away", "away_losses", "losses_away", "away_defeats"],
+    "home_form": ["home_form", "formRun_home", "form_home", "home_recent_form", "casa_forma"],
+    "formRun_home": ["formRun_home", "home_form", "form_home", "home_recent_form"],
+    "away_form": ["away_form", "formRun_away", "form_away", "away_recent_form", "fora_forma"],
+    "formRun_away": ["formRun_away", "away_form", "form_away", "away_recent_form"],
+    "seasonPPG_home": ["seasonPPG_home", "home_ppg", "points_per_game_home", "home_average_points"],
+    "seasonPPG_away": ["seasonPPG_away", "away_ppg", "points_per_game_away", "away_average_points"],
+    "leaguePosition_home": ["leaguePosition_home", "home_league_position", "position_home", "home_rank"],
+    "leaguePosition_away": ["leaguePosition_away", "away_league_position", "position_away", "away_rank"],
+
+    # Gols
+    "goals_scored": ["goals_scored", "seasonScoredNum_overall", "scored", "GF", "goals_for", "GoalsFor", "goals"],
+    "seasonScoredNum_overall": ["seasonScoredNum_overall", "goals_scored", "scored", "GF", "total_goals_for"],
+    "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "conceded", "GA", "goals_against", "GoalsAgainst"],
+    "seasonConcededNum_overall": ["seasonConcededNum_overall", "goals_conceded", "conceded", "GA", "total_goals_against"],
+    "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "goals_scored_home", "home_GF", "home_goals"],
+    "seasonScoredNum_home": ["seasonScoredNum_home", "home_goals_scored", "goals_scored_home", "home_goals_for"],
+    "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "goals_scored_away", "away_GF", "away_goals"],
+    "seasonScoredNum_away": ["seasonScoredNum_away", "away_goals_scored", "goals_scored_away", "away_goals_for"],
+    "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "goals_conceded_home", "home_GA"],
+    "seasonConcededNum_home": ["seasonConcededNum_home", "home_goals_conceded", "goals_conceded_home", "home_goals_against"],
+    "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "goals_conceded_away", "away_GA"],
+    "seasonConcededNum_away": ["seasonConcededNum_away", "away_goals_conceded", "goals_conceded_away", "away_goals_against"],
+    "goals_per_game": ["goals_per_game", "gpg", "goals_per_match", "avg_goals_for", "average_goals_scored"],
+    "conceded_per_game": ["conceded_per_game", "cpg", "conceded_per_match", "avg_goals_against", "average_goals_conceded"],
+    "seasonGoalsTotal_overall": ["seasonGoalsTotal_overall", "total_goals", "goals_total", "all_goals", "total_match_goals"],
+    "seasonGoalsTotal_home": ["seasonGoalsTotal_home", "total_goals_home", "home_goals_total", "home_match_goals"],
+    "seasonGoalsTotal_away": ["seasonGoalsTotal_away", "total_goals_away", "away_goals_total", "away_match_goals"],
+    "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct", "percentage_cs", "pct_clean_sheets"],
+    "seasonCSPercentage_overall": ["seasonCSPercentage_overall", "clean_sheet_percentage", "cs_pct", "pct_clean_sheets"],
+    "seasonCS_overall": ["seasonCS_overall", "clean_sheets", "cs", "total_clean_sheets", "shutouts"],
+    "seasonCS_home": ["seasonCS_home", "home_clean_sheets", "cs_home", "clean_sheets_home", "home_shutouts"],
+    "seasonCS_away": ["seasonCS_away", "away_clean_sheets", "cs_away", "clean_sheets_away", "away_shutouts"],
+    "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct", "pct_btts", "ambos_marcam_pct"],
+    "seasonBTTSPercentage_overall": ["seasonBTTSPercentage_overall", "btts_percentage", "both_teams_to_score_pct", "pct_btts"],
+    "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct", "pct_over_25", "mais_25_pct"],
+    "seasonOver25Percentage_overall": ["seasonOver25Percentage_overall", "over_2_5_percentage", "o25_pct", "pct_over_25"],
+
+    # Expected Goals
+    "xg": ["xg", "xG", "expected_goals", "xg_for", "ExpG", "xGF"],
+    "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals", "total_xg"],
+    "xga": ["xga", "xGA", "expected_goals_against", "xg_against", "ExpGA", "xGAg"],
+    "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against", "total_xga"],
+    "home_xg": ["home_xg", "xg_home", "xg_for_home", "home_expected_goals", "xg_h"],
+    "xg_for_home": ["xg_for_home", "home_xg", "xg_home", "home_expected_goals", "xG_home"],
+    "away_xg": ["away_xg", "xg_away", "xg_for_away", "away_expected_goals", "xg_a"],
+    "xg_for_away": ["xg_for_away", "away_xg", "xg_away", "away_expected_goals", "xG_away"],
+    "home_xga": ["home_xga", "xga_home", "xg_against_home", "home_expected_goals_against", "xGA_home"],
+    "xg_against_home": ["xg_against_home", "home_xga", "xga_home", "home_expected_goals_against"],
+    "away_xga": ["away_xga", "xga_away", "xg_against_away", "away_expected_goals_against", "xGA_away"],
+    "xg_against_away": ["xg_against_away", "away_xga", "xga_away", "away_expected_goals_against"],
+    "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game", "avg_xg", "xg_avg"],
+    "xg_for_avg_home": ["xg_for_avg_home", "xg_per_game_home", "expected_goals_per_game_home", "home_avg_xg"],
+    "xg_for_avg_away": ["xg_for_avg_away", "xg_per_game_away", "expected_goals_per_game_away", "away_avg_xg"],
+    "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game", "expected_goals_against_per_game", "avg_xga"],
+    "xg_against_avg_home": ["xg_against_avg_home", "xga_per_game_home", "expected_goals_against_per_game_home", "home_avg_xga"],
+    "xg_against_avg_away": ["xg_against_avg_away", "xga_per_game_away", "expected_goals_against_per_game_away", "away_avg_xga"],
+
+    # Cartões
+    "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards", "average_cards", "cards_per_match"],
+    "cardsAVG_overall": ["cardsAVG_overall", "cards_per_game", "cards_avg", "avg_cards", "average_cards"],
+    "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "home_cards_avg", "home_avg_cards"],
+    "cardsAVG_home": ["cardsAVG_home", "home_cards_per_game", "cards_per_game_home", "home_cards_avg"],
+    "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "away_cards_avg", "away_avg_cards"],
+    "cardsAVG_away": ["cardsAVG_away", "away_cards_per_game", "cards_per_game_away", "away_cards_avg"],
+    "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total", "cards", "all_cards"],
+    "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home", "home_cards"],
+    "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away", "away_cards"],
+    "yellow_cards": ["yellow_cards", "yellows", "cards_yellow", "CrdY", "YellowCards", "yellow"],
+    "red_cards": ["red_cards", "reds", "cards_red", "CrdR", "RedCards", "red"],
+    "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage", "o35_cards_pct", "pct_over_35_cards"],
+
+    # Escanteios
+    "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners", "average_corners", "corners_per_match"],
+    "cornersTotalAVG_overall": ["cornersTotalAVG_overall", "corners_per_game", "corners_avg", "avg_corners"],
+    "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "home_corners_avg", "home_avg_corners"],
+    "cornersTotalAVG_home": ["cornersTotalAVG_home", "home_corners_per_game", "corners_per_game_home", "home_corners_avg"],
+    "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "away_corners_avg", "away_avg_corners"],
+    "cornersTotalAVG_away": ["cornersTotalAVG_away", "away_corners_per_game", "corners_per_game_away", "away_corners_avg"],
+    "corners_for": ["corners_for", "cornersTotal_overall", "corners", "CK", "Corners", "attacking_corners"],
+    "cornersTotal_overall": ["cornersTotal_overall", "corners_for", "corners", "total_corners_for"],
+    "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total", "defensive_corners"],
+    "cornersAgainst_overall": ["cornersAgainst_overall", "corners_against", "corners_against_total"],
+    "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game", "avg_corners_for"],
+    "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home", "home_avg_corners_for"],
+    "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away", "away_avg_corners_for"],
+    "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg", "corners_against_per_game", "avg_corners_against"],
+    "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home", "corners_against_per_game_home", "home_avg_corners_against"],
+    "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away", "corners_against_per_game_away", "away_avg_corners_against"],
+    "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage", "o95_corners_pct", "pct_over_95_corners"],
+
+    # Chutes
+    "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg", "average_shots", "avg_shots"],
+    "shotsAVG_home": ["shotsAVG_home", "shots_per_game_home", "shots_avg_home", "home_avg_shots"],
+    "shotsAVG_away": ["shotsAVG_away", "shots_per_game_away", "shots_avg_away", "away_avg_shots"],
+    "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg", "shots_on_target_avg", "avg_shots_on_target"],
+    "shotsOnTargetAVG_home": ["shotsOnTargetAVG_home", "shots_on_target_per_game_home", "sot_avg_home", "home_avg_shots_on_target"],
+    "shotsOnTargetAVG_away": ["shotsOnTargetAVG_away", "shots_on_target_per_game_away", "sot_avg_away", "away_avg_shots_on_target"],
+
+    # Posse de Bola
+    "possession": ["possession", "possessionAVG_overall", "possession_avg", "avg_possession", "Poss", "posesion"],
+    "possessionAVG_overall": ["possessionAVG_overall", "possession", "possession_avg", "average_possession"],
+    "home_possession": ["home_possession", "possessionAVG_home", "possession_home", "home_poss", "casa_posesion"],
+    "possessionAVG_home": ["possessionAVG_home", "home_possession", "possession_home", "home_average_possession"],
+    "away_possession": ["away_possession", "possessionAVG_away", "possession_away", "away_poss", "fora_posesion"],
+    "possessionAVG_away": ["possessionAVG_away", "away_possession", "possession_away", "away_average_possession"]
+}
+_RECURSIVE_STATS_INDEX = AliasIndex(RECURSIVE_STATS_ALIASES)
+
 # Função para extrair estatísticas específicas dos dicionários que encontramos
 def extract_stats_recursive(source, target, path=""):
     """
@@ -3743,194 +3848,40 @@ def extract_stats_recursive(source, target, path=""):
     if not isinstance(source, dict):
         return
     
-    # Mapeamento abrangente de campo estatístico → possíveis nomes na API
-    field_mapping = {
-        # Estatísticas Gerais
-        "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games", "total_matches", "games"],
-        "seasonMatchesPlayed_overall": ["seasonMatchesPlayed_overall", "matches_played", "MP", "games_played", "total_matches"],
-        "wins": ["wins", "seasonWinsNum_overall", "W", "Wins", "win", "team_wins", "won", "victorias", "vitorias"],
-        "seasonWinsNum_overall": ["seasonWinsNum_overall", "wins", "W", "won", "victorias", "total_wins"],
-        "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws", "draw", "team_draws", "empates", "tied"],
-        "seasonDrawsNum_overall": ["seasonDrawsNum_overall", "draws", "D", "drawn", "empates", "total_draws"],
-        "losses": ["losses", "seasonLossesNum_overall", "L", "Losses", "loss", "team_losses", "defeats", "derrotas", "lost"],
-        "seasonLossesNum_overall": ["seasonLossesNum_overall", "losses", "L", "lost", "derrotas", "total_losses"],
-        "win_pct": ["win_percentage", "winPercentage", "win_pct", "win_rate", "victory_rate", "pct_wins"],
-        "draw_pct": ["draw_percentage", "drawPercentage", "draw_pct", "draw_rate", "pct_draws"],
-        "loss_pct": ["loss_percentage", "lossPercentage", "loss_pct", "loss_rate", "defeat_rate", "pct_losses"],
-        "form": ["form", "recent_form", "formRun_overall", "form_string", "team_form", "last_matches"],
-        "formRun_overall": ["formRun_overall", "form", "recent_form", "form_string", "overall_form"],
-        "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game", "pts_per_game", "average_points"],
-        "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg", "recent_points_per_game", "last5_ppg"],
-        "leaguePosition_overall": ["leaguePosition_overall", "league_position", "position", "rank", "table_position"],
-        
-        # Casa/Fora específicos
-        "home_played": ["home_played", "seasonMatchesPlayed_home", "matches_played_home", "games_home", "home_games"],
-        "seasonMatchesPlayed_home": ["seasonMatchesPlayed_home", "home_played", "matches_played_home", "home_games"],
-        "away_played": ["away_played", "seasonMatchesPlayed_away", "matches_played_away", "games_away", "away_games"],
-        "seasonMatchesPlayed_away": ["seasonMatchesPlayed_away", "away_played", "matches_played_away", "away_games"],
-        "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home", "home_won", "victorias_casa"],
-        "seasonWinsNum_home": ["seasonWinsNum_home", "home_wins", "wins_home", "home_victories"],
-        "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away", "away_won", "victorias_fuera"],
-        "seasonWinsNum_away": ["seasonWinsNum_away", "away_wins", "wins_away", "away_victories"],
-        "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home", "home_drawn", "empates_casa"],
-        "seasonDrawsNum_home": ["seasonDrawsNum_home", "home_draws", "draws_home", "home_tied"],
-        "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away", "away_drawn", "empates_fuera"],
-        "seasonDrawsNum_away": ["seasonDrawsNum_away", "away_draws", "draws_away", "away_tied"],
-        "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home", "home_lost", "derrotas_casa"],
-        "seasonLossesNum_home": ["seasonLossesNum_home", "home_losses", "losses_home", "home_defeats"],
-        "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away", "away_lost", "derrotas_fuera"],
-        "seasonLossesNum_away": ["seasonLossesNum_away", "away_losses", "losses_away", "away_defeats"],
-        "home_form": ["home_form", "formRun_home", "form_home", "home_recent_form", "casa_forma"],
-        "formRun_home": ["formRun_home", "home_form", "form_home", "home_recent_form"],
-        "away_form": ["away_form", "formRun_away", "form_away", "away_recent_form", "fora_forma"],
-        "formRun_away": ["formRun_away", "away_form", "form_away", "away_recent_form"],
-        "seasonPPG_home": ["seasonPPG_home", "home_ppg", "points_per_game_home", "home_average_points"],
-        "seasonPPG_away": ["seasonPPG_away", "away_ppg", "points_per_game_away", "away_average_points"],
-        "leaguePosition_home": ["leaguePosition_home", "home_league_position", "position_home", "home_rank"],
-        "leaguePosition_away": ["leaguePosition_away", "away_league_position", "position_away", "away_rank"],
-        
-        # Gols
-        "goals_scored": ["goals_scored", "seasonScoredNum_overall", "scored", "GF", "goals_for", "GoalsFor", "goals"],
-        "seasonScoredNum_overall": ["seasonScoredNum_overall", "goals_scored", "scored", "GF", "total_goals_for"],
-        "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "conceded", "GA", "goals_against", "GoalsAgainst"],
-        "seasonConcededNum_overall": ["seasonConcededNum_overall", "goals_conceded", "conceded", "GA", "total_goals_against"],
-        "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "goals_scored_home", "home_GF", "home_goals"],
-        "seasonScoredNum_home": ["seasonScoredNum_home", "home_goals_scored", "goals_scored_home", "home_goals_for"],
-        "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "goals_scored_away", "away_GF", "away_goals"],
-        "seasonScoredNum_away": ["seasonScoredNum_away", "away_goals_scored", "goals_scored_away", "away_goals_for"],
-        "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "goals_conceded_home", "home_GA"],
-        "seasonConcededNum_home": ["seasonConcededNum_home", "home_goals_conceded", "goals_conceded_home", "home_goals_against"],
-        "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "goals_conceded_away", "away_GA"],
-        "seasonConcededNum_away": ["seasonConcededNum_away", "away_goals_conceded", "goals_conceded_away", "away_goals_against"],
-        "goals_per_game": ["goals_per_game", "gpg", "goals_per_match", "avg_goals_for", "average_goals_scored"],
-        "conceded_per_game": ["conceded_per_game", "cpg", "conceded_per_match", "avg_goals_against", "average_goals_conceded"],
-        "seasonGoalsTotal_overall": ["seasonGoalsTotal_overall", "total_goals", "goals_total", "all_goals", "total_match_goals"],
-        "seasonGoalsTotal_home": ["seasonGoalsTotal_home", "total_goals_home", "home_goals_total", "home_match_goals"],
-        "seasonGoalsTotal_away": ["seasonGoalsTotal_away", "total_goals_away", "away_goals_total", "away_match_goals"],
-        "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct", "percentage_cs", "pct_clean_sheets"],
-        "seasonCSPercentage_overall": ["seasonCSPercentage_overall", "clean_sheet_percentage", "cs_pct", "pct_clean_sheets"],
-        "seasonCS_overall": ["seasonCS_overall", "clean_sheets", "cs", "total_clean_sheets", "shutouts"],
-        "seasonCS_home": ["seasonCS_home", "home_clean_sheets", "cs_home", "clean_sheets_home", "home_shutouts"],
-        "seasonCS_away": ["seasonCS_away", "away_clean_sheets", "cs_away", "clean_sheets_away", "away_shutouts"],
-        "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_pct", "pct_btts", "ambos_marcam_pct"],
-        "seasonBTTSPercentage_overall": ["seasonBTTSPercentage_overall", "btts_percentage", "both_teams_to_score_pct", "pct_btts"],
-        "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct", "pct_over_25", "mais_25_pct"],
-        "seasonOver25Percentage_overall": ["seasonOver25Percentage_overall", "over_2_5_percentage", "o25_pct", "pct_over_25"],
-        
-        # Expected Goals
-        "xg": ["xg", "xG", "expected_goals", "xg_for", "ExpG", "xGF"],
-        "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals", "total_xg"],
-        "xga": ["xga", "xGA", "expected_goals_against", "xg_against", "ExpGA", "xGAg"],
-        "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against", "total_xga"],
-        "home_xg": ["home_xg", "xg_home", "xg_for_home", "home_expected_goals", "xg_h"],
-        "xg_for_home": ["xg_for_home", "home_xg", "xg_home", "home_expected_goals", "xG_home"],
-        "away_xg": ["away_xg", "xg_away", "xg_for_away", "away_expected_goals", "xg_a"],
-        "xg_for_away": ["xg_for_away", "away_xg", "xg_away", "away_expected_goals", "xG_away"],
-        "home_xga": ["home_xga", "xga_home", "xg_against_home", "home_expected_goals_against", "xGA_home"],
-        "xg_against_home": ["xg_against_home", "home_xga", "xga_home", "home_expected_goals_against"],
-        "away_xga": ["away_xga", "xga_away", "xg_against_away", "away_expected_goals_against", "xGA_away"],
-        "xg_against_away": ["xg_against_away", "away_xga", "xga_away", "away_expected_goals_against"],
-        "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game", "avg_xg", "xg_avg"],
-        "xg_for_avg_home": ["xg_for_avg_home", "xg_per_game_home", "expected_goals_per_game_home", "home_avg_xg"],
-        "xg_for_avg_away": ["xg_for_avg_away", "xg_per_game_away", "expected_goals_per_game_away", "away_avg_xg"],
-        "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game", "expected_goals_against_per_game", "avg_xga"],
-        "xg_against_avg_home": ["xg_against_avg_home", "xga_per_game_home", "expected_goals_against_per_game_home", "home_avg_xga"],
-        "xg_against_avg_away": ["xg_against_avg_away", "xga_per_game_away", "expected_goals_against_per_game_away", "away_avg_xga"],
-        
-        # Cartões
-        "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards", "average_cards", "cards_per_match"],
-        "cardsAVG_overall": ["cardsAVG_overall", "cards_per_game", "cards_avg", "avg_cards", "average_cards"],
-        "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "home_cards_avg", "home_avg_cards"],
-        "cardsAVG_home": ["cardsAVG_home", "home_cards_per_game", "cards_per_game_home", "home_cards_avg"],
-        "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "away_cards_avg", "away_avg_cards"],
-        "cardsAVG_away": ["cardsAVG_away", "away_cards_per_game", "cards_per_game_away", "away_cards_avg"],
-        "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total", "cards", "all_cards"],
-        "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home", "home_cards"],
-        "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away", "away_cards"],
-        "yellow_cards": ["yellow_cards", "yellows", "cards_yellow", "CrdY", "YellowCards", "yellow"],
-        "red_cards": ["red_cards", "reds", "cards_red", "CrdR", "RedCards", "red"],
-        "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage", "o35_cards_pct", "pct_over_35_cards"],
-        
-        # Escanteios
-        "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners", "average_corners", "corners_per_match"],
-        "cornersTotalAVG_overall": ["cornersTotalAVG_overall", "corners_per_game", "corners_avg", "avg_corners"],
-        "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "home_corners_avg", "home_avg_corners"],
-        "cornersTotalAVG_home": ["cornersTotalAVG_home", "home_corners_per_game", "corners_per_game_home", "home_corners_avg"],
-        "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "away_corners_avg", "away_avg_corners"],
-        "cornersTotalAVG_away": ["cornersTotalAVG_away", "away_corners_per_game", "corners_per_game_away", "away_corners_avg"],
-        "corners_for": ["corners_for", "cornersTotal_overall", "corners", "CK", "Corners", "attacking_corners"],
-        "cornersTotal_overall": ["cornersTotal_overall", "corners_for", "corners", "total_corners_for"],
-        "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total", "defensive_corners"],
-        "cornersAgainst_overall": ["cornersAgainst_overall", "corners_against", "corners_against_total"],
-        "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game", "avg_corners_for"],
-        "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home", "home_avg_corners_for"],
-        "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away", "away_avg_corners_for"],
-        "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg", "corners_against_per_game", "avg_corners_against"],
-        "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home", "corners_against_per_game_home", "home_avg_corners_against"],
-        "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away", "corners_against_per_game_away", "away_avg_corners_against"],
-        "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage", "o95_corners_pct", "pct_over_95_corners"],
-        
-        # Chutes
-        "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg", "average_shots", "avg_shots"],
-        "shotsAVG_home": ["shotsAVG_home", "shots_per_game_home", "shots_avg_home", "home_avg_shots"],
-        "shotsAVG_away": ["shotsAVG_away", "shots_per_game_away", "shots_avg_away", "away_avg_shots"],
-        "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg", "shots_on_target_avg", "avg_shots_on_target"],
-        "shotsOnTargetAVG_home": ["shotsOnTargetAVG_home", "shots_on_target_per_game_home", "sot_avg_home", "home_avg_shots_on_target"],
-        "shotsOnTargetAVG_away": ["shotsOnTargetAVG_away", "shots_on_target_per_game_away", "sot_avg_away", "away_avg_shots_on_target"],
-        
-        # Posse de Bola
-        "possession": ["possession", "possessionAVG_overall", "possession_avg", "avg_possession", "Poss", "posesion"],
-        "possessionAVG_overall": ["possessionAVG_overall", "possession", "possession_avg", "average_possession"],
-        "home_possession": ["home_possession", "possessionAVG_home", "possession_home", "home_poss", "casa_posesion"],
-        "possessionAVG_home": ["possessionAVG_home", "home_possession", "possession_home", "home_average_possession"],
-        "away_possession": ["away_possession", "possessionAVG_away", "possession_away", "away_poss", "fora_posesion"],
-        "possessionAVG_away": ["possessionAVG_away", "away_possession", "possession_away", "away_average_possession"]
-    }
-    
-    # Extrair cada campo usando todos os nomes possíveis
-    for target_field, source_fields in field_mapping.items():
-        if target_field not in target:  # Somente se o campo ainda não existe no alvo
-            for field in source_fields:
-                if field in source:
-                    value = source[field]
-                    if value is not None and value != 'N/A' and value != '':
-                        try:
-                            # Para form e similares (campos de texto)
-                            if target_field in ["form", "home_form", "away_form", "formRun_overall", "formRun_home", "formRun_away"]:
-                                if isinstance(value, str):
-                                    target[target_field] = value[:5]  # Limitar a 5 caracteres
-                                    if target_field == "form":
-                                        logger.info(f"Encontrada forma: {value[:5]} em {path}.{field}")
-                                break
-                            
-                            # Para valores numéricos
-                            float_value = float(value)
-                            target[target_field] = float_value
-                            
-                            # Log para campos importantes (somente alguns para evitar spam)
-                            if target_field in ["played", "wins", "goals_scored", "xg", "form"]:
-                                logger.info(f"Encontrado {target_field}={float_value} em {path}.{field}")
-                                
-                            break
-                        except (ValueError, TypeError):
-                            pass
+    # Extrair cada campo ainda ausente no alvo, em uma passada pelo dicionário
+    origins = {}
+    found = _RECURSIVE_STATS_INDEX.resolve(source, skip=target, as_float=True, origins=origins)
+    for target_field, value in found.items():
+        if target_field in TEXT_FIELDS:
+            value = value[:5]  # Limitar a 5 caracteres
+            if target_field == "form":
+                logger.info(f"Encontrada forma: {value} em {path}.{origins[target_field]}")
+        elif target_field in ["played", "wins", "goals_scored", "xg"]:
+            # Log para campos importantes (somente alguns para evitar spam)
+            logger.info(f"Encontrado {target_field}={value} em {path}.{origins[target_field]}")
+        target[target_field] = value
     
     # Verificar subchaves importantes
     for subkey in ["stats", "statistics", "seasonStats", "data", "season_stats"]:
         if subkey in source and isinstance(source[subkey], dict):
             extract_stats_recursive(source[subkey], target, f"{path}.{subkey}")
-def validate_stats_for_agent(stats_data):
+def validate_stats_for_agent(stats_data, in_place=False):
     """
     Valida os dados estatísticos antes de enviar para o agente IA.
     
+    Os dados não são copiados: as verificações leem a estrutura original e
+    guardam as correções à parte (nenhuma verificação depende de uma correção
+    anterior); só as seções corrigidas ganham um dicionário novo.
+    
     Args:
         stats_data (dict): Dados formatados para enviar ao agente
+        in_place (bool): Aplicar as correções no próprio stats_data (estrutura
+            do pipeline) em vez de devolver uma cópia rasa com as seções corrigidas
         
     Returns:
         dict: Dados validados e corrigidos
     """
     import logging
-    import copy
     
     logger = logging.getLogger("valueHunter.prompt_adapter")
     
@@ -3938,16 +3889,17 @@ def validate_stats_for_agent(stats_data):
         logger.error("Dados estatísticos inválidos ou vazios")
         return stats_data
     
-    # Clonar dados para não modificar o original
-    validated_data = copy.deepcopy(stats_data)
+    # Correções por seção: {"home_team": {campo: valor}, ...}
+    corrections = {}
     
     # Verificar e corrigir problemas em cada time
     for team_key in ["home_team", "away_team"]:
-        if team_key not in validated_data:
+        if team_key not in stats_data:
             continue
             
-        team_data = validated_data[team_key]
-        team_name = validated_data.get("match_info", {}).get(team_key, "Time")
+        team_data = stats_data[team_key]
+        fixes = corrections.setdefault(team_key, {})
+        team_name = stats_data.get("match_info", {}).get(team_key, "Time")
         
         # 1. Verificar forma inválida
         if "form" in team_data:
@@ -3973,7 +3925,7 @@ def validate_stats_for_agent(stats_data):
                             new_form += "L"
                     
                     logger.info(f"Forma corrigida para {team_name}: {form} -> {new_form}")
-                    team_data["form"] = new_form
+                    fixes["form"] = new_form
         
         # 2. Verificar porcentagens inválidas
         for field in ["win_pct", "draw_pct", "loss_pct", "clean_sheets_pct", 
@@ -3981,7 +3933,7 @@ def validate_stats_for_agent(stats_data):
                     "over_9_5_corners_pct"]:
             if field in team_data and (team_data[field] < 0 or team_data[field] > 100):
                 logger.warning(f"Porcentagem inválida em {team_name}.{field}: {team_data[field]}")
-                team_data[field] = max(0, min(100, team_data[field]))
+                fixes[field] = max(0, min(100, team_data[field]))
         
         # 3. Verificar consistência entre jogos e resultados
         if "played" in team_data and team_data["played"] > 0:
@@ -3994,27 +3946,28 @@ def validate_stats_for_agent(stats_data):
                     if "win_pct" in team_data and "draw_pct" in team_data and "loss_pct" in team_data:
                         # Recalcular porcentagens com base nos jogos
                         if total > 0:
-                            team_data["win_pct"] = round((team_data["wins"] / total) * 100, 1)
-                            team_data["draw_pct"] = round((team_data["draws"] / total) * 100, 1)
-                            team_data["loss_pct"] = round((team_data["losses"] / total) * 100, 1)
+                            fixes["win_pct"] = round((team_data["wins"] / total) * 100, 1)
+                            fixes["draw_pct"] = round((team_data["draws"] / total) * 100, 1)
+                            fixes["loss_pct"] = round((team_data["losses"] / total) * 100, 1)
         
         # 4. Verificar estatísticas de gols
         if "goals_scored" in team_data and "goals_per_game" not in team_data and "played" in team_data and team_data["played"] > 0:
-            team_data["goals_per_game"] = round(team_data["goals_scored"] / team_data["played"], 2)
+            fixes["goals_per_game"] = round(team_data["goals_scored"] / team_data["played"], 2)
             
         if "goals_conceded" in team_data and "conceded_per_game" not in team_data and "played" in team_data and team_data["played"] > 0:
-            team_data["conceded_per_game"] = round(team_data["goals_conceded"] / team_data["played"], 2)
+            fixes["conceded_per_game"] = round(team_data["goals_conceded"] / team_data["played"], 2)
     
     # Verificar dados de H2H
-    if "h2h" in validated_data:
-        h2h = validated_data["h2h"]
+    if "h2h" in stats_data:
+        h2h = stats_data["h2h"]
+        fixes = corrections.setdefault("h2h", {})
         
         # Verificar se total_matches é consistente com os resultados
         if "total_matches" in h2h and "home_wins" in h2h and "away_wins" in h2h and "draws" in h2h:
             total = h2h["home_wins"] + h2h["away_wins"] + h2h["draws"]
             if h2h["total_matches"] == 0 and total > 0:
                 logger.warning(f"H2H total_matches=0 mas soma={total}")
-                h2h["total_matches"] = total
+                fixes["total_matches"] = total
             elif h2h["total_matches"] > 0 and total > 0 and abs(h2h["total_matches"] - total) > 1:
                 logger.warning(f"Discrepância em H2H: total_matches={h2h['total_matches']}, soma={total}")
                 
@@ -4027,10 +3980,20 @@ def validate_stats_for_agent(stats_data):
         for field in ["over_2_5_pct", "btts_pct"]:
             if field in h2h and (h2h[field] < 0 or h2h[field] > 100):
                 logger.warning(f"Porcentagem inválida em h2h.{field}: {h2h[field]}")
-                h2h[field] = max(0, min(100, h2h[field]))
+                fixes[field] = max(0, min(100, h2h[field]))
+    
+    validated_data = stats_data if in_place else dict(stats_data)
+    for section, fixes in corrections.items():
+        if not fixes:
+            continue
+        if in_place:
+            stats_data[section].update(fixes)
+        else:
+            validated_data[section] = {**stats_data[section], **fixes}
     
     logger.info("Validação de dados concluída com sucesso")
     return validated_data
+
 def alternative_paths_extraction(api_data, formatted_data, home_team_name, away_team_name):
     """
     Busca estatísticas em caminhos alternativos específicos de algumas APIs.
@@ -4130,6 +4093,54 @@ def alternative_paths_extraction(api_data, formatted_data, home_team_name, away_
                     target_dict = formatted_data["home_team"] if team_type == "home" else formatted_data["away_team"]
                     logger.info(f"Extraindo estatísticas de data.teams.{team_type}")
                     extract_stats_recursive(teams[team_type], target_dict, f"data.teams.{team_type}")
+# Mapeamento ampliado de campos para extração
+BASIC_TEAM_ALIASES = {
+    "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games"],
+    "wins": ["wins", "seasonWinsNum_overall", "W", "Wins"],
+    "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws"],
+    "losses": ["losses", "seasonLossesNum_overall", "L", "Defeats", "Losses"],
+    "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals", "GF"],
+    "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA"],
+    "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall"],
+    "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall"],
+    "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall"],
+    "xg": ["xG", "xg", "xg_for_overall", "expected_goals"],
+    "xga": ["xGA", "xga", "xg_against_avg_overall"],
+    "possession": ["possession", "possessionAVG_overall", "Poss"],
+    "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY"],
+    "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR"],
+    "over_3_5_cards_pct": ["over_3_5_cards_percentage"],
+    "corners_for": ["corners_for", "seasonCornersFor_overall", "CK"],
+    "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
+    "over_9_5_corners_pct": ["over_9_5_corners_percentage"],
+}
+_BASIC_TEAM_INDEX = AliasIndex(BASIC_TEAM_ALIASES)
+
+# Campos específicos para casa/fora
+BASIC_TEAM_SIDE_ALIASES = {
+    "home": {
+        "home_played": ["home_played", "matches_played_home", "seasonMatchesPlayed_home"],
+        "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
+        "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
+        "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
+        "home_goals_scored": ["home_goals_scored", "goals_scored_home", "seasonGoals_home"],
+        "home_goals_conceded": ["home_goals_conceded", "goals_conceded_home", "seasonConceded_home"],
+        "home_form": ["home_form", "formRun_home", "current_form_home"]
+    },
+    "away": {
+        "away_played": ["away_played", "matches_played_away", "seasonMatchesPlayed_away"],
+        "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
+        "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
+        "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
+        "away_goals_scored": ["away_goals_scored", "goals_scored_away", "seasonGoals_away"],
+        "away_goals_conceded": ["away_goals_conceded", "goals_conceded_away", "seasonConceded_away"],
+        "away_form": ["away_form", "formRun_away", "current_form_away"]
+    },
+}
+_BASIC_TEAM_SIDE_INDEX = {
+    side: AliasIndex({**BASIC_TEAM_ALIASES, **aliases}) for side, aliases in BASIC_TEAM_SIDE_ALIASES.items()
+}
+
 def extract_basic_stats_team(team_data, target_dict, team_type):
     """
     Extrai estatísticas básicas de um time a partir de basic_stats
@@ -4164,73 +4175,56 @@ def extract_basic_stats_team(team_data, target_dict, team_type):
     if stats_data is None:
         stats_data = team_data
     
-    # Mapeamento ampliado de campos para extração
-    field_mapping = {
-        "played": ["played", "matches_played", "seasonMatchesPlayed_overall", "MP", "PJ", "Games"],
-        "wins": ["wins", "seasonWinsNum_overall", "W", "Wins"],
-        "draws": ["draws", "seasonDrawsNum_overall", "D", "Draws"],
-        "losses": ["losses", "seasonLossesNum_overall", "L", "Defeats", "Losses"],
-        "goals_scored": ["goals_scored", "seasonGoals_overall", "Gls", "goals", "GF"],
-        "goals_conceded": ["goals_conceded", "seasonConceded_overall", "GA"],
-        "clean_sheets_pct": ["clean_sheet_percentage", "seasonCSPercentage_overall"],
-        "btts_pct": ["btts_percentage", "seasonBTTSPercentage_overall"],
-        "over_2_5_pct": ["over_2_5_percentage", "seasonOver25Percentage_overall"],
-        "xg": ["xG", "xg", "xg_for_overall", "expected_goals"],
-        "xga": ["xGA", "xga", "xg_against_avg_overall"],
-        "possession": ["possession", "possessionAVG_overall", "Poss"],
-        "yellow_cards": ["yellow_cards", "seasonCrdYNum_overall", "CrdY"],
-        "red_cards": ["red_cards", "seasonCrdRNum_overall", "CrdR"],
-        "over_3_5_cards_pct": ["over_3_5_cards_percentage"],
-        "corners_for": ["corners_for", "seasonCornersFor_overall", "CK"],
-        "corners_against": ["corners_against", "seasonCornersAgainst_overall"],
-        "over_9_5_corners_pct": ["over_9_5_corners_percentage"],
-    }
-    
-    # Adicionar campos específicos para casa/fora
-    if team_type == "home":
-        specific = {
-            "home_played": ["home_played", "matches_played_home", "seasonMatchesPlayed_home"],
-            "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home"],
-            "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home"],
-            "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home"],
-            "home_goals_scored": ["home_goals_scored", "goals_scored_home", "seasonGoals_home"],
-            "home_goals_conceded": ["home_goals_conceded", "goals_conceded_home", "seasonConceded_home"],
-            "home_form": ["home_form", "formRun_home", "current_form_home"]
-        }
-        field_mapping.update(specific)
-    elif team_type == "away":
-        specific = {
-            "away_played": ["away_played", "matches_played_away", "seasonMatchesPlayed_away"],
-            "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away"],
-            "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away"],
-            "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away"],
-            "away_goals_scored": ["away_goals_scored", "goals_scored_away", "seasonGoals_away"],
-            "away_goals_conceded": ["away_goals_conceded", "goals_conceded_away", "seasonConceded_away"],
-            "away_form": ["away_form", "formRun_away", "current_form_away"]
-        }
-        field_mapping.update(specific)
-    
-    # Extrair cada campo
-    for target_field, source_fields in field_mapping.items():
-        for field in source_fields:
-            if field in stats_data:
-                value = stats_data[field]
-                try:
-                    if isinstance(value, (int, float)) and value != 0:
-                        target_dict[target_field] = value
-                        break
-                    elif isinstance(value, str) and field in ["form", "home_form", "away_form"]:
-                        if value not in ["", "?????"]:
-                            target_dict[target_field] = value
-                            break
-                    else:
-                        # Tentar converter para número
-                        numeric_value = float(value)
-                        if numeric_value != 0:
-                            target_dict[target_field] = numeric_value
-                            break
-                except (ValueError, TypeError):
-                    pass
+    # Extrair cada campo (valores zero e forma vazia são ignorados)
+    index = _BASIC_TEAM_SIDE_INDEX.get(team_type, _BASIC_TEAM_INDEX)
+    target_dict.update(index.resolve(stats_data, skip_empty=True))
+
+# Lista abrangente de campos para extrair
+STATS_TEAM_ALIASES = {
+    "played": ["played", "matches_played", "games", "total_matches", "MP", "PJ"],
+    "wins": ["wins", "W", "won", "total_wins"],
+    "draws": ["draws", "D", "drawn", "total_draws"],
+    "losses": ["losses", "L", "lost", "defeats", "total_losses"],
+    "goals_scored": ["goals_scored", "scored", "goals_for", "GF", "goals"],
+    "goals_conceded": ["goals_conceded", "conceded", "goals_against", "GA"],
+    "clean_sheets_pct": ["clean_sheet_percentage", "clean_sheets_pct", "cs_pct"],
+    "btts_pct": ["btts_percentage", "btts_pct", "both_teams_scored_pct"],
+    "over_2_5_pct": ["over_2_5_percentage", "over_2_5_pct", "o25_pct"],
+    "xg": ["xg", "xG", "expected_goals", "xGF"],
+    "xga": ["xga", "xGA", "expected_goals_against", "xGAg"],
+    "possession": ["possession", "possessionAVG", "Poss", "ball_possession"],
+    "yellow_cards": ["yellow_cards", "yellows", "YellowCards"],
+    "red_cards": ["red_cards", "reds", "RedCards"],
+    "corners_for": ["corners_for", "corners", "CK", "attacking_corners"],
+    "corners_against": ["corners_against", "defensive_corners"],
+    "form": ["form", "recent_form", "last_matches"]
+}
+_STATS_TEAM_INDEX = AliasIndex(STATS_TEAM_ALIASES)
+
+# Campos específicos para casa/fora
+STATS_TEAM_SIDE_ALIASES = {
+    "home": {
+        "home_played": ["home_played", "home_matches", "matches_home"],
+        "home_wins": ["home_wins", "wins_home", "home_won"],
+        "home_draws": ["home_draws", "draws_home", "home_drawn"],
+        "home_losses": ["home_losses", "losses_home", "home_lost"],
+        "home_goals_scored": ["home_goals_scored", "goals_home", "home_goals"],
+        "home_goals_conceded": ["home_goals_conceded", "conceded_home", "home_conceded"],
+        "home_form": ["home_form", "form_home", "home_recent_results"]
+    },
+    "away": {
+        "away_played": ["away_played", "away_matches", "matches_away"],
+        "away_wins": ["away_wins", "wins_away", "away_won"],
+        "away_draws": ["away_draws", "draws_away", "away_drawn"],
+        "away_losses": ["away_losses", "losses_away", "away_lost"],
+        "away_goals_scored": ["away_goals_scored", "goals_away", "away_goals"],
+        "away_goals_conceded": ["away_goals_conceded", "conceded_away", "away_conceded"],
+        "away_form": ["away_form", "form_away", "away_recent_results"]
+    },
+}
+_STATS_TEAM_SIDE_INDEX = {
+    side: AliasIndex({**STATS_TEAM_ALIASES, **aliases}) for side, aliases in STATS_TEAM_SIDE_ALIASES.items()
+}
 
 def extract_stats_team(stats_data, target_dict, team_type):
     """
@@ -4244,72 +4238,21 @@ def extract_stats_team(stats_data, target_dict, team_type):
     if not stats_data or not isinstance(stats_data, dict):
         return
     
-    # Lista abrangente de campos para extrair
-    field_mapping = {
-        "played": ["played", "matches_played", "games", "total_matches", "MP", "PJ"],
-        "wins": ["wins", "W", "won", "total_wins"],
-        "draws": ["draws", "D", "drawn", "total_draws"],
-        "losses": ["losses", "L", "lost", "defeats", "total_losses"],
-        "goals_scored": ["goals_scored", "scored", "goals_for", "GF", "goals"],
-        "goals_conceded": ["goals_conceded", "conceded", "goals_against", "GA"],
-        "clean_sheets_pct": ["clean_sheet_percentage", "clean_sheets_pct", "cs_pct"],
-        "btts_pct": ["btts_percentage", "btts_pct", "both_teams_scored_pct"],
-        "over_2_5_pct": ["over_2_5_percentage", "over_2_5_pct", "o25_pct"],
-        "xg": ["xg", "xG", "expected_goals", "xGF"],
-        "xga": ["xga", "xGA", "expected_goals_against", "xGAg"],
-        "possession": ["possession", "possessionAVG", "Poss", "ball_possession"],
-        "yellow_cards": ["yellow_cards", "yellows", "YellowCards"],
-        "red_cards": ["red_cards", "reds", "RedCards"],
-        "corners_for": ["corners_for", "corners", "CK", "attacking_corners"],
-        "corners_against": ["corners_against", "defensive_corners"],
-        "form": ["form", "recent_form", "last_matches"]
-    }
-    
-    # Adicionar campos específicos para casa/fora
-    if team_type == "home":
-        specific = {
-            "home_played": ["home_played", "home_matches", "matches_home"],
-            "home_wins": ["home_wins", "wins_home", "home_won"],
-            "home_draws": ["home_draws", "draws_home", "home_drawn"],
-            "home_losses": ["home_losses", "losses_home", "home_lost"],
-            "home_goals_scored": ["home_goals_scored", "goals_home", "home_goals"],
-            "home_goals_conceded": ["home_goals_conceded", "conceded_home", "home_conceded"],
-            "home_form": ["home_form", "form_home", "home_recent_results"]
-        }
-        field_mapping.update(specific)
-    elif team_type == "away":
-        specific = {
-            "away_played": ["away_played", "away_matches", "matches_away"],
-            "away_wins": ["away_wins", "wins_away", "away_won"],
-            "away_draws": ["away_draws", "draws_away", "away_drawn"],
-            "away_losses": ["away_losses", "losses_away", "away_lost"],
-            "away_goals_scored": ["away_goals_scored", "goals_away", "away_goals"],
-            "away_goals_conceded": ["away_goals_conceded", "conceded_away", "away_conceded"],
-            "away_form": ["away_form", "form_away", "away_recent_results"]
-        }
-        field_mapping.update(specific)
-    
-    # Extrair cada campo
-    for target_field, source_fields in field_mapping.items():
-        for field in source_fields:
-            if field in stats_data:
-                value = stats_data[field]
-                try:
-                    if isinstance(value, (int, float)) and value != 0:
-                        target_dict[target_field] = value
-                        break
-                    elif isinstance(value, str) and field in ["form", "home_form", "away_form"]:
-                        if value not in ["", "?????"]:
-                            target_dict[target_field] = value
-                            break
-                    else:
-                        # Tentar converter para número
-                        numeric_value = float(value)
-                        if numeric_value != 0:
-                            target_dict[target_field] = numeric_value
-                            break
-                except (ValueError, TypeError):
-                    pass
+    # Extrair cada campo (valores zero e forma vazia são ignorados)
+    index = _STATS_TEAM_SIDE_INDEX.get(team_type, _STATS_TEAM_INDEX)
+    target_dict.update(index.resolve(stats_data, skip_empty=True))
+
+# Mapeamento de métricas avançadas
+ADVANCED_METRICS_ALIASES = {
+    "xg": ["xg", "xG", "expected_goals"],
+    "xga": ["xga", "xGA", "expected_goals_against"],
+    "ppda": ["ppda", "passes_per_defensive_action", "PPDA"],
+    "possession": ["possession", "possessionAVG", "ball_possession"],
+    "deep_completions": ["deep_completions", "deep_passes"],
+    "progressive_passes": ["progressive_passes", "prog_passes"],
+    "field_tilt": ["field_tilt", "territory"]
+}
+_ADVANCED_METRICS_INDEX = AliasIndex(ADVANCED_METRICS_ALIASES)
 
 def extract_advanced_metrics(target_dict, advanced_data):
     """
@@ -4322,34 +4265,8 @@ def extract_advanced_metrics(target_dict, advanced_data):
     if not advanced_data or not isinstance(advanced_data, dict):
         return
     
-    # Mapeamento de métricas avançadas
-    metrics = {
-        "xg": ["xg", "xG", "expected_goals"],
-        "xga": ["xga", "xGA", "expected_goals_against"],
-        "ppda": ["ppda", "passes_per_defensive_action", "PPDA"],
-        "possession": ["possession", "possessionAVG", "ball_possession"],
-        "deep_completions": ["deep_completions", "deep_passes"],
-        "progressive_passes": ["progressive_passes", "prog_passes"],
-        "field_tilt": ["field_tilt", "territory"]
-    }
-    
-    # Extrair cada métrica
-    for target_field, source_fields in metrics.items():
-        for field in source_fields:
-            if field in advanced_data:
-                value = advanced_data[field]
-                try:
-                    if isinstance(value, (int, float)) and value != 0:
-                        target_dict[target_field] = value
-                        break
-                    else:
-                        # Tentar converter para número
-                        numeric_value = float(value)
-                        if numeric_value != 0:
-                            target_dict[target_field] = numeric_value
-                            break
-                except (ValueError, TypeError):
-                    pass
+    # Extrair cada métrica (valores zero são ignorados)
+    target_dict.update(_ADVANCED_METRICS_INDEX.resolve(advanced_data, skip_empty=True))
 
 def count_non_zero_fields(data_dict):
     """
@@ -4418,7 +4335,51 @@ def extract_all_fields_direct(api_data, result_dict):
     h2h_fields = sum(1 for v in result_dict["h2h"].values() if v != 0)
     
     logger.info(f"Campos extraídos diretamente: Casa={home_fields}, Visitante={away_fields}, H2H={h2h_fields}")
-def simplify_api_data(api_data, home_team_name, away_team_name):
+def fill_derived_team_fields(team, played=None):
+    """
+    Percentuais e médias por jogo ausentes, calculados a partir dos totais (altera team)
+    
+    Args:
+        team (dict): Campos do time
+        played (float, optional): Jogos disputados quando não estão em team
+            (campos resolvidos sob demanda)
+        
+    Returns:
+        dict: O próprio team
+    """
+    if played is None:
+        played = team.get("played")
+    if played is None or not played > 0:
+        return team
+    
+    # Calculate percentages
+    if "wins" in team and "win_pct" not in team:
+        team["win_pct"] = (team["wins"] / played) * 100
+        
+    if "draws" in team and "draw_pct" not in team:
+        team["draw_pct"] = (team["draws"] / played) * 100
+        
+    if "losses" in team and "loss_pct" not in team:
+        team["loss_pct"] = (team["losses"] / played) * 100
+    
+    # Calculate per-game stats
+    if "goals_scored" in team and "goals_per_game" not in team:
+        team["goals_per_game"] = team["goals_scored"] / played
+        
+    if "goals_conceded" in team and "conceded_per_game" not in team:
+        team["conceded_per_game"] = team["goals_conceded"] / played
+        
+    # Calculate cards per game
+    if "cardsTotal_overall" in team and "cards_per_game" not in team:
+        team["cards_per_game"] = team["cardsTotal_overall"] / played
+        
+    # Calculate corners per game
+    if "cornersTotal_overall" in team and "corners_per_game" not in team:
+        team["corners_per_game"] = team["cornersTotal_overall"] / played
+    
+    return team
+
+def simplify_api_data(api_data, home_team_name, away_team_name, selected_markets=None):
     """
     Advanced data extraction - thoroughly searches all nested structures
     for essential football statistics.
@@ -4427,6 +4388,9 @@ def simplify_api_data(api_data, home_team_name, away_team_name):
         api_data (dict): Original API data from FootyStats
         home_team_name (str): Name of home team
         away_team_name (str): Name of away team
+        selected_markets (dict, optional): Mercados selecionados; só os campos
+            deles e das entradas do motor de probabilidades são extraídos na
+            hora, os demais sob demanda (None = extração completa)
         
     Returns:
         dict: Data structure with all essential fields
@@ -4462,296 +4426,44 @@ def simplify_api_data(api_data, home_team_name, away_team_name):
     # Log API data structure
     logger.info(f"API data keys: {list(api_data.keys())}")
     
-    # Helper function to recursively search for fields in a structure
-    def deep_search(obj, path="", home_data=None, away_data=None, h2h_data=None):
-        if home_data is None: home_data = {}
-        if away_data is None: away_data = {}
-        if h2h_data is None: h2h_data = {}
-        
-        if isinstance(obj, dict):
-            # Log if this object contains important information
-            if any(key in obj for key in ["played", "wins", "form", "xg", "cards", "corners"]):
-                logger.info(f"Found potential stats at path: {path}")
-                
-            # Check if this is team-specific data
-            is_home = False
-            is_away = False
-            is_h2h = False
-            
-            if "name" in obj and isinstance(obj["name"], str):
-                # By team name
-                if home_team_name.lower() in obj["name"].lower():
-                    is_home = True
-                    logger.info(f"Found home team by name at {path}")
-                elif away_team_name.lower() in obj["name"].lower():
-                    is_away = True
-                    logger.info(f"Found away team by name at {path}")
-            
-            # By path name
-            if not (is_home or is_away):
-                if "home" in path.lower():
-                    is_home = True
-                elif "away" in path.lower():
-                    is_away = True
-                    
-            # Check if this is H2H data
-            if "h2h" in path.lower() or "head" in path.lower() or "vs" in path.lower():
-                is_h2h = True
-                
-            # Process the data according to its type
-            if is_home:
-                extract_team_fields(obj, home_data)
-            elif is_away:
-                extract_team_fields(obj, away_data)
-            elif is_h2h:
-                extract_h2h_fields(obj, h2h_data)
-            
-            # Continue searching in all keys
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                deep_search(value, new_path, home_data, away_data, h2h_data)
-                
-        elif isinstance(obj, list):
-            # Search in list items
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                deep_search(item, new_path, home_data, away_data, h2h_data)
-        
-        return home_data, away_data, h2h_data
-    
-    # Helper to extract team fields with many variant names
-    def extract_team_fields(source, target):
-        if not source or not isinstance(source, dict):
-            return
-            
-        # Comprehensive field mapping with all possible variant names
-        field_mappings = {
-            # Basic stats
-            "played": ["played", "matches_played", "matchesPlayed", "seasonMatchesPlayed_overall", "MP", "games"],
-            "wins": ["wins", "seasonWinsNum_overall", "W", "victories", "won", "team_wins"],
-            "draws": ["draws", "seasonDrawsNum_overall", "D", "drawn", "empates", "team_draws"],
-            "losses": ["losses", "seasonLossesNum_overall", "L", "defeats", "lost", "derrotas"],
-            "goals_scored": ["goals_scored", "seasonScoredNum_overall", "GF", "goals_for", "goalsFor", "goals"],
-            "goals_conceded": ["goals_conceded", "seasonConcededNum_overall", "GA", "goals_against", "goalsAgainst"],
-            
-            # Form/Runs
-            "form": ["form", "recent_form", "last5", "team_form", "current_form"],
-            "formRun_overall": ["formRun_overall", "form_run", "form_string", "recent_results"],
-            
-            # Percentages
-            "win_pct": ["win_pct", "winPercentage", "win_percentage", "victory_percentage"],
-            "draw_pct": ["draw_pct", "drawPercentage", "draw_percentage"],
-            "loss_pct": ["loss_pct", "lossPercentage", "loss_percentage", "defeat_percentage"],
-            "clean_sheets_pct": ["clean_sheets_pct", "clean_sheet_percentage", "cs_pct", "seasonCSPercentage_overall"],
-            "btts_pct": ["btts_pct", "btts_percentage", "both_teams_to_score_pct", "seasonBTTSPercentage_overall"],
-            "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "o25_pct", "seasonOver25Percentage_overall"],
-            
-            # Points per game
-            "seasonPPG_overall": ["seasonPPG_overall", "ppg", "points_per_game", "pts_per_game"],
-            "seasonRecentPPG": ["seasonRecentPPG", "recent_ppg", "last5_ppg"],
-            
-            # League position
-            "leaguePosition_overall": ["leaguePosition_overall", "league_position", "position", "rank"],
-            
-            # Home stats
-            "home_played": ["home_played", "seasonMatchesPlayed_home", "home_matches", "matches_home"],
-            "home_wins": ["home_wins", "seasonWinsNum_home", "wins_home", "home_victories"],
-            "home_draws": ["home_draws", "seasonDrawsNum_home", "draws_home", "home_drawn"],
-            "home_losses": ["home_losses", "seasonLossesNum_home", "losses_home", "home_lost"],
-            "home_goals_scored": ["home_goals_scored", "seasonScoredNum_home", "home_goals_for", "goals_for_home"],
-            "home_goals_conceded": ["home_goals_conceded", "seasonConcededNum_home", "home_goals_against"],
-            "home_form": ["home_form", "formRun_home", "home_recent_form", "form_home"],
-            "formRun_home": ["formRun_home", "home_form_run", "home_form_string"],
-            
-            # Away stats
-            "away_played": ["away_played", "seasonMatchesPlayed_away", "away_matches", "matches_away"],
-            "away_wins": ["away_wins", "seasonWinsNum_away", "wins_away", "away_victories"],
-            "away_draws": ["away_draws", "seasonDrawsNum_away", "draws_away", "away_drawn"],
-            "away_losses": ["away_losses", "seasonLossesNum_away", "losses_away", "away_lost"],
-            "away_goals_scored": ["away_goals_scored", "seasonScoredNum_away", "away_goals_for", "goals_for_away"],
-            "away_goals_conceded": ["away_goals_conceded", "seasonConcededNum_away", "away_goals_against"],
-            "away_form": ["away_form", "formRun_away", "away_recent_form", "form_away"],
-            "formRun_away": ["formRun_away", "away_form_run", "away_form_string"],
-            
-            # xG stats (VERY IMPORTANT)
-            "xg": ["xg", "xG", "expected_goals", "xg_for", "xGF"],
-            "xg_for_overall": ["xg_for_overall", "xg", "xG", "expected_goals"],
-            "xga": ["xga", "xGA", "expected_goals_against", "xg_against", "xGAg"],
-            "xg_against_overall": ["xg_against_overall", "xga", "xGA", "expected_goals_against"],
-            "home_xg": ["home_xg", "xg_home", "xg_for_home", "home_expected_goals"],
-            "xg_for_home": ["xg_for_home", "home_xg", "xg_home", "home_expected_goals"],
-            "away_xg": ["away_xg", "xg_away", "xg_for_away", "away_expected_goals"],
-            "xg_for_away": ["xg_for_away", "away_xg", "xg_away", "away_expected_goals"],
-            "home_xga": ["home_xga", "xga_home", "xg_against_home"],
-            "xg_against_home": ["xg_against_home", "home_xga", "xga_home"],
-            "away_xga": ["away_xga", "xga_away", "xg_against_away"],
-            "xg_against_away": ["xg_against_away", "away_xga", "xga_away"],
-            "xg_for_avg_overall": ["xg_for_avg_overall", "xg_per_game", "expected_goals_per_game"],
-            "xg_against_avg_overall": ["xg_against_avg_overall", "xga_per_game"],
-            
-            # Card stats (IMPORTANT)
-            "cards_per_game": ["cards_per_game", "cards_avg", "avg_cards", "cardsAVG_overall"],
-            "home_cards_per_game": ["home_cards_per_game", "cards_per_game_home", "cardsAVG_home"],
-            "away_cards_per_game": ["away_cards_per_game", "cards_per_game_away", "cardsAVG_away"],
-            "cardsTotal_overall": ["cardsTotal_overall", "total_cards", "cards_total", "cards"],
-            "cardsTotal_home": ["cardsTotal_home", "total_cards_home", "cards_total_home"],
-            "cardsTotal_away": ["cardsTotal_away", "total_cards_away", "cards_total_away"],
-            "yellow_cards": ["yellow_cards", "yellows", "cards_yellow", "CrdY", "YellowCards"],
-            "red_cards": ["red_cards", "reds", "cards_red", "CrdR", "RedCards"],
-            "over_3_5_cards_pct": ["over_3_5_cards_pct", "over_3_5_cards_percentage"],
-            
-            # Corner stats (IMPORTANT)
-            "corners_per_game": ["corners_per_game", "corners_avg", "avg_corners", "cornersTotalAVG_overall"],
-            "home_corners_per_game": ["home_corners_per_game", "corners_per_game_home", "cornersTotalAVG_home"],
-            "away_corners_per_game": ["away_corners_per_game", "corners_per_game_away", "cornersTotalAVG_away"],
-            "corners_for": ["corners_for", "cornersTotal_overall", "corners", "CK", "Corners"],
-            "corners_against": ["corners_against", "cornersAgainst_overall", "corners_against_total"],
-            "cornersAVG_overall": ["cornersAVG_overall", "corners_for_avg", "corners_for_per_game"],
-            "cornersAVG_home": ["cornersAVG_home", "corners_for_avg_home", "corners_for_per_game_home"],
-            "cornersAVG_away": ["cornersAVG_away", "corners_for_avg_away", "corners_for_per_game_away"],
-            "cornersAgainstAVG_overall": ["cornersAgainstAVG_overall", "corners_against_avg"],
-            "cornersAgainstAVG_home": ["cornersAgainstAVG_home", "corners_against_avg_home"],
-            "cornersAgainstAVG_away": ["cornersAgainstAVG_away", "corners_against_avg_away"],
-            "over_9_5_corners_pct": ["over_9_5_corners_pct", "over_9_5_corners_percentage"],
-            
-            # Other important stats
-            "shotsAVG_overall": ["shotsAVG_overall", "shots_per_game", "shots_avg"],
-            "shotsOnTargetAVG_overall": ["shotsOnTargetAVG_overall", "shots_on_target_per_game", "sot_avg"],
-            "possession": ["possession", "possessionAVG_overall", "possession_avg", "Poss"]
-        }
-        
-        # Extract each field with all possible names
-        for target_field, possible_names in field_mappings.items():
-            for name in possible_names:
-                if name in source and source[name] is not None and source[name] != 'N/A' and source[name] != '':
-                    try:
-                        # Special handling for form fields
-                        if target_field in ["form", "home_form", "away_form", "formRun_overall", "formRun_home", "formRun_away"]:
-                            if isinstance(source[name], str):
-                                target[target_field] = source[name]
-                                logger.info(f"Found {target_field}={source[name]}")
-                                break
-                        # Numeric fields
-                        elif isinstance(source[name], (int, float)):
-                            target[target_field] = source[name]
-                            break
-                        else:
-                            # Try to convert to number
-                            target[target_field] = float(source[name])
-                            break
-                    except (ValueError, TypeError):
-                        # Skip if conversion fails
-                        pass
-        
-        # Also check for stats in sub-dictionaries
-        for subkey in ["stats", "statistics", "seasonStats", "additional_info"]:
-            if subkey in source and isinstance(source[subkey], dict):
-                extract_team_fields(source[subkey], target)
-    
-    # Helper to extract H2H fields
-    def extract_h2h_fields(source, target):
-        if not source or not isinstance(source, dict):
-            return
-            
-        # H2H field mappings
-        h2h_mappings = {
-            "total_matches": ["total_matches", "matches", "total", "matches_played", "numberOfMatches"],
-            "home_wins": ["home_wins", "homeWins", "home_team_wins", "team_a_wins", "local_wins"],
-            "away_wins": ["away_wins", "awayWins", "away_team_wins", "team_b_wins", "visitor_wins"],
-            "draws": ["draws", "draw", "empates", "equal", "tied", "drawn"],
-            "avg_goals": ["avg_goals", "average_goals", "goals_avg", "goals_per_match", "mean_goals"],
-            "over_2_5_pct": ["over_2_5_pct", "over_2_5_percentage", "over25_percentage", "o25_pct"],
-            "btts_pct": ["btts_pct", "btts_percentage", "both_teams_scored_percentage", "both_score_pct"],
-            "avg_cards": ["avg_cards", "average_cards", "cards_avg", "cards_per_match", "mean_cards"],
-            "avg_corners": ["avg_corners", "average_corners", "corners_avg", "corners_per_match"]
-        }
-        
-        # Extract each H2H field
-        for target_field, possible_names in h2h_mappings.items():
-            for name in possible_names:
-                if name in source and source[name] is not None and source[name] != 'N/A' and source[name] != '':
-                    try:
-                        if isinstance(source[name], (int, float)):
-                            target[target_field] = source[name]
-                            break
-                        else:
-                            # Try to convert to number
-                            target[target_field] = float(source[name])
-                            break
-                    except (ValueError, TypeError):
-                        # Skip if conversion fails
-                        pass
-    
-    # First, search known paths directly
-    logger.info("Search phase 1: checking known direct paths")
-    
-    # Home team
-    if "home_team" in api_data and isinstance(api_data["home_team"], dict):
-        extract_team_fields(api_data["home_team"], simplified_data["home_team"])
-    
-    # Away team
-    if "away_team" in api_data and isinstance(api_data["away_team"], dict):
-        extract_team_fields(api_data["away_team"], simplified_data["away_team"])
-    
-    # H2H
-    if "h2h" in api_data and isinstance(api_data["h2h"], dict):
-        extract_h2h_fields(api_data["h2h"], simplified_data["h2h"])
-    
-    # Check basic_stats structure
-    if "basic_stats" in api_data:
-        if "home_team" in api_data["basic_stats"]:
-            extract_team_fields(api_data["basic_stats"]["home_team"], simplified_data["home_team"])
-        if "away_team" in api_data["basic_stats"]:
-            extract_team_fields(api_data["basic_stats"]["away_team"], simplified_data["away_team"])
-        if "h2h" in api_data["basic_stats"]:
-            extract_h2h_fields(api_data["basic_stats"]["h2h"], simplified_data["h2h"])
-    
-    # Now do a deep recursive search
-    logger.info("Search phase 2: deep recursive search")
-    home_deep, away_deep, h2h_deep = deep_search(api_data)
-    
-    # Merge the results from deep search with simplified_data
-    for key, value in home_deep.items():
-        if key not in simplified_data["home_team"] or simplified_data["home_team"][key] == 0:
-            simplified_data["home_team"][key] = value
-    
-    for key, value in away_deep.items():
-        if key not in simplified_data["away_team"] or simplified_data["away_team"][key] == 0:
-            simplified_data["away_team"][key] = value
-    
-    for key, value in h2h_deep.items():
-        if key not in simplified_data["h2h"] or simplified_data["h2h"][key] == 0:
-            simplified_data["h2h"][key] = value
+    # Extração pelo plano compilado (caminhos conhecidos do payload); a busca
+    # genérica na árvore inteira só roda se faltarem campos essenciais
+    from utils.extraction_plan import extract_with_plan, fields_for_markets, defer_team_fields
+    fields = None
+    if selected_markets is not None:
+        from utils.team_features import engine_features
+        fields = fields_for_markets(selected_markets, required=engine_features(selected_markets))
+    home_data, away_data, h2h_data = extract_with_plan(api_data, home_team_name, away_team_name, fields)
+    simplified_data["home_team"].update(home_data)
+    simplified_data["away_team"].update(away_data)
+    simplified_data["h2h"].update(h2h_data)
+    
+    # H2H do histórico local de partidas (utils/h2h_store.py), quando ele tem
+    # mais confrontos que o payload (match_details.h2h só vem com o match_id)
+    from utils.h2h_store import stored_h2h_for_payload
+    stored_h2h = stored_h2h_for_payload(api_data)
+    if stored_h2h and stored_h2h["total_matches"] > (simplified_data["h2h"].get("total_matches") or 0):
+        simplified_data["h2h"].update(stored_h2h)
+        logger.info(f"H2H do histórico local: {stored_h2h['total_matches']} confrontos")
+    
+    # Forma, médias móveis e calendário das janelas locais por time (utils/rolling_features.py)
+    from utils.rolling_features import stored_features_for_payload, merge_rolling_features
+    stored_features = stored_features_for_payload(api_data)
+    if stored_features:
+        for team_key, features in zip(("home_team", "away_team"), stored_features):
+            if features:
+                merge_rolling_features(simplified_data[team_key], features)
+    
+    # Ratings Elo do histórico local (utils/team_ratings.py)
+    from utils.team_ratings import stored_ratings_for_payload
+    stored_ratings = stored_ratings_for_payload(api_data)
+    if stored_ratings:
+        simplified_data["home_team"].update(stored_ratings[0])
+        simplified_data["away_team"].update(stored_ratings[1])
     
     # Calculate any missing fields if we have the necessary data
     for team_key in ["home_team", "away_team"]:
-        team = simplified_data[team_key]
-        
-        # Calculate percentages
-        if "played" in team and team["played"] > 0:
-            if "wins" in team and "win_pct" not in team:
-                team["win_pct"] = (team["wins"] / team["played"]) * 100
-                
-            if "draws" in team and "draw_pct" not in team:
-                team["draw_pct"] = (team["draws"] / team["played"]) * 100
-                
-            if "losses" in team and "loss_pct" not in team:
-                team["loss_pct"] = (team["losses"] / team["played"]) * 100
-            
-            # Calculate per-game stats
-            if "goals_scored" in team and "goals_per_game" not in team:
-                team["goals_per_game"] = team["goals_scored"] / team["played"]
-                
-            if "goals_conceded" in team and "conceded_per_game" not in team:
-                team["conceded_per_game"] = team["goals_conceded"] / team["played"]
-                
-            # Calculate cards per game
-            if "cardsTotal_overall" in team and "cards_per_game" not in team:
-                team["cards_per_game"] = team["cardsTotal_overall"] / team["played"]
-                
-            # Calculate corners per game
-            if "cornersTotal_overall" in team and "corners_per_game" not in team:
-                team["corners_per_game"] = team["cornersTotal_overall"] / team["played"]
+        fill_derived_team_fields(simplified_data[team_key])
     
     # Log what we found
     home_count = sum(1 for k, v in simplified_data["home_team"].items() 
@@ -4770,6 +4482,16 @@ def simplify_api_data(api_data, home_team_name, away_team_name):
     logger.info(f"Home team keys: {list(simplified_data['home_team'].keys())}")
     logger.info(f"Away team keys: {list(simplified_data['away_team'].keys())}")
     
+    # Campos dos mercados não selecionados: resolvidos só se forem lidos, com
+    # as médias por jogo que dependem deles (ex.: cards_per_game) calculadas na resolução
+    if fields is not None:
+        for team_key in ["home_team", "away_team"]:
+            team = simplified_data[team_key]
+            simplified_data[team_key] = defer_team_fields(
+                team, api_data, team_key, fields,
+                complete=lambda values, played=team.get("played"): fill_derived_team_fields(values, played)
+            )
+    
     # Final backup: check if API data is exactly what we want already
     if "match_info" in api_data and "home_team" in api_data and "away_team" in api_data and "h2h" in api_data:
         logger.info("API data already in correct format, using directly")
@@ -4796,3 +4518,35 @@ def simplify_api_data(api_data, home_team_name, away_team_name):
     simplified_data["away_team"]["name"] = away_team_name
     
     return simplified_data
+
+
+def extract_team_features(simplified_data, selected_markets=None):
+    """
+    Constrói os registros tipados (TeamFeatures) dos dois times uma única vez,
+    a partir da saída de simplify_api_data, para os cálculos de probabilidade
+
+    Args:
+        simplified_data (dict): Dados simplificados com home_team e away_team
+        selected_markets (dict, optional): Mercados selecionados; só as entradas
+            do motor para eles são lidas (None = todas)
+
+    Returns:
+        tuple: (TeamFeatures casa, TeamFeatures visitante)
+    """
+    import logging
+    from utils.team_features import TeamFeatures, engine_features
+    logger = logging.getLogger("valueHunter.prompt_adapter")
+
+    names = engine_features(selected_markets)
+    home_features = TeamFeatures.from_dict(simplified_data.get("home_team", {}), names)
+    away_features = TeamFeatures.from_dict(simplified_data.get("away_team", {}), names)
+
+    essential = tuple(name for name in ("played", "goals_per_game", "conceded_per_game", "form",
+                                        "cards_per_game", "cornersAVG_overall", "cornersAgainstAVG_overall")
+                      if name in names)
+    for label, features in (("casa", home_features), ("visitante", away_features)):
+        missing = features.missing(essential)
+        if missing:
+            logger.warning(f"Campos essenciais ausentes ({label}): {missing}")
+
+    return home_features, away_features
@@ -0,0 +1,126 @@
+# utils/prompt_budget.py - Medição e compactação de prompts
+"""
+Estimativa offline do número de tokens dos prompts enviados ao LLM e
+compactação do texto (indentação e linhas em branco não carregam informação
+para o modelo, mas custam tokens).
+
+Usa o tiktoken quando instalado; caso contrário, uma aproximação baseada nas
+regras de segmentação do tokenizador cl100k (palavras, números em grupos de
+até 3 dígitos, pontuação).
+"""
+import re
+import logging
+from functools import lru_cache
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.prompt_budget")
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+# Orçamento de tokens de entrada por análise (acima disso, registrar aviso).
+# O prompt com todos os mercados selecionados fica em ~2460 tokens
+PROMPT_TOKEN_BUDGET = 3000
+
+# Segmentação aproximada do cl100k (contagens feitas por regex, sem laço em Python)
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+_WORD_EXTRA_PATTERN = re.compile(r"(?<=[^\W\d_])[^\W\d_]{4}")
+_NUMBER_PATTERN = re.compile(r"\d{1,3}")
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+_INDENT_PATTERN = re.compile(r"[ \t]{2,}")
+
+
+@lru_cache(maxsize=256)
+def estimate_tokens(text):
+    """
+    Estima o número de tokens de um texto
+
+    Args:
+        text (str): Texto do prompt
+
+    Returns:
+        int: Número (estimado) de tokens
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+
+    # Palavras: 1 token + 1 a cada 4 letras adicionais (português com acentos se divide
+    # mais que inglês); números em grupos de até 3 dígitos; pontuação; quebras de linha
+    # e sequências de espaços (indentação). Espaço simples é absorvido pela palavra.
+    return (
+        len(_WORD_PATTERN.findall(text))
+        + len(_WORD_EXTRA_PATTERN.findall(text))
+        + len(_NUMBER_PATTERN.findall(text))
+        + len(_PUNCTUATION_PATTERN.findall(text))
+        + text.count("\n")
+        + len(_INDENT_PATTERN.findall(text))
+    )
+
+
+def compact_prompt(text):
+    """
+    Remove indentação, espaços finais e linhas em branco repetidas
+
+    Sub-itens ("- ") indentados abaixo de um item ("* ") mantêm dois espaços
+    por nível de aninhamento, para preservar a hierarquia das listas.
+
+    Args:
+        text (str): Prompt montado
+
+    Returns:
+        str: Prompt compactado
+    """
+    lines = []
+    previous_blank = True
+    bullet_indents = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if not previous_blank:
+                lines.append("")
+            previous_blank = True
+            continue
+
+        indent = len(raw_line) - len(raw_line.lstrip())
+        if line.startswith("#"):
+            bullet_indents = []
+        elif line.startswith("* "):
+            bullet_indents = [indent]
+        elif line.startswith("- ") and bullet_indents and indent > bullet_indents[0]:
+            # Níveis com indentação maior ou igual já foram fechados
+            while bullet_indents[-1] >= indent:
+                bullet_indents.pop()
+            line = "  " * len(bullet_indents) + line
+            bullet_indents.append(indent)
+
+        lines.append(line)
+        previous_blank = False
+
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
+
+
+def log_prompt_budget(sections, label=""):
+    """
+    Registra o tamanho do prompt por seção e o total
+
+    Args:
+        sections (dict): {nome da seção: texto}
+        label (str): Identificação da requisição (ex.: "Time A vs Time B")
+
+    Returns:
+        int: Total estimado de tokens
+    """
+    counts = {name: estimate_tokens(text) for name, text in sections.items() if text}
+    total = sum(counts.values())
+    detail = ", ".join(f"{name}={count}" for name, count in counts.items())
+    logger.info(f"Prompt {label}: ~{total} tokens ({detail})")
+    if total > PROMPT_TOKEN_BUDGET:
+        logger.warning(f"Prompt {label} acima do orçamento: ~{total} > {PROMPT_TOKEN_BUDGET} tokens")
+    return total
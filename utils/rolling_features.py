@@ -0,0 +1,469 @@
+# utils/rolling_features.py - Janelas móveis de features por time
+"""
+Features de forma e calendário de cada time mantidas de forma incremental a
+partir das partidas concluídas do league-matches, em vez de recalculadas a
+cada análise a partir das strings e listas do payload.
+
+Para cada time (ID da FootyStats) ficam guardadas as últimas ROLLING_WINDOW
+partidas no geral, como mandante e como visitante: data, resultado, gols,
+xG, escanteios e cartões. Cada partida ingerida altera só as janelas dos
+dois times (inserção ordenada e corte da mais antiga). A partir delas saem,
+para uma data de referência e sem usar partidas posteriores a ela:
+forma (últimos 5 e 10 resultados, geral e por mando), médias móveis de
+5 e 10 jogos, dias desde a última partida e jogos nos últimos 15 dias.
+A ingestão é idempotente (uma linha por partida e time).
+
+Uso (job em lote):
+    python -m utils.rolling_features           # armazém local ou cache de league-matches
+    python -m utils.rolling_features --fetch   # busca na API as temporadas sem cache
+"""
+import os
+import json
+import time
+import bisect
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+
+from utils.league_factors import extract_match_totals
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.rolling_features")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+ROLLING_FEATURES_DB_FILE = os.path.join(DATA_DIR, "rolling_features.db")
+
+# Partidas guardadas por janela (geral, casa, fora)
+ROLLING_WINDOW = 10
+
+# Janela do contador de jogos recentes (matches_last_15_days)
+RECENT_DAYS = 15
+
+# Idade máxima da última partida da janela em relação à data analisada. Acima
+# disso as janelas estão desatualizadas (sincronização parada) ou o time está
+# em pausa longa; elas são ignoradas e valem a forma e o calendário do payload
+MAX_WINDOW_AGE_DAYS = 21
+
+# Estatísticas das médias móveis, na ordem das entradas da janela (após data, ID e resultado)
+ROLLING_STATS = ("goals_for", "goals_against", "xg_for", "xg_against", "corners_for", "corners_against", "cards")
+
+# Vetor de features (ordem fixa, mesmos nomes de utils/team_features.NUMERIC_FEATURES)
+ROLLING_FEATURES = (
+    ("ppg_last5", "ppg_last10", "home_ppg_last5", "away_ppg_last5")
+    + tuple(f"{stat}_last{size}" for size in (5, 10) for stat in ROLLING_STATS)
+    + ("days_since_last_match", "matches_last_15_days")
+)
+
+_POINTS = {"W": 3, "D": 1, "L": 0}
+_VENUES = ("overall", "home", "away")
+_SECONDS_PER_DAY = 86400
+
+
+def _stat(value):
+    """Valor numérico de uma estatística (None se ausente ou não coletado)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return None
+    return value
+
+
+def _team_entries(match):
+    """
+    Entradas da janela dos dois times para uma partida concluída
+
+    Args:
+        match (dict): Partida do league-matches
+
+    Returns:
+        list: [(team_id, is_home, entrada)] ou [] se a partida não estiver
+              concluída ou não tiver os IDs; entrada = [date_unix, match_id,
+              resultado, *ROLLING_STATS]
+    """
+    if not extract_match_totals(match):
+        return []
+    try:
+        match_id = int(match["id"])
+        home_id = int(match["homeID"])
+        away_id = int(match["awayID"])
+    except (KeyError, TypeError, ValueError):
+        return []
+    if home_id == away_id:
+        return []
+
+    date_unix = int(match.get("date_unix") or 0)
+    home_goals = match["homeGoalCount"]
+    away_goals = match["awayGoalCount"]
+    entries = []
+    for team_id, is_home, side, other, goals_for, goals_against in (
+        (home_id, True, "team_a", "team_b", home_goals, away_goals),
+        (away_id, False, "team_b", "team_a", away_goals, home_goals),
+    ):
+        if goals_for > goals_against:
+            result = "W"
+        elif goals_for == goals_against:
+            result = "D"
+        else:
+            result = "L"
+
+        xg_for = _stat(match.get(f"{side}_xg"))
+        xg_against = _stat(match.get(f"{other}_xg"))
+        # A API devolve 0/0 quando o xG da partida não foi coletado
+        if not (xg_for or xg_against):
+            xg_for = xg_against = None
+
+        entries.append((team_id, is_home, [
+            date_unix, match_id, result, goals_for, goals_against, xg_for, xg_against,
+            _stat(match.get(f"{side}_corners")), _stat(match.get(f"{other}_corners")),
+            _stat(match.get(f"{side}_cards_num")),
+        ]))
+    return entries
+
+
+def _insert_entry(window, entry):
+    """Insere a entrada em ordem cronológica e mantém só as ROLLING_WINDOW mais recentes"""
+    keys = [(item[0], item[1]) for item in window]
+    window.insert(bisect.bisect(keys, (entry[0], entry[1])), entry)
+    del window[:-ROLLING_WINDOW]
+    return window
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def _ppg(entries):
+    return sum(_POINTS[entry[2]] for entry in entries) / len(entries) if entries else None
+
+
+def rolling_features(windows, at_unix=None):
+    """
+    Features de um time a partir das janelas, usando só partidas antes de at_unix
+
+    Args:
+        windows (dict): {"overall"|"home"|"away": [entradas em ordem cronológica]}
+        at_unix (int, optional): Data da partida analisada (padrão: agora)
+
+    Returns:
+        dict: form, home_form, away_form, recent_results e os de ROLLING_FEATURES
+              que existirem, ou {} sem partidas ou se a última tem mais de
+              MAX_WINDOW_AGE_DAYS dias. As médias móveis entram nas
+              expectativas de gols, escanteios e cartões (utils/ai.recent_average);
+              os ppg_* ficam só na matriz em lote (a forma já vem das sequências)
+    """
+    at_unix = time.time() if at_unix is None else at_unix
+    overall, home, away = ([entry for entry in windows.get(venue, ()) if entry[0] < at_unix] for venue in _VENUES)
+    if not overall or at_unix - overall[-1][0] > MAX_WINDOW_AGE_DAYS * _SECONDS_PER_DAY:
+        return {}
+
+    results = [entry[2] for entry in overall]
+    features = {
+        "form": "".join(results[-5:]),
+        "recent_results": results[::-1],
+        "ppg_last5": _ppg(overall[-5:]),
+        "ppg_last10": _ppg(overall),
+        "days_since_last_match": (at_unix - overall[-1][0]) / _SECONDS_PER_DAY,
+        "matches_last_15_days": sum(1 for entry in overall
+                                    if at_unix - entry[0] <= RECENT_DAYS * _SECONDS_PER_DAY),
+    }
+    if home:
+        features["home_form"] = "".join(entry[2] for entry in home[-5:])
+        features["home_ppg_last5"] = _ppg(home[-5:])
+    if away:
+        features["away_form"] = "".join(entry[2] for entry in away[-5:])
+        features["away_ppg_last5"] = _ppg(away[-5:])
+
+    for size in (5, 10):
+        recent = overall[-size:]
+        for offset, stat in enumerate(ROLLING_STATS, start=3):
+            value = _mean(entry[offset] for entry in recent)
+            if value is not None:
+                features[f"{stat}_last{size}"] = value
+    return features
+
+
+class RollingFeatureStore:
+    """
+    Janelas móveis por time, atualizadas por partida concluída
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or ROLLING_FEATURES_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rolling_matches (
+                    match_id INTEGER NOT NULL,
+                    team_id INTEGER NOT NULL,
+                    PRIMARY KEY (match_id, team_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS team_windows (
+                    team_id INTEGER PRIMARY KEY,
+                    overall TEXT NOT NULL,
+                    home TEXT NOT NULL,
+                    away TEXT NOT NULL,
+                    matches INTEGER NOT NULL,
+                    last_match_unix INTEGER,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def ingest_matches(self, matches):
+        """
+        Acrescenta partidas concluídas às janelas dos times (partidas já ingeridas são ignoradas)
+
+        Partidas fora de ordem cronológica entram na posição certa da janela;
+        uma partida mais antiga que todas as da janela cheia não altera nada.
+
+        Args:
+            matches (list): Partidas do league-matches
+
+        Returns:
+            int: Partidas novas
+        """
+        now = time.time()
+        added = set()
+        windows = {}
+        with self._lock, self._connect() as conn:
+            for match in matches or []:
+                if not isinstance(match, dict):
+                    continue
+                for team_id, is_home, entry in _team_entries(match):
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO rolling_matches (match_id, team_id) VALUES (?, ?)",
+                        (entry[1], team_id)
+                    )
+                    if cursor.rowcount != 1:
+                        continue
+
+                    state = windows.get(team_id)
+                    if state is None:
+                        row = conn.execute(
+                            "SELECT overall, home, away, matches FROM team_windows WHERE team_id = ?",
+                            (team_id,)
+                        ).fetchone()
+                        if row:
+                            state = {venue: json.loads(text) for venue, text in zip(_VENUES, row)}
+                            state["matches"] = row[3]
+                        else:
+                            state = {venue: [] for venue in _VENUES}
+                            state["matches"] = 0
+                        windows[team_id] = state
+
+                    _insert_entry(state["overall"], entry)
+                    _insert_entry(state["home" if is_home else "away"], entry)
+                    state["matches"] += 1
+                    added.add(entry[1])
+
+            # Uma gravação por time alterado
+            conn.executemany(
+                "INSERT OR REPLACE INTO team_windows "
+                "(team_id, overall, home, away, matches, last_match_unix, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (team_id, *(json.dumps(state[venue], separators=(",", ":")) for venue in _VENUES),
+                     state["matches"], state["overall"][-1][0] if state["overall"] else None, now)
+                    for team_id, state in windows.items()
+                ]
+            )
+
+        if added:
+            logger.info(f"{len(added)} partidas novas nas janelas de {len(windows)} times")
+        return len(added)
+
+    def get_windows(self, team_id):
+        """
+        Janelas de um time
+
+        Returns:
+            dict: {"overall"|"home"|"away": [entradas]} ou None se o time não tem partidas
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT overall, home, away FROM team_windows WHERE team_id = ?", (int(team_id),)
+            ).fetchone()
+        if not row:
+            return None
+        return {venue: json.loads(text) for venue, text in zip(_VENUES, row)}
+
+    def get_features(self, team_id, at_unix=None):
+        """
+        Features pré-jogo de um time (ver rolling_features)
+
+        Returns:
+            dict: Campos de utils/team_features ou {} se o time não tem partidas
+        """
+        windows = self.get_windows(team_id)
+        return rolling_features(windows, at_unix) if windows else {}
+
+    def feature_matrix(self, team_ids, at_unix=None):
+        """
+        Vetores de ROLLING_FEATURES de vários times, para processamento em lote
+
+        Args:
+            team_ids (list): IDs dos times
+            at_unix (int, optional): Data de referência (padrão: agora)
+
+        Returns:
+            np.ndarray: Matriz (times, len(ROLLING_FEATURES)) com NaN onde não há dados
+        """
+        matrix = np.full((len(team_ids), len(ROLLING_FEATURES)), np.nan)
+        for row, team_id in enumerate(team_ids):
+            features = self.get_features(team_id, at_unix)
+            for column, name in enumerate(ROLLING_FEATURES):
+                value = features.get(name)
+                if value is not None:
+                    matrix[row, column] = value
+        return matrix
+
+    def stats(self):
+        """Resumo das janelas: times e partidas por time ingeridas"""
+        with self._lock, self._connect() as conn:
+            teams = conn.execute("SELECT COUNT(*) FROM team_windows").fetchone()[0]
+            entries = conn.execute("SELECT COUNT(*) FROM rolling_matches").fetchone()[0]
+        return {"teams": teams, "team_matches": entries}
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_rolling_feature_store():
+    """Instância única das janelas no processo"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = RollingFeatureStore()
+        return _shared_store
+
+
+def stored_features_for_payload(api_data):
+    """
+    Features das janelas locais para os dois times de um payload complete_analysis
+
+    Não cria o banco: sem janelas ingeridas, retorna None sem tocar no disco.
+    A data de referência é match_details.date_unix (ou agora).
+
+    Args:
+        api_data (dict): Payload com basic_stats.home_team.id e basic_stats.away_team.id
+
+    Returns:
+        tuple: (features do mandante, features do visitante), dicts vazios para
+               times sem partidas recentes, ou None
+    """
+    try:
+        basic_stats = api_data["basic_stats"]
+        home_team_id = int(basic_stats["home_team"]["id"])
+        away_team_id = int(basic_stats["away_team"]["id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if _shared_store is None and not os.path.exists(ROLLING_FEATURES_DB_FILE):
+        return None
+
+    match_details = api_data.get("match_details")
+    at_unix = match_details.get("date_unix") if isinstance(match_details, dict) else None
+    at_unix = at_unix if isinstance(at_unix, (int, float)) and at_unix > 0 else None
+
+    try:
+        store = get_rolling_feature_store()
+        return store.get_features(home_team_id, at_unix), store.get_features(away_team_id, at_unix)
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao consultar as janelas de features: {str(e)}")
+        return None
+
+
+# Sequências de resultados: as das janelas substituem as do payload se não forem mais curtas
+_SEQUENCE_FIELDS = ("form", "home_form", "away_form", "recent_results")
+
+
+def merge_rolling_features(team, features):
+    """
+    Aplica as features das janelas às estatísticas de um time extraídas do payload
+
+    Médias móveis e calendário (que o payload não traz) são sempre gravados;
+    form, home_form, away_form e recent_results só substituem os do payload
+    quando não são mais curtos (time recém-chegado ao histórico local).
+    Janelas desatualizadas já chegam vazias (ver MAX_WINDOW_AGE_DAYS), e
+    então o payload fica como está.
+
+    Args:
+        team (dict): Estatísticas do time (alterado no lugar)
+        features (dict): Saída de rolling_features
+
+    Returns:
+        dict: O próprio team
+    """
+    for name, value in features.items():
+        if name in _SEQUENCE_FIELDS:
+            current = team.get(name)
+            if current and len(current) > len(value):
+                continue
+        team[name] = value
+    return team
+
+
+def build_rolling_features(league_ids=None, fetch_missing=False, store=None):
+    """
+    Job em lote: ingere as partidas concluídas de todas as ligas do registro
+
+    Args:
+        league_ids (list, optional): IDs de temporada (padrão: todo o registro)
+        fetch_missing (bool): Se True, busca na API as temporadas que não estão no cache
+        store (RollingFeatureStore, optional): Destino (padrão: o compartilhado)
+
+    Returns:
+        int: Partidas novas
+    """
+    from utils.league_factors import get_registry_league_ids
+    from utils.footystats_api import load_cached_league_matches, fetch_league_matches
+    from utils.match_warehouse import load_warehouse_matches
+
+    store = store or get_rolling_feature_store()
+    if league_ids is None:
+        league_ids = get_registry_league_ids()
+
+    added = 0
+    for league_id in league_ids:
+        matches = load_warehouse_matches(league_id)
+        if not matches:
+            matches = fetch_league_matches(league_id) if fetch_missing else load_cached_league_matches(league_id)
+        if not matches:
+            logger.warning(f"Sem partidas em cache para a liga {league_id}, ignorando")
+            continue
+        added += store.ingest_matches(matches)
+
+    return added
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Atualiza as janelas móveis de features por time")
+    parser.add_argument("--fetch", action="store_true", help="Buscar na API as temporadas sem cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    added = build_rolling_features(fetch_missing=args.fetch)
+    summary = get_rolling_feature_store().stats()
+    print(f"Partidas novas: {added} | Total: {summary['teams']} times, {summary['team_matches']} partidas por time")
+
+
+if __name__ == "__main__":
+    main()
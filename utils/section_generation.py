@@ -0,0 +1,200 @@
+# utils/section_generation.py - Geração da análise em seções paralelas
+"""
+Modo opcional que divide a análise da IA em pedidos independentes (um por
+grupo de mercados selecionado e um para o resumo e a confiança), enviados pelo
+despachante do processo e combinados em ordem fixa.
+
+Numa única resposta o tempo cresce com o tamanho do texto gerado; com as
+seções em paralelo, o tempo total se aproxima do da seção de aquecimento mais
+o da seção mais longa. Todas as seções usam o mesmo prompt seguido de uma
+instrução curta com a parte pedida.
+
+Custo: cada seção reenvia o prompt inteiro (~2,5k tokens), ou seja, até 4x os
+tokens de entrada de uma resposta única; cada seção é registrada em
+utils/llm_metrics.py com o seu consumo. Para que o provedor sirva esse prefixo
+do cache (tarifa reduzida a partir de 1024 tokens), a seção de resumo e
+confiança, a mais curta, vai sozinha primeiro e as demais só saem depois que
+ela termina.
+
+Ativação: LLM_PARALLEL_SECTIONS=1 (ou parallel_sections=True em analyze_with_gpt).
+"""
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.analysis_schema import ANALYSIS_JSON_SCHEMA, parse_structured_analysis
+from utils.llm_dispatcher import get_llm_dispatcher, LLMDispatcherError
+from utils.llm_metrics import LLMCallTimer
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.section_generation")
+
+PARALLEL_SECTIONS_ENABLED = os.environ.get("LLM_PARALLEL_SECTIONS", "0") == "1"
+
+# Grupos de mercados gerados em pedidos separados, na ordem de exibição
+SECTION_GROUPS = [
+    ("resultado", "Resultado (1X2 e Chance Dupla)", ("money_line", "chance_dupla")),
+    ("gols", "Gols (Over/Under e Ambos Marcam)", ("over_under", "ambos_marcam")),
+    ("escanteios_cartoes", "Escanteios e Cartões", ("escanteios", "cartoes")),
+]
+
+# Resumo e confiança (sempre gerados, por último na exibição)
+CONFIDENCE_SECTION = "confianca"
+
+# Campos do esquema completo pedidos a cada tipo de seção
+_MARKET_FIELDS = ("sections", "opportunities")
+_CONFIDENCE_FIELDS = ("summary", "confidence")
+
+
+def section_plan(selected_markets):
+    """
+    Seções a gerar para os mercados selecionados
+
+    Returns:
+        list: [(nome, título, mercados)] - grupos com algum mercado selecionado e a confiança
+    """
+    plan = [(name, title, markets) for name, title, markets in SECTION_GROUPS
+            if any(selected_markets.get(market) for market in markets)]
+    plan.append((CONFIDENCE_SECTION, "Resumo e Nível de Confiança", ()))
+    return plan
+
+
+def section_response_format(name):
+    """response_format (esquema JSON estrito) de uma seção: subconjunto do esquema completo"""
+    fields = _CONFIDENCE_FIELDS if name == CONFIDENCE_SECTION else _MARKET_FIELDS
+    schema = {
+        "type": "object",
+        "additionalProperties": False,
+        "required": list(fields),
+        "properties": {field: ANALYSIS_JSON_SCHEMA["properties"][field] for field in fields}
+    }
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": f"match_analysis_{name}", "strict": True, "schema": schema}
+    }
+
+
+def section_prompt(prompt, name, title, markets):
+    """Prompt completo seguido da instrução da parte pedida"""
+    if name == CONFIDENCE_SECTION:
+        instruction = ('Gere APENAS "summary" e "confidence" (visão geral da partida e nível de '
+                       'confiança), sem seções de mercado nem oportunidades.')
+    else:
+        instruction = (f'Gere APENAS "sections" e "opportunities" referentes a {title} '
+                       f'(mercados: {", ".join(markets)}). '
+                       'Ignore os demais mercados.')
+    return f"{prompt}\n\n# PARTE DA ANÁLISE: {title}\n{instruction}"
+
+
+def merge_sections(parts, plan):
+    """
+    Combina as respostas das seções em ordem fixa
+
+    Args:
+        parts (dict): {nome da seção: objeto JSON da resposta}
+        plan (list): Resultado de section_plan
+
+    Returns:
+        dict: Objeto no esquema completo (utils/analysis_schema.py)
+    """
+    merged = {"summary": "", "sections": [], "opportunities": [], "confidence": None}
+    for name, _, _ in plan:
+        part = parts.get(name)
+        if not part:
+            continue
+        if name == CONFIDENCE_SECTION:
+            merged["summary"] = part.get("summary", "")
+            merged["confidence"] = part.get("confidence")
+        else:
+            merged["sections"].extend(part.get("sections") or [])
+            merged["opportunities"].extend(part.get("opportunities") or [])
+    return merged
+
+
+def generate_analysis_by_sections(call, prompt, selected_markets, tier="free", dispatcher=None,
+                                  queue_timeout=None, on_progress=None, model=None, on_queue_position=None):
+    """
+    Gera a análise em seções (a de confiança primeiro, as demais em paralelo)
+    e retorna o JSON combinado
+
+    Args:
+        call (callable): call(prompt, response_format, timer) -> texto da resposta do provedor;
+                         timer (LLMCallTimer ou None) recebe o consumo de tokens
+        prompt (str): Prompt formatado (format_highly_optimized_prompt)
+        selected_markets (dict): Mercados selecionados
+        tier (str): Tier do usuário (prioridade na fila)
+        dispatcher (LLMDispatcher): Despachante (padrão: o do processo)
+        queue_timeout (float): Espera máxima na fila de cada seção
+        on_progress (callable): Chamado na thread de quem chamou, a cada seção concluída,
+                                com o JSON combinado até o momento
+        model (str): Modelo chamado; se informado, cada seção é registrada em utils/llm_metrics.py
+        on_queue_position (callable): Posição na fila enquanto a primeira seção espera
+                                      (chamado na thread de quem chamou)
+
+    Returns:
+        str: JSON no esquema completo
+
+    Raises:
+        LLMDispatcherError: Fila cheia ou espera esgotada em alguma seção
+    """
+    dispatcher = dispatcher or get_llm_dispatcher()
+    plan = section_plan(selected_markets)
+    started = time.time()
+
+    def run_section(name, title, markets, on_position=None):
+        timer = LLMCallTimer(f"section:{name}", model, tier) if model else None
+
+        def request():
+            if timer:
+                timer.start()
+            return call(section_prompt(prompt, name, title, markets), section_response_format(name), timer)
+
+        try:
+            text = dispatcher.run(request, tier=tier, on_position=on_position, timeout=queue_timeout)
+        except LLMDispatcherError:
+            if timer:
+                timer.record("overload")
+            raise
+        except Exception:
+            if timer:
+                timer.record("error")
+            raise
+        if timer:
+            timer.record()
+        return json.loads(text)
+
+    def section_done(name):
+        logger.info(f"Seção {name} concluída em {time.time() - started:.2f}s")
+        if on_progress:
+            on_progress(json.dumps(merge_sections(parts, plan), ensure_ascii=False))
+
+    # Confiança primeiro e sozinha (sem ela a análise fica incompleta): aquece o cache
+    # de prompt do provedor para as seções de mercado, que podem faltar
+    warmup = plan[-1]
+    market_sections = plan[:-1]
+    parts = {CONFIDENCE_SECTION: run_section(*warmup, on_position=on_queue_position)}
+    section_done(CONFIDENCE_SECTION)
+
+    if market_sections:
+        with ThreadPoolExecutor(max_workers=len(market_sections), thread_name_prefix="llm-section") as executor:
+            futures = {executor.submit(run_section, name, title, markets): name
+                       for name, title, markets in market_sections}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    parts[name] = future.result()
+                except LLMDispatcherError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Seção {name} da análise falhou: {str(e)}")
+                    continue
+                section_done(name)
+
+    merged = json.dumps(merge_sections(parts, plan), ensure_ascii=False)
+    logger.info(f"Análise em {len(plan)} seções concluída em {time.time() - started:.2f}s")
+
+    # Valida o resultado combinado no contrato completo antes de devolver
+    parse_structured_analysis(merged)
+    return merged
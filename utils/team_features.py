@@ -0,0 +1,293 @@
+# utils/team_features.py - Registro tipado de features por time
+"""
+Registro de esquema fixo com as estatísticas de um time usadas pelos cálculos
+de probabilidade (utils/ai.py). Cada campo presente é marcado em uma máscara
+de bits, de modo que um valor ausente nunca se confunde com zero, e os
+registros podem ser empilhados em arrays NumPy para processamento em lote.
+"""
+import math
+import logging
+
+import numpy as np
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.team_features")
+
+# Campos numéricos (float) - ordem fixa, também usada no empilhamento em arrays
+NUMERIC_FEATURES = (
+    # Campanha
+    "played", "matches_played", "wins", "draws", "losses", "win_pct",
+    "home_played", "away_played",
+    # Gols e xG
+    "goals_scored", "goals_conceded", "goals_per_game", "conceded_per_game",
+    "xg", "xga", "xg_for_avg", "xg_against_avg", "xg_for_avg_overall",
+    "home_xg_for_avg", "home_xg_against_avg", "away_xg_for_avg", "away_xg_against_avg",
+    "clean_sheet_probability",
+    # Estilo de jogo
+    "possession", "pass_completion", "shots_per_game",
+    # Cartões
+    "cards_per_game", "home_cards_per_game", "away_cards_per_game",
+    "cardsTotal_home", "cardsTotal_away",
+    # Escanteios
+    "corners_per_game", "cornersAVG_overall", "cornersAgainstAVG_overall",
+    "cornersAVG_home", "cornersAgainstAVG_home", "cornersAVG_away", "cornersAgainstAVG_away",
+    # Calendário
+    "days_since_last_match", "matches_last_15_days", "travel_distance",
+    # Médias móveis (utils/rolling_features.py; forma e calendário vão nos campos acima)
+    "goals_for_last5", "goals_against_last5", "xg_for_last5", "xg_against_last5",
+    "corners_for_last5", "corners_against_last5", "cards_last5",
+    "goals_for_last10", "goals_against_last10", "xg_for_last10", "xg_against_last10",
+    "corners_for_last10", "corners_against_last10", "cards_last10",
+    # Rating Elo e partidas processadas (utils/team_ratings.py)
+    "elo_rating", "elo_matches",
+)
+
+# Sequências de resultados ("WDLWW")
+TEXT_FEATURES = ("name", "form", "home_form", "away_form")
+
+# Listas (resultados recentes, jogadores ausentes)
+LIST_FEATURES = ("recent_results", "missing_players")
+
+ALL_FEATURES = NUMERIC_FEATURES + TEXT_FEATURES + LIST_FEATURES
+
+# Entradas lidas só pelos mercados de escanteios e cartões (chaves de
+# selected_markets); 1X2, gols e ambos marcam usam apenas os demais campos
+MARKET_FEATURES = {
+    "escanteios": (
+        "corners_per_game", "cornersAVG_overall", "cornersAgainstAVG_overall",
+        "cornersAVG_home", "cornersAgainstAVG_home", "cornersAVG_away", "cornersAgainstAVG_away",
+        "corners_for_last5", "corners_against_last5", "corners_for_last10", "corners_against_last10",
+    ),
+    "cartoes": (
+        "cards_per_game", "home_cards_per_game", "away_cards_per_game",
+        "cardsTotal_home", "cardsTotal_away", "cards_last5", "cards_last10",
+    ),
+}
+
+_FIELD_BITS = {name: 1 << index for index, name in enumerate(ALL_FEATURES)}
+_NUMERIC_SET = frozenset(NUMERIC_FEATURES)
+_TEXT_SET = frozenset(TEXT_FEATURES)
+
+_ENGINE_FEATURES = {}
+
+
+def market_selected(selected_markets, market):
+    """True se o mercado entra no cálculo (selected_markets None = todos)"""
+    return selected_markets is None or bool(selected_markets.get(market))
+
+
+def engine_features(selected_markets=None):
+    """
+    Campos do esquema lidos pelo motor de probabilidades para os mercados selecionados
+
+    Memorizado por combinação de mercados de MARKET_FEATURES: são só quatro.
+
+    Args:
+        selected_markets (dict, optional): Mercados selecionados {mercado: bool}
+            (None = todos)
+
+    Returns:
+        tuple: Campos em ordem do esquema
+    """
+    if selected_markets is None:
+        return ALL_FEATURES
+    skipped = frozenset(market for market in MARKET_FEATURES if not market_selected(selected_markets, market))
+    names = _ENGINE_FEATURES.get(skipped)
+    if names is None:
+        unused = {name for market in skipped for name in MARKET_FEATURES[market]}
+        names = tuple(name for name in ALL_FEATURES if name not in unused)
+        _ENGINE_FEATURES[skipped] = names
+    return names
+
+
+# dtype do empilhamento em lote (apenas campos numéricos)
+FEATURE_DTYPE = np.dtype([(name, np.float64) for name in NUMERIC_FEATURES])
+
+
+class TeamFeatures:
+    """
+    Features de um time com esquema fixo e máscara explícita de campos presentes
+
+    Mantém a interface de leitura de dicionário usada pelos cálculos
+    (get, in, [], copy), para que dict e TeamFeatures sejam intercambiáveis.
+    """
+
+    __slots__ = ALL_FEATURES + ("_mask",)
+
+    def __init__(self, **values):
+        self._mask = 0
+        for name, value in values.items():
+            self[name] = value
+
+    @classmethod
+    def from_dict(cls, data, names=None):
+        """
+        Constrói o registro a partir de um dicionário livre (ex.: saída do prompt_adapter)
+
+        Campos fora do esquema são ignorados; valores numéricos inválidos, NaN
+        ou None ficam marcados como ausentes.
+
+        Args:
+            data (dict): Estatísticas do time
+            names (tuple, optional): Só estes campos do esquema (ver engine_features);
+                os demais não são lidos de data
+
+        Returns:
+            TeamFeatures: Registro construído
+        """
+        if isinstance(data, TeamFeatures):
+            return data
+
+        record = cls()
+        if not data:
+            return record
+
+        numeric, text, lists = _schema_groups(names)
+        mask = 0
+        setattr_ = object.__setattr__
+        for name in numeric:
+            value = data.get(name)
+            if value is None:
+                continue
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                logger.debug(f"Valor inválido para {name}: {value!r}")
+                continue
+            if value == value:  # descarta NaN
+                setattr_(record, name, value)
+                mask |= _FIELD_BITS[name]
+
+        for name in text:
+            value = data.get(name)
+            if isinstance(value, str):
+                setattr_(record, name, value)
+                mask |= _FIELD_BITS[name]
+
+        for name in lists:
+            value = data.get(name)
+            if isinstance(value, (list, tuple, str)):
+                setattr_(record, name, list(value))
+                mask |= _FIELD_BITS[name]
+
+        record._mask = mask
+        return record
+
+    # Interface de dicionário
+
+    def __setitem__(self, name, value):
+        bit = _FIELD_BITS.get(name)
+        if bit is None:
+            raise KeyError(f"Campo desconhecido: {name}")
+
+        if value is None:
+            self._mask &= ~bit
+            return
+
+        if name in _NUMERIC_SET:
+            value = float(value)
+            if math.isnan(value):
+                self._mask &= ~bit
+                return
+        elif name in _TEXT_SET:
+            if not isinstance(value, str):
+                raise TypeError(f"Campo {name} deve ser texto")
+        else:
+            value = list(value)
+
+        object.__setattr__(self, name, value)
+        self._mask |= bit
+
+    def __getitem__(self, name):
+        if not self._mask & _FIELD_BITS.get(name, 0):
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name):
+        return bool(self._mask & _FIELD_BITS.get(name, 0))
+
+    def get(self, name, default=None):
+        """Valor do campo ou default se ausente (mesma semântica de dict.get)"""
+        if self._mask & _FIELD_BITS.get(name, 0):
+            return getattr(self, name)
+        return default
+
+    def pick(self, *names, default=None):
+        """Primeiro campo presente entre names, ou default"""
+        for name in names:
+            if self._mask & _FIELD_BITS.get(name, 0):
+                return getattr(self, name)
+        return default
+
+    def has(self, name):
+        return bool(self._mask & _FIELD_BITS.get(name, 0))
+
+    def missing(self, names=None):
+        """Lista dos campos ausentes (entre names, ou todos os do esquema)"""
+        return [name for name in (names or ALL_FEATURES) if not self._mask & _FIELD_BITS[name]]
+
+    def keys(self):
+        return [name for name in ALL_FEATURES if self._mask & _FIELD_BITS[name]]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def copy(self):
+        clone = TeamFeatures()
+        for name in self.keys():
+            value = getattr(self, name)
+            object.__setattr__(clone, name, list(value) if isinstance(value, list) else value)
+        clone._mask = self._mask
+        return clone
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"TeamFeatures({self.get('name', '?')!r}, {len(self.keys())} campos)"
+
+
+_SCHEMA_GROUPS = {None: (NUMERIC_FEATURES, TEXT_FEATURES, LIST_FEATURES)}
+_SCHEMA_GROUPS[ALL_FEATURES] = _SCHEMA_GROUPS[None]
+
+
+def _schema_groups(names):
+    """Campos numéricos, de texto e listas restritos a names (memorizado)"""
+    groups = _SCHEMA_GROUPS.get(names)
+    if groups is None:
+        kept = frozenset(names)
+        groups = tuple(tuple(name for name in group if name in kept)
+                       for group in (NUMERIC_FEATURES, TEXT_FEATURES, LIST_FEATURES))
+        _SCHEMA_GROUPS[names] = groups
+    return groups
+
+
+def as_team_features(team, names=None):
+    """Converte um dicionário em TeamFeatures (sem custo se já for um registro)"""
+    if isinstance(team, TeamFeatures):
+        return team
+    return TeamFeatures.from_dict(team, names)
+
+
+def stack_team_features(records):
+    """
+    Empilha registros em um array estruturado NumPy com a máscara de presença
+
+    Args:
+        records (list): Lista de TeamFeatures (ou dicionários)
+
+    Returns:
+        tuple: (array estruturado com FEATURE_DTYPE, máscara booleana (n, campos numéricos));
+               campos ausentes ficam como NaN no array
+    """
+    records = [as_team_features(record) for record in records]
+    values = np.empty(len(records), dtype=FEATURE_DTYPE)
+    mask = np.zeros((len(records), len(NUMERIC_FEATURES)), dtype=bool)
+
+    for column, name in enumerate(NUMERIC_FEATURES):
+        bit = _FIELD_BITS[name]
+        present = [bool(record._mask & bit) for record in records]
+        mask[:, column] = present
+        values[name] = [getattr(record, name) if flag else np.nan for record, flag in zip(records, present)]
+
+    return values, mask
@@ -0,0 +1,489 @@
+# utils/team_ratings.py - Ratings Elo dos times sobre o histórico de partidas
+"""
+Ratings Elo (com mando de campo e multiplicador por saldo de gols, como no
+World Football Elo) atualizados partida a partida a partir das partidas
+concluídas do league-matches. Cada resultado novo custa uma atualização dos
+dois times envolvidos; os ratings ficam gravados, então não há recálculo da
+temporada a cada análise.
+
+Os ratings entram no motor de probabilidades (utils/ai.py) como uma entrada
+a mais do 1X2: rating_1x2_probabilities converte a diferença de ratings em
+probabilidades de vitória, empate e derrota, para arrays de partidas de uma
+vez, com peso que cresce com as partidas processadas dos dois times
+(rating_1x2_weight). Times sem partidas processadas ficam sem rating.
+
+A ordem das partidas importa no Elo: partidas que chegam depois de outras
+mais recentes são aplicadas na ordem de chegada. O replay (--replay) refaz
+todos os ratings em ordem cronológica a partir do armazém local.
+
+Uso (job em lote):
+    python -m utils.team_ratings            # ingere as partidas novas do armazém local ou cache
+    python -m utils.team_ratings --replay   # recalcula tudo em ordem cronológica
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+
+from utils.league_factors import extract_match_totals
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.team_ratings")
+
+try:
+    from utils.core import DATA_DIR
+except (ImportError, ModuleNotFoundError):
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    if "RENDER" in os.environ:
+        DATA_DIR = "/mnt/value-hunter-data"
+
+TEAM_RATINGS_DB_FILE = os.path.join(DATA_DIR, "team_ratings.db")
+
+# Parâmetros do Elo
+ELO_INITIAL = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+ELO_SCALE = 400.0
+
+# Probabilidade máxima de empate (partida equilibrada); cai com a diferença de ratings
+ELO_DRAW_MAX = 0.28
+
+# Peso das probabilidades dos ratings no 1X2 do motor (o restante vem das pontuações compostas),
+# atingido quando os dois times têm RATING_FULL_WEIGHT_MATCHES partidas processadas
+RATING_1X2_WEIGHT = 0.4
+RATING_FULL_WEIGHT_MATCHES = 20
+
+
+def goal_difference_multiplier(goal_difference):
+    """Multiplicador do K pelo saldo de gols (World Football Elo)"""
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11 + goal_difference) / 8
+
+
+def expected_home_score(home_rating, away_rating):
+    """Pontuação esperada do mandante (vitória=1, empate=0.5), já com o mando de campo"""
+    return 1 / (1 + 10 ** ((away_rating - home_rating - ELO_HOME_ADVANTAGE) / ELO_SCALE))
+
+
+def elo_update(home_rating, away_rating, home_goals, away_goals):
+    """
+    Ratings dos dois times depois de uma partida
+
+    Returns:
+        tuple: (novo rating do mandante, novo rating do visitante)
+    """
+    if home_goals > away_goals:
+        score = 1.0
+    elif home_goals == away_goals:
+        score = 0.5
+    else:
+        score = 0.0
+    delta = ELO_K * goal_difference_multiplier(home_goals - away_goals) * (
+        score - expected_home_score(home_rating, away_rating))
+    return home_rating + delta, away_rating - delta
+
+
+def rating_1x2_probabilities(home_ratings, away_ratings):
+    """
+    Probabilidades 1X2 pela diferença de ratings (escalares ou arrays)
+
+    O empate vale ELO_DRAW_MAX em partidas equilibradas e diminui com a
+    diferença; vitória e derrota dividem o restante mantendo a pontuação
+    esperada do Elo.
+
+    Args:
+        home_ratings (float|array): Ratings dos mandantes
+        away_ratings (float|array): Ratings dos visitantes
+
+    Returns:
+        tuple: (casa, empate, fora), arrays do mesmo formato da entrada (0-1)
+    """
+    expected = 1 / (1 + 10 ** ((np.asarray(away_ratings, dtype=np.float64)
+                                - np.asarray(home_ratings, dtype=np.float64)
+                                - ELO_HOME_ADVANTAGE) / ELO_SCALE))
+    draw = ELO_DRAW_MAX * (1 - np.abs(2 * expected - 1))
+    return expected - draw / 2, draw, 1 - expected - draw / 2
+
+
+def rating_1x2_weight(home_matches, away_matches):
+    """
+    Peso dos ratings no 1X2, proporcional às partidas processadas do time com menos jogos
+
+    Um rating recém-iniciado ainda está perto de ELO_INITIAL e diz pouco sobre o
+    time; o peso cresce linearmente até RATING_1X2_WEIGHT.
+
+    Args:
+        home_matches (int): Partidas processadas do mandante (None = sem contagem, peso cheio)
+        away_matches (int): Partidas processadas do visitante
+
+    Returns:
+        float: Peso entre 0 e RATING_1X2_WEIGHT
+    """
+    counts = [count for count in (home_matches, away_matches) if count is not None]
+    if not counts:
+        return RATING_1X2_WEIGHT
+    return RATING_1X2_WEIGHT * min(1.0, max(0.0, min(counts) / RATING_FULL_WEIGHT_MATCHES))
+
+
+def _rated_result(match):
+    """(match_id, date_unix, home_id, away_id, gols casa, gols fora) ou None se a partida não serve"""
+    if not extract_match_totals(match):
+        return None
+    try:
+        row = (int(match["id"]), int(match.get("date_unix") or 0), int(match["homeID"]), int(match["awayID"]),
+               match["homeGoalCount"], match["awayGoalCount"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return row if row[2] != row[3] else None
+
+
+class EloRatings:
+    """
+    Ratings em memória (replay de uma temporada no backtest, ou do histórico inteiro)
+    """
+
+    def __init__(self, ratings=None):
+        self.ratings = dict(ratings or {})
+        self.matches = {}
+
+    def rating(self, team_id):
+        return self.ratings.get(team_id, ELO_INITIAL)
+
+    def update(self, home_id, away_id, home_goals, away_goals):
+        """Aplica uma partida concluída (O(1))"""
+        self.ratings[home_id], self.ratings[away_id] = elo_update(
+            self.rating(home_id), self.rating(away_id), home_goals, away_goals)
+        self.matches[home_id] = self.matches.get(home_id, 0) + 1
+        self.matches[away_id] = self.matches.get(away_id, 0) + 1
+
+    def features(self, team_id):
+        """
+        Campos de utils/team_features do time (elo_rating e elo_matches)
+
+        Returns:
+            dict: {} se o time ainda não tem partidas processadas (como em stored_ratings_for_payload)
+        """
+        matches = self.matches.get(team_id, 0)
+        if not matches:
+            return {}
+        return {"elo_rating": self.rating(team_id), "elo_matches": matches}
+
+
+class TeamRatingStore:
+    """
+    Ratings Elo persistidos, atualizados por partida concluída
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or TEAM_RATINGS_DB_FILE
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rated_matches (
+                    match_id INTEGER PRIMARY KEY,
+                    date_unix INTEGER
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS team_ratings (
+                    team_id INTEGER PRIMARY KEY,
+                    rating REAL NOT NULL,
+                    matches INTEGER NOT NULL,
+                    last_match_unix INTEGER,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _write(self, conn, elo, last_match):
+        now = time.time()
+        conn.executemany(
+            "INSERT OR REPLACE INTO team_ratings (team_id, rating, matches, last_match_unix, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(team_id, elo.ratings[team_id], elo.matches[team_id], last_match.get(team_id), now)
+             for team_id in elo.matches]
+        )
+
+    def ingest_matches(self, matches):
+        """
+        Aplica as partidas concluídas ainda não processadas (em ordem cronológica dentro do lote)
+
+        Args:
+            matches (list): Partidas do league-matches
+
+        Returns:
+            int: Partidas novas
+        """
+        results = sorted(filter(None, (_rated_result(match) for match in matches or [])),
+                         key=lambda row: (row[1], row[0]))
+        if not results:
+            return 0
+
+        with self._lock, self._connect() as conn:
+            newest = conn.execute("SELECT MAX(date_unix) FROM rated_matches").fetchone()[0]
+            known = set()
+            for start in range(0, len(results), 500):
+                chunk = [row[0] for row in results[start:start + 500]]
+                known.update(match_id for (match_id,) in conn.execute(
+                    f"SELECT match_id FROM rated_matches WHERE match_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                ))
+            # Partidas já processadas, ou repetidas no lote, ficam de fora
+            pending = []
+            for row in results:
+                if row[0] not in known:
+                    known.add(row[0])
+                    pending.append(row)
+            results = pending
+            if not results:
+                return 0
+
+            # Ratings atuais só dos times envolvidos
+            team_ids = list({team_id for row in results for team_id in row[2:4]})
+            elo = EloRatings()
+            matches_before = {}
+            for start in range(0, len(team_ids), 500):
+                chunk = team_ids[start:start + 500]
+                for team_id, rating, matches in conn.execute(
+                    f"SELECT team_id, rating, matches FROM team_ratings "
+                    f"WHERE team_id IN ({', '.join('?' for _ in chunk)})", chunk
+                ):
+                    elo.ratings[team_id] = rating
+                    matches_before[team_id] = matches
+
+            last_match = {}
+            for match_id, date_unix, home_id, away_id, home_goals, away_goals in results:
+                elo.update(home_id, away_id, home_goals, away_goals)
+                last_match[home_id] = last_match[away_id] = date_unix
+            for team_id, matches in matches_before.items():
+                elo.matches[team_id] += matches
+
+            conn.executemany("INSERT INTO rated_matches (match_id, date_unix) VALUES (?, ?)",
+                             [row[:2] for row in results])
+            self._write(conn, elo, last_match)
+
+        late = sum(1 for row in results if newest is not None and row[1] < newest)
+        if late:
+            logger.warning(f"{late} partidas anteriores à última já processada aplicadas fora de ordem "
+                           f"(use --replay para recalcular em ordem cronológica)")
+        logger.info(f"{len(results)} partidas novas nos ratings de {len(elo.matches)} times")
+        return len(results)
+
+    def replay(self, results):
+        """
+        Recalcula todos os ratings do zero, em ordem cronológica
+
+        Args:
+            results (iterable): (match_id, date_unix, home_id, away_id, gols casa, gols fora)
+
+        Returns:
+            int: Partidas processadas
+        """
+        results = sorted(results, key=lambda row: (row[1], row[0]))
+        elo = EloRatings()
+        last_match = {}
+        seen = set()
+        rated = []
+        for row in results:
+            match_id, date_unix, home_id, away_id, home_goals, away_goals = row
+            if match_id in seen:
+                continue
+            seen.add(match_id)
+            elo.update(home_id, away_id, home_goals, away_goals)
+            last_match[home_id] = last_match[away_id] = date_unix
+            rated.append((match_id, date_unix))
+
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM rated_matches")
+            conn.execute("DELETE FROM team_ratings")
+            conn.executemany("INSERT INTO rated_matches (match_id, date_unix) VALUES (?, ?)", rated)
+            self._write(conn, elo, last_match)
+
+        logger.info(f"Replay: {len(rated)} partidas, {len(elo.matches)} times")
+        return len(rated)
+
+    def get_rating(self, team_id):
+        """Rating do time (None se o time não tem partidas processadas)"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT rating FROM team_ratings WHERE team_id = ?", (int(team_id),)).fetchone()
+        return row[0] if row else None
+
+    def get_rating_features(self, team_id):
+        """
+        Campos de utils/team_features do time (elo_rating e elo_matches)
+
+        Returns:
+            dict: Campos ou None se o time não tem partidas processadas
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT rating, matches FROM team_ratings WHERE team_id = ?",
+                               (int(team_id),)).fetchone()
+        return {"elo_rating": row[0], "elo_matches": row[1]} if row else None
+
+    def get_ratings(self, team_ids):
+        """
+        Ratings de vários times como array (entrada vetorizada do motor de probabilidades)
+
+        Returns:
+            np.ndarray: Ratings (ELO_INITIAL para times sem partidas)
+        """
+        team_ids = [int(team_id) for team_id in team_ids]
+        found = {}
+        with self._lock, self._connect() as conn:
+            for start in range(0, len(team_ids), 500):
+                chunk = team_ids[start:start + 500]
+                found.update(conn.execute(
+                    f"SELECT team_id, rating FROM team_ratings WHERE team_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                ))
+        return np.array([found.get(team_id, ELO_INITIAL) for team_id in team_ids], dtype=np.float64)
+
+    def stats(self):
+        """Resumo: times, partidas processadas e faixa dos ratings"""
+        with self._lock, self._connect() as conn:
+            teams, low, high = conn.execute(
+                "SELECT COUNT(*), MIN(rating), MAX(rating) FROM team_ratings").fetchone()
+            matches = conn.execute("SELECT COUNT(*) FROM rated_matches").fetchone()[0]
+        return {"teams": teams, "matches": matches, "min_rating": low, "max_rating": high}
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_team_rating_store():
+    """Instância única dos ratings no processo"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = TeamRatingStore()
+        return _shared_store
+
+
+def stored_ratings_for_payload(api_data):
+    """
+    Ratings dos dois times de um payload complete_analysis
+
+    Não cria o banco: sem ratings processados, retorna None sem tocar no disco.
+
+    Args:
+        api_data (dict): Payload com basic_stats.home_team.id e basic_stats.away_team.id
+
+    Returns:
+        tuple: (campos do mandante, campos do visitante) - dicts com elo_rating e
+               elo_matches - ou None se algum dos times não tem rating
+    """
+    try:
+        basic_stats = api_data["basic_stats"]
+        home_team_id = int(basic_stats["home_team"]["id"])
+        away_team_id = int(basic_stats["away_team"]["id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if _shared_store is None and not os.path.exists(TEAM_RATINGS_DB_FILE):
+        return None
+
+    try:
+        store = get_team_rating_store()
+        home_rating = store.get_rating_features(home_team_id)
+        away_rating = store.get_rating_features(away_team_id)
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao consultar os ratings dos times: {str(e)}")
+        return None
+    if home_rating is None or away_rating is None:
+        return None
+    return home_rating, away_rating
+
+
+def replay_stored_seasons(store=None):
+    """
+    Recalcula os ratings com todas as partidas concluídas do armazém local
+
+    As colunas vêm do armazém como arrays (sem decodificar o JSON das partidas).
+
+    Returns:
+        int: Partidas processadas
+    """
+    from utils.match_warehouse import get_match_warehouse
+
+    store = store or get_team_rating_store()
+    columns = get_match_warehouse().load_columns(
+        ["match_id", "date_unix", "home_id", "away_id", "home_goals", "away_goals"])
+    valid = ~(np.isnan(columns["home_goals"]) | np.isnan(columns["away_goals"]))
+    results = zip(
+        *(columns[name][valid].astype(np.int64).tolist()
+          for name in ("match_id", "date_unix", "home_id", "away_id", "home_goals", "away_goals"))
+    )
+    return store.replay(results)
+
+
+def build_team_ratings(league_ids=None, fetch_missing=False, store=None):
+    """
+    Job em lote: aplica as partidas concluídas novas de todas as ligas do registro
+
+    Args:
+        league_ids (list, optional): IDs de temporada (padrão: todo o registro)
+        fetch_missing (bool): Se True, busca na API as temporadas que não estão no cache
+        store (TeamRatingStore, optional): Destino (padrão: o compartilhado)
+
+    Returns:
+        int: Partidas novas
+    """
+    from utils.league_factors import get_registry_league_ids
+    from utils.footystats_api import load_cached_league_matches, fetch_league_matches
+    from utils.match_warehouse import load_warehouse_matches
+
+    store = store or get_team_rating_store()
+    if league_ids is None:
+        league_ids = get_registry_league_ids()
+
+    # Um único lote: as partidas de todas as ligas entram em ordem cronológica
+    matches = []
+    for league_id in league_ids:
+        league_matches = load_warehouse_matches(league_id)
+        if not league_matches:
+            league_matches = (fetch_league_matches(league_id) if fetch_missing
+                              else load_cached_league_matches(league_id))
+        if not league_matches:
+            logger.warning(f"Sem partidas em cache para a liga {league_id}, ignorando")
+            continue
+        matches.extend(league_matches)
+
+    return store.ingest_matches(matches)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Atualiza os ratings Elo dos times")
+    parser.add_argument("--fetch", action="store_true", help="Buscar na API as temporadas sem cache")
+    parser.add_argument("--replay", action="store_true",
+                        help="Recalcular tudo em ordem cronológica a partir do armazém local")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    if args.replay:
+        processed = replay_stored_seasons()
+    else:
+        processed = build_team_ratings(fetch_missing=args.fetch)
+    summary = get_team_rating_store().stats()
+    print(f"Partidas processadas: {processed} em {time.perf_counter() - started:.2f}s | "
+          f"Total: {summary['teams']} times, {summary['matches']} partidas")
+
+
+if __name__ == "__main__":
+    main()
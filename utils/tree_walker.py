@@ -0,0 +1,154 @@
+# utils/tree_walker.py - Percurso iterativo e limitado de payloads aninhados
+"""
+Percurso em profundidade (pré-ordem, a mesma ordem da recursão que substitui)
+de dicionários e listas, sem recursão do Python e com limites de profundidade
+e de nós, usado pelas buscas genéricas de utils/prompt_adapter.py e
+utils/extraction_plan.py.
+
+Cada busca é um callback chamado com (nó, caminho) para cada dicionário ou
+lista; várias buscas podem ser feitas em uma única passada pela árvore.
+Valores escalares não são visitados. O caminho ("a.b[0].c") só é montado
+como texto se um callback pedir.
+"""
+import logging
+
+# Configuração de logging
+logger = logging.getLogger("valueHunter.tree_walker")
+
+# Payloads da FootyStats têm poucos níveis; league-matches tem milhares de nós
+DEFAULT_MAX_DEPTH = 32
+DEFAULT_MAX_NODES = 200000
+
+
+class TreePath:
+    """
+    Caminho de um nó, montado como texto apenas quando pedido
+
+    O texto segue o formato das buscas recursivas: chaves separadas por "."
+    e índices de lista entre colchetes ("basic_stats.home_team.stats[0]").
+
+    Args:
+        parent (TreePath): Caminho do nó pai (None na raiz)
+        key: Chave do dicionário ou índice da lista no pai
+        in_list (bool): True se key é um índice de lista
+    """
+
+    __slots__ = ("parent", "key", "in_list", "_text")
+
+    def __init__(self, parent=None, key=None, in_list=False):
+        self.parent = parent
+        self.key = key
+        self.in_list = in_list
+        self._text = None if parent is not None else ""
+
+    def __str__(self):
+        if self._text is None:
+            # Sobe até o primeiro ancestral com texto já montado
+            pending = []
+            node = self
+            while node._text is None:
+                pending.append(node)
+                node = node.parent
+            text = node._text
+            for node in reversed(pending):
+                if node.in_list:
+                    text = f"{text}[{node.key}]"
+                else:
+                    text = f"{text}.{node.key}" if text else str(node.key)
+                node._text = text
+        return self._text
+
+    def __repr__(self):
+        return f"TreePath({str(self)!r})"
+
+    def lower(self):
+        return str(self).lower()
+
+
+ROOT_PATH = TreePath()
+
+_CONTAINERS = (dict, list)
+
+
+def _callbacks(value):
+    if value is None:
+        return ()
+    if callable(value):
+        return (value,)
+    return tuple(value)
+
+
+def walk_tree(root, on_dict=None, on_list=None, max_depth=DEFAULT_MAX_DEPTH, max_nodes=DEFAULT_MAX_NODES):
+    """
+    Percorre dicionários e listas em profundidade, sem recursão
+
+    Os callbacks de cada nó rodam antes dos filhos serem examinados, na mesma
+    ordem da busca recursiva equivalente. Um nó referenciado em dois lugares
+    é visitado duas vezes, como na recursão.
+
+    Args:
+        root: Raiz (dicionário ou lista)
+        on_dict (callable|iterable): Callback(s) (nó, TreePath) para cada dicionário
+        on_list (callable|iterable): Callback(s) (nó, TreePath) para cada lista
+        max_depth (int): Profundidade máxima visitada (raiz = 0)
+        max_nodes (int): Máximo de dicionários e listas visitados
+
+    Returns:
+        int: Nós visitados
+    """
+    on_dict = _callbacks(on_dict)
+    on_list = _callbacks(on_list)
+
+    if not isinstance(root, _CONTAINERS):
+        return 0
+    if max_nodes <= 0:
+        logger.warning(f"Busca interrompida no limite de {max_nodes} nós")
+        return 0
+
+    # Pilha de iteradores (pares chave/valor ou índice/item) dos nós abertos:
+    # escalares são descartados sem chamada de função nem caminho
+    stack = []
+    visited = 0
+    depth_limited = False
+    node, path, depth = root, ROOT_PATH, 0
+    while True:
+        visited += 1
+        if isinstance(node, dict):
+            for callback in on_dict:
+                callback(node, path)
+            if node:
+                if depth < max_depth:
+                    stack.append((iter(node.items()), path, False, depth))
+                else:
+                    depth_limited = True
+        else:
+            for callback in on_list:
+                callback(node, path)
+            if node:
+                if depth < max_depth:
+                    stack.append((enumerate(node), path, True, depth))
+                else:
+                    depth_limited = True
+
+        # Próximo dicionário ou lista em pré-ordem
+        node = None
+        while stack:
+            items, parent, in_list, parent_depth = stack[-1]
+            for key, value in items:
+                if isinstance(value, _CONTAINERS):
+                    node = value
+                    break
+            if node is not None:
+                break
+            stack.pop()
+        if node is None:
+            break
+        if visited >= max_nodes:
+            logger.warning(f"Busca interrompida no limite de {max_nodes} nós")
+            break
+        path = TreePath(parent, key, in_list)
+        depth = parent_depth + 1
+
+    if depth_limited:
+        logger.debug(f"Nós abaixo da profundidade {max_depth} ignorados")
+    return visited